@@ -0,0 +1,44 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The modules of WSPR_TX_Config, the configuration tool for ZachTek WSPR devices
+
+Structure of the code:
+   common - items needed to get python started
+   widgets - Tk helpers: TipManager(), CreateToolTip(), CreateCanvasTip(),
+             CreateInfoButton(), InfoDialog(), and MC(), a mirror clock,
+             because the GPS time reports are not constant
+   model - Model(), the logic needed to work with the device, SocketPort(),
+           the Model's port when the device is shared by the Daemon, and
+           DeviceState(), the last values reported by the device
+   gps - GPSStats(), rolling GPS signal statistics per satellite,
+         ClockOffset(), the host clock against GPS time, and
+         SkyCoverage(), long term map of where satellites are heard
+   txlog - TxLog(), the local log of WSPR transmissions
+   capture - Capture(), a compressed record of the lines sent and received
+   encoder - WSPREncoder(), the symbols a WSPR message is sent as
+   metrics - Metrics(), named values for monitoring
+   profiles - Profiles(), named sets of device settings, saved to a file
+   inventory - StateCache(), the last known settings of each device, and
+               Inventory(), the devices seen, with their firmware and configuration
+   spots - SpotArchive(), the spots of our callsigns in a WSPRnet archive
+   views - NullView(), the commands a View is given, doing nothing, and
+           RecordingView(), a View keeping the commands it is given
+   gui - View(), the tkinter GUI
+   term - TermView(), a curses View for terminals
+   transaction - Transaction(), a group of setting writes, verified by the device's reports
+   script - Script(), an expect style command script
+   poller - Poller(), asks for the fields the device does not report by itself
+   alerts - Alerts(), rules for the conditions to be alerted to, and where alerts go
+   hooks - Hooks(), local commands and named pipes told of changes on the device
+   watchdog - Watchdog(), notices a dead link to the device and reopens the port
+   controller - Controller(), ties together the Model and View and runs the app
+   daemon - Daemon(), owns the device and shares it with local clients,
+            and DaemonClient(), a connection to the Daemon
+   web - WebServer(), a read only status page served over HTTP
+   firmware - IntelHex(), a firmware image from an Intel HEX file, STK500(),
+              the bootloader protocol, FirmwareUpdate(), writes and verifies
+              firmware on a device, and SimBootloader(), a pretend device
+              for trying out firmware updates
+   main - main(), the command line, that instatiates and boots the app
+"""
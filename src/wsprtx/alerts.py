@@ -0,0 +1,240 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Rules for the conditions to be alerted to, and where alerts go
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from .common import monotonic
+
+# Alerts - the conditions an unattended beacon should be looked at for
+#
+# Each rule watches one code, and the messages with other codes pass
+# it by, so the cost of a message does not grow with the rules.  The
+# rules are a list of objects, from a JSON file (--alerts) or the
+# defaults below:
+#   name     - names the alert
+#   code     - the code watched (not for "unknown")
+#   kind     - "equals": the data starts with "value"
+#              "below", "above": the data is a number beyond "value";
+#                  once firing, it must pass "clear" to stop (hysteresis)
+#              "absence": the code is not heard for "for" seconds,
+#                  "cycle" being one beacon cycle plus the pause (OTP)
+#              "unknown": a response the program does not know
+#   for      - seconds the condition must hold before the alert fires
+#   clear_for - seconds it must be gone before the alert is resolved
+#   while    - {code: value} that the device state must match, for the
+#              rule to be watched at all (as {"CCM": "W"}, beaconing)
+#   repeat   - seconds after which a firing alert is sent again, 0 never
+#   message  - the text sent
+# An alert is sent when it fires and when it is resolved, once each,
+# however many messages hold the condition up.  Unknown responses are
+# sent once for each code in "repeat" seconds.
+#
+class Alerts(object):
+    """
+    Notices the conditions of its rules in the messages, and sends alerts
+
+        rules            - the rules, see above
+        sinks            - functions given each alert (a dict)
+        message(code,data) - notes a message
+        unknown(line)    - notes a response that is not understood
+        check()          - called from the main loop, for the rules that wait on time
+        active           - {name: alert} of the alerts firing now
+        toLog(filename), toJSON(out), toDesktop() - sinks
+    """
+    defaults = [{'name': 'gps_lock', 'code': 'GLC', 'kind': 'equals', 'value': 'F', 'for': 600, 'clear_for': 60,
+                 'message': 'GPS position lock lost'},
+                {'name': 'no_transmission', 'code': 'TWS', 'kind': 'absence', 'for': 'cycle', 'while': {'CCM': 'W'},
+                 'message': 'No transmission for longer than a beacon cycle'},
+                {'name': 'unknown_response', 'kind': 'unknown', 'repeat': 3600,
+                 'message': 'Unknown response from the device'}]
+    kinds = ['equals', 'below', 'above', 'absence', 'unknown']
+
+    def __init__(self, controller, rules = None, sinks = None):
+        self._vc = controller
+        self.rules = [dict(_r) for _r in (self.defaults if rules is None else rules)]
+        self.sinks = list(sinks or [])
+        self.active = {}
+        self._byCode = {}
+        self._unknown = {}
+        self._checked = 0
+        _now = monotonic()
+        for _r in self.rules:
+            if _r.get('kind') not in self.kinds or 'name' not in _r or (_r['kind'] != 'unknown' and 'code' not in _r):
+                raise ValueError('alert rule {} needs a name, a code and a kind ({})'.format(
+                    json.dumps(_r, sort_keys = True), ', '.join(self.kinds)))
+            if _r['kind'] in ['below', 'above']:
+                _r['value'] = float(_r['value'])
+                _r['clear'] = float(_r.get('clear', _r['value']))
+            _r['_since'] = None   # when the condition began to hold
+            _r['_clear'] = None   # when it began to be gone, while firing
+            _r['_seen'] = _now    # when the code was last heard
+            _r['_sent'] = 0
+            _r['_data'] = None
+            if 'code' in _r:
+                self._byCode.setdefault(_r['code'], []).append(_r)
+
+    @staticmethod
+    def load(filename):
+        """The rules in a JSON file"""
+        with open(filename) as _f:
+            _rules = json.load(_f)
+        if not isinstance(_rules, list):
+            raise ValueError('{} should hold a list of rules'.format(filename))
+        return _rules
+
+    def _holds(self, rule, data):
+        _k = rule['kind']
+        if _k == 'equals':
+            return data[0:len(rule['value'])] == rule['value']
+        try:
+            _v = float(data)
+        except ValueError:
+            return rule['_since'] is not None or rule['name'] in self.active # no news, no change
+        _firing = rule['name'] in self.active
+        if _k == 'below':
+            return _v < (rule['clear'] if _firing else rule['value'])
+        return _v > (rule['clear'] if _firing else rule['value'])
+
+    def _watched(self, rule):
+        for _code, _value in rule.get('while', {}).items():
+            if self._vc.state.get(_code, '')[0:len(_value)] != _value:
+                return False
+        return True
+
+    def message(self, code, data):
+        _rules = self._byCode.get(code)
+        if _rules is None:
+            return
+        _now = monotonic()
+        for _r in _rules:
+            _r['_seen'] = _now
+            _r['_data'] = data
+            if _r['kind'] == 'absence':
+                self._update(_r, False, _now)
+            else:
+                self._update(_r, self._holds(_r, data) and self._watched(_r), _now)
+
+    def unknown(self, line):
+        _now = monotonic()
+        for _r in self.rules:
+            if _r['kind'] != 'unknown':
+                continue
+            _code = line[1:4]
+            if _now - self._unknown.get(_code, -1e9) < _r.get('repeat', 3600):
+                continue
+            self._unknown[_code] = _now
+            if len(self._unknown) > 1000: # a device sending noise
+                self._unknown.clear()
+            self._send(_r, 'event', line)
+
+    def _update(self, rule, holds, now, wait = None):
+        _name = rule['name']
+        if holds:
+            rule['_clear'] = None
+            if rule['_since'] is None:
+                rule['_since'] = now
+            if _name not in self.active and now - rule['_since'] >= (rule.get('for', 0) if wait is None else wait):
+                self._send(rule, 'firing', rule['_data'])
+        else:
+            rule['_since'] = None
+            if _name in self.active:
+                if rule['_clear'] is None:
+                    rule['_clear'] = now
+                if now - rule['_clear'] >= rule.get('clear_for', 0):
+                    self._send(rule, 'resolved', rule['_data'])
+
+    def check(self):
+        _now = monotonic()
+        if _now - self._checked < 1:
+            return
+        self._checked = _now
+        for _r in self.rules:
+            _k = _r['kind']
+            if _k == 'unknown':
+                continue
+            if not self._watched(_r):
+                _r['_seen'] = _now # a rule starts afresh when it is watched again
+                _r['_since'] = _r['_clear'] = None
+                if _r['name'] in self.active:
+                    self._send(_r, 'resolved', _r['_data'])
+            elif _k == 'absence':
+                _for = _r.get('for', 0)
+                if _for == 'cycle':
+                    _p = self._vc.state.get('OTP', '0')
+                    _for = 240 + (int(_p) if _p.isdigit() else 0)
+                _missing = _now - _r['_seen'] > _for
+                if _missing:
+                    _r['_data'] = None # the last one heard is not news
+                self._update(_r, _missing, _now, 0) # the wait is in the holding
+            elif _r['_since'] is not None or _r['_clear'] is not None:
+                self._update(_r, _r['_since'] is not None, _now)
+            _name = _r['name']
+            if _name in self.active and _r.get('repeat', 0) > 0 and _now - _r['_sent'] >= _r['repeat']:
+                self._send(_r, 'firing', _r['_data'])
+
+    def _send(self, rule, state, data):
+        _alert = {'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'rule': rule['name'],
+                  'state': state, 'message': rule.get('message', rule['name']), 'data': data}
+        if 'code' in rule:
+            _alert['code'] = rule['code']
+        rule['_sent'] = monotonic()
+        if state == 'firing':
+            self.active[rule['name']] = _alert
+        elif state == 'resolved':
+            self.active.pop(rule['name'], None)
+        self._vc.metrics.inc('alerts_total', labels = {'rule': rule['name']}, help = 'Alerts sent')
+        self._vc.metrics.set('alert_active', 1 if rule['name'] in self.active else 0, {'rule': rule['name']},
+                             help = 'Whether the alert is firing')
+        for _sink in self.sinks:
+            try:
+                _sink(_alert)
+            except (IOError, OSError) as e:
+                sys.stderr.write('Alert not sent: {}\n'.format(e))
+
+    @staticmethod
+    def text(alert):
+        _t = '{} {} {}: {}'.format(alert['time'], alert['state'].upper(), alert['rule'], alert['message'])
+        if alert.get('data'):
+            _t += ' ({})'.format(alert['data'])
+        return _t
+
+    @staticmethod
+    def toLog(filename):
+        def sink(alert):
+            with open(filename, 'a') as _f:
+                _f.write(Alerts.text(alert) + '\n')
+        return sink
+
+    @staticmethod
+    def toJSON(out):
+        def sink(alert):
+            out.write(json.dumps(alert, sort_keys = True) + '\n')
+            out.flush()
+        return sink
+
+    @staticmethod
+    def toDesktop():
+        """A sink for the desktop's notifications, or None if there is no way to send them"""
+        if sys.platform.startswith('darwin'):
+            _command = lambda _title, _text: ['osascript', '-e', 'display notification {} with title {}'.format(
+                json.dumps(_text), json.dumps(_title))]
+        elif any(os.access(os.path.join(_d, 'notify-send'), os.X_OK)
+                 for _d in os.environ.get('PATH', '').split(os.pathsep)):
+            _command = lambda _title, _text: ['notify-send', _title, _text]
+        else:
+            return None
+        _running = []
+        def sink(alert):
+            _running[:] = [_p for _p in _running if _p.poll() is None] # collect the finished ones
+            if len(_running) > 4:
+                return
+            _title = 'WSPR TX: {}'.format(alert['rule'])
+            _text = '{} {}'.format('Resolved:' if alert['state'] == 'resolved' else '', alert['message']).strip()
+            _running.append(subprocess.Popen(_command(_title, _text)))
+        return sink
@@ -0,0 +1,177 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+A compressed record of the lines sent to and received from the device
+"""
+
+import bisect
+import os
+import struct
+import time
+import zlib
+from .common import monotonic
+
+# Capture - every line sent to and received from the device
+#
+# For bug reports, and for looking back at what a device did days ago.
+# Each line is recorded with its direction and the time it arrived (or
+# was sent) in nanoseconds since 1970.  Lines are gathered into blocks,
+# and each block is compressed with zlib and written with a header
+# holding its first and last times, so the cost of a line is a little
+# packing and, now and then, a compression.
+#
+# The file is:
+#   magic, blocks..., index, trailer
+#   block   - 'BLK1', first ns, last ns, line count, size, then the
+#             compressed lines: ns, direction, length, the line
+#   index   - the first ns, last ns, offset and line count of each block
+#   trailer - the offset of the index, 'IDX1'
+# A reader finds the blocks for a time from the index, and decompresses
+# only those.  If the program stopped without writing the index, the
+# block headers are read instead (without decompressing anything), and
+# a block that was only partly written is dropped.  Opening a capture
+# again removes the index, appends blocks, and writes the index anew.
+#
+class Capture(object):
+    """
+    Compressed capture of the lines sent to and received from the device
+
+        add(direction,line,ns)     - records a line (RX or TX), at ns nanoseconds (default now)
+        flush(age)                 - writes the lines gathered as a block, if older than age seconds
+        close()                    - writes the last block, and the index
+        read(filename,since,until) - yields (ns, direction, line) between the times (ns), oldest first
+        text(filename,out,since,until) - writes the lines as text, returns the count
+    """
+    RX = 0
+    TX = 1
+    blockSize = 65536 # bytes of lines gathered into a block
+    _magic = b'WSPRCAP1'
+    _block = struct.Struct('<4sqqII')
+    _line = struct.Struct('<qBH')
+    _entry = struct.Struct('<qqQI')
+    _trailer = struct.Struct('<Q4s')
+
+    def __init__(self, filename):
+        self.filename = filename
+        if not os.path.exists(filename):
+            with open(filename, 'wb') as _f:
+                _f.write(self._magic)
+        self._f = open(filename, 'r+b')
+        try:
+            self.index, _end = self._blocks(self._f)
+        except ValueError:
+            self._f.close()
+            raise
+        self._f.seek(_end)
+        self._f.truncate()
+        self._lines = []
+        self._size = 0
+        self._first = self._last = None
+        self._started = monotonic()
+
+    @staticmethod
+    def now():
+        """The time in nanoseconds since 1970"""
+        if hasattr(time, 'time_ns'):
+            return time.time_ns()
+        return int(time.time() * 1000000000)
+
+    @classmethod
+    def _blocks(cls, f):
+        # The index entries, and where the blocks end
+        f.seek(0)
+        if f.read(len(cls._magic)) != cls._magic:
+            raise ValueError('{} is not a capture'.format(getattr(f, 'name', 'file')))
+        f.seek(0, 2)
+        _len = f.tell()
+        if _len >= len(cls._magic) + cls._trailer.size:
+            f.seek(_len - cls._trailer.size)
+            _at, _tag = cls._trailer.unpack(f.read(cls._trailer.size))
+            _n = (_len - cls._trailer.size - _at) // cls._entry.size
+            if _tag == b'IDX1' and _at >= len(cls._magic) and _at + _n * cls._entry.size + cls._trailer.size == _len:
+                f.seek(_at)
+                _raw = f.read(_n * cls._entry.size)
+                return [cls._entry.unpack_from(_raw, _i * cls._entry.size) for _i in range(_n)], _at
+        # No index, so walk the block headers
+        _index = []
+        _at = len(cls._magic)
+        while _at + cls._block.size <= _len:
+            f.seek(_at)
+            _tag, _first, _last, _count, _size = cls._block.unpack(f.read(cls._block.size))
+            if _tag != b'BLK1' or _at + cls._block.size + _size > _len:
+                break
+            _index.append((_first, _last, _at, _count))
+            _at += cls._block.size + _size
+        return _index, _at
+
+    def add(self, direction, line, ns = None):
+        if ns is None:
+            ns = self.now()
+        if not isinstance(line, bytes):
+            line = line.encode('ascii', 'replace')
+        line = line[0:65535]
+        self._lines.append(self._line.pack(ns, direction, len(line)))
+        self._lines.append(line)
+        self._size += self._line.size + len(line)
+        if self._first is None:
+            self._first = self._last = ns
+            self._started = monotonic()
+        self._first = min(ns, self._first) # a line received is stamped back to when it began to arrive
+        self._last = max(ns, self._last)
+        if self._size >= self.blockSize:
+            self.flush()
+
+    def flush(self, age = 0):
+        if self._size == 0 or monotonic() - self._started < age:
+            return
+        _data = zlib.compress(b''.join(self._lines), 6)
+        _count = len(self._lines) // 2
+        _at = self._f.tell()
+        self._f.write(self._block.pack(b'BLK1', self._first, self._last, _count, len(_data)))
+        self._f.write(_data)
+        self._f.flush()
+        self.index.append((self._first, self._last, _at, _count))
+        self._lines = []
+        self._size = 0
+        self._first = self._last = None
+
+    def close(self):
+        if self._f is None:
+            return
+        self.flush()
+        _at = self._f.tell()
+        self._f.write(b''.join(self._entry.pack(*_e) for _e in self.index))
+        self._f.write(self._trailer.pack(_at, b'IDX1'))
+        self._f.close()
+        self._f = None
+
+    @classmethod
+    def read(cls, filename, since = None, until = None):
+        with open(filename, 'rb') as _f:
+            _index, _end = cls._blocks(_f)
+            # Blocks are in time order, so the first one wanted is found by a binary search
+            _n = bisect.bisect_left([_e[1] for _e in _index], since) if since is not None else 0
+            for _first, _last, _at, _count in _index[_n:]:
+                if until is not None and _first >= until:
+                    break
+                _f.seek(_at)
+                _size = cls._block.unpack(_f.read(cls._block.size))[4]
+                _data = zlib.decompress(_f.read(_size))
+                _p = 0
+                while _p < len(_data):
+                    _ns, _dir, _len = cls._line.unpack_from(_data, _p)
+                    _p += cls._line.size
+                    _line = _data[_p:_p + _len]
+                    _p += _len
+                    if (since is None or _ns >= since) and (until is None or _ns < until):
+                        yield _ns, _dir, _line.decode('ascii', 'replace')
+
+    @classmethod
+    def text(cls, filename, out, since = None, until = None):
+        _n = 0
+        for _ns, _dir, _line in cls.read(filename, since, until):
+            _s, _frac = divmod(_ns, 1000000000)
+            out.write('{}.{:09d}Z {} {}\n'.format(time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(_s)), _frac,
+                                                  '<' if _dir == cls.RX else '>', _line))
+            _n += 1
+        return _n
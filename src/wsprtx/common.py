@@ -0,0 +1,40 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Python preliminaries: items needed by all of the modules
+"""
+#
+# Python needs a bit of setup before entering the MVC structure, even before
+# we get to main(). This includes importing some libraries to interact with
+# the platform, os, tkinter, etc.
+#
+# Currently, we support both Python 2.x (mainly for MacOS) and Python 3.x
+#
+import sys     # system hooks
+import os      # operating system hooks
+import time    # timeouts for pipelined device exchanges
+
+VERSION = "0.0.1"  ### Beta Version
+
+debug = False  # set by -d, for debug information on stdout
+
+# tkinter is named differently in 2.x vs 3.x, as is the http server
+if sys.version_info[0] < 3:
+    python = 2
+else:
+    python = 3
+
+# time.monotonic() is not available in Python 2.x
+if hasattr(time, 'monotonic'):
+    monotonic = time.monotonic
+else:
+    monotonic = time.time
+
+def configDir(create = True):
+    """
+    Returns the directory where saved settings are kept, creating it if needed (and wanted)
+    """
+    _d = os.path.join(os.path.expanduser('~'), '.WSPR_TX_Config')
+    if create and not os.path.isdir(_d):
+        os.makedirs(_d)
+    return _d
@@ -0,0 +1,898 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The Controller: ties together the Model and View and runs the app
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from .common import configDir, monotonic
+from .alerts import Alerts
+from .encoder import WSPREncoder
+from .gps import ClockOffset, GPSStats, SkyCoverage
+from .hooks import Hooks
+from .inventory import Inventory, StateCache
+from .metrics import Metrics
+from .model import DeviceState, Model
+from .poller import Poller
+from .profiles import Profiles
+from .script import Script
+from .transaction import Transaction
+from .txlog import TxLog
+from .views import NullView
+from .watchdog import Watchdog
+
+###############################################################################
+#### Controller
+###############################################################################
+#
+# The Controller receives input from the user or other events, validates them,
+# and converts them into commands for the Model and View according to the
+# application logic.
+#
+# The Controller is where the Application Logic is implemented.  It will
+# determine:
+# - Any specific machine-dependant operations
+# - What actions to take from user input
+#
+class Controller():
+    
+    def __init__(self, directory = None):
+        self.view = NullView() # Until a View is attached (as when configuring a device from the command line)
+        self.model = self
+        self.directory = directory or configDir() # Where the files kept between runs are (another for tests)
+        self.sats = []
+        self.fq = 100000000
+        self.rxChars = 0
+        self.state = DeviceState() # Last known values reported by the device
+        self.gpsStats = GPSStats() # Rolling GPS signal statistics
+        self.clock = ClockOffset() # The host clock against GPS time
+        self.sky = SkyCoverage(os.path.join(self.directory, 'sky.dat')) # Long term map of the sky coverage
+        self.sky.load()
+        self._skyDue = monotonic() + 600
+        self.txlog = TxLog(os.path.join(self.directory, 'txlog.dat')) # Local log of the transmissions
+        self._tx = None            # The transmission in progress, for the log
+        self.encoder = WSPREncoder() # Checks that the device's message can be sent
+        self._unsendable = None    # Why it cannot, as last shown
+        self.metrics = Metrics()   # Values for monitoring
+        self.metricsFile = None    # File to write the metrics to, if any
+        self._metricsDue = 0
+        self.watchdog = Watchdog(self) # Reopens the port when the link fails
+        self.poller = Poller(self, {}) # Asks for fields now and then (none until chosen)
+        self.alerts = Alerts(self, [])  # Watches for trouble (no rules until chosen)
+        self.hooks = Hooks(self, [])    # Tells local commands of changes (none until chosen)
+        self.inventory = Inventory(os.path.join(self.directory, 'inventory.db')) # The devices seen
+        self.stateCache = StateCache(os.path.join(self.directory, 'devices.json')) # The last known settings, shown while the device is asked
+        self._stale = set()        # The keys shown from the cache, not yet reported again
+        self._staleEntry = None    # The cache entry they came from
+        self._showing = 0          # Above 0 while the View is given values, not sent them
+        self._writing = []         # The Transactions of the settings entered, being verified
+        self._inventoryDue = None
+        self._device = None        # The inventory id of the device connected
+        self._seenDue = 0
+        self.script = None         # The command script running, if any
+        self.handlers = {'CCM':self.handleCCM, 'OTP':self.handleOTP,
+                         'OSM':self.handleOSM, 'OBD':self.handleOBD,
+                         'OLC':self.handleOLC, 'OPW':self.handleOPW,
+                         
+                         'DCS':self.handleDCS, 'DL4':self.handleDL4,
+                         'DPD':self.handleDPD, 'DNM':self.handleDNM,
+                         'DGF':self.handleDGF,
+              
+                         'FPN':self.handleFPN, 'FHV':self.handleFHV,
+                         'FHR':self.handleFHR, 'FSV':self.handleFSV,
+                         'FSR':self.handleFSR, 'FRF':self.handleFRF,
+                         'FLP':self.handleFLP,
+
+                         'GL4':self.handleGL4,
+                         'GTM':self.handleGTM, 'GLC':self.handleGLC,
+                         'GSI':self.handleGSI, 'TFQ':self.handleTFQ,
+                         'TON':self.handleTON, 'MPS':self.handleMPS,
+                         'MIN':self.handleMIN, 'LPI':self.handleLPI,
+                         'MVC':self.handleMVC, 'TBN':self.handleTBN,
+                         'TWS':self.handleTWS, 'TCC':self.handleTCC}  
+    
+
+    ################################################
+    # Controller: Event handlers from View 
+    ################################################
+    # WSPR Configuration tab
+    def startPressed(self):
+        self.model.sendPort('CCM','S W')
+    def stopPressed(self):
+        self.model.sendPort('CCM','S N')
+
+    def bandCheck(self, enabled):
+        _writes = []
+        for self.band in range(len(self.model.bands())):
+            _writes.append(('OBD', '{0:02d} {1}'.format(self.band, 'E' if enabled[self.band] else 'D')))
+        self.writeSettings(_writes)
+
+    def changeLocation(self, locator):
+        self.v = locator
+        self.writeSettings([('DL4', self.v)])
+    def quitButtonPressed(self):
+        self.parent.destroy()
+    def callUpdate(self, call):
+        self.v = call
+        if len(self.v) > 6:
+            self.v = self.v[:6]
+            self.view.setCall(self.v)
+        self.writeSettings([('CCM', 'N'), ('DCS', self.v)])
+    def pauseUpdate(self, seconds):
+        self.t = seconds
+        if self.t > 99999: # Only allowed 5 digits
+            self.model.sendPort('OTP', 'G')
+        else:
+            self.writeSettings([('OTP', '{0:05d}'.format(self.t))])
+    def rpamGPS(self, *args):
+        self.writeSettings([('OLC', 'G')])
+    def rpamManual(self, *args):
+        self.writeSettings([('OLC', 'M')])
+    def rpmodeNormal(self, *args):
+        self.writeSettings([('OPW', 'N')])
+    def rpmodeAltitude(self, *args):
+        self.writeSettings([('OPW', 'A')])
+    def setBoot(self, mode):
+        self.writeSettings([('OSM', mode)])
+    def rpwrUpdate(self, power):
+        self.t = power
+        self.v = int(self.t)
+        self.writeSettings([('DPD', '{0:02d}'.format(self.v))])
+
+    # Signal Generator tab
+    def addFQ(self,add):
+        t = self.fq + add
+        if t > 100000000000:
+            t -= 100000000000
+        self.fq = t
+        self.model.sendPort('DGF','S '+'{0:012d}'.format(t))
+        self.view.setFQ('{0:012d}'.format(t))
+    def subFQ(self,sub):
+        t = self.fq - sub
+        if t < 0:
+            t = 1
+        self.fq = t
+        self.model.sendPort('DGF','S '+'{0:012d}'.format(t))
+        self.view.setFQ('{0:012d}'.format(t))
+    def up100M(self):
+        self.addFQ(10000000000)
+    def up10M(self):
+        self.addFQ(1000000000)
+    def up1M(self):
+        self.addFQ(100000000)
+    def up100k(self):
+        self.addFQ(10000000)
+    def up10k(self):
+        self.addFQ(1000000)
+    def up1k(self):
+        self.addFQ(100000)
+    def up100Hz(self):
+        self.addFQ(10000)
+    def up10Hz(self):
+        self.addFQ(1000)
+    def up1Hz(self):
+        self.addFQ(100)
+    def up10c(self):
+        self.addFQ(10)
+    def up1c(self):
+        self.addFQ(1)
+    def down100M(self):
+        self.subFQ(10000000000)
+    def down10M(self):
+        self.subFQ(1000000000)
+    def down1M(self):
+        self.subFQ(100000000)
+    def down100k(self):
+        self.subFQ(10000000)
+    def down10k(self):
+        self.subFQ(1000000)
+    def down1k(self):
+        self.subFQ(100000)
+    def down100Hz(self):
+        self.subFQ(10000)
+    def down10Hz(self):
+        self.subFQ(1000)
+    def down1Hz(self):
+        self.subFQ(100)
+    def down10c(self):
+        self.subFQ(10)
+    def down1c(self):
+        self.subFQ(1)
+
+    def startGenerator(self):
+        self.model.sendPort('CCM','S S')
+    # Stop button is same as on the WSPR tab
+        
+    # Serial tab
+    def selectPort(self, name):
+        if self.model.wanted == 'None': # a port that failed is still wanted, until it is closed here
+            self.portName = name                     # the selected new port name
+            self.model.portName = self.portName      # request to set it on the model
+            self.gpsStats.restart()
+        else:
+            self.saveState()
+            self.model.portName = 'None'
+        self.view.setPort(self.model.portName, self.model.wanted != 'None') # set the View based on the Model's state
+        self.view.serialOK(False)
+        self.warmStart()
+
+    # Right side
+    def nameUpdate(self, name):
+        self.n = name
+        self.writeSettings([('DNM', self.n)])
+            
+    # Bottom row
+    def saveSettingsPressed(self):
+        self.view.setSaving(True)
+        self.model.sendPort('CSE', 'S')
+
+    def setDebug(self, state):
+        self.view.setDebug(state)
+            
+    def setCRLF(self):
+        pass
+
+    def sendPressed(self, text, crlf):
+        d = text
+        if crlf:
+            d = d + '\r\n'
+        self.model.sendPort('',d)
+        # clear it?
+        #self.view.sendCommands.set('')
+
+    def scriptPressed(self, name = None):
+        if self.script is not None: # the button stops a script that is running
+            self.script.ok = False
+            return
+        if not name:
+            return
+        try:
+            with open(name) as _f:
+                self.script = Script(self, _f, self.view.traceInsert)
+        except (IOError, ValueError) as e:
+            self.view.traceInsert('Script not run: {}'.format(e))
+            return
+        self.view.traceInsert('Running {}'.format(os.path.basename(name)))
+        self.view.setScriptRunning(True)
+            
+
+    ################################################
+    # Controller: Messages from Model
+    ################################################
+    @staticmethod
+    def splitMessage(msg):
+        """Returns the (code,data) of a message from the device"""
+        _data = ''
+        if len(msg)>5:
+            _data = msg[6:]
+            if msg[5] != ' ': # MIN seems to forget to add this space sometimes
+                _data = msg[5:]
+        return msg[1:4], _data
+
+    def handleMessage(self, msg):
+        if len(msg)<5:
+            sys.stderr.write('Short message: '+msg+'\n')
+            return
+        if msg[0] == '{' and msg[4] == '}':
+            self.watchdog.heard()
+            self.setPortStatus(True)
+        self.resp, self.data = self.splitMessage(msg)
+        if self.script is not None:
+            self.script.feed(self.resp, self.data)
+        self.rnum = self.resp in self.handlers.keys()
+        if self.rnum == False:
+            sys.stderr.write('response: {} is unknown.  Need to upgrade?\n'.format(msg))
+            self.alerts.unknown(msg)
+            return
+        else:
+            self.state.update(self.resp, self.data)
+            if self._stale:
+                self.fresh(DeviceState.key(self.resp, self.data))
+            self.record(self.resp, self.data)
+            self._showing += 1 # what the View is given here came from the device, and is not sent back
+            try:
+                self.handlers[self.resp](self.data)
+            finally:
+                self._showing -= 1
+
+    def handleCCM(self, data): # Current Mode
+        if len(data)<1:
+            self.model.sendPort('CCM','G')
+            return
+        if data[0] == 'N':
+            self.view.setStopped()
+            self.view.program(0)
+        elif data[0] == 'W':
+            self.view.setRunning()
+            self.view.program(1)
+        elif data[0] == 'S':
+            self.view.setGenerating()
+            self.view.program(2)
+        else:
+            sys.stderr.write('unknown CCM received: '+data+'\n')
+            self.model.sendPort('CCM','G')
+    def handleOTP(self, data): # Option TX Pause
+        if data.isdigit():
+            self.v = int(data)
+            self.view.setPauseTime(self.v)
+        else:
+            sys.stderr.write('unknown OTP received: '+data+'\n')
+            self.model.sendPort('OTP','G')
+    def handleOSM(self, data): # Option StartMode
+        if data[0:1] in ['N', 'W', 'S']:
+            self.view.setBoot(data[0])
+        else:
+            sys.stderr.write('unknown OSM received: '+data+'\n')
+            self.model.sendPort('OSM','G')
+    def handleOBD(self, data):
+        if not data[0:2].isdigit() or int(data[0:2]) >= len(self.model.bands()):
+            sys.stderr.write('unknown OBD response:'+data+'\n')
+            return
+        self.filter = int(data[0:2])
+        if data[3:4] == 'E':
+            self.view.setBandEnabled(self.filter, True)
+        elif data[3:4] == 'D':
+            self.view.setBandEnabled(self.filter, False)
+        else:
+            sys.stderr.write('unknown OBD response:'+data+'\n')
+            self.model.sendPort('OBD','G')
+    def handleOLC(self, data):
+        if data[0:1] == 'G':
+            self.view.setPositionSource('G')
+        elif data[0:1] == 'M':
+            self.view.setPositionSource('M')
+        else:
+            sys.stderr.write('unknown OLC response:'+data+'\n')
+            self.model.sendPort('OLC','G')            
+    def handleOPW(self, data):
+        if data[0:1] == 'N':
+            self.view.setPowerMode('N')
+        elif data[0:1] == 'A':
+            self.view.setPowerMode('A')
+        else:
+            sys.stderr.write('unknown OPW response:'+data+'\n')
+            self.model.sendPort('OPW','G')
+    def handleDCS(self, data):
+        self.view.setCall(data) # I don't check this
+    def handleDL4(self, data):
+        self.view.setLocation(data) # I don't check this
+    def handleDPD(self, data):
+        if data.isdigit():
+            self.powerlevel = int(data)
+            if self.powerlevel > 60: self.powerlevel = 60
+            self.view.setPower(str(self.powerlevel))
+        else:
+            self.model.sendPort('DPD','G')
+    def handleDNM(self, data):
+        self.view.setName(data) # I don't check this
+    def handleDGF(self, data):
+        if len(data) == 12:
+            if data.isdigit():
+                self.fq = int(data)
+                self.view.setFQ(data)
+                return
+        sys.stderr.write('Bad DGF data: '+data+'\n')
+        self.model.sendPort('DGF','G')
+        
+    def handleFPN(self, data):
+        self.view.setDevice(data) # I don't check this
+    def handleFHV(self, data): # Hardware Version
+        self.view.setHardwareVer(data) # I don't check this
+    def handleFHR(self, data): # Hardware Revision
+        self.view.setHardwareRev(data) # I don't check this
+    def handleFSV(self, data): # Firmware Version
+        self.view.setFirmwareVer(data) # I don't check this
+    def handleFSR(self, data): # Firmware Revision
+        self.view.setFirmwareRev(data) # I don't check this
+    def handleFRF(self, data): # Reference OSC frequency
+        pass                   # Not Used, it seems
+    def handleFLP(self, data):
+        self.v = data[2:]
+        if not self.v.isdigit():
+            sys.stderr.write('Invalid LPF requested: '+data+'\n')
+            return -1
+        self.filter = int(self.v)
+        if self.filter >= len(self.model.bands()):
+            sys.stderr.write('Device reported an unsupported LPF with an ID of {}.\n'.format(self.filter))
+            return -1
+        self.view.installLP(self.filter)
+        
+    def handleGL4(self, data): # GPS locator 4 char Maidenhead
+        self.view.setPosition(data) # I don't check this
+    def handleGTM(self, data): # GPS Time
+        self.view.updateTime(data) # I don't check this
+        self.view.setClockOffset(self.clock.summary())
+        if len(self.sats)>0:
+            self.view.satdata(self.sats)
+            self.sats = []
+    def handleGLC(self, data): # GPS Locked - not sure what to do with this
+        if data[0:1] == 'F':
+            self.view.setLocked(False)
+        elif data[0:1] == 'T':
+            self.view.setLocked(True)
+        else:
+            sys.stderr.write('unknown GLC response:'+data+'\n')
+    def handleGSI(self, data): # Info for the GPS plot
+        if len(self.sats) < 64: # GTM plots and clears them, but it may not come
+            self.sats.append(data) # I don't check this
+    def handleTFQ(self, data): # Current frequency
+        if data.isdigit():
+            self.view.setFrequency(data)
+        else:
+            sys.stderr.write('unknown TFQ response: '+data+'\n')
+    def handleTON(self, data): # Transmit on? (T/F)
+        if data[0:1] == 'T':
+            self.view.tx(1)
+        elif data[0:1] == 'F':
+            self.view.tx(0)
+        else:
+            sys.stderr.write('unknown TON response:'+data+'\n')
+            self.model.sendPort('TON','G')
+    def handleMPS(self, data): # Progress while paused
+        self.view.setActive(-1,'black')
+        if data.isdigit():
+            self.view.setProgress(-1,int(data))
+        else:
+            sys.stderr.write('unknown MPS response: '+data+'\n')
+    def handleMIN(self, data): # Informational Messages
+        self.view.logInsert(data)
+        self.setPortStatus(True)
+        self.view.setSaving(False)
+    def handleLPI(self, data): # Low pass filter set
+        pass                   # Not used, AFAIK (maybe the 'mid' in the name?)
+    def handleMVC(self, data): # MicroController VCC Voltage - not used
+        pass                   # Not used
+    def handleTBN(self, data): # Next transmitting band 
+        if not data.isdigit():
+            sys.stderr.write('invalid TBN band data:: '+data+'\n')
+            return -1
+        self.view.setActive(int(data),'black')
+    def handleTWS(self, data): # Transmitting band status
+        if not data[0:2].isdigit():
+            sys.stderr.write('invalid TWS band data:: '+data+'\n')
+            return -1
+        self.v = int(data[0:2])        
+        self.view.setActive(self.v,'red') # This should be changed to blinking, I think
+        if data[3:6].isdigit():
+            self.view.setProgress(self.v,int(data[3:6]))
+        else:
+            sys.stderr.write('unknown MPS response: '+data+'\n')
+    def handleTCC(self, data): # End of cycle, use it to clear
+        self.view.setProgress(-1,0)
+
+        
+    ################################################
+    # Controller internal functions
+    ################################################
+    statusCodes = Model.statusCodes
+
+    def updateStatus(self):
+        for self.cmd in self.statusCodes:
+            self.model.sendPort(self.cmd, 'G')
+            self.count = 0
+            _end = monotonic() + 2 # a device that does not answer is not waited for
+            while self.count < 100 and monotonic() < _end:
+                self.msg = self.model.readPort()
+                if len(self.msg) == 0:
+                    if self.model.waiting() == 0: # not just the end of a line
+                        time.sleep(0.005)
+                    continue
+                self.rxChars += len(self.msg)
+                self.view.traceInsert(self.msg)
+                self.view.setRxChars(self.rxChars)
+                if len(self.msg)>2:
+                    self.handleMessage(self.msg)
+                    if self.cmd == self.msg[1:4]:
+                        break
+                    self.count += 1
+
+    def record(self, code, data):
+        """
+        Keeps the statistics that do not depend on a View, for every message
+        """
+        if code == 'GSI':
+            _f = data.split()
+            if len(_f) > 3 and _f[0].isdigit() and _f[3].isdigit():
+                self.gpsStats.sample(int(_f[0]), int(_f[3]))
+                if _f[1].isdigit() and _f[2].isdigit() and int(_f[3]) > 0:
+                    self.sky.add(int(_f[1]), int(_f[2]), int(_f[3]))
+        elif code == 'GTM':
+            if self.model is not self:
+                self.clock.sample(data, self.model.stamp[1])
+        elif code == 'GLC':
+            if data[0:1] == 'T':
+                self.gpsStats.lock(True)
+            elif data[0:1] == 'F':
+                self.gpsStats.lock(False)
+        elif code == 'TWS':
+            if data[0:2].isdigit():
+                self.transmitting(int(data[0:2]))
+        elif code == 'TFQ':
+            if self._tx is not None and data.isdigit():
+                self._tx['frequency'] = int(data)
+        elif code == 'TCC' or (code == 'TON' and data[0:1] == 'F'):
+            self.transmitted()
+        elif code == 'CCM' and data[0:1] != 'W':
+            self.transmitted() # the mode changed from the beacon, not a reply to a question
+        if code in ['DCS', 'DL4', 'GL4', 'DPD', 'OLC']:
+            self.checkMessage()
+        self.poller.heard(code, data)
+        self.alerts.message(code, data)
+        self.hooks.message(code, data)
+        if code in Inventory.codes: # wait for the rest of the identity before recording it
+            self._inventoryDue = monotonic() + 2
+
+    def transmitting(self, band):
+        """
+        Starts a transmission log record, when a band starts transmitting
+        """
+        if self._tx is not None:
+            if self._tx['band'] == band:
+                return
+            self.transmitted()
+        _fq = self.state.get('TFQ', '')
+        self._tx = {'start': time.time(), 'band': band, 'frequency': int(_fq) if _fq.isdigit() else 0}
+
+    def transmitted(self):
+        """
+        Completes the transmission log record, when a transmission ends
+        """
+        if self._tx is None:
+            return
+        _tx, self._tx = self._tx, None
+        _tx['end'] = time.time()
+        _tx['call'], _tx['locator'], _p = self.message()
+        _tx['power'] = int(_p) if _p.isdigit() else 0
+        try:
+            self.txlog.add(_tx)
+        except (IOError, OSError) as e:
+            sys.stderr.write('Transmission not logged: {}\n'.format(e))
+
+    def message(self):
+        """
+        The callsign, locator and power the device sends, as it reported them
+        """
+        if self.state.get('OLC', 'G')[0:1] == 'M':
+            _locator = self.state.get('DL4', '')
+        else:
+            _locator = self.state.get('GL4', self.state.get('DL4', ''))
+        return self.state.get('DCS', ''), _locator, self.state.get('DPD', '')
+
+    def checkMessage(self):
+        """
+        Tells the user when the device's message cannot be encoded as WSPR
+        """
+        _message = self.message()
+        if '' in _message:
+            return
+        _why = self.encoder.check(*_message)
+        if _why != self._unsendable:
+            self._unsendable = _why
+            if _why is not None:
+                self.view.logInsert('The device cannot send {}: {}'.format(' '.join(_message), _why))
+
+    def periodic(self):
+        """
+        Work done on a timer, called from the main loop
+        """
+        self.watchdog.check()
+        self.checkWrites()
+        self.poller.check()
+        self.alerts.check()
+        if self.script is not None and not self.script.poll():
+            self.view.traceInsert('Script {}'.format('finished' if self.script.ok else 'failed'))
+            self.script = None
+            self.view.setScriptRunning(False)
+        _now = monotonic()
+        if self.metricsFile is not None and _now >= self._metricsDue:
+            self._metricsDue = _now + 15
+            self.exportMetrics()
+            self.metrics.write(self.metricsFile)
+        if _now >= self._skyDue:
+            self._skyDue = _now + 600
+            self.saveSky()
+        if self.model is not self and self.model.capture is not None:
+            self.model.capture.flush(60) # so that a quiet device's lines are not held back for long
+        if self._inventoryDue is not None and _now >= self._inventoryDue:
+            self._inventoryDue = None
+            self.updateInventory()
+        elif self._device is not None and _now >= self._seenDue and self.watchdog.up:
+            self._seenDue = _now + 300
+            try:
+                self.inventory.seen(self._device, self.model.portName)
+            except sqlite3.Error as e:
+                sys.stderr.write('Inventory not updated: {}\n'.format(e))
+
+    def updateInventory(self):
+        """
+        Records the connected device in the inventory, with the filters it last reported
+        """
+        if self.state.get('FPN') is None:
+            return
+        _since = self.state.received('FPN') # the filters are reported after the identity
+        _filters = [int(_k[5:]) for _k in self.state.keys()
+                    if _k[0:3] == 'FLP' and _k[5:].isdigit() and self.state.received(_k) > _since]
+        try:
+            self._device = self.inventory.update(self.state, _filters, self.model.portName,
+                                                 self.model.usbId, len(self.model.bands()))
+            self._seenDue = monotonic() + 300
+        except sqlite3.Error as e:
+            sys.stderr.write('Inventory not updated: {}\n'.format(e))
+
+    def exportMetrics(self):
+        """Brings the statistics kept elsewhere into self.metrics"""
+        self.gpsStats.export(self.metrics)
+        self.clock.export(self.metrics)
+        _v = self.state.get('MVC', '')
+        if _v.replace('.', '', 1).isdigit():
+            self.metrics.set('mcu_vcc', float(_v), help = 'Microcontroller supply voltage, as reported (MVC)')
+
+    def shutdown(self):
+        """
+        Saves anything that is kept between runs
+        """
+        self.transmitted()
+        self.saveSky()
+        self.inventory.close()
+        self.hooks.close()
+        self.saveState()
+        if self.model is not self and self.model.capture is not None:
+            self.model.capture.close()
+
+    def saveState(self):
+        if self.model is self or self.model.portName == 'None' or self.state.get('FPN') is None:
+            return
+        _id = self._device or Inventory.identity(self.state, self.model.usbId, self.model.portName)
+        self.stateCache.put(self.model.portName, _id, self.state)
+        try:
+            self.stateCache.save()
+        except (IOError, OSError) as e:
+            sys.stderr.write('Device settings not saved: {}\n'.format(e))
+
+    def saveSky(self):
+        if self.sky.dirty:
+            try:
+                self.sky.save()
+            except (IOError, OSError) as e:
+                sys.stderr.write('Sky coverage not saved: {}\n'.format(e))
+
+    def pump(self, done, timeout):
+        """
+        Reads and handles messages until done() is True or timeout seconds pass
+
+        Returns True if done() was satisfied
+        """
+        _end = monotonic() + timeout
+        while not done():
+            if monotonic() > _end:
+                return False
+            _msg = self.model.readPort()
+            if len(_msg) > 0:
+                self.rxChars += len(_msg)
+                self.view.traceInsert(_msg)
+                self.view.setRxChars(self.rxChars)
+                if len(_msg) > 2:
+                    self.handleMessage(_msg)
+            else:
+                time.sleep(0.01)
+        return True
+
+    def readSettings(self, codes, timeout = 5):
+        """
+        Asks for all of the codes in one batch, then waits for every answer
+
+        Unlike updateStatus(), the requests are not sent one by one, so
+        the whole set costs about one round trip.  OBD is answered with
+        one line per band, and all of them are waited for.
+        """
+        _start = self.state.count
+        _keys = []
+        for _c in codes:
+            if _c == 'OBD':
+                _keys += ['OBD{0:02d}'.format(_b) for _b in range(len(self.model.bands()))]
+            else:
+                _keys.append(_c)
+        self.model.sendBatch([(_c, 'G') for _c in codes])
+        return self.pump(lambda: min([self.state.received(_k) for _k in _keys]) > _start, timeout)
+
+    def snapshotProfile(self):
+        """Reads the device settings and returns them as a profile"""
+        if not self.readSettings(Profiles.codes):
+            sys.stderr.write('Device did not report all settings, profile may be incomplete\n')
+        return Profiles.fromState(self.state, len(self.model.bands()))
+
+    def applyProfile(self, profile):
+        """
+        Sets the device to match the profile, returns the Transaction used
+
+        The current settings are read once, only the settings that differ
+        are written, all in one verified batch, followed by a single save
+        to EEPROM.
+        """
+        if not self.readSettings(Profiles.codes):
+            sys.stderr.write('Device did not report all settings, writing the unknown ones\n')
+        _t = self.transaction()
+        for _cmd, _data in Profiles.writes(profile, self.state, len(self.model.bands())):
+            _t.set(_cmd, _data[2:])
+        if len(_t.writes()) == 0:
+            return _t
+        _t.commit()
+        if 'ok' in _t.results.values():
+            self.model.sendPort('CSE', 'S')
+        return _t
+
+    def transaction(self):
+        """Starts a write-then-verify group of settings, see Transaction"""
+        return Transaction(self)
+
+    def writeSettings(self, writes, timeout = 2):
+        """
+        Starts a Transaction for settings entered in the View, for checkWrites() to follow up
+        """
+        if self._showing or self.model.portName == 'None':
+            return None # the View showing a value it was given, not one entered
+        _t = self.transaction()
+        for _cmd, _data in writes:
+            if not DeviceState.matches(_data, self.state.get(DeviceState.key(_cmd, _data))):
+                _t.set(_cmd, _data)
+        if len(_t.writes()) == 0:
+            return _t
+        for _old in self._writing: # the newest value of a field is the one wanted
+            for _k in _t.keys():
+                _old.drop(_k)
+        _t.start(timeout)
+        self._writing.append(_t)
+        return _t
+
+    def checkWrites(self):
+        """
+        Follows up the View's Transactions, and logs what the device made of them
+        """
+        for _t in list(self._writing):
+            if not _t.poll():
+                self._writing.remove(_t)
+                self.showWrites(_t)
+
+    def showWrites(self, t):
+        for _cmd, _data in t.writes():
+            _k = DeviceState.key(_cmd, _data)
+            _name = NullView.names.get(_cmd, _cmd)
+            if t.results[_k] == 'ok':
+                self.view.logInsert('Set {} to {}'.format(_name, _data))
+            elif t.results[_k] == 'mismatch':
+                self.view.logInsert('The device kept {} {}, not {}'.format(_name, t.reported[_k], _data))
+            else:
+                self.view.logInsert('The device did not confirm {} {}'.format(_name, _data))
+
+    def runScript(self, script):
+        """Runs a Script to the end, without a View, returns True if every step succeeded"""
+        self.script = script
+        self.pump(lambda: not script.poll(), float('inf'))
+        self.script = None
+        return script.ok
+
+    def warmStart(self):
+        """
+        Shows the last known settings of the device on the port just opened, as stale
+        """
+        if self._stale:
+            self._stale = set()
+            self.view.setStale(set())
+        self._staleEntry = None
+        if self.model.portName == 'None':
+            return
+        _entry = self.stateCache.get(self.model.portName, self.model.usbId)
+        if _entry is None or len(_entry.get('state', {})) == 0:
+            return
+        self._staleEntry = _entry
+        self._stale = set(_k for _k, _data in _entry['state'].items() if _data is not None)
+        for _k in sorted(self._stale):
+            self.show(_k[0:3], _entry['state'][_k])
+        self.view.setStale(set(self._stale), _entry.get('saved'))
+
+    def show(self, code, data):
+        """
+        Gives the View a setting, without acting on it (as the handlers do), for the last known settings
+        """
+        self._showing += 1
+        try:
+            self._show(code, data)
+        finally:
+            self._showing -= 1
+
+    def _show(self, code, data):
+        _bands = len(self.model.bands())
+        _simple = {'DCS': self.view.setCall, 'DL4': self.view.setLocation, 'DNM': self.view.setName,
+                   'FPN': self.view.setDevice, 'FHV': self.view.setHardwareVer, 'FHR': self.view.setHardwareRev,
+                   'FSV': self.view.setFirmwareVer, 'FSR': self.view.setFirmwareRev}
+        if code in _simple:
+            _simple[code](data)
+        elif code == 'CCM' and data[0:1] in ['N', 'W', 'S']:
+            _mode = 'NWS'.index(data[0])
+            [self.view.setStopped, self.view.setRunning, self.view.setGenerating][_mode]()
+            self.view.program(_mode)
+        elif code == 'OTP' and data.isdigit():
+            self.view.setPauseTime(int(data))
+        elif code == 'OSM' and data[0:1] in ['N', 'W', 'S']:
+            self.view.setBoot(data[0])
+        elif code == 'OBD' and data[0:2].isdigit() and int(data[0:2]) < _bands and data[3:4] in ['E', 'D']:
+            self.view.setBandEnabled(int(data[0:2]), data[3:4] == 'E')
+        elif code == 'OLC' and data[0:1] in ['G', 'M']:
+            self.view.setPositionSource(data[0])
+        elif code == 'OPW' and data[0:1] in ['N', 'A']:
+            self.view.setPowerMode(data[0])
+        elif code == 'DPD' and data.isdigit():
+            self.view.setPower(str(min(int(data), 60)))
+        elif code == 'DGF' and len(data) == 12 and data.isdigit():
+            self.view.setFQ(data)
+        elif code == 'FLP' and data[2:].isdigit() and int(data[2:]) < _bands:
+            self.view.installLP(int(data[2:]))
+
+    def fresh(self, key):
+        """
+        Notes a value reported by the device, replacing the one last known
+        """
+        if key not in self._stale:
+            return
+        self._stale.discard(key)
+        _identity = ['FPN', 'FHV', 'FHR']
+        if key in _identity and not any(_k in self._stale for _k in _identity) and \
+           Inventory.identity(self.state, self.model.usbId, self.model.portName) != self._staleEntry.get('identity'):
+            # Another device is on the port: what is not reported again is not known
+            self.view.logInsert('The device on {} is not the one last seen there'.format(self.model.portName))
+            self._stale = set()
+            self._showing += 1
+            try:
+                self.view.clearSettings()
+            finally:
+                self._showing -= 1
+            for _k in self.state.keys():
+                if _k[0:3] in self.statusCodes:
+                    self.show(_k[0:3], self.state.get(_k))
+        self.view.setStale(set(self._stale), self._staleEntry.get('saved'))
+
+    def linkChanged(self, up, why):
+        """
+        Shows the Watchdog's changes to the link in the View
+        """
+        self.view.setPort(self.model.portName, True)
+        self.view.logInsert('Link {}: {}'.format('up' if up else 'down', why))
+        self.hooks.fire('connected' if up else 'disconnected', {'why': why})
+        if not up:
+            self.setPortStatus(False)
+
+    def setPortStatus(self,state):
+        if state:
+            self.view.serialOK(True)
+        else:
+            self.view.serialOK(False)
+        
+    def setCall(self, call):
+        self.call = call
+        self.model.sendPort('CCM', 'S N')
+        self.model.sendPort('DCS', 'S '+call)
+
+    ################################################
+    # Controller: main loop
+    ################################################
+    def step(self): # One pass of the main loop, without the View's events
+        if self.model.portName != 'None':
+            self.buff = self.model.readPort()
+            if len(self.buff)>0:
+                self.rxChars += len(self.buff)
+                self.view.traceInsert(self.buff)
+                self.view.setRxChars(self.rxChars)
+                self.handleMessage(self.buff)
+            if self.buff[1:4] == 'MIN':
+                self.updateStatus()
+        self.periodic()
+
+    def drive(self): # Main controller loop, until the View is closed
+        while True:
+            self.step()
+            if not self.view.update():
+                break
+        self.shutdown()
@@ -0,0 +1,269 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The daemon that owns the device and shares it with local clients, and its client
+"""
+
+import collections
+import json
+import os
+import select
+import socket
+from .controller import Controller
+from .model import DeviceState
+
+###############################################################################
+##### Daemon
+###############################################################################
+#
+# Only one program can hold a serial port.  The Daemon holds it, keeps
+# the Controller's DeviceState up to date, and shares the device with
+# any number of local clients over a Unix socket.  Clients get answers
+# about the device from the cache at once, without the device being
+# asked again, and can subscribe to the messages as they arrive.
+# Commands from all of the clients are queued, and written to the
+# device by the Daemon alone.
+#
+# The protocol is one JSON object per line, each way.  Requests have an
+# "op", and an optional "id" that is copied into the reply:
+#   {"op":"state"}                      -> {"ok":true,"state":{key:data}}
+#   {"op":"send","code":"CCM","data":"S W"} -> {"ok":true,"queued":n}
+#   {"op":"raw","line":"[CCM] G"}       -> {"ok":true,"queued":n}
+#   {"op":"subscribe","codes":[...],"raw":false}
+#       -> {"ok":true}, then {"event":"state","state":{...}} and one
+#          {"event":"update","key":k,"code":c,"data":d} per message.
+#          With "raw":true the cache is replayed as device lines, and
+#          then every line is sent as {"event":"line","line":"{CCM} W"}.
+#   {"op":"unsubscribe"}                -> {"ok":true}
+#   {"op":"metrics"}                    -> {"ok":true,"text":"..."}
+#   {"op":"clock"}                      -> {"ok":true,"clock":{...}} (see ClockOffset)
+# A request with "quiet":true gets no reply.
+#
+class Daemon(object):
+    """
+    Owner of the device connection, serving local clients
+
+        serve()  - runs until stopped (or interrupted)
+        stop()   - ends serve()
+    """
+    # Messages that describe a moment rather than the device, and are not replayed
+    transient = ['MIN', 'GTM', 'TWS', 'TBN', 'MPS', 'TCC']
+
+    def __init__(self, controller, path, limit = 1048576):
+        self._vc = controller
+        self.path = path
+        self._limit = limit      # a client that falls this far behind is dropped
+        self._clients = {}       # socket -> {'in':bytes, 'out':bytes, 'sub':None or {...}}
+        self._queue = collections.deque()
+        self._running = False
+
+    def _listen(self):
+        if os.path.exists(self.path):
+            _s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                _s.connect(self.path)
+            except socket.error:
+                os.remove(self.path) # left over from a daemon that stopped
+            else:
+                _s.close()
+                raise IOError('a daemon is already running on '+self.path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        os.chmod(self.path, 0o660)
+        self._server.listen(8)
+        self._server.setblocking(False)
+
+    def _send(self, client, obj):
+        _c = self._clients.get(client)
+        if _c is None:
+            return
+        _c['out'] += str.encode(json.dumps(obj) + '\n')
+        if len(_c['out']) > self._limit:
+            self._drop(client)
+
+    def _drop(self, client):
+        self._clients.pop(client, None)
+        client.close()
+
+    def _replay(self, client, raw):
+        _state = self._vc.state
+        if not raw:
+            self._send(client, {'event': 'state', 'state': dict((_k, _state.get(_k)) for _k in _state.keys())})
+            return
+        for _k in sorted(_state.keys()):
+            if _k[0:3] not in self.transient:
+                self._send(client, {'event': 'line', 'line': '{'+_k[0:3]+'} '+_state.get(_k)})
+
+    def request(self, client, req):
+        _op = req.get('op')
+        _reply = {'ok': True}
+        if _op == 'state':
+            _state = self._vc.state
+            _reply['state'] = dict((_k, _state.get(_k)) for _k in _state.keys())
+        elif _op == 'send':
+            self._queue.append((str(req['code']), str(req.get('data', ''))))
+            _reply['queued'] = len(self._queue)
+        elif _op == 'raw':
+            self._queue.append(('', str(req['line'])))
+            _reply['queued'] = len(self._queue)
+        elif _op == 'subscribe':
+            _codes = req.get('codes')
+            self._clients[client]['sub'] = {'raw': bool(req.get('raw')),
+                                            'codes': None if _codes is None else set(_codes)}
+        elif _op == 'unsubscribe':
+            self._clients[client]['sub'] = None
+        elif _op == 'metrics':
+            self._vc.exportMetrics()
+            _reply['text'] = self._vc.metrics.text()
+        elif _op == 'clock':
+            _reply['clock'] = self._vc.clock.summary()
+        else:
+            _reply = {'ok': False, 'error': 'unknown op {}'.format(_op)}
+        if 'id' in req:
+            _reply['id'] = req['id']
+        if not req.get('quiet'):
+            self._send(client, _reply)
+        if _op == 'subscribe' and client in self._clients:
+            self._replay(client, self._clients[client]['sub']['raw'])
+
+    def message(self, msg):
+        """Handles a line from the device, and passes it on to the subscribers"""
+        self._vc.handleMessage(msg)
+        if len(msg) < 5:
+            return
+        _code, _data = Controller.splitMessage(msg)
+        if _code == 'MIN': # the device restarted, so refresh the cache (the answers arrive as usual)
+            self._queue.extend([(_c, 'G') for _c in Controller.statusCodes])
+        _update = {'event': 'update', 'key': DeviceState.key(_code, _data), 'code': _code, 'data': _data}
+        for _client in list(self._clients.keys()):
+            _sub = self._clients.get(_client, {}).get('sub')
+            if _sub is None:
+                continue
+            if _sub['raw']:
+                self._send(_client, {'event': 'line', 'line': msg})
+            elif _sub['codes'] is None or _code in _sub['codes']:
+                self._send(_client, _update)
+
+    def _read(self, client):
+        try:
+            _b = client.recv(4096)
+        except socket.error:
+            _b = b''
+        if len(_b) == 0:
+            self._drop(client)
+            return
+        _c = self._clients[client]
+        _c['in'] += _b
+        while b'\n' in _c['in'] and client in self._clients:
+            _line, _c['in'] = _c['in'].split(b'\n', 1)
+            if len(_line.strip()) == 0:
+                continue
+            try:
+                _req = json.loads(_line.decode('utf-8'))
+                self.request(client, _req)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                self._send(client, {'ok': False, 'error': 'bad request: {}'.format(e)})
+
+    def _write(self, client):
+        _c = self._clients.get(client)
+        try:
+            _n = client.send(_c['out'])
+            _c['out'] = _c['out'][_n:]
+        except socket.error:
+            self._drop(client)
+
+    def stop(self):
+        self._running = False
+
+    def serve(self):
+        self._listen()
+        self._running = True
+        self._queue.extend([(_c, 'G') for _c in Controller.statusCodes]) # fill the cache
+        try:
+            while self._running:
+                _writing = [_c for _c in self._clients if len(self._clients[_c]['out']) > 0]
+                _r, _w, _x = select.select([self._server] + list(self._clients.keys()), _writing, [], 0.02)
+                for _s in _r:
+                    if _s is self._server:
+                        try:
+                            _client, _addr = self._server.accept()
+                        except socket.error:
+                            continue
+                        _client.setblocking(False)
+                        self._clients[_client] = {'in': b'', 'out': b'', 'sub': None}
+                    elif _s in self._clients:
+                        self._read(_s)
+                for _s in _w:
+                    if _s in self._clients:
+                        self._write(_s)
+                # The one writer to the device
+                if len(self._queue) > 0 and self._vc.model.portName != 'None':
+                    _batch = []
+                    while len(self._queue) > 0:
+                        _cmd, _data = self._queue.popleft()
+                        if _cmd != '':
+                            _batch.append((_cmd, _data))
+                            continue
+                        if len(_batch) > 0: # keep the order of raw and formatted commands
+                            self._vc.model.sendBatch(_batch)
+                            _batch = []
+                        self._vc.model.sendPort('', _data + '\r\n')
+                    if len(_batch) > 0:
+                        self._vc.model.sendBatch(_batch)
+                # Everything the device has sent
+                for _n in range(200):
+                    if self._vc.model.waiting() < 1:
+                        break
+                    _msg = self._vc.model.readPort()
+                    if len(_msg) == 0:
+                        continue
+                    self._vc.rxChars += len(_msg)
+                    self._vc.view.traceInsert(_msg)
+                    self.message(_msg)
+                self._vc.periodic()
+        finally:
+            for _c in list(self._clients.keys()):
+                self._drop(_c)
+            self._server.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._vc.shutdown()
+
+class DaemonClient(object):
+    """
+    A connection to a Daemon()
+
+        request(op,...)  - sends a request and returns the reply
+        events()         - yields the events of a subscription
+    """
+    def __init__(self, path):
+        self._s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._s.connect(path)
+        self._f = self._s.makefile('rb')
+        self._id = 0
+
+    def request(self, op, **args):
+        self._id += 1
+        args['op'] = op
+        args['id'] = self._id
+        self._s.sendall(str.encode(json.dumps(args) + '\n'))
+        while True:
+            _line = self._f.readline()
+            if len(_line) == 0:
+                raise IOError('daemon closed the connection')
+            _reply = json.loads(_line.decode('utf-8'))
+            if _reply.get('id') == self._id:
+                return _reply
+
+    def events(self):
+        while True:
+            _line = self._f.readline()
+            if len(_line) == 0:
+                return
+            _event = json.loads(_line.decode('utf-8'))
+            if 'event' in _event:
+                yield _event
+
+    def close(self):
+        self._f.close()
+        self._s.close()
@@ -0,0 +1,136 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The symbols a WSPR message is sent as
+"""
+
+import collections
+
+# WSPREncoder - the symbols a WSPR Type 1 message is sent as
+#
+# To show what the device will send, and to check that a callsign,
+# locator and power can be sent at all, before a balloon is launched.
+# The message is packed into 50 bits:
+#   callsign - 28 bits, six characters with the digit third (" K1ABC")
+#   locator  - 15 bits, four characters (FN42)
+#   power    - 7 bits, 0 to 60 dBm ending in 0, 3 or 7
+# coded with the K=32, rate 1/2 convolutional code into 162 bits,
+# interleaved by bit reversed addresses, and each bit put with a bit of
+# the sync vector into a symbol, 0 to 3, one of the four tones.
+# Callsigns with a prefix or suffix (/) need the Type 2 and 3 messages,
+# which are not encoded.
+#
+class WSPREncoder(object):
+    """
+    WSPR Type 1 encoder, with a cache of the messages encoded
+
+        encode(call,locator,power) - the 162 symbols, a tuple of 0 to 3; ValueError if it cannot be sent
+        encodeMany(messages)       - a list of the symbols, or of the ValueErrors, for (call,locator,power)s
+        check(call,locator,power)  - None, or why the message cannot be sent
+        cacheSize                  - the most messages kept
+    """
+    cacheSize = 4096
+    _sync = (1, 1, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 1, 0, 1, 1, 1, 1, 0, 0, 0, 0, 0,
+             0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 1, 0, 1, 1, 0, 0, 1, 1, 0, 1, 0, 0, 0, 1, 1, 0, 1, 0,
+             0, 0, 0, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 1, 0, 0, 0, 1, 1, 0, 1, 0, 1, 0,
+             0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 1, 1, 1, 0, 1, 1, 0, 0, 1, 1, 0, 1, 0, 0, 0, 1, 1, 1,
+             0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 1, 0, 1, 1, 0, 0, 0, 1, 1, 0,
+             0, 0)
+    _polys = (0xf2d05351, 0xe4613c47)
+    _parity = bytearray(bin(_n).count('1') & 1 for _n in range(256))
+    # Where each coded bit goes: the 162 addresses below 256 with their 8 bits reversed, in order
+    _order = [_j for _j in (int('{0:08b}'.format(_i)[::-1], 2) for _i in range(256)) if _j < 162]
+
+    def __init__(self):
+        self._cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _char(c):
+        if c.isdigit():
+            return ord(c) - ord('0')
+        if 'A' <= c <= 'Z':
+            return ord(c) - ord('A') + 10
+        if c == ' ':
+            return 36
+        raise ValueError('"{}" cannot be sent'.format(c))
+
+    @classmethod
+    def pack(cls, call, locator, power):
+        """The 50 bit message, as (callsign 28 bits, locator and power 22 bits)"""
+        _call = str(call).strip().upper()
+        if '/' in _call:
+            raise ValueError('{} needs a Type 2 message, which is not encoded'.format(_call))
+        if len(_call) > 1 and _call[1:2].isdigit() and not _call[2:3].isdigit():
+            _call = ' ' + _call # the digit is third
+        if not 3 <= len(_call) <= 6 or not _call[2:3].isdigit():
+            raise ValueError('callsign {} should have a digit third, or second in at most 5 characters'.format(call))
+        _call = '{0:<6}'.format(_call)
+        if not _call[1].isalnum() or any(not ('A' <= _c <= 'Z' or _c == ' ') for _c in _call[3:]):
+            raise ValueError('callsign {} should end in letters'.format(call))
+        _n = cls._char(_call[0])
+        _n = _n * 36 + cls._char(_call[1])
+        _n = _n * 10 + cls._char(_call[2])
+        for _c in _call[3:]:
+            _n = _n * 27 + cls._char(_c) - 10
+        _loc = str(locator).strip().upper()
+        if len(_loc) != 4 or not 'A' <= _loc[0] <= 'R' or not 'A' <= _loc[1] <= 'R' or not _loc[2:4].isdigit():
+            raise ValueError('locator {} should be like FN42'.format(locator))
+        _m = (179 - 10 * (ord(_loc[0]) - ord('A')) - int(_loc[2])) * 180 + 10 * (ord(_loc[1]) - ord('A')) + int(_loc[3])
+        try:
+            _p = int(power)
+        except ValueError:
+            _p = -1
+        if not 0 <= _p <= 60 or _p % 10 not in [0, 3, 7]:
+            raise ValueError('power {} should be 0 to 60 dBm, ending in 0, 3 or 7'.format(power))
+        return _n, _m * 128 + _p + 64
+
+    @classmethod
+    def _symbols(cls, call, locator, power):
+        _n, _m = cls.pack(call, locator, power)
+        _bits = (_n << 22 | _m) << 31 # the message, then the zeros that empty the coder
+        _p1, _p2 = cls._polys
+        _parity = cls._parity
+        _coded = []
+        _reg = 0
+        for _i in range(80, -1, -1):
+            _reg = (_reg << 1 | (_bits >> _i) & 1) & 0xffffffff
+            for _poly in (_p1, _p2):
+                _x = _reg & _poly
+                _x ^= _x >> 16
+                _x ^= _x >> 8
+                _coded.append(_parity[_x & 0xff])
+        _symbols = list(cls._sync)
+        for _i, _j in enumerate(cls._order):
+            _symbols[_j] += 2 * _coded[_i]
+        return tuple(_symbols)
+
+    def encode(self, call, locator, power):
+        _key = (str(call).strip().upper(), str(locator).strip().upper(), str(power).strip())
+        _s = self._cache.pop(_key, None)
+        if _s is None:
+            self.misses += 1
+            _s = self._symbols(*_key)
+            if len(self._cache) >= self.cacheSize:
+                self._cache.popitem(last = False) # the least recently used
+        else:
+            self.hits += 1
+        self._cache[_key] = _s
+        return _s
+
+    def encodeMany(self, messages):
+        _out = []
+        for _call, _locator, _power in messages:
+            try:
+                _out.append(self.encode(_call, _locator, _power))
+            except ValueError as e:
+                _out.append(e)
+        return _out
+
+    def check(self, call, locator, power):
+        try:
+            self.encode(call, locator, power)
+        except ValueError as e:
+            return str(e)
+        return None
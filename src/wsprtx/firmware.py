@@ -0,0 +1,413 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Firmware images, the STK500 bootloader protocol, and firmware updates
+"""
+
+import binascii
+import os
+import random
+import select
+import serial
+import threading
+import time
+import zlib
+from .common import monotonic
+from .controller import Controller
+
+###############################################################################
+##### Firmware
+###############################################################################
+#
+# Firmware updates, without the vendor's tool.  The devices are
+# Arduino style boards, with an optiboot (STK500 version 1) bootloader
+# that runs for a moment after a reset.  An update:
+#   - asks the running firmware what the device is (FPN and FHV),
+#   - resets it into the bootloader (by dropping DTR) and syncs with it,
+#   - checks the processor signature against the one for that device,
+#   - writes the pages of the image, one at a time.  The bootloader
+#     answers each command only when it is done, so the next page is
+#     not sent before the last is written (that is the flow control),
+#   - reads every page back and compares it, and the CRC32 of the
+#     whole image with the CRC32 of what was read,
+#   - leaves the bootloader, which starts the new firmware.
+# Several ports can be updated at once, each in its own thread.
+#
+# SimBootloader is a pretend device on a pseudo terminal, which answers
+# both the WSPR commands and the bootloader, so that all of this can be
+# tried out without risking a real device:
+#   WSPR_TX_Config.py --sim-bootloader=01012 &
+#   WSPR_TX_Config.py -p /dev/pts/N --flash=firmware.hex
+#
+class IntelHex(object):
+    """
+    A firmware image read from an Intel HEX file
+
+        parse(lines)  - reads the records (raises ValueError on a bad one)
+        pages(size)   - yields (address, bytearray) for each page with data
+        size          - the number of bytes of data
+        end           - one past the highest address with data
+    """
+    def __init__(self, lines = None, limit = 1048576):
+        self.data = bytearray()
+        self.ranges = []  # (start, end) of each run of data
+        self.limit = limit
+        if lines is not None:
+            self.parse(lines)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename) as _f:
+            return cls(_f)
+
+    @property
+    def end(self):
+        return len(self.data)
+
+    @property
+    def size(self):
+        return sum(_e - _s for _s, _e in self.ranges)
+
+    def _put(self, address, payload):
+        _end = address + len(payload)
+        if _end > self.limit:
+            raise ValueError('data at 0x{:X} is beyond the end of memory'.format(address))
+        if _end > len(self.data):
+            self.data.extend(b'\xff' * (_end - len(self.data)))
+        self.data[address:_end] = payload
+        if len(self.ranges) > 0 and self.ranges[-1][1] == address:
+            self.ranges[-1] = (self.ranges[-1][0], _end)
+        else:
+            self.ranges.append((address, _end))
+
+    def parse(self, lines):
+        _base = 0
+        for _n, _line in enumerate(lines, 1):
+            _line = _line.strip()
+            if len(_line) == 0:
+                continue
+            if _line[0] != ':':
+                raise ValueError('line {}: not a HEX record'.format(_n))
+            try:
+                _rec = bytearray(binascii.unhexlify(_line[1:]))
+            except (TypeError, binascii.Error):
+                raise ValueError('line {}: bad hex digits'.format(_n))
+            if len(_rec) < 5 or len(_rec) != _rec[0] + 5:
+                raise ValueError('line {}: wrong length'.format(_n))
+            if sum(_rec) & 0xFF != 0:
+                raise ValueError('line {}: bad checksum'.format(_n))
+            _type = _rec[3]
+            _payload = _rec[4:-1]
+            if _type == 0:      # data
+                self._put(_base + (_rec[1] << 8 | _rec[2]), _payload)
+            elif _type == 1:    # end of file
+                return
+            elif _type == 2:    # extended segment address
+                _base = (_payload[0] << 8 | _payload[1]) << 4
+            elif _type == 4:    # extended linear address
+                _base = (_payload[0] << 8 | _payload[1]) << 16
+            elif _type not in [3, 5]: # start addresses mean nothing to the bootloader
+                raise ValueError('line {}: unknown record type {}'.format(_n, _type))
+        raise ValueError('no end of file record')
+
+    def pages(self, size):
+        _used = set()
+        for _s, _e in self.ranges:
+            _used.update(range(_s // size, (_e + size - 1) // size))
+        for _p in sorted(_used):
+            _page = self.data[_p * size:(_p + 1) * size]
+            yield _p * size, _page + b'\xff' * (size - len(_page))
+
+class STK500(object):
+    """
+    The STK500 version 1 bootloader protocol, as spoken by optiboot
+
+        sync()                 - gets the bootloader's attention
+        signature()            - the three processor signature bytes
+        enter() / leave()      - programming mode, leave() starts the firmware
+        writePage(addr,data)   - writes one flash page
+        readPage(addr,n)       - reads n bytes of flash
+    """
+    INSYNC, OK, NOSYNC, EOP = 0x14, 0x10, 0x15, 0x20
+
+    def __init__(self, fd, timeout = 1.0):
+        self._fd = fd
+        self.timeout = timeout
+
+    def _read(self, n, timeout):
+        _buff = bytearray()
+        _end = monotonic() + timeout
+        while len(_buff) < n and monotonic() < _end:
+            _buff += bytearray(self._fd.read(n - len(_buff)))
+        return _buff
+
+    def command(self, data, n = 0, timeout = None):
+        self._fd.write(bytes(bytearray(data) + bytearray([self.EOP])))
+        _reply = self._read(n + 2, timeout or self.timeout)
+        if len(_reply) < n + 2:
+            raise IOError('bootloader did not answer')
+        if _reply[0] != self.INSYNC or _reply[-1] != self.OK:
+            raise IOError('bootloader out of sync')
+        return _reply[1:-1]
+
+    def sync(self, tries = 25):
+        for _n in range(tries):
+            try:
+                self._fd.reset_input_buffer()
+                self.command([0x30], timeout = 0.2)
+                return True
+            except IOError:
+                pass
+        return False
+
+    def signature(self):
+        return bytes(self.command([0x75], 3))
+
+    def enter(self):
+        self.command([0x50])
+
+    def leave(self):
+        self.command([0x51])
+
+    def _load(self, address): # the bootloader counts in 16 bit words
+        _w = address >> 1
+        self.command([0x55, _w & 0xFF, _w >> 8])
+
+    def writePage(self, address, data):
+        self._load(address)
+        self.command(bytearray([0x64, len(data) >> 8, len(data) & 0xFF, ord('F')]) + data)
+
+    def readPage(self, address, n):
+        self._load(address)
+        return self.command([0x74, n >> 8, n & 0xFF, ord('F')], n)
+
+class FirmwareUpdate(object):
+    """
+    Writes a firmware image to the device on one port
+
+        run()        - does the update, returns a result {name:value}
+        runAll(list) - runs several updates at once, returns their results
+
+    progress(port, phase, done, total, rate) is called as the pages go,
+    phase being 'write' or 'verify' and rate the bytes per second.
+    """
+    # The processor in each device, by FPN: signature, page size and the
+    # flash below the bootloader
+    targets = {'01011': {'signature': b'\x1e\x95\x0f', 'page': 128, 'flash': 32256},
+               '01012': {'signature': b'\x1e\x95\x0f', 'page': 128, 'flash': 32256},
+               '01017': {'signature': b'\x1e\x95\x0f', 'page': 128, 'flash': 32256}}
+
+    def __init__(self, port, image, baud = 115200, progress = None):
+        self.port = port
+        self.image = image
+        self.baud = baud
+        self.progress = progress or (lambda *args: None)
+        self.result = {'port': port, 'ok': False, 'error': None}
+
+    def _identify(self, fd):
+        # Ask the running firmware, which may not answer if it is broken
+        fd.reset_input_buffer()
+        fd.write(b'[FPN] G\r\n[FHV] G\r\n')
+        _found = {}
+        _buff = bytearray()
+        _end = monotonic() + 2
+        while len(_found) < 2 and monotonic() < _end:
+            _buff += bytearray(fd.read(64))
+            while b'\n' in _buff:
+                _line, _buff = _buff.split(b'\n', 1)
+                _line = _line.decode('ascii', 'replace').strip()
+                if len(_line) > 5 and _line[0] == '{':
+                    _code, _data = Controller.splitMessage(_line)
+                    if _code in ['FPN', 'FHV']:
+                        _found[_code] = _data
+        return _found.get('FPN'), _found.get('FHV')
+
+    def _reset(self, fd):
+        # Dropping DTR resets the board into the bootloader.  A pseudo
+        # terminal has no DTR, but the simulator is always listening.
+        try:
+            fd.dtr = False
+            time.sleep(0.1)
+            fd.dtr = True
+        except (IOError, OSError, ValueError):
+            pass
+
+    def _pages(self, phase, pages, do):
+        _total = len(pages) * len(pages[0][1]) if len(pages) > 0 else 0
+        _start = monotonic()
+        _done = 0
+        for _address, _page in pages:
+            do(_address, _page)
+            _done += len(_page)
+            _t = monotonic() - _start
+            self.progress(self.port, phase, _done, _total, _done / _t if _t > 0 else 0)
+        return monotonic() - _start
+
+    def run(self):
+        _r = self.result
+        _fd = None
+        try:
+            _fd = serial.Serial(port = self.port, baudrate = 9600, timeout = 0.1, exclusive = True)
+            _r['product'], _r['hardware'] = self._identify(_fd)
+            if _r['product'] is not None and _r['product'] not in self.targets:
+                raise ValueError('unknown device {}, not updated'.format(_r['product']))
+            _fd.baudrate = self.baud
+            self._reset(_fd)
+            _stk = STK500(_fd)
+            if not _stk.sync():
+                raise IOError('no bootloader answered')
+            _sig = _stk.signature()
+            _targets = [self.targets[_r['product']]] if _r['product'] else list(self.targets.values())
+            _target = ([_t for _t in _targets if _t['signature'] == _sig] + [None])[0]
+            if _target is None:
+                raise ValueError('processor signature {} does not match the device'.format(binascii.hexlify(_sig).decode('ascii')))
+            if self.image.end > _target['flash']:
+                raise ValueError('image is {} bytes, the device has room for {}'.format(self.image.end, _target['flash']))
+            _pages = list(self.image.pages(_target['page']))
+            _stk.enter()
+            _t = self._pages('write', _pages, _stk.writePage)
+            _bad = []
+            _read = bytearray(self.image.data) # the pages with no data are not written or read
+            def verify(address, page):
+                _back = _stk.readPage(address, len(page))
+                _read[address:address + len(page)] = _back
+                if _back != page:
+                    _bad.append(address)
+            _v = self._pages('verify', _pages, verify)
+            _stk.leave()
+            _r['pages'] = len(_pages)
+            _r['bytes'] = len(_pages) * _target['page']
+            _r['seconds'] = round(_t + _v, 2)
+            _r['rate'] = int(_r['bytes'] / _t) if _t > 0 else 0
+            _r['crc'] = '{:08x}'.format(zlib.crc32(bytes(self.image.data)) & 0xFFFFFFFF)
+            _r['crc_read'] = '{:08x}'.format(zlib.crc32(bytes(_read[0:self.image.end])) & 0xFFFFFFFF)
+            if len(_bad) > 0:
+                raise IOError('{} page(s) did not verify, first at 0x{:04X}'.format(len(_bad), _bad[0]))
+            if _r['crc'] != _r['crc_read']:
+                raise IOError('image CRC does not match the read back CRC')
+            _r['ok'] = True
+        except (IOError, OSError, ValueError, serial.SerialException) as e:
+            _r['error'] = str(e)
+        finally:
+            if _fd is not None:
+                _fd.close()
+        return _r
+
+    @staticmethod
+    def runAll(updates):
+        _threads = [threading.Thread(target = _u.run) for _u in updates]
+        for _t in _threads:
+            _t.daemon = True
+            _t.start()
+        for _t in _threads:
+            while _t.is_alive():
+                _t.join(0.5) # so that an interrupt is not held up
+        return [_u.result for _u in updates]
+
+class SimBootloader(object):
+    """
+    A pretend device on a pseudo terminal, answering the WSPR identity
+    commands and the STK500 bootloader, for trying out updates
+
+        start()   - opens the pseudo terminal and serves it in a thread
+        name      - the path of the port to use
+        flash     - the simulated flash memory
+        stop()    - stops serving
+    """
+    # The length of each command, including the EOP.  0x64 is followed
+    # by its data, so has its own rule.
+    lengths = {0x30: 2, 0x31: 2, 0x50: 2, 0x51: 2, 0x75: 2, 0x41: 3,
+               0x55: 4, 0x56: 6, 0x45: 7, 0x42: 22, 0x74: 5}
+
+    def __init__(self, product = '01012', hardware = '1', target = None, corrupt = 0.0, delay = 0.0):
+        self.product = product
+        self.hardware = hardware
+        self.target = target or FirmwareUpdate.targets.get(product, FirmwareUpdate.targets['01012'])
+        self.flash = bytearray(b'\xff' * (self.target['flash'] + 512))
+        self.corrupt = corrupt     # the chance of a bad byte in each page written
+        self.delay = delay         # seconds to write a page
+        self.name = None
+        self.writes = 0
+        self._address = 0
+        self._in = bytearray()
+        self._running = False
+
+    def start(self):
+        import tty # only on Unix, as are pseudo terminals
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.name = os.ttyname(self._slave)
+        self._running = True
+        _t = threading.Thread(target = self._serve)
+        _t.daemon = True
+        _t.start()
+
+    def stop(self):
+        self._running = False
+
+    def _serve(self):
+        try:
+            while self._running:
+                _r, _w, _x = select.select([self._master], [], [], 0.1)
+                if len(_r) > 0:
+                    self._in += bytearray(os.read(self._master, 4096))
+                    self._process()
+        finally:
+            os.close(self._master)
+            os.close(self._slave)
+
+    def _reply(self, data):
+        os.write(self._master, bytes(bytearray(data)))
+
+    def _process(self):
+        while len(self._in) > 0:
+            _c = self._in[0]
+            if _c == ord('['): # a WSPR command
+                if b'\n' not in self._in:
+                    return
+                _line, self._in = self._in.split(b'\n', 1)
+                _code = _line[1:4].decode('ascii', 'replace')
+                _data = {'FPN': self.product, 'FHV': self.hardware}.get(_code)
+                if _data is not None:
+                    self._reply(('{' + _code + '} ' + _data + '\r\n').encode('ascii'))
+                continue
+            if _c in bytearray(b'\r\n '):
+                self._in = self._in[1:]
+                continue
+            if _c == 0x64:
+                if len(self._in) < 4:
+                    return
+                _n = 5 + (self._in[1] << 8 | self._in[2])
+            else:
+                _n = self.lengths.get(_c, 1)
+            if len(self._in) < _n:
+                return
+            _cmd, self._in = self._in[:_n], self._in[_n:]
+            if _cmd[-1] != STK500.EOP: # lost sync, so skip a byte and look again
+                self._reply([STK500.NOSYNC])
+                self._in = _cmd[1:] + self._in
+                continue
+            self._reply([STK500.INSYNC] + self._stk(_cmd) + [STK500.OK])
+
+    def _stk(self, cmd):
+        _c = cmd[0]
+        if _c == 0x41:
+            return [{0x81: 8, 0x82: 0}.get(cmd[1], 3)] # optiboot 8.0
+        if _c == 0x75:
+            return list(bytearray(self.target['signature']))
+        if _c == 0x56:
+            return [0]
+        if _c == 0x55:
+            self._address = (cmd[1] | cmd[2] << 8) << 1
+        elif _c == 0x64:
+            _data = bytearray(cmd[4:-1])
+            if self.corrupt > 0 and random.random() < self.corrupt:
+                _data[random.randrange(len(_data))] ^= 0x01
+            if self._address + len(_data) <= self.target['flash']: # the bootloader protects itself
+                self.flash[self._address:self._address + len(_data)] = _data
+            self.writes += 1
+            time.sleep(self.delay)
+        elif _c == 0x74:
+            _n = cmd[1] << 8 | cmd[2]
+            return list(self.flash[self._address:self._address + _n])
+        return []
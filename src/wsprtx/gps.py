@@ -0,0 +1,324 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+GPS statistics, the host clock against GPS time, and the sky coverage map
+"""
+
+import array
+import collections
+import math
+import os
+import sys
+from .common import configDir, monotonic
+
+# GPS Statistics - rolling signal quality per satellite
+#
+# The GSI reports give one SNR per satellite each time the GPS updates.
+# For each satellite (PRN) the last reports are kept in a fixed size
+# ring buffer, and for each window (a number of reports, about one per
+# second) a histogram of the SNRs in that window is kept up to date as
+# reports enter and leave it.  SNR is a whole number of dB below 100,
+# so adding a report costs the same however long the windows are, and
+# the mean, minimum, maximum and percentiles are read straight from
+# the histogram when a summary is asked for.
+#
+# The GLC lock reports are used to measure how long the receiver has
+# held a position lock, and the time to first fix after a connection
+# or a lost lock.
+#
+class GPSStats(object):
+    """
+    Rolling GPS signal statistics
+
+        sample(prn,snr) - adds one SNR report for a satellite
+        lock(state)     - records a GLC report (True = position lock)
+        restart()       - starts timing a new first fix (e.g. on connect)
+        summary()       - dict of the statistics, for the View, the command line and Metrics
+        export(metrics) - puts the statistics into a Metrics()
+    """
+    def __init__(self, windows = (60, 600, 3600)):
+        self.windows = sorted(windows)
+        self._size = self.windows[-1]
+        self._sats = {}
+        self.restart()
+
+    class _Sat(object):
+        def __init__(self, size, windows):
+            self.buf = bytearray(size)
+            self.n = 0
+            self.hist = [[0] * 100 for _w in windows]
+            self.sum = [0] * len(windows)
+            self.last = 0
+
+    def restart(self):
+        self._started = monotonic()
+        self._locked = None       # monotonic() when the current lock started
+        self._lockedTotal = 0.0
+        self.ttff = None          # seconds from restart() or lock loss to the first lock
+        self._searching = self._started
+        self.losses = 0
+
+    def sample(self, prn, snr):
+        if snr < 0: snr = 0
+        if snr > 99: snr = 99
+        _s = self._sats.get(prn)
+        if _s is None:
+            _s = self._sats[prn] = GPSStats._Sat(self._size, self.windows)
+        for _i, _w in enumerate(self.windows):
+            if _s.n >= _w:
+                _old = _s.buf[(_s.n - _w) % self._size]
+                _s.hist[_i][_old] -= 1
+                _s.sum[_i] -= _old
+            _s.hist[_i][snr] += 1
+            _s.sum[_i] += snr
+        _s.buf[_s.n % self._size] = snr
+        _s.n += 1
+        _s.last = monotonic()
+
+    def lock(self, state):
+        _now = monotonic()
+        if state and self._locked is None:
+            self._locked = _now
+            if self._searching is not None:
+                self.ttff = _now - self._searching
+                self._searching = None
+        elif not state and self._locked is not None:
+            self._lockedTotal += _now - self._locked
+            self._locked = None
+            self._searching = _now
+            self.losses += 1
+
+    @staticmethod
+    def _window(hist, total, count):
+        _r = {'count': count, 'mean': float(total) / count}
+        _marks = [(0.1, 'p10'), (0.5, 'p50'), (0.9, 'p90')]
+        _seen = 0
+        for _snr in range(100):
+            if hist[_snr] == 0:
+                continue
+            if _seen == 0:
+                _r['min'] = _snr
+            _seen += hist[_snr]
+            while len(_marks) > 0 and _seen >= _marks[0][0] * count:
+                _r[_marks.pop(0)[1]] = _snr
+            _r['max'] = _snr
+        return _r
+
+    def satellite(self, prn):
+        """Statistics for one satellite: {window:{count,mean,min,max,p10,p50,p90}}"""
+        _s = self._sats.get(prn)
+        if _s is None:
+            return {}
+        _r = {}
+        for _i, _w in enumerate(self.windows):
+            _c = min(_s.n, _w)
+            _r[_w] = self._window(_s.hist[_i], _s.sum[_i], _c)
+        return _r
+
+    def summary(self):
+        _now = monotonic()
+        _up = self._lockedTotal
+        if self._locked is not None:
+            _up += _now - self._locked
+        _r = {'locked': self._locked is not None,
+              'lock_seconds': round(_now - self._locked, 1) if self._locked is not None else 0,
+              'lock_uptime': round(_up / max(_now - self._started, 1e-6), 4),
+              'lock_losses': self.losses,
+              'ttff': None if self.ttff is None else round(self.ttff, 1),
+              'satellites': {}}
+        for _prn in sorted(self._sats.keys()):
+            _sat = {'age': round(_now - self._sats[_prn].last, 1), 'samples': self._sats[_prn].n}
+            for _w, _st in self.satellite(_prn).items():
+                _sat[str(_w)] = dict((_k, round(_v, 1)) for _k, _v in _st.items())
+            _r['satellites'][_prn] = _sat
+        return _r
+
+    def export(self, metrics):
+        _sum = self.summary()
+        metrics.set('gps_locked', 1 if _sum['locked'] else 0, help = 'GPS position lock (1 = locked)')
+        metrics.set('gps_lock_uptime_ratio', _sum['lock_uptime'], help = 'Fraction of time with a position lock')
+        metrics.set('gps_lock_losses_total', _sum['lock_losses'], help = 'Number of times the lock was lost')
+        if _sum['ttff'] is not None:
+            metrics.set('gps_ttff_seconds', _sum['ttff'], help = 'Time to the last first fix')
+        _w = str(self.windows[0])
+        for _prn, _sat in _sum['satellites'].items():
+            if _w in _sat:
+                metrics.set('gps_snr_mean', _sat[_w]['mean'], {'prn': _prn, 'window': _w},
+                            help = 'Mean satellite SNR over the last window of reports')
+
+# Clock Offset - how far the host clock is from GPS time
+#
+# The Model stamps each line from the device when it is framed, with
+# both the monotonic and the wall clock.  A line that has waited in
+# the port's buffer is stamped late, so the time it takes to send the
+# bytes already waiting behind it is taken off, giving the time the
+# line's last byte arrived.  The time to send the line itself is taken
+# off too, giving the time its first byte left the device.
+#
+# Each GTM report then gives one sample of (host wall clock - GPS time
+# of day).  The delays in the device, the port and the host can only
+# make a sample late, never early, so the smallest sample of the last
+# few is the best estimate of the offset (as NTP does with its round
+# trip delays), and the spread of the samples is the jitter.  Whatever
+# fixed delay the device has between the GPS second and its report is
+# left in the offset; it is a few milliseconds.
+#
+# WSPR transmissions must start within about a second of the even
+# minute, so the host clock is good enough for the slots when the
+# offset, allowing for the jitter, is well inside that.
+#
+class ClockOffset(object):
+    """
+    Host clock against the GPS time reports
+
+        sample(gtm,wall)  - adds a GTM report stamped with the wall clock
+        offset            - host minus GPS, in seconds, or None
+        jitter            - standard deviation of the recent samples
+        summary()         - {name:value} of the estimate
+        export(metrics)   - puts the estimate in a Metrics
+    """
+    def __init__(self, window = 16, tolerance = 1.0):
+        self._samples = collections.deque(maxlen = window)
+        self.tolerance = tolerance
+        self.count = 0
+        self.offset = None
+        self.jitter = None
+        self._last = None
+
+    def sample(self, gtm, wall):
+        try:
+            _h, _m, _s = gtm.split(':')
+            _gps = int(_h) * 3600 + int(_m) * 60 + int(_s)
+        except ValueError:
+            return
+        _d = (wall % 86400) - _gps
+        _d = (_d + 43200) % 86400 - 43200 # the host and GPS may be either side of midnight
+        self._samples.append(_d)
+        self.count += 1
+        self._last = _d
+        self.offset = min(self._samples)
+        _mean = sum(self._samples) / len(self._samples)
+        self.jitter = math.sqrt(sum((_x - _mean) ** 2 for _x in self._samples) / len(self._samples))
+
+    def summary(self):
+        _ok = None
+        if self.offset is not None:
+            _ok = abs(self.offset) + 2 * self.jitter < self.tolerance / 2
+        return {'offset': None if self.offset is None else round(self.offset, 4),
+                'jitter': None if self.jitter is None else round(self.jitter, 4),
+                'last': None if self._last is None else round(self._last, 4),
+                'samples': self.count,
+                'window': len(self._samples),
+                'good_for_wspr': _ok}
+
+    def export(self, metrics):
+        if self.offset is None:
+            return
+        metrics.set('clock_offset_seconds', round(self.offset, 4), help = 'Host clock minus GPS time')
+        metrics.set('clock_jitter_seconds', round(self.jitter, 4), help = 'Spread of the recent offset samples')
+        metrics.set('clock_samples_total', self.count, help = 'GPS time reports used for the clock offset')
+
+# Sky Coverage - a long term map of where satellites are heard
+#
+# Every GSI report is binned by azimuth and elevation into a fixed
+# polar grid (10 degrees by 10 degrees), keeping a count of reports
+# and the sum of their SNRs for each cell.  Over hours and days this
+# shows which parts of the sky are blocked or weak at a site.  Adding a
+# report touches one cell, and the cells changed since the View last
+# drew them are remembered, so the display is updated incrementally.
+# The tables are arrays of 32 bit counters, saved to a small binary
+# file so the map builds up between runs.
+#
+class SkyCoverage(object):
+    """
+    Accumulated sky coverage map
+
+        add(az,el,snr) - bins one satellite report
+        cell(az,el)    - the cell number for a position
+        bounds(cell)   - the (az,el) of the low corner of a cell
+        mean(cell)     - mean SNR heard in a cell, None if nothing was
+        changed()      - the set of cells changed since the last call
+        load(), save() - reads or writes the map file
+    """
+    azStep = 10
+    elStep = 10
+    azBins = 36
+    elBins = 9
+    _magic = b'WSPRSKY1'
+
+    def __init__(self, filename = None):
+        if filename is None:
+            filename = os.path.join(configDir(), 'sky.dat')
+        self.filename = filename
+        self.cells = self.azBins * self.elBins
+        self.count = self._table()
+        self.snr = self._table()
+        self._changed = set()
+        self.dirty = False
+
+    def _table(self):
+        _t = array.array('I', [0]) * self.cells
+        if _t.itemsize != 4:
+            _t = array.array('L', [0]) * self.cells
+        return _t
+
+    def cell(self, az, el):
+        _a = (int(az) % 360) // self.azStep
+        _e = min(max(int(el), 0), 89) // self.elStep
+        return _e * self.azBins + _a
+
+    def bounds(self, cell):
+        return (cell % self.azBins) * self.azStep, (cell // self.azBins) * self.elStep
+
+    def add(self, az, el, snr):
+        _c = self.cell(az, el)
+        self.count[_c] += 1
+        self.snr[_c] += snr
+        self._changed.add(_c)
+        self.dirty = True
+
+    def mean(self, cell):
+        if self.count[cell] == 0:
+            return None
+        return float(self.snr[cell]) / self.count[cell]
+
+    def changed(self):
+        _c = self._changed
+        self._changed = set()
+        return _c
+
+    def load(self):
+        if not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, 'rb') as _f:
+                if _f.read(len(self._magic)) != self._magic:
+                    raise ValueError('not a sky coverage file')
+                _count = array.array(self.count.typecode)
+                _snr = array.array(self.snr.typecode)
+                _count.fromfile(_f, self.cells)
+                _snr.fromfile(_f, self.cells)
+        except (ValueError, EOFError, IOError, OSError) as e:
+            sys.stderr.write('Sky coverage file {} not loaded: {}\n'.format(self.filename, e))
+            return
+        if sys.byteorder == 'big':
+            _count.byteswap()
+            _snr.byteswap()
+        self.count, self.snr = _count, _snr
+        self._changed = set(range(self.cells))
+
+    def save(self):
+        _count, _snr = self.count, self.snr
+        if sys.byteorder == 'big':
+            _count, _snr = array.array(_count.typecode, _count), array.array(_snr.typecode, _snr)
+            _count.byteswap()
+            _snr.byteswap()
+        _tmp = self.filename + '.tmp'
+        with open(_tmp, 'wb') as _f:
+            _f.write(self._magic)
+            _count.tofile(_f)
+            _snr.tofile(_f)
+        if os.path.exists(self.filename) and sys.platform.startswith('win'):
+            os.remove(self.filename)
+        os.rename(_tmp, self.filename)
+        self.dirty = False
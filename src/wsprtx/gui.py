@@ -0,0 +1,1387 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The tkinter View
+"""
+
+import collections
+import math
+import time
+from . import common
+from .common import VERSION, python
+from .views import NullView
+from .widgets import CreateCanvasTip, CreateInfoButton, CreateToolTip, MC
+try:
+    if python == 2:
+        from Tkinter import *
+        import ttk
+        import tkFileDialog as filedialog
+    else:
+        from tkinter import *
+        from tkinter import ttk
+        from tkinter import filedialog
+except ImportError:
+    ttk = None     # the GUI (not needed for the terminal View, the daemon, ...)
+
+###############################################################################
+##### View
+###############################################################################
+#
+# The "View" is responsible to create an interface to the user, in this case
+# via a GUI.  The View can be re-written independently of the Model and
+# Controller to implement another GUI framework.
+#
+# This class is implemented to use tkinter (TK) since that is readily
+# available on practically all machines where Python is found. It is
+# the default GUI interface for Python.  The decision as to which View
+# to select is made in main(), where Qt or another GUI framework could
+# be selected.
+#
+# The View ideally should only output to the user.  User input from
+# tkinter is redirected to the Controller. This requires the use of
+# the "command" options on many input elements to involke the
+# appropriate functions to handle user input, or other methods (like
+# trace) to inform the Controller of changes intended by the user.
+#
+# A View may gather data from the Model or receive it from the
+# Controller to output on the display.  In this implementation, input
+# to View() from the Controller is not needed to provide view
+# selection, since the only view selection is the tab selection
+# handled internally to tkinter, and scrollbars.  In addition,
+# time-based updates to the view that are driven by tkinter, such as
+# the time clock, and remain within the View.  Input from the
+# Contoller include real-time changes originating from the Model and
+# responses to the View as a result of validating user selections.
+# View() also reads some data directly from the Model, which
+# simplifies that interface.
+#
+class View(NullView):
+    """
+    Tkinter View implemenetation
+    """
+    listLimit = 1000 # lines kept in the trace and log lists
+
+    def __init__(self, Controller):
+        self.vc = Controller
+
+        self.points = []       # for satellite positions
+        self.tabbg = '#D9E4F1' # background color for the tabbed left frame
+
+        self.root = Tk()
+        self.root.resizable(0, 0)
+        self.root.title('ZachTek WSPR Transmitter Configuration')
+        self.logo = PhotoImage(file = 'LP1 Icon.gif')
+        self.root.tk.call('wm','iconphoto',self.root._w,self.logo)
+        self.root.configure(background='white')
+
+        self.style = ttk.Style(self.root)
+        self.style.theme_use('classic')
+        self.style.theme_create( 'WSPR', parent = 'clam', settings = {
+            'TNotebook': {'configure': {'tabmargins': [2, 5, 2, 0],
+                                        'background': 'white'} },
+            'TNotebook.Tab': {
+                'configure': {'padding': [5, 1], 'background': self.tabbg },
+                'map':       {'background': [('selected', self.tabbg)],
+                              'expand': [('selected', [1, 1, 1, 0])] } },
+            'TFrame': {'configure': {'background':self.tabbg} },
+            'TProgressbar': {'configure': {'troughcolor':'#FFFFFF', 'background':'green'}},
+        } )
+        self.style.theme_use('WSPR')
+
+        self.name        = StringVar()  # set name or information
+        self.hardwareVer = StringVar()  # hardware version
+        self.hardwareRev = StringVar()  # hardware revision
+        self.firmwareVer = StringVar()  # firmware version
+        self.firmwareRev = StringVar()  # firmware revision
+        self.frequency   = StringVar()  # current output frequency
+        self.signal      = IntVar()     # GPS signal strenth (percentage)
+        self.curtime     = StringVar()  # Current time being displayed
+        self.position    = StringVar()  # Current GPS Maidenhead
+        self.debug       = IntVar()     # Debug checkbox setting
+        self.rxChars     = IntVar()     # Number of characters received on the port
+        self.sendCommands = StringVar() # Command string to send in debug mode
+        self.CRLF        = IntVar()     # CR/LF checkbox setting
+        self.pauseTime   = IntVar()     # Number of seconds to pause between transmit cycles
+        self.pausepercent = IntVar()    # Percentage progress of the pause part of the cycle
+        self.call        = StringVar()  # Amateur radio callsign
+        self.rpam        = StringVar()  # Selection of Automatic or Manual reported position
+        self.location    = StringVar()  # User-selected position entry
+        self.rpmode      = StringVar()  # Selection of Altitude or Power reporting
+        self.rpwr        = StringVar()  # Selected output power to be reported
+        self.d100M       = IntVar()     # 100MHz digit for the signal generator
+        self.d10M        = IntVar()     # 10MHz digit for the signal generator
+        self.d1M         = IntVar()     # 1MHz digit for the signal generator
+        self.d100k       = IntVar()     # 100kHz digit for the signal generator
+        self.d10k        = IntVar()     # 10kHz digit for the signal generator
+        self.d1k         = IntVar()     # 1kHz digit for the signal generator
+        self.d100Hz      = IntVar()     # 100Hz digit for the signal generator
+        self.d10Hz       = IntVar()     # 10Hz digit for the signal generator
+        self.d1Hz        = IntVar()     # 1Hz digit for the signal generator
+        self.d10c        = IntVar()     # 10cHz digit for the signal generator
+        self.d1c         = IntVar()     # 1cHz digit for the signal generator
+        self.boot        = StringVar()  # User selection of boot mode
+        self.portName    = StringVar()  # User setting of port name (may not be the one in use)
+        self.currentPort = StringVar()  # The current port Model() is using for comms
+        
+        self.mirror = MC(self.root,self.curtime) # Instantiate the Mirror clock
+
+        self._bands  = self.vc.model.bands()   # get info from Model
+        self._powers = self.vc.model.powers()  # band config and power levels
+
+        ################################################################
+        # Text for the information popup boxes
+        ################################################################
+        _tips1 = '''
+        The Signal Generator outputs a constant signal on the chosen frequency.
+        This is useful in a number of applications, like for example to measure SWR
+        or field strength of antennas.
+        If the boot configuration is set to signal generator, it can be unplugged after
+        setting and saving the frequency.  It can then be used standalone with a
+        phone charger or power bank.
+        This will in effect make it a mobile signal generator that will start up on the
+        same frequency whenever it gets power.
+        The signal generator will use any interal Low Pass filters in the transmitter to
+        get the cleanest signal.
+        In case there are no low pass filters fitted, the output signal will be square
+        wave with lots of overtones that can be used up to the UHF range.
+        The frequency accuracy is 2.5ppm or better for the WSPR Desktop and LP1
+        models and 10ppm for the WSPR Mini.
+        The actual accuracy can be a lot better than this due to frequency calibration
+        saved in EEPROM.
+        For example, the WSPR Desktop oputputting a 10MHz signal will often not be
+        off more than a couple of Hertz.'''
+        _tipb1 = '''
+        A green square indicates that a Low Pass filter is fitted
+        in this transmitter for this band.
+
+        This serves as a reminder as to what band is OK to
+        transmit on.
+        However, nothing has been done to prevent the user
+        to transmit on any band regardless of
+        what filters are fitted or not.
+        This is by design to give the maximum freedom for the
+        user in case the transmitter is modified or if external
+        filters are used, etc.
+        '''
+        _tipb2 = '''
+        The band tick-boxes determine what bands the WSPR Beacon will transmit on.
+
+        The frequency used will be somewhere within the 200Hz wide area used by WSPR on each
+        amateur band.
+        The modulation only occupies a few Hz in this 200Hz and the actual frequency is randomized
+        before each transmission
+        Using a random frequency minimizes the chances of tansmitting on top of another user for
+        extended periods.
+        The center frequency for the 200Hz WSPR area for all bands is shown below.
+
+        2190m       137.500kHz
+         630m       475.700kHz
+         160m     1.838 100MHz
+          80m     3.570 100MHz
+          40m     7.040 100MHz
+          30m    10.140 200MHz
+          20m    14.097 100MHz
+          17m    18.106 100MHz
+          15m    21,096 100MHz
+          12m    24.926 100MHz
+          10m    28.126 100MHz
+           6m    50.294 500MHz
+           4m    70.092 500MHz
+
+        As mentioned above, the actual frequency used is randomized +/- 100Hz.
+        The status area will show the current frequency used, the modulation frequency shift can also be
+        observed here when the beacon is running.
+
+        If a fixed frequency is needed, a special firmware has to be used and can be provided by
+        contacting ZachTek.
+        '''
+        _tipb3 = '''
+        This option sets an optional delay afte the WSPR beacon has run
+        for one pass.
+        The delay is in seconds and can be set from 0 to 99999.
+        The delay will come into effect after all enabled bands have been
+        transmitted on once.
+
+        By pausing the transmitter, we provide space on the bands for
+        other users.
+        This delay is especially important if only a single band is enabled.
+        For since band operation, I would recommend an 8 minute delay
+        (480 seconds).
+        As more bands are enabled, this delay can be lowered.
+        If four bands or more are enabled for transmission, the delay can be
+        set to 0.
+        While this pause is running, the pause can be seen in the
+        pause progess bar.
+        However, in the WSPR Mini, the entire Microcontroller is put to
+        sleep if the delay is more than 60 seconds.
+        This means that the pause progress may not be visible if the
+        transmitter is an WSPR Mini.
+        '''
+        _tipb4 = '''
+        This option will encode the altitude into the power information bits.
+
+        Every 3dB is 900 meters of altitude, so:
+             0dBm (0.001W) means the altitude is between 0 and 900m
+             3dBm (0.002W) is  900m to 1800m
+             7dBm (0.005W) is 1800m to 2700m
+            10dBm (0.010W) is 2700m to 3600m
+            etc.
+            60dBm ( 1000W) is 18km or higher
+
+        The transmitter must have firmware version 0.81 or higher to
+        support this.
+        This option is mostly meant to be used by the WSPR Pico model in
+        balloon flight applications.'''
+
+        ###################################################
+        # Top Level
+        ###################################################
+        #                                                 #
+        #  Layout scheme:                                 #
+        #                                                 #
+        #  +-tabs----------------+ +-right-------------+  #
+        #  |                     | | +-r1------------+ |  #
+        #  |   tab1 -WSPR beacon | | |               | |  #
+        #  |   tab2 -Signal Gen  | | +---------------+ |  #
+        #  |   tab3 -Boot config | | +-r2---+ +-r3---+ |  #
+        #  |   tab4 -Port select | | |      | |      | |  #
+        #  |                     | | |      | |      | |  #
+        #  |                     | | |      | |      | |  #
+        #  |                     | | |      | |      | |  #
+        #  |                     | | |      | |      | |  #
+        #  |                     | | |      | |      | |  #
+        #  |                     | | |      | |      | |  #
+        #  |                     | | +------+ +------+ |  #
+        #  +---------------------+ +-------------------+  #
+        #  +-bl------------------+ +-br----------------+  #
+        #  |                     | |                   |  #
+        #  |                     | |                   |  #
+        #  +---------------------+ +-------------------+  #
+        #  +-f0----------------------------------------+  #
+        #  |                                           |  #
+        #  |                                           |  #
+        #  +-------------------------------------------+  #
+        #                                                 #
+        ###################################################
+
+        ###################################################
+        ###################################################
+        # Left side is Notebook tabs
+        ###################################################
+        ###################################################
+        self.tabs = ttk.Notebook(self.root, padding = [0,0,0,0])
+        self.tab1 = ttk.Frame(self.tabs, borderwidth = 0, relief = 'flat')
+        self.tab2 = ttk.Frame(self.tabs, borderwidth = 0, relief = 'flat')
+        self.tab3 = ttk.Frame(self.tabs, borderwidth = 0, relief = 'flat')
+        self.tab4 = ttk.Frame(self.tabs, borderwidth = 0, relief = 'flat')
+        self.tabs.add(self.tab1, text = 'WSPR Beacon', state = 'disabled')
+        self.tabs.add(self.tab2, text = 'Signal Generator', state = 'disabled')
+        self.tabs.add(self.tab3, text = 'Boot Configuration', state = 'disabled')
+        self.tabs.add(self.tab4, text = 'Serial Port')
+        self.tabs.grid(row = 0, column = 0, columnspan = 2, sticky = W+N+S, padx = 5, pady = 5)
+        #self.tabs.select(self.tab4) Don't need to select it, since it is the only one enabled.
+        #                            Maybe later can add auto switching to the boot selection
+        #                            if the port is remembered from prior saves
+
+        ###################################################
+        ###################################################
+        # Right side frame set
+        ###################################################
+        ###################################################
+        self.right = Frame(self.root, padx = 5, bg='white')
+        self.right.grid(row = 0, column = 2, sticky = N+S)
+        self.r1 = Frame(self.right, bg='white')
+        self.r1.grid(row = 0, column = 0, sticky = W+N+E, columnspan = 2)
+        self.r2 = Frame(self.right, relief = 'ridge', bd = 2, bg='white')
+        self.r2.grid(row = 2, column = 0, sticky = N+S, pady = 10)
+        self.r3 = Frame(self.right, relief = 'ridge', bd = 2, bg='white')
+        self.r3.grid(row = 2, column = 1, sticky = N+S, padx = 10, pady = 10)
+
+        ###################################################
+        # r1 - User set name or information
+        ###################################################
+        ttk.Label(self.r1, anchor = SW, font = ('Arial', 12), text = 'User set name or information',
+                  background = 'white', justify = LEFT).grid(row = 0, column = 0, sticky = W+N+E, padx=5)
+        self.r1f1 = Frame(self.r1, relief = 'ridge', bd=2, bg='white')
+        self.r1f1.grid(row = 1, column = 0, sticky = W+N+E, padx=2)
+        self.name.set('')
+        self.r1e1 = Entry(self.r1f1, width = 48, textvariable = self.name, font = ('Arial', 18), justify = LEFT, relief='flat')
+        self.r1e1.grid(row = 0, column = 0, sticky = W+N+E)
+        for _event in ['<Return>', '<FocusOut>']:
+            self.r1e1.bind(_event, lambda event: self.vc.nameUpdate(self.name.get()), '+')
+        CreateToolTip(self.r1e1,'Give this transmitter a useful name.')
+        
+        ###################################################
+        # r2 - Device Status
+        ###################################################
+        #### r2f0 - top frame set: photo, hardware and firmware version info    
+        self.r2f0 = Frame(self.r2, bd = 0, width = 180, bg='white')
+        self.r2f0.grid(row = 0, column = 0, sticky = W+N, padx = 10)
+        self.frequency.set('0 000 000.00')
+        self.r2l1 = ttk.Label(self.r2f0, anchor = SW, font = ('Arial', 24), text = 'Device Status', background = 'white', justify = LEFT)
+        self.r2l1.grid(row = 0, column = 0, sticky = W+S, columnspan = 4, padx = 10, pady = 2)
+        self.unknown = PhotoImage(file = 'unknown.gif')
+        self.img1011 = PhotoImage(file = '1011.gif')
+        self.img1012 = PhotoImage(file = '1012.gif')
+        self.img1017 = PhotoImage(file = '1017.gif')
+        self.deviceName = 'Device not loaded'
+        self.image = Label(self.r2f0, image = self.unknown, text = 'Device not loaded', compound = CENTER, wraplength = 50, fg = 'red', bg='white')
+        self.image.grid(row = 1, column = 0, sticky = W+N+E+S, rowspan = 4, padx = 10)
+        self.image.ttp = CreateToolTip(self.image,self.deviceName)
+        self.r2l2 = ttk.Label(self.r2f0, anchor = SW, font = ('Arial', 18), text = 'Hardware', background = 'white', justify = LEFT)
+        self.r2l2.grid(row = 1, column = 1, sticky = W+S+E, columnspan = 3)
+        self.r2l3 = ttk.Label(self.r2f0, anchor = NE, font = ('Arial', 18), textvariable = self.hardwareVer, background = 'white', justify = RIGHT)
+        self.r2l3.grid(row = 2, column = 1, sticky = E+N)
+        CreateToolTip(self.r2l3,'Hardware version')
+        self.r2l4 = ttk.Label(self.r2f0, anchor = N, font = ('Arial', 18), text = '.', background = 'white', justify = CENTER)
+        self.r2l4.grid(row = 2, column = 2, sticky = N)
+        self.r2l5 = ttk.Label(self.r2f0, anchor = NW, font = ('Arial', 18), textvariable = self.hardwareRev, background = 'white', justify = LEFT)
+        self.r2l5.grid(row = 2, column = 3, sticky = W+N)
+        CreateToolTip(self.r2l5,'Hardware revision')
+        self.r2l6 = ttk.Label(self.r2f0, anchor = SW, font = ('Arial', 18), text = 'Firmware', background = 'white', justify = LEFT)
+        self.r2l6.grid(row = 3, column = 1, sticky = W+S+E, columnspan = 3)
+        self.r2l7 = ttk.Label(self.r2f0, anchor = NE, font = ('Arial', 18), textvariable = self.firmwareVer, background = 'white', justify = RIGHT)
+        self.r2l7.grid(row = 4, column = 1, sticky = E+N)
+        CreateToolTip(self.r2l7,'Software version - Major')
+        self.r2l8 = ttk.Label(self.r2f0, anchor = N, font = ('Arial', 18), text = '.', background = 'white', justify = CENTER)
+        self.r2l8.grid(row = 4, column = 2, sticky = N)
+        self.r2l9 = ttk.Label(self.r2f0, anchor = NW, font = ('Arial', 18), textvariable = self.firmwareRev, background = 'white', justify = LEFT)
+        self.r2l9.grid(row = 4, column = 3, sticky = W+N)
+        CreateToolTip(self.r2l9,'Software version - Minor')
+        
+        #### r2f1 - Frequency label frame set
+        self.r2f1 = LabelFrame(self.r2, font = ('Arial', 14), text = 'Current output frequency', background = 'white', width = 180)
+        self.r2f1.grid(row = 1, column = 0, sticky = W+N+E, pady = 10, padx = 10)
+        self.r2l6 = ttk.Label(self.r2f1, anchor = SE, font = ('Arial', 24), textvariable = self.frequency, background = 'white', justify = RIGHT)
+        self.r2l6.grid(row = 0, column = 0, sticky = E+S, padx = 10)
+        self.r2l7 = ttk.Label(self.r2f1, anchor = N, font = ('Arial', 16), text = 'MHz    kHz     Hz  ', background = 'white', justify = CENTER)
+        self.r2l7.grid(row = 1, column = 0, sticky = E+N, padx = 45)
+
+        #### r2f2 - Transmitter label frame set
+        self.r2f2 = LabelFrame(self.r2, font = ('Arial', 16), text = 'Transmitter output', background = 'white')
+        self.r2f2.grid(row = 2, column = 0, sticky = W+N+E, pady = 5, padx = 10)
+   
+        def LED(p, s, t):
+            f = Frame(p, bg='white')
+            txon = Frame(f, bg = 'grey80', relief = 'sunken', width = s, height = s)
+            txon.grid(row = 0, column = 0)
+            r2i2 = Label(f, text = t, font = ('Arial', 14), bg='white').grid(row = 0, column = 1, sticky = W)
+            return f, txon
+
+        self.r2b1, self.txon = LED(p = self.r2f2, s = 10, t = 'On')
+        self.r2b1.pack(anchor = W, padx = 10, pady = 0)
+        self.r2b2, self.txoff = LED(p = self.r2f2, s = 10, t = 'Off')
+        self.r2b2.pack(anchor = W, padx = 10, pady = 0)
+        
+        #### r2f2 - Running Program label frame set
+        self.r2f3 = LabelFrame(self.r2, font = ('Arial', 16), text = 'Program running', background = 'white')
+        self.r2f3.grid(row = 3, column = 0, sticky = W+N+E, pady = 5, padx = 10)
+        self.r2b3, self.beacon = LED(self.r2f3, 10, 'WSPR Beacon')
+        self.r2b3.pack(anchor = W, padx = 10)
+        self.r2b4, self.siggen = LED(self.r2f3, 10, 'Signal Generator')
+        self.r2b4.pack(anchor = W, padx = 10)
+        self.r2b5, self.idle = LED(self.r2f3, 10, 'Idle')
+        self.r2b5.pack(anchor = W, padx = 10)
+        CreateToolTip(self.r2f3,'Information about the running software routine in the transmitter.')
+
+        ###################################################
+        # r3 - GPS Information
+        ###################################################
+        self.r3l1 = ttk.Label(self.r3, anchor = SW, font = ('Arial', 24), text = 'GPS Information', background = 'white', justify = LEFT)
+        self.r3l1.grid(row = 0, column = 0, sticky = W+S, padx = 10)
+
+        #### r3f1 - Signal Quality frame
+        self.r3f1 = Frame(self.r3, bg='white')
+        self.r3l2 = ttk.Label(self.r3f1, anchor = S, font = ('Arial', 12), text = 'Signal Quality', background = 'white', justify = CENTER)
+        self.r3l2.grid(row = 1, column = 0, sticky = S)
+        self.signal_style = ttk.Style()
+        self.signal_style.layout('signal.Horizontal.TProgressbar', 
+                                 [('Horizontal.Progressbar.trough',
+                                   {'children': [('Horizontal.Progressbar.pbar',
+                                                  {'side': 'left', 'sticky': 'ns'})],
+                                    'sticky': 'nswe'}), 
+                                  ('Horizontal.Progressbar.label', {'sticky': ''})])
+        self.signal_style.configure('signal.Horizontal.TProgressbar', troughcolor = 'white', background = 'blue')
+        self.signal.set(0)
+        self.r3p1 = ttk.Progressbar(self.r3f1, orient = HORIZONTAL, length = 180, mode = 'determinate',
+                                    style = 'signal.Horizontal.TProgressbar', variable = self.signal)
+        self.r3p1.grid(row = 2, column = 0, sticky = N)
+        self.r3p1.ttp = CreateToolTip(self.r3p1,'The mean Signal to Noise Ratio of the four strongest satellites')
+        self.r3f1.grid(row = 1, column = 0, padx = 10, pady = 5)
+        self.locked = Label(self.r3f1, text = ' ', font = ('Arial',18), bg='white')
+        self.locked.grid(row = 3, column = 0, sticky = N)
+
+        #### r3f2 - Time and Position frame
+        self.r3f2 = Frame(self.r3, bg='white') 
+        self.r3l3 = ttk.Label(self.r3f2, anchor = SW, font = ('Arial', 12), text = 'UTC Time', background = 'white', justify = LEFT)
+        self.r3l3.grid(row = 0, column = 0, sticky = SW)
+        self.r3l4 = ttk.Label(self.r3f2, anchor = S, font = ('Arial', 12), text = 'Position', background = 'white', justify = LEFT)
+        self.r3l4.grid(row = 0, column = 1, sticky = S, padx = 30)
+        self.r3l5 = Label(self.r3f2, anchor = NW, font = ('Arial', 24), textvariable = self.curtime, background = 'white', justify = LEFT, fg = 'grey80')
+        self.r3l5.grid(row = 1, column = 0, sticky = NW)
+        self.r3l5.ttp = CreateToolTip(self.r3l5,'The host clock has not been compared with GPS yet')
+        self.r3l6 = Label(self.r3f2, anchor = N, font = ('Arial', 24), textvariable = self.position, background = 'white', justify = LEFT)
+        self.r3l6.grid(row = 1, column = 1, sticky = N)
+        CreateToolTip(self.r3l6,'Maidenhead grid')
+        self.r3f2.grid(row = 2, column = 0, padx = 10, pady = 5, sticky = W)
+
+        #### Label in r3 - Az/El info
+        self.r3l7 = ttk.Label(self.r3, anchor = S, font = ('Arial', 12), text = 'Az/El plot of GPS Satellites', background = 'white', justify = CENTER)
+        self.r3l7.grid(row = 3, column = 0, sticky = S, padx = 10)
+        CreateToolTip(self.r3l7,'Azimuth/Elevation plot of the visible GPS satellites')
+
+        #### Canvas for the GPS plot
+        self.plot = Canvas(self.r3, width = 240, height = 240, borderwidth = 0, highlightthickness = 0, bg = 'white')
+        self.plot.create_text(10, 120, text = 'W')
+        self.plot.create_text(120, 10, text = 'N')
+        self.plot.create_text(230, 120, text = 'E')
+        self.plot.create_text(120, 230, text = 'S')
+        self.plot.p1 = self.plot.create_arc(10, 10, 230, 230, style = ARC, start =  5, extent = 80, width = 2)
+        CreateCanvasTip(self.plot,self.plot.p1,'0 degree elevation marker (Local horizon)')
+        self.plot.p2 = self.plot.create_arc(10, 10, 230, 230, style = ARC, start = 95, extent = 80, width = 2)
+        CreateCanvasTip(self.plot,self.plot.p2,'0 degree elevation marker (Local horizon)')
+        self.plot.p3 = self.plot.create_arc(10, 10, 230, 230, style = ARC, start = 185, extent = 80, width = 2)
+        CreateCanvasTip(self.plot,self.plot.p3,'0 degree elevation marker (Local horizon)')
+        self.plot.p4 = self.plot.create_arc(10, 10, 230, 230, style = ARC, start = 275, extent = 80, width = 2)
+        CreateCanvasTip(self.plot,self.plot.p4,'0 degree elevation marker (Local horizon)')
+        self.plot.p5 = self.plot.create_oval(50, 50, 190, 190, outline = '#000000', fill = 'white', width = 2)
+        CreateCanvasTip(self.plot,self.plot.p5,'30 degree elevation marker')
+        self.plot.p6 = self.plot.create_oval(90, 90, 150, 150, outline = '#000000', fill = 'white', width = 2)
+        CreateCanvasTip(self.plot,self.plot.p6,'60 degree elevation marker')
+        self.plot.grid(row = 4, column = 0, padx = 10, pady = 5)
+        self.satTips = CreateCanvasTip(self.plot,'sat','') # every satellite shares one binding
+        self.skycells = {}     # canvas item for each coverage map cell that has been drawn
+        self.trails = {}       # [positions, canvas item, update last seen] for each satellite
+        self.updates = 0       # number of GPS updates plotted
+        self.skymap = IntVar()
+        self.showTrails = IntVar()
+        self.r3f3 = Frame(self.r3, bg='white')
+        self.r3f3.grid(row = 5, column = 0, padx = 10, sticky = W+E)
+        self.r3c1 = Checkbutton(self.r3f3, selectcolor = 'white', fg = 'black', text = 'Coverage map',
+                                variable = self.skymap, command = self.setSkymap, bg='white')
+        self.r3c1.pack(side = LEFT)
+        CreateToolTip(self.r3c1,'Shade the sky by the mean SNR heard there over all sessions.  Blank areas are never heard.')
+        self.r3c2 = Checkbutton(self.r3f3, selectcolor = 'white', fg = 'black', text = 'Trails',
+                                variable = self.showTrails, command = self.setTrails, bg='white')
+        self.r3c2.pack(side = RIGHT)
+        CreateToolTip(self.r3c2,'Show the recent track of each satellite')
+        
+        ###################################################
+        ###################################################
+        # bl - Bottom Left frame set
+        ###################################################
+        ###################################################
+        self.bl = Frame(self.root, relief = 'ridge', bd = 2, bg='white')
+        self.scrollbar = Scrollbar(self.bl)
+        self.scrollbar.pack(side = RIGHT, fill = Y)
+        self.log = Listbox(self.bl, yscrollcommand = self.scrollbar.set, height = 5, width = 40)
+        self.log.pack(side = LEFT, fill = BOTH)
+        self.scrollbar.config(command = self.log.yview)
+        self.bl.grid(row = 1, column = 0, sticky = W, padx = 5, pady = 5)
+        CreateToolTip(self.bl,'Errors and other miscellaneous information from the microcontroller are shown here')
+        
+        self.saveButton = Frame(self.root, bg='grey80')
+        self.saveButton.grid(row = 1, column = 1)
+        Button(self.saveButton, text = 'Save Settings', wraplength = 100, command = self.vc.saveSettingsPressed,
+               bg = 'grey80', font = ('Arial', 18), width = 10).grid(row = 0, column = 0, ipadx = 5,
+                                                                     ipady = 2, padx = 2, pady = 2)
+        CreateToolTip(self.saveButton,'Save the configuration to EEPROM')
+
+
+        ###################################################
+        ###################################################
+        # br - Bottom right frame set
+        ###################################################
+        ###################################################
+        self.br = Frame(self.root, bg='white')
+        self.br.grid(row = 1,column = 2,sticky = E)
+        self.debug.set(0)
+        self.debugButton = Checkbutton(self.br, selectcolor = 'white', fg = 'black', text = 'Debug view',
+                                       variable = self.debug, command = lambda: self.vc.setDebug(self.debug.get()),
+                                       bg='white')
+        self.debugButton.grid(row = 0, column = 0, sticky = E+S,pady = 10,padx = 20)
+        CreateToolTip(self.debugButton,'Display optional controls for troubleshooting')
+        self.ver = Label(self.br, text = 'Version: '+VERSION, bg='white')
+        self.ver.grid(row = 0, column = 1, sticky = E+S, pady = 10, padx = 10)
+        CreateToolTip(self.ver,'Version of this program')
+
+        ###################################################
+        ###################################################
+        # f0 - Debug frame
+        ###################################################
+        ###################################################
+        self.f0 = Frame(self.root, bg='white')
+        self.f0.grid(row = 2,column = 0,columnspan = 4,sticky = W+E,pady = 5)
+
+        self.b0 = Frame(self.f0, relief = 'ridge', bd = 2)
+        self.s0 = Scrollbar(self.b0)
+        self.s0.pack(side = RIGHT, fill = Y)
+        self.trace = Listbox(self.b0, yscrollcommand = self.s0.set, height = 10, width = 60)
+        self.trace.pack(side = LEFT, fill = BOTH)
+        self.s0.config(command = self.trace.yview)
+        self.b0.grid(row = 0, rowspan = 2, column = 0, sticky = W)
+        CreateToolTip(self.f0,'Incoming API texts are shown here')
+
+        self.f0f1 = Frame(self.f0, bg='white')
+        self.f0f1.grid(row = 0,column = 1,padx = 20,sticky = W+N)
+        self.f0l1 = Label(self.f0f1, text = 'RXChars:', bg='white')
+        self.f0l1.grid(row = 0, column = 1, sticky = E)
+        self.f0l2 = Label(self.f0f1, textvariable = self.rxChars, bg='white')
+        self.f0l2.grid(row = 0, column = 2, sticky = W)
+        self.f0l3 = LabelFrame(self.f0, text = 'SendCommands', bg='white')
+        self.f0l3.grid(row = 1, column = 1,sticky = S+W,padx = 10,pady = 10)
+        CreateToolTip(self.f0l3,'Use this to send API commands to the microcontroller')
+        self.f0e1 = ttk.Entry(self.f0l3, width = 40, textvariable = self.sendCommands)
+        self.f0e1.grid(row = 0, column = 0, columnspan = 2, padx = 20)
+        CreateToolTip(self.f0e1,'Put you API command string here')
+        self.CRLF.set(1)
+        self.f0c1 = Checkbutton(self.f0l3, selectcolor = 'white', fg='black', text = 'Send CR+LF',
+                                variable = self.CRLF, command = self.vc.setCRLF, bg='white')
+        self.f0c1.grid(row = 1, column = 0, sticky = W+S,pady = 10)
+        self.sendButton = Button(self.f0l3, text = 'Send',
+                                 command = lambda: self.vc.sendPressed(self.sendCommands.get(), self.CRLF.get()),
+                                 bg = 'grey80', font = ('Arial', 18))
+        self.sendButton.grid(row = 1, column = 1, sticky = E+S,padx = 5,pady = 5)
+        self.scriptButton = Button(self.f0l3, text = 'Script', command = self.scriptPressed,
+                                   bg = 'grey80', font = ('Arial', 18))
+        self.scriptButton.grid(row = 1, column = 2, sticky = E+S,padx = 5,pady = 5)
+        CreateToolTip(self.scriptButton,'Run a file of send/expect/wait/repeat steps, with timings in this pane')
+        self.f0.grid_forget()
+
+        ###################################################
+        ###################################################
+        # tab1 - WSPR Beacon Tab
+        ###################################################
+        ###################################################
+
+        ### Layout - tab1 #############################
+        #                                             #
+        #  +-f1------------------------------------+  #
+        #  | +-f1l1------------------------------+ |  #
+        #  | | +-f1l2------------+ +-f1f1------+ | |  #
+        #  | | |                 | |           | | |  #
+        #  | | |   per band      | | Callsign  | | |  #
+        #  | | |     settings    | |           | | |  #
+        #  | | |                 | | +-f1l6--+ | | |  #
+        #  | | |                 | | | Pos'n | | | |  #
+        #  | | |                 | | +-------+ | | |  #
+        #  | | |                 | | +-f1l7--+ | | |  #
+        #  | | |                 | | | Power | | | |  #
+        #  | | |                 | | +-------+ | | |  #
+        #  | | |                 | |           | | |  #
+        #  | | |                 | | +-f1f2--+ | | |  #
+        #  | | |    pause        | | | St/St | | | |  #
+        #  | | |                 | | +-------+ | | |  #
+        #  | | +-----------------+ +-----------+ | |  #
+        #  | +-----------------------------------+ |  #
+        #  +---------------------------------------+  #
+        #                                             #
+        ###############################################
+
+        self.f1 = Frame(self.tab1, bg = self.tabbg)
+        self.f1.grid(row = 0, column = 0)
+        self.f1l1 = LabelFrame(self.f1, font = ('Arial', 18), text = 'WSPR Configuration', background = self.tabbg, padx = 5)
+        self.f1l1.grid(row = 0, column = 0)
+
+        ##### Items within the Left side of the Beacon tab
+        self.f1l2 = LabelFrame(self.f1l1, font = ('Arial', 14), text = 'Bands to transmit on', background = self.tabbg)
+        self.f1l2.grid(row = 0, column = 0, sticky = N+S+W)
+        CreateInfoButton(self.f1l2, 'Click me for more information about this section',
+                         _tipb1, bg=self.tabbg).grid(row = 0, column = 0)
+        CreateInfoButton(self.f1l2, 'Click me for more information about this section',
+                         _tipb2, bg=self.tabbg).grid(row = 0, column = 1, columnspan = 2)
+        ttk.Label(self.f1l2, font = ('Arial', 16), text = 'LP', background = self.tabbg,
+                  justify = CENTER).grid(row = 1, column = 0)
+        ttk.Label(self.f1l2, font = ('Arial', 16), text = 'Band', background = self.tabbg,
+                  justify = CENTER).grid(row = 1, column = 1, columnspan = 2)
+        ttk.Label(self.f1l2, font = ('Arial', 16), text = 'Progress', background = self.tabbg,
+                  justify = CENTER).grid(row = 1, column = 3, columnspan = 2)
+
+        self.lp = []
+        self.band = []
+        self.bandlabel = []
+        self.progress = []
+        self.percentprogress = []
+        self.active = []
+        self.f1f = []
+        self.enable = []        
+        self.blank_style = ttk.Style()
+        self.blank_style.configure('blank.Horizontal.TProgressbar',troughcolor = self.tabbg, background = self.tabbg,
+                                   bordercolor = self.tabbg, darkcolor = self.tabbg, lightcolor = self.tabbg)
+
+        for n in range(len(self._bands)):
+            self.lp.append(Frame(self.f1l2, bg = self.tabbg, relief = 'flat', width = 10, height = 10))
+            self.lp[n].grid(row = 2+n, column = 0)
+            self.enable.append(IntVar())
+            self.band.append(Checkbutton(self.f1l2, bg = self.tabbg, selectcolor = 'white', fg='black', bd = 2, highlightthickness = 0,
+                                         variable = self.enable[n],
+                                         command = lambda: self.vc.bandCheck([_e.get() == 1 for _e in self.enable])))
+            self.band[n].grid(row = 2+n, column = 1, sticky = E)
+            self.enable[n].set(0)
+            #self.band[n].configure(state = 'disabled')
+            CreateToolTip(self.band[n],'Enable/Disable transmission on this band')
+            self.bandlabel.append(ttk.Label(self.f1l2, font = ('Arial', 14), text = self._bands[n],
+                                            background = self.tabbg, justify = LEFT, anchor = W))
+            self.bandlabel[n].grid(row = 2+n, column = 2, sticky = W)
+            self.percentprogress.append(IntVar())
+            self.percentprogress[n].set(0)
+            self.progress.append(ttk.Progressbar(self.f1l2, style = 'blank.Horizontal.TProgressbar', orient = HORIZONTAL, length = 50,
+                                                 mode = 'determinate',variable = self.percentprogress[n]))
+            self.progress[n].grid(row = 2+n, column = 3)
+            CreateToolTip(self.progress[n],'WSPR transmission progress')
+            self.active.append(Label(self.f1l2, font = ('Arial', 16), text = ' ', width = 1, borderwidth = 0, bg = self.tabbg, bd = 0,
+                                     highlightthickness = 0, anchor = 'center'))
+            self.active[n].grid(row = 2+n, column = 4)
+
+        n = len(self._bands)+2
+        ttk.Label(self.f1l2, font = ('Arial', 14), text = 'Pause after transmission.', background = self.tabbg,
+                  justify = CENTER).grid(row = n, column = 0, columnspan = 3)
+        CreateInfoButton(self.f1l2, 'Click me for more information about this section',
+                         _tipb3, bg=self.tabbg).grid(row = n+1, column = 0, padx = 10, sticky = E)
+        self.pauseTime.set(0)
+        self.pause = ttk.Entry(self.f1l2, width = 6, textvariable = self.pauseTime)
+        self.pause.grid(row = n+1, column = 1, columnspan = 2, sticky = W)
+        CreateToolTip(self.pause,'Pause in seconds after the WSPR beacon has transmitted on all enabled bands.')
+        for _event in ['<Return>', '<FocusOut>']:
+            self.pause.bind(_event, self.pauseUpdate, '+')
+        self.f1p1 = ttk.Progressbar(self.f1l2, orient = HORIZONTAL, length = 50, mode = 'determinate', variable = self.pausepercent)
+        self.f1p1.grid(row = n+1, column = 3)
+        CreateToolTip(self.f1p1,'Pause progress')
+        self.pauseactive = Label(self.f1l2, font = ('Arial', 16), text = ' ', width = 1, borderwidth = 0, bg = self.tabbg, bd = 0,
+                                 highlightthickness = 0, anchor = 'center')
+        self.pauseactive.grid(row = n+1, column = 4)
+        
+        # Loop graphic
+        m = (5+n)*20
+        self.loop = Canvas(self.f1l2, width = 60, height = m, borderwidth = 0, highlightthickness = 0, bg = self.tabbg)
+        self.loop.create_line(50, 30, 50, m-40, width = 3)
+        self.loop.create_line(10, 40, 10, m-40, dash = (4, 2), width = 3, arrow = LAST)
+        self.loop.create_line(10, 40, 10, 44, dash = (4, 2), width = 3, arrow = LAST)
+        self.loop.create_arc(10, 60, 50, 10, style = ARC, start = 0, extent = 180, width = 3)
+        self.loop.create_arc(10, m-20, 50, m-60, style = ARC, start = 180, extent = 180, width = 3)
+        self.loop.grid(row = 0, column = 5, rowspan = n+4, padx = 10)
+
+        ################################################################
+        # Right side of Beacon Configuration frame
+        ################################################################
+        self.f1f1 = Frame(self.f1l1, bg = self.tabbg)
+        self.f1f1.grid(row = 0, column = 1, sticky = N+S, padx = 10)
+
+        # Call sign
+        ttk.Label(self.f1f1, font = ('Arial', 14), text = 'Call Sign', background = self.tabbg,
+                  justify = LEFT).grid(row = 0, column = 0, sticky = W+N)
+        self.f1e2 = ttk.Entry(self.f1f1, width = 8, textvariable = self.call, font = ('Arial', 20))
+        for _event in ['<Return>', '<FocusOut>']:
+            self.f1e2.bind(_event, lambda event: self.vc.callUpdate(self.call.get()), '+')
+        self.f1e2.grid(row = 1, column = 0, sticky = W+N)
+        self.f1e2.insert(0, '')
+        CreateToolTip(self.f1e2,'Your Amateur Call Sign.  Max six characters')
+
+        #### f1l6 - Position reporting labelframe
+        self.f1l6 = LabelFrame(self.f1f1, font = ('Arial', 14), text = 'Reported position', background = self.tabbg, pady = 10)
+        self.f1l6.grid(row = 2, column = 0, pady = 10, sticky = N+W+E)
+        Radiobutton(self.f1l6, text = 'Auto (GPS)', font = ('Arial', 14), padx = 10,
+                    variable = self.rpam, value = 'G', bg = self.tabbg, command = self.vc.rpamGPS).pack(anchor = W)
+        Radiobutton(self.f1l6, text = 'Manual', font = ('Arial', 14), padx = 10,
+                    variable = self.rpam, value = 'M', bg = self.tabbg,  command = self.vc.rpamManual).pack(anchor = W)
+        self.rpam.set('G')
+        self.f1e3 = ttk.Entry(self.f1l6, width = 5, textvariable = self.location)
+        self.f1e3.pack(anchor = N)
+        for _event in ['<Return>', '<FocusOut>']:
+            self.f1e3.bind(_event, lambda event: self.vc.changeLocation(self.location.get()), '+')
+        
+        #### f1l7 - Power reporting labelframe
+        self.f1l7 = LabelFrame(self.f1f1, font = ('Arial', 14), text = 'Reported power', background = self.tabbg, pady = 10)
+        self.f1l7.grid(row = 3, column = 0, sticky = N+W+E)
+        CreateToolTip(self.f1l7,'Set the power you want to report in the transmission')
+        self.f1b3 = Radiobutton(self.f1l7, text = 'Normal mode', font = ('Arial', 14), padx = 10,
+                                variable = self.rpmode, value = 'N', bg = self.tabbg,
+                                command = self.vc.rpmodeNormal)
+        self.f1b3.grid(row = 0, column = 0, columnspan = 2, sticky = W+S)
+        # Note: need to separate the button and label - different tool tip in each in the official version
+        CreateToolTip(self.f1b3,'Normal power reporting from the listbox below.')
+        self.f1o1 = OptionMenu(self.f1l7, self.rpwr, *self._powers, command = self.vc.rpwrUpdate)
+        self.f1o1.grid(row = 1, column = 0, sticky = E)
+        self.rpwr.set('23')
+        CreateToolTip(self.f1o1,'Pick the power you are using.  Normally 23 dBm for the Desktop and LP1 products.')
+        Label(self.f1l7, text = 'dBm', bg = self.tabbg).grid(row = 1, column = 1, sticky = W)
+        self.f1df = Frame(self.f1l7, bg=self.tabbg)
+        self.f1df.grid(row = 3, column = 0, columnspan = 2, sticky=W, pady = 5)
+        self.f1b4 = Radiobutton(self.f1df, variable = self.rpmode, value = 'A', command = self.vc.rpmodeAltitude,
+                                bg = self.tabbg, anchor = SW).grid(row = 0, column = 0, sticky=W+N)
+        Label(self.f1df, text = 'Encode Altitude as power', font = ('Arial', 14), justify = LEFT, wraplength = 100,
+              bg = self.tabbg).grid(row = 0, column = 1, sticky=W)
+        self.rpmode.set('N')
+        CreateToolTip(self.f1df,'Altitude will be sent as power. 0-18km will be coded into 0-60dBm.')
+        CreateInfoButton(self.f1l7, 'Click me for more information about this section',
+                         _tipb4, bg=self.tabbg).grid(row = 4, column = 1, sticky = E)
+
+        #### f1f2 - Start/Stop buttons
+        self.f1f2 = Frame(self.f1f1, background = self.tabbg)
+        self.f1f2.grid(row = 4, column = 0, sticky = 'SWE', padx = 15, pady = 15)
+
+        self.running = Frame(self.f1f2, bg = self.tabbg)
+        self.running.pack(side = LEFT)
+        Button(self.running, text = 'Start', command = self.vc.startPressed, bg = 'grey80',
+               font = ('Arial', 18)).grid(row = 0, column = 0, ipadx = 5, ipady = 2, padx = 2, pady = 2)
+        self.stopped = Frame(self.f1f2, bg = self.tabbg)
+        self.stopped.pack(side = RIGHT)
+        Button(self.stopped, text = 'Stop', command = self.vc.stopPressed, bg = 'grey80',
+               font = ('Arial', 18)).grid(row = 0, column = 0, ipadx = 5, ipady = 2, padx = 2, pady = 2)
+
+        self.f1f1.grid_columnconfigure(1, weight = 1)
+        self.f1f1.grid_rowconfigure(4, weight = 1)
+
+        ###################################################
+        ###################################################
+        # tab2 - Signal Generator tab
+        ###################################################
+        ###################################################
+        self.f2 = Frame(self.tab2, bg = self.tabbg)
+        self.f2.grid(row = 0, column = 0, sticky = W+E, padx = 20)
+        self.f2l1 = LabelFrame(self.f2, font = ('Arial', 18), text = 'Signal Generator', background = self.tabbg, pady = 10)
+        self.f2l1.grid(row = 0, column = 0, columnspan = 2, sticky = N+W+E+S, ipadx = 20)
+
+        #### row 0 - labels
+        Label(self.f2l1, text = 'MHz', bg = self.tabbg, font = ('Arial', 14)).grid(row = 0, column = 1, sticky = 'N')
+        Label(self.f2l1, text = 'kHz', bg = self.tabbg, font = ('Arial', 14)).grid(row = 0, column = 3, sticky = 'N')
+        Label(self.f2l1, text = ' Hz', bg = self.tabbg, font = ('Arial', 14)).grid(row = 0, column = 5, sticky = 'N')
+        Label(self.f2l1, text = 'cHz', bg = self.tabbg, font = ('Arial', 14)).grid(row = 0, column = 7, sticky = 'N')
+        
+        #### row 1 - frames to hold groups of three digits, spacings, and info button
+        self.f2f0 = Frame(self.f2l1, bg = self.tabbg)
+        self.f2f0.grid(row = 1, column = 0, padx=20)
+        self.f2f1 = Frame(self.f2l1, bg = self.tabbg) #MHz
+        self.f2f1.grid(row = 1, column = 1)
+        self.f2f2 = Frame(self.f2l1, bg = self.tabbg)
+        self.f2f2.grid(row = 1, column = 2)
+        self.f2f3 = Frame(self.f2l1, bg = self.tabbg) #kHz
+        self.f2f3.grid(row = 1, column = 3)
+        self.f2f4 = Frame(self.f2l1, bg = self.tabbg)
+        self.f2f4.grid(row = 1, column = 4)
+        self.f2f5 = Frame(self.f2l1, bg = self.tabbg) #Hz
+        self.f2f5.grid(row = 1, column = 5)
+        self.f2f6 = Frame(self.f2l1, bg = self.tabbg) #dot
+        self.f2f6.grid(row = 1, column = 6)
+        self.f2f7 = Frame(self.f2l1, bg = self.tabbg) #cHz
+        self.f2f7.grid(row = 1, column = 7)
+        self.f2f8 = Frame(self.f2l1, bg = self.tabbg) #info
+        self.f2f8.grid(row = 1, column = 8)
+
+        # up buttons, digits, and down buttons for the MHz frame
+        Button(self.f2f1, text = '+', command = self.vc.up100M, bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 0, column = 0, sticky = 'S')
+        Button(self.f2f1, text = '+', command = self.vc.up10M,  bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 0, column = 1, sticky = 'S')
+        Button(self.f2f1, text = '+', command = self.vc.up1M,   bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 0, column = 2, sticky = 'S')
+        Label(self.f2f1, textvariable = self.d100M, bg = self.tabbg, font = ('Arial', 16)).grid(row = 1, column = 0)
+        Label(self.f2f1, textvariable = self.d10M,  bg = self.tabbg, font = ('Arial', 16)).grid(row = 1, column = 1)
+        Label(self.f2f1, textvariable = self.d1M,   bg = self.tabbg, font = ('Arial', 16)).grid(row = 1, column = 2)
+        Button(self.f2f1, text = '-', command = self.vc.down100M, bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 2, column = 0, sticky = 'S')
+        Button(self.f2f1, text = '-', command = self.vc.down10M,  bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 2, column = 1, sticky = 'S')
+        Button(self.f2f1, text = '-', command = self.vc.down1M,   bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 2, column = 2, sticky = 'S')
+
+        # Space holder to seperate the MHz from the kHz
+        Label(self.f2f2, text = ' ', bg = self.tabbg, font = ('Arial', 16)).grid(row = 0, column = 0, padx = 10)
+        
+        # up buttons, digits, and down buttons for the kHz frame
+        Button(self.f2f3, text = '+', command = self.vc.up100k, bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 0, column = 0, sticky = 'S')
+        Button(self.f2f3, text = '+', command = self.vc.up10k,  bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 0, column = 1, sticky = 'S')
+        Button(self.f2f3, text = '+', command = self.vc.up1k,   bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 0, column = 2, sticky = 'S')
+        Label(self.f2f3, textvariable = self.d100k, bg = self.tabbg, font = ('Arial', 16)).grid(row = 1, column = 0)
+        Label(self.f2f3, textvariable = self.d10k,  bg = self.tabbg, font = ('Arial', 16)).grid(row = 1, column = 1)
+        Label(self.f2f3, textvariable = self.d1k,   bg = self.tabbg, font = ('Arial', 16)).grid(row = 1, column = 2)
+        Button(self.f2f3, text = '-', command = self.vc.down100k, bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 2, column = 0, sticky = 'S')
+        Button(self.f2f3, text = '-', command = self.vc.down10k,  bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 2, column = 1, sticky = 'S')
+        Button(self.f2f3, text = '-', command = self.vc.down1k,   bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 2, column = 2, sticky = 'S')
+
+        # Space holder to seperate the kHz from the Hz
+        Label(self.f2f4, text = ' ', bg = self.tabbg, font = ('Arial', 16)).grid(row = 0, column = 0, padx = 10)
+
+        # up buttons, digits, and down buttons for the Hz frame
+        Button(self.f2f5, text = '+', command = self.vc.up100Hz, bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 0, column = 0, sticky = 'S')
+        Button(self.f2f5, text = '+', command = self.vc.up10Hz,  bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 0, column = 1, sticky = 'S')
+        Button(self.f2f5, text = '+', command = self.vc.up1Hz,   bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 0, column = 2, sticky = 'S')
+        Label(self.f2f5, textvariable = self.d100Hz, bg = self.tabbg, font = ('Arial', 16)).grid(row = 1, column = 0)
+        Label(self.f2f5, textvariable = self.d10Hz,  bg = self.tabbg, font = ('Arial', 16)).grid(row = 1, column = 1)
+        Label(self.f2f5, textvariable = self.d1Hz,   bg = self.tabbg, font = ('Arial', 16)).grid(row = 1, column = 2)
+        Button(self.f2f5, text = '-', command = self.vc.down100Hz, bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 2, column = 0, sticky = 'S')
+        Button(self.f2f5, text = '-', command = self.vc.down10Hz,  bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 2, column = 1, sticky = 'S')
+        Button(self.f2f5, text = '-', command = self.vc.down1Hz,   bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 2, column = 2, sticky = 'S')
+
+        # Decimal mark to seperate the Hz from the cHz
+        Label(self.f2f6, text = '.', bg = self.tabbg, font = ('Arial', 16)).grid(row = 0, column = 0, padx = 10)
+
+        # up buttons, digits, and down buttons for the cHz frame
+        Button(self.f2f7, text = '+', command = self.vc.up10c,  bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 0, column = 1, sticky = 'S')
+        Button(self.f2f7, text = '+', command = self.vc.up1c,   bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 0, column = 2, sticky = 'S')
+        Label(self.f2f7, textvariable = self.d10c,  bg = self.tabbg, font = ('Arial', 16)).grid(row = 1, column = 1)
+        Label(self.f2f7, textvariable = self.d1c,   bg = self.tabbg, font = ('Arial', 16)).grid(row = 1, column = 2)
+        Button(self.f2f7, text = '-', command = self.vc.down10c,  bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 2, column = 1, sticky = 'S')
+        Button(self.f2f7, text = '-', command = self.vc.down1c,   bg = 'grey80', font = ('Arial', 12),
+               highlightthickness = 0).grid(row = 2, column = 2, sticky = 'S')
+
+        # info button on the right side
+        CreateInfoButton(self.f2f8, 'Click me for more information about this section', _tips1, bg=self.tabbg).grid(row = 0, column = 0, padx=20)
+
+        # Frame to hold the Start/Stop buttons
+        self.f2f9 = Frame(self.f2l1, bg = self.tabbg)
+        self.f2f9.grid(row = 2, column = 6, columnspan = 3, padx=20, pady = 40, sticky=W+E+S)
+        self.generating = Frame(self.f2f9, bg = self.tabbg)
+        self.generating.pack(side = LEFT)
+        Button(self.generating, text = 'Start', command = self.vc.startGenerator, bg = 'grey80',
+               font = ('Arial', 18)).grid(row = 0, column = 0, ipadx = 5, ipady = 2, padx = 2, pady = 2)
+        self.silent = Frame(self.f2f9, bg = self.tabbg)
+        self.silent.pack(side = RIGHT)
+        Button(self.silent, text = 'Stop', command = self.vc.stopPressed, bg = 'grey80',
+               font = ('Arial', 18)).grid(row = 0, column = 0, ipadx = 5, ipady = 2, padx = 2, pady = 2)
+
+        ###################################################
+        ###################################################
+        # tab3 - Boot Configuration tab
+        ###################################################
+        ###################################################
+        self.f3 = Frame(self.tab3, bg = self.tabbg)
+        self.f3.grid(row = 0, column = 0) 
+        self.f3l1 = LabelFrame(self.f3, font = ('Arial', 14), text = 'Do this at startup', background = self.tabbg, pady = 10)
+        self.f3l1.grid(row = 0, column = 0, columnspan = 2, sticky = W+E, padx = 20)
+        Radiobutton(self.f3l1, text = 'Signal Generator', font = ('Arial', 14), padx = 10, variable = self.boot,
+                    highlightthickness = 0, value = 'S', bg = self.tabbg, command = lambda: self.vc.setBoot(self.boot.get())).pack(anchor = W, padx=10)
+        Radiobutton(self.f3l1, text = 'WSPR Beacon', font = ('Arial', 14), padx = 10, variable = self.boot,
+                    highlightthickness = 0, value = 'W', bg = self.tabbg,  command = lambda: self.vc.setBoot(self.boot.get())).pack(anchor = W, padx=10)
+        Radiobutton(self.f3l1, text = 'Idle', font = ('Arial', 14), padx = 10, variable = self.boot,
+                    highlightthickness = 0, value = 'N', bg = self.tabbg,  command = lambda: self.vc.setBoot(self.boot.get())).pack(anchor = W, padx=10)
+        self.boot.set('N')
+        CreateToolTip(self.f3l1,'Determines what software routine is executed at power on.')
+        
+        ###################################################
+        ###################################################
+        # tab4 - Serial port tab
+        ###################################################
+        ###################################################
+        self.f4 = Frame(self.tab4, bg = self.tabbg,padx = 20)
+        self.f4.grid(row = 0, column = 0, padx = 20, sticky=W+E)
+ 
+        #### Top labelframe holds the user selection
+        self.f4l4 = LabelFrame(self.f4, font = ('Arial', 14), text = 'Serial Port', background = self.tabbg, pady = 10)
+        self.f4l4.grid(row=0,column=0,sticky=N+W+E)
+        self.f4m1 = OptionMenu(self.f4l4, self.portName, *self.vc.model.getPorts())
+        self.f4m1.config(bg = self.tabbg)
+        self.f4m1.pack(side=LEFT,expand=True,fill=BOTH)
+        self.serialButton = Button(self.f4l4, text = 'Select', command = lambda: self.vc.selectPort(self.portName.get()),
+                                   bg = 'grey80', font = ('Arial', 14))
+        self.serialButton.pack(side=RIGHT,padx=10)
+        CreateToolTip(self.f4l4,'Serial port setting for communication with the transmitter.')
+        
+        #### Bottom labelframe holds the current status
+        self.f4l1 = LabelFrame(self.f4, font = ('Arial', 14), text = 'Status', background = self.tabbg, pady = 10)
+        self.f4l1.grid(row = 1, column = 0, columnspan = 2, sticky = S+W+E, padx = 20)
+        Label(self.f4l1, text = 'Current Port:', bg = self.tabbg).grid(row = 0, column = 0, sticky = 'E')
+        self.currentPort.set(self.vc.model.portName)
+        Label(self.f4l1, textvariable = self.currentPort, bg = self.tabbg).grid(row = 0, column = 1, columnspan = 2, sticky = 'W')
+        Label(self.f4l1, text = 'Device detected:', bg = self.tabbg).grid(row = 1, column = 0, sticky = 'E')
+        def LEDx(p, s, t, b):
+            f = Frame(p,bg = b)
+            txon = Frame(f, bg = 'grey80', relief = 'sunken', width = s, height = s)
+            txon.grid(row = 0, column = 0)
+            r2i2 = Label(f, text = t, font = ('Arial', 14), bg = b).grid(row = 0, column = 1, sticky = W)
+            return f, txon
+        self.f4b2, self.deviceOK = LEDx(self.f4l1, 10, 'OK', self.tabbg)
+        self.f4b2.grid(row = 1, column = 1, sticky = 'W', padx = 10)
+        self.f4b3, self.deviceNOK = LEDx(self.f4l1, 10, 'Not Detected', self.tabbg)
+        self.f4b3.grid(row = 1, column = 2, sticky = 'W', padx = 10)
+        self.deviceNOK.config(bg = 'red')
+
+        self.f4.grid_rowconfigure(1, weight = 1)
+        self.f4.grid_columnconfigure(0, weight = 1)
+
+        ################################################################
+        ################################################################
+        # "Loading" labels - here, because they go on top of everything
+        ################################################################
+        ################################################################
+        self.l1 = Label(self.f1, text = 'Loading...', font = ('Arial',40), fg = 'red',  borderwidth = 5, relief = 'solid')
+        self.l1.place(relx = 0.5, rely = 0.5, anchor = 'center')
+        self.l2 = Label(self.f2, text = 'Loading...', font = ('Arial',40), fg = 'red',  borderwidth = 5, relief = 'solid')
+        self.l2.place(relx = 0.5, rely = 0.5, anchor = 'center')
+        self.l3 = Label(self.f3, text = 'Loading...', font = ('Arial',40), fg = 'red',  borderwidth = 5, relief = 'solid')
+        self.l3.place(relx = 0.5, rely = 0.5, anchor = 'center')
+
+
+        ################################################################
+        # End of __init__ -- setup of templates complete!
+        ################################################################
+
+
+        
+    ################################################################
+    # Commands from the Controller
+    ################################################################
+    # WSPR Configuration commands
+    def installLP(self, band):
+        self.lp[band].config(bg = 'green', relief = 'sunken')
+        CreateToolTip(self.lp[band],'A lowpass filter for the '+self._bands[band]+' band is built in.')
+        #self.band[band].configure(state = 'normal') # We don't disable them, now
+
+    def setPauseTime(self, data):
+        self.pauseTime.set(int(data))
+    def setBandEnabled(self, band, enabled):
+        self.enable[band].set(1 if enabled else 0)
+        self.progress[band].configure(style = 'WSPR.Horizontal.TProgressbar' if enabled else 'blank.Horizontal.TProgressbar')
+    def setCall(self, call):
+        self.call.set(call)
+    def setLocation(self, locator):
+        self.location.set(locator)
+    def setPositionSource(self, source):
+        self.rpam.set(source)
+    def setPower(self, power):
+        self.rpwr.set(power)
+    def setPowerMode(self, mode):
+        self.rpmode.set(mode)
+    def setProgress(self, band, seconds):
+        self.found = False
+        if band<0:
+            if seconds == 0: self.found = True
+            _p = self.pauseTime.get()
+            if _p < 1:
+                self.percent = 100
+            else:
+                self.percent = 100 * (_p - seconds) / _p
+            self.pausepercent.set(self.percent)
+        else:
+            self.pausepercent.set(0)
+            self.percent = 100 * seconds/161
+        for self.v in range(len(self._bands)):
+            if self.v == band:
+                self.found = True
+                self.percentprogress[self.v].set(self.percent)
+            else:
+                if self.found:
+                    self.percentprogress[self.v].set(0)
+
+    def setActive(self,band,color):
+        if band < 0:
+            if python == 2:
+                self.pauseactive.configure(text = unichr(0x2B05),fg = color)
+            else:
+                self.pauseactive.configure(text = chr(0x2B05),fg = color)
+        else:
+            self.pauseactive.configure(text = ' ',fg = self.tabbg)
+        for self.v in range(len(self._bands)):
+            if self.v == band:
+                if python == 2:
+                    self.active[self.v].configure(text = unichr(0x2B05),fg = color)
+                else:
+                    self.active[self.v].configure(text = chr(0x2B05),fg = color)
+            else:
+                self.active[self.v].configure(text = ' ',fg = self.tabbg)
+
+    def setRunning(self):
+        self.stopped.config(bg = self.tabbg)
+        self.silent.config(bg = self.tabbg)
+        self.generating.config(bg = self.tabbg)
+        self.running.config(bg = '#0000FF')
+    def setStopped(self):
+        self.running.config(bg = self.tabbg)
+        self.generating.config(bg = self.tabbg)
+        self.stopped.config(bg = '#0000FF')
+        self.silent.config(bg = '#0000FF')
+        self.setActive(-1,self.tabbg)
+
+    # Signal Generator commands
+    def setGenerating(self):
+        self.stopped.config(bg = self.tabbg)
+        self.silent.config(bg = self.tabbg)
+        self.running.config(bg = self.tabbg)
+        self.generating.config(bg = '#0000FF')
+        self.setActive(-1,self.tabbg)
+
+    def setFQ(self,data):
+        self.d100M.set(int(data[1]))
+        self.d10M.set(int(data[2]))
+        self.d1M.set(int(data[3]))
+        self.d100k.set(int(data[4]))
+        self.d10k.set(int(data[5]))
+        self.d1k.set(int(data[6]))
+        self.d100Hz.set(int(data[7]))
+        self.d10Hz.set(int(data[8]))
+        self.d1Hz.set(int(data[9]))
+        self.d10c.set(int(data[10]))
+        self.d1c.set(int(data[11]))
+
+    # Boot Configuration commands
+    def setBoot(self, mode):
+        self.boot.set(mode)
+
+    # Serial Port configuration commands
+    def setPort(self, name, selected):
+        self.currentPort.set(name)
+        if selected and name != 'None':
+            self.portName.set(name)
+        self.serialButton.config(text = 'Close' if selected else 'Select')
+
+    def serialOK(self,state):
+        if state:
+            self.deviceNOK.config(bg = 'grey80')
+            self.deviceOK.config(bg = 'green')
+            
+            # Enable the other tabs (if they are still disabled)
+            self.tabs.tab(self.tab1,state = 'normal')
+            self.tabs.tab(self.tab2,state = 'normal')
+            self.tabs.tab(self.tab3,state = 'normal')
+
+            # Remove 'Loading...' labels, if they are there
+            if self.l1.winfo_exists():
+                self.l1.place_forget()
+            if self.l2.winfo_exists():
+                self.l2.place_forget()
+            if self.l3.winfo_exists():
+                self.l3.place_forget()
+                
+        else:
+            self.deviceOK.config(bg = 'grey80')
+            self.deviceNOK.config(bg = 'red')
+
+            # Put the Loading labels on everything except Serial port
+            self.l1.place(relx = 0.5, rely = 0.5, anchor = 'center')
+            self.l2.place(relx = 0.5, rely = 0.5, anchor = 'center')
+            self.l3.place(relx = 0.5, rely = 0.5, anchor = 'center')
+
+            # Should I just disable the non-serial-configuration tabs instead????
+
+    def setStale(self, keys, saved = None):
+        if keys: # the last known values are worth seeing, while the device is asked
+            self.tabs.tab(self.tab1,state = 'normal')
+            self.tabs.tab(self.tab2,state = 'normal')
+            self.tabs.tab(self.tab3,state = 'normal')
+            self.l1.place_forget()
+            self.l2.place_forget()
+            self.l3.place_forget()
+            _names = self.staleNames(keys)
+            self.root.title('ZachTek WSPR Transmitter Configuration - last known from {}: {}{}'.format(
+                time.strftime('%Y-%m-%d %H:%M', time.localtime(saved or 0)), ', '.join(_names[0:6]),
+                ', ...' if len(_names) > 6 else ''))
+        else:
+            self.root.title('ZachTek WSPR Transmitter Configuration')
+
+    def clearSettings(self):
+        for _v in [self.call, self.location, self.rpwr, self.rpam, self.rpmode, self.boot, self.name,
+                   self.hardwareVer, self.hardwareRev, self.firmwareVer, self.firmwareRev]:
+            _v.set('')
+        self.pauseTime.set(0)
+        for _n in range(len(self._bands)):
+            self.setBandEnabled(_n, False)
+            if self.lp[_n].cget('bg') == 'green':
+                self.lp[_n].config(bg = self.tabbg, relief = 'flat')
+                CreateToolTip(self.lp[_n], 'No lowpass filter for the '+self._bands[_n]+' band is known.')
+
+    def setRxChars(self, count):
+        self.rxChars.set(count)
+
+    def setScriptRunning(self, running):
+        self.scriptButton.config(text = 'Stop' if running else 'Script')
+
+    def setDebug(self,state): # Displays or hides the debug pane
+        if state:
+            self.f0.grid(row = 2, column = 0, columnspan = 3, sticky=W)
+        elif self.f0.winfo_exists():
+            self.f0.grid_forget() # Hide debug frame
+
+    def traceInsert(self, msg): # puts a debug message in the debug frame
+        if len(msg)>0:
+            if common.debug: print(msg)
+            self.trace.insert(END, msg)
+            if self.trace.size() > self.listLimit: # keep the last lines only, for long runs
+                self.trace.delete(0, self.trace.size() - self.listLimit - 1)
+            self.trace.see(END)
+
+    # Device Status commands
+    def setName(self, name):
+        self.name.set(name)
+
+    def setSaving(self, saving):
+        self.saveButton.config(bg = 'blue' if saving else 'grey80')
+
+    def setDevice(self, data):
+        if data == '01011':
+            self.image['image'] = self.img1011
+            self.image['text'] = ''
+            self.image.ttp.text = 'WSPR TX LP1 detected'
+        elif data == '01012':
+            self.image['image'] = self.img1012
+            self.image['text'] = ''
+            self.image.ttp.text = 'WSPR TX Desktop detected'
+        elif data == '01017':
+            self.image['image'] = self.img1017
+            self.image['text'] = ''
+            self.image.ttp.text = 'WSPR Mini detected'
+        else:
+            self.image['image'] = self.unknown
+            self.image['text'] = 'Device Unknown'
+            self.image['compound'] = CENTER
+            self.image['wraplength'] = 50
+            self.image['fg'] = 'red'
+            self.image.ttp.text = 'Unknown device detected'
+
+    def setHardwareVer(self, data):
+        self.hardwareVer.set(data)
+    def setHardwareRev(self, data):
+        self.hardwareRev.set(data)
+    def setFirmwareVer(self, data):
+        self.firmwareVer.set(data)
+    def setFirmwareRev(self, data):
+        self.firmwareRev.set(data)
+    def setFrequency(self, data):
+        self.v = '{0:12.2f}'.format(int(data)/100.0)
+        self.frequency.set(self.v[0:3]+' '+self.v[3:6]+' '+self.v[6:])
+    def tx(self, onoff):
+        if onoff == 0:
+            self.txon.config(bg = 'grey80')
+            self.txoff.config(bg = 'green')
+        else:
+            self.txon.config(bg = 'red')
+            self.txoff.config(bg = 'grey80')
+    def program(self, mode):
+        if mode == 0:
+            self.beacon.config(bg = 'grey80')
+            self.siggen.config(bg = 'grey80')
+            self.idle.config(bg = 'green')
+        elif mode == 1:
+            self.beacon.config(bg = 'green')
+            self.siggen.config(bg = 'grey80')
+            self.idle.config(bg = 'grey80')
+        else:
+            self.beacon.config(bg = 'grey80')
+            self.siggen.config(bg = 'green')
+            self.idle.config(bg = 'grey80')
+
+    # GPS plot helpers
+    def _polar(self, az, el):
+        _rho = 110*(90-el)/90.0 # The plot radius is 110
+        _theta = (az-90) * math.pi/180.0
+        return 120+_rho * math.cos(_theta), 120+_rho * math.sin(_theta)
+
+    def _snrColor(self, snr):
+        if snr < 17:   # 3 - 16 = red
+            return 'red'
+        elif snr < 25: # 17 - 24 = yellow
+            return 'yellow'
+        elif snr < 33: # 25 - 32 = dark green
+            return 'dark green'
+        return 'green' # 33 and over is green
+
+    def drawSky(self, cells):
+        # Only the cells that changed are redrawn, each cell keeps its own item
+        _sky = self.vc.sky
+        for _c in cells:
+            _mean = _sky.mean(_c)
+            if _mean is None:
+                continue
+            if _c not in self.skycells:
+                _az, _el = _sky.bounds(_c)
+                _xy = []
+                for _a in (_az, _az+_sky.azStep/2.0, _az+_sky.azStep):
+                    _xy += self._polar(_a, _el)
+                for _a in (_az+_sky.azStep, _az+_sky.azStep/2.0, _az):
+                    _xy += self._polar(_a, _el+_sky.elStep)
+                self.skycells[_c] = self.plot.create_polygon(*_xy, outline = '', stipple = 'gray50', tags = 'sky',
+                                                             state = NORMAL if self.skymap.get() else HIDDEN)
+                self.plot.tag_raise(self.skycells[_c], self.plot.p6) # above the grid, below the satellites
+            self.plot.itemconfig(self.skycells[_c], fill = self._snrColor(_mean))
+
+    def setSkymap(self):
+        if self.skymap.get():
+            self.drawSky(range(self.vc.sky.cells))
+            self.plot.itemconfig('sky', state = NORMAL)
+        else:
+            self.plot.itemconfig('sky', state = HIDDEN)
+
+    def setTrails(self):
+        self.plot.itemconfig('trail', state = NORMAL if self.showTrails.get() else HIDDEN)
+
+    def trail(self, n, x, y):
+        _t = self.trails.get(n)
+        if _t is None:
+            _t = self.trails[n] = [collections.deque(maxlen = 120), None, 0]
+        _t[2] = self.updates
+        if len(_t[0]) > 0 and _t[0][-1] == (x, y):
+            return
+        _t[0].append((x, y))
+        if len(_t[0]) < 2:
+            return
+        _xy = [_v for _p in _t[0] for _v in _p]
+        if _t[1] is None:
+            _t[1] = self.plot.create_line(*_xy, fill = 'grey50', width = 1, tags = 'trail',
+                                          state = NORMAL if self.showTrails.get() else HIDDEN)
+        else:
+            self.plot.coords(_t[1], *_xy)
+
+    # GPS Status commands
+    def setPosition(self, maidenhead):
+        self.position.set(maidenhead)
+    def updateTime(self, time):
+        self.mirror.time = time # The mirror clock updates curtime
+        self.r3l5.config(fg='black')
+    def setLocked(self, locked):
+        if locked:
+            self.locked.config(text = 'Position Lock', font = ('Arial',18))
+            self.r3l6.config(fg='black')
+        else:
+            self.locked.config(text = 'No Position Lock', font = ('Arial Italic',18))
+            self.r3l6.config(fg='grey80')
+    def setClockOffset(self, summary):
+        if summary['offset'] is None:
+            return
+        self.r3l5.ttp.text = 'Host clock is {:+.3f} s from GPS (jitter {:.3f} s), {} for WSPR'.format(
+            summary['offset'], summary['jitter'], 'good enough' if summary['good_for_wspr'] else 'not good enough')
+    def satdata(self, data):
+        #Clear previous plot points
+        if len(self.points)>0:
+            for self.point in self.points:
+                self.plot.delete(self.point)
+        self.points = []
+        self.satTips.clearItems()
+        self.snrList = []
+        self.updates += 1
+        
+        # Add new point for each bird
+        for self.sat in data:
+            self.line = self.sat.split()
+            if len(self.line)<4:
+                continue
+            self.n, self.az, self.el, self.snr = self.line[0], self.line[1], self.line[2], self.line[3]
+            
+            # Make a list of the SNRs, the top 4 are picked out afterwards
+            if not (self.n.isdigit() and self.az.isdigit() and self.el.isdigit() and self.snr.isdigit()):
+                continue
+            self.snrList.append(int(self.snr))
+                
+            #convert polar to cartesian
+            self.rho = 110*(90-int(self.el))/90 # The plot radius is 110
+            self.theta = (int(self.az)-90) * math.pi/180.0
+            self.x = 120+int(self.rho * math.cos(self.theta)) # The canvas is 240x240, so 120
+            self.y = 120+int(self.rho * math.sin(self.theta)) #   pushes it into the middle
+            self.color = 'white'
+            if self.snr.isdigit():
+                #self.quality = int(self.snr)*2+57
+                #if self.quality > 255: self.quality = 255
+                #self.color = '#00'+'{0:02x}'.format(self.quality)+'00'
+                self.quality = int(self.snr)
+                if self.quality < 3:    # 0-2 do not display (I don't see and birds with 2dB SNR)
+                    continue
+                elif self.quality < 17: # 3 - 16 = red
+                    self.color = 'red'
+                elif self.quality < 25: # 17 - 24 = yellow
+                    self.color = 'yellow'
+                elif self.quality < 33: # 25 - 32 = dark green
+                    self.color = 'dark green'
+                else:
+                    self.color = 'green' # 33 and over is green
+                    
+            self.trail(self.n, self.x, self.y)
+            self.point = self.plot.create_oval(self.x-5, self.y-5, self.x+5, self.y+5, fill = self.color, outline = 'black',
+                                               tags = 'sat')
+            self.points.append(self.point)
+            self.tip = 'Sat {} Az={} El={} SNR={}'.format(self.n,self.az,self.el,self.snr)
+            self.stats = self.vc.gpsStats.satellite(int(self.n))
+            for self.window in sorted(self.stats.keys()):
+                if self.stats[self.window]['count'] > 0:
+                    self.tip += '\nLast {} reports: mean {:.1f}, {}-{} dB'.format(
+                        self.stats[self.window]['count'], self.stats[self.window]['mean'],
+                        self.stats[self.window]['min'], self.stats[self.window]['max'])
+                if self.stats[self.window]['count'] < self.window:
+                    break # the longer windows are not filled yet
+            self.satTips.setItem(self.point, self.tip)
+
+        # Drop the trails of satellites not seen for a while, and add the new coverage
+        for self.sat in list(self.trails.keys()):
+            if self.updates - self.trails[self.sat][2] > 300:
+                if self.trails[self.sat][1] is not None:
+                    self.plot.delete(self.trails[self.sat][1])
+                del self.trails[self.sat]
+        if self.skymap.get():
+            self.drawSky(self.vc.sky.changed())
+
+        self.snrList.sort(reverse=True)
+        _q=0
+        for _snr in self.snrList[0:4]: _q+=_snr
+        #                # Always dividing by 4 birds -- if there are less, the rest are 0
+        #self.q = 2*_q/4 # Multiply by 2, becuase an SNR of 50 is about as good as it gets.
+        #                # This can/should be modified to something more interesting, maybe.
+        self.q = (_q - 15) * 100 / 36 # "The linear Signal Quality meter is 0 when average SNR is 15dB or lower 
+        if self.q > 100: self.q = 100 # and 100%  when average is 51dB or more" - Harry
+        elif self.q < 0: self.q = 0
+        self.signal.set(self.q)
+        self.summary = self.vc.gpsStats.summary()
+        self.tip = 'The mean Signal to Noise Ratio of the four strongest satellites'
+        self.tip += '\nPosition lock {:.0f}% of the time, lost {} times'.format(100 * self.summary['lock_uptime'],
+                                                                         self.summary['lock_losses'])
+        if self.summary['ttff'] is not None:
+            self.tip += '\nTime to first fix {} seconds'.format(self.summary['ttff'])
+        self.r3p1.ttp.text = self.tip
+        if self.q < 20:
+            self.signal_style.configure('signal.Horizontal.TProgressbar', troughcolor = 'white', background = 'red') 
+        elif self.q < 40:
+            self.signal_style.configure('signal.Horizontal.TProgressbar', troughcolor = 'white', background = 'yellow')
+        elif self.q < 60:
+            self.signal_style.configure('signal.Horizontal.TProgressbar', troughcolor = 'white', background = 'blue')
+        else:
+            self.signal_style.configure('signal.Horizontal.TProgressbar', troughcolor = 'white', background = 'green')
+        if self.q < 30:
+            self.signal_style.configure('signal.Horizontal.TProgressbar', text='{} %'.format(self.q), foreground='black')
+        elif self.q < 60:
+            self.signal_style.configure('signal.Horizontal.TProgressbar', text='{} %'.format(self.q), foreground='grey50')
+        else:
+            self.signal_style.configure('signal.Horizontal.TProgressbar', text='{} %'.format(self.q), foreground='white')
+            
+    # Log commands
+    def logInsert(self, msg):
+        self.log.insert(END, msg)
+        if self.log.size() > self.listLimit:
+            self.log.delete(0, self.log.size() - self.listLimit - 1)
+        self.log.see(END)
+
+    ################################################################
+    # User input that needs more than a value passed on
+    ################################################################
+    def pauseUpdate(self, *args):
+        try:
+            _t = self.pauseTime.get()
+        except (TclError, ValueError): # not a number (yet)
+            return
+        self.vc.pauseUpdate(_t)
+
+    def scriptPressed(self): # Runs a script, or stops the one running
+        if self.scriptButton['text'] == 'Stop':
+            self.vc.scriptPressed()
+            return
+        _name = filedialog.askopenfilename(title = 'Command script')
+        if _name:
+            self.vc.scriptPressed(_name)
+
+    def update(self): # The window's events, until it is closed
+        try:
+            self.root.update_idletasks()
+            self.root.update()
+        except TclError:
+            return False
+        return True
@@ -0,0 +1,198 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Local commands and named pipes told of changes on the device
+"""
+
+import collections
+import errno
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from .common import monotonic
+
+# Hooks - local commands told of changes on the device
+#
+# A hook runs a command, or writes to a named pipe, when one of the
+# events happens:
+#   mode          - the mode (CCM) changed, as from S to W
+#   tx_start, tx_end - a transmission began or ended
+#   lock_lost, lock_regained - the GPS position lock (GLC)
+#   disconnected, connected - the Watchdog lost or restored the link
+# The event is a line of JSON: the command gets it on its standard input
+# (and the name in WSPR_EVENT), a pipe gets it written, as
+#   {"event": "tx_start", "time": "2024-01-01T12:00:01Z",
+#    "data": {"band": "06"}, "device": {"call": ..., "locator": ..., ...}}
+# The hooks are given as a list of objects, from a JSON file (--hooks)
+# or the command line (--hook):
+#   events   - the names of the events, or "*" for all of them
+#   command  - the command, as a list of arguments, or
+#   pipe     - the path of a named pipe (the event is dropped if nothing reads it)
+#   timeout  - seconds before the command is killed (default 10)
+#   rate     - most runs in a minute (default 10), the others are dropped
+# A few worker threads run the hooks from a bounded queue, so a hook can
+# never hold up the serial line: when the queue is full, events are
+# dropped and counted in the metrics.
+#
+class Hooks(object):
+    """
+    Runs the hooks for the events seen in the messages
+
+        hooks            - the hooks, see above
+        message(code,data) - notes a message, firing the events it makes
+        fire(event,data) - queues an event for the hooks that want it
+        close()          - stops the workers, waiting a little for the running hooks
+    """
+    events = ['mode', 'tx_start', 'tx_end', 'lock_lost', 'lock_regained', 'disconnected', 'connected']
+    workers = 2
+    queueLimit = 64
+
+    def __init__(self, controller, hooks = None):
+        self._vc = controller
+        self.hooks = [dict(_h) for _h in (hooks or [])]
+        for _h in self.hooks:
+            _events = _h.get('events', ['*'])
+            if ('command' in _h) == ('pipe' in _h) or not isinstance(_events, list) or \
+               any(_e != '*' and _e not in self.events for _e in _events):
+                raise ValueError('hook {} needs events (from {}) and a command or a pipe'.format(
+                    json.dumps(_h, sort_keys = True), ', '.join(self.events)))
+            if 'command' in _h and not isinstance(_h['command'], list):
+                _h['command'] = [str(_h['command'])]
+            _h['events'] = _events
+            _h['_runs'] = collections.deque() # when it last ran, for the rate
+            _h['_busy'] = False
+        self._last = {'TON': 'F'} # not transmitting, until told otherwise: the first TON T is a tx_start
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stop = False
+
+    @staticmethod
+    def load(filename):
+        """The hooks in a JSON file"""
+        with open(filename) as _f:
+            _hooks = json.load(_f)
+        if not isinstance(_hooks, list):
+            raise ValueError('{} should hold a list of hooks'.format(filename))
+        return _hooks
+
+    def message(self, code, data):
+        if len(self.hooks) == 0 or code not in ['CCM', 'TON', 'GLC']:
+            return
+        _was = self._last.get(code)
+        _now = data[0:1]
+        self._last[code] = _now
+        if _was is None or _was == _now:
+            return
+        if code == 'CCM':
+            self.fire('mode', {'from': _was, 'to': _now})
+        elif code == 'TON':
+            self.fire('tx_start' if _now == 'T' else 'tx_end', {'band': self._vc.state.get('TBN', '')})
+        elif code == 'GLC':
+            self.fire('lock_regained' if _now == 'T' else 'lock_lost', {})
+
+    def fire(self, event, data):
+        _hooks = [_h for _h in self.hooks if '*' in _h['events'] or event in _h['events']]
+        if len(_hooks) == 0:
+            return
+        _payload = {'event': event, 'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'data': data,
+                    'device': {'call': self._vc.state.get('DCS', ''), 'locator': self._vc.state.get('DL4', ''),
+                               'name': self._vc.state.get('DNM', ''), 'port': self._vc.model.portName
+                               if self._vc.model is not self._vc else None}}
+        _line = json.dumps(_payload, sort_keys = True) + '\n'
+        _now = monotonic()
+        with self._cond:
+            for _h in _hooks:
+                _runs = _h['_runs']
+                while len(_runs) > 0 and _now - _runs[0] >= 60:
+                    _runs.popleft()
+                if len(_runs) >= _h.get('rate', 10) or len(self._queue) >= self.queueLimit:
+                    self._vc.metrics.inc('hooks_dropped_total', help = 'Hook runs dropped, over the rate or queue')
+                    continue
+                _runs.append(_now)
+                self._queue.append((_h, event, _line))
+            if len(self._threads) == 0:
+                for _n in range(self.workers):
+                    _t = threading.Thread(target = self._work)
+                    _t.daemon = True
+                    _t.start()
+                    self._threads.append(_t)
+            self._cond.notify_all()
+
+    def _next(self):
+        # The first event for a hook that is not running, so each hook has its events in order
+        for _n, (_h, _e, _l) in enumerate(self._queue):
+            if not _h['_busy']:
+                del self._queue[_n]
+                _h['_busy'] = True
+                return _h, _e, _l
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                _job = None
+                while not self._stop:
+                    _job = self._next()
+                    if _job is not None:
+                        break
+                    self._cond.wait()
+                if self._stop:
+                    return
+            _hook, _event, _line = _job
+            try:
+                ok = self._run(_hook, _event, _line)
+            except (IOError, OSError, ValueError) as e:
+                sys.stderr.write('Hook for {} failed: {}\n'.format(_event, e))
+                ok = False
+            with self._cond:
+                _hook['_busy'] = False
+                self._cond.notify_all()
+            self._vc.metrics.inc('hooks_run_total' if ok else 'hooks_failed_total', help = 'Hook runs' if ok else
+                                 'Hook runs that failed, timed out or found no reader')
+
+    def _run(self, hook, event, line):
+        if 'pipe' in hook:
+            try:
+                _fd = os.open(hook['pipe'], os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                if e.errno == errno.ENXIO: # nothing reading
+                    return False
+                raise
+            try:
+                os.write(_fd, line.encode())
+            finally:
+                os.close(_fd)
+            return True
+        _env = dict(os.environ)
+        _env['WSPR_EVENT'] = event
+        _p = subprocess.Popen(hook['command'], stdin = subprocess.PIPE, env = _env)
+        try:
+            _p.stdin.write(line.encode())
+            _p.stdin.close()
+        except (IOError, OSError): # it did not want it
+            pass
+        _end = monotonic() + hook.get('timeout', 10)
+        while _p.poll() is None:
+            if monotonic() > _end or self._stop:
+                _p.kill()
+                _p.wait()
+                sys.stderr.write('Hook for {} killed after {} seconds\n'.format(event, hook.get('timeout', 10)))
+                return False
+            time.sleep(0.05)
+        return _p.returncode == 0
+
+    def close(self, wait = 2):
+        _end = monotonic() + wait
+        while (len(self._queue) > 0 or any(_h['_busy'] for _h in self.hooks)) and len(self._threads) > 0 \
+              and monotonic() < _end:
+            time.sleep(0.05) # let the last events go out, and the hooks running finish
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        for _t in self._threads:
+            _t.join(1)
+        self._threads = []
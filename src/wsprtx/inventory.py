@@ -0,0 +1,238 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The last known settings of each device, and the inventory of the devices seen
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+from .common import configDir
+from .model import Model
+from .profiles import Profiles
+
+# StateCache - the last known settings of each device, kept between runs
+#
+# When the program ends, the settings and identity the device reported
+# are saved under the port it was on, with its identity (see Inventory)
+# and the time.  When a port is next opened, they are shown at once,
+# marked as stale, while the device is asked again, and each value the
+# device reports replaces the one saved.  What the device never reports
+# again (a filter it does not have) stays marked.  If the identity it
+# reports is not the one saved, another device is on the port, and the
+# settings shown are cleared instead.  A device that moved to another
+# port is found by the serial number of its USB adapter, when it has one.
+# Only the most recently saved ports are kept.
+#
+class StateCache(object):
+    """
+    Last known device settings by port, kept in a JSON file
+
+        get(port,usbId)             - {'identity','saved','state'} for the device on the port, or None
+        put(port,identity,state)    - keeps the values of the codes saved, from a DeviceState
+        save()                      - writes the file, if anything changed
+    """
+    ports = 32
+
+    def __init__(self, filename = None):
+        if filename is None:
+            filename = os.path.join(configDir(), 'devices.json')
+        self.filename = filename
+        self._entries = None
+        self._dirty = False
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.filename) as _f:
+                    self._entries = json.load(_f)
+            except (IOError, OSError, ValueError):
+                pass # nothing saved, or nothing usable
+        return self._entries
+
+    def get(self, port, usbId = None):
+        _entries = self._load()
+        if usbId is not None and usbId[2]:
+            for _e in sorted(_entries.values(), key = lambda _e: -_e.get('saved', 0)):
+                if _e.get('identity', '').endswith('-usb:' + usbId[2]):
+                    return _e
+        return _entries.get(port)
+
+    def put(self, port, identity, state):
+        _entries = self._load()
+        _values = dict((_k, state.get(_k)) for _k in state.keys() if _k[0:3] in Model.statusCodes)
+        _entries[port] = {'identity': identity, 'saved': time.time(), 'state': _values}
+        for _port in sorted(_entries, key = lambda _p: _entries[_p].get('saved', 0))[0:max(0, len(_entries) - self.ports)]:
+            del _entries[_port]
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        _tmp = self.filename + '.tmp'
+        with open(_tmp, 'w') as _f:
+            json.dump(self._entries, _f, indent = 2, sort_keys = True)
+        if os.path.exists(self.filename) and sys.platform.startswith('win'):
+            os.remove(self.filename)
+        os.rename(_tmp, self.filename)
+        self._dirty = False
+
+# Inventory - what is known about each device seen, in SQLite
+#
+# Each time a device reports its identity (after connecting, or after
+# a reset), its row is brought up to date: the port it was on, its
+# firmware, the low pass filters fitted and its configuration (as a
+# profile, see Profiles).  A device has no serial number of its own, so
+# it is known by its product and hardware version, and the serial
+# number of its USB adapter, or failing that (CH34x adapters have none)
+# the port it is on.  Nothing the user can set is part of the key, so
+# renaming a unit keeps its row, and two unnamed units are two rows.
+#
+# The query fields are indexed, so "all 1017 units on firmware below
+# 1.0" or "units with a 20m filter" do not read the whole table, and
+# export() writes the rows as they come from the cursor.
+#
+class Inventory(object):
+    """
+    The fleet of devices, kept in an SQLite file
+
+        update(state,...)  - records a device from its DeviceState
+        seen(id,port)      - notes that a device is still connected
+        query(...)         - yields the devices matching, as {name:value}
+        export(out,...)    - writes the devices matching as csv or json
+    """
+    # The codes that make up an inventory entry
+    codes = ['FPN', 'FHV', 'FHR', 'FSV', 'FSR', 'FLP', 'DNM', 'DCS']
+    fields = ['id', 'product', 'hardware', 'hardware_rev', 'firmware', 'firmware_rev', 'usb_serial',
+              'name', 'call', 'locator', 'port', 'first_seen', 'last_seen', 'filters', 'config']
+    schema = ['CREATE TABLE IF NOT EXISTS devices (id TEXT PRIMARY KEY, product TEXT, hardware TEXT,'
+              ' hardware_rev TEXT, firmware INTEGER, firmware_rev INTEGER, usb_serial TEXT, name TEXT,'
+              ' call TEXT, locator TEXT, port TEXT, first_seen REAL, last_seen REAL, config TEXT)',
+              'CREATE TABLE IF NOT EXISTS filters (device TEXT, band INTEGER, PRIMARY KEY (device, band))',
+              'CREATE INDEX IF NOT EXISTS devices_firmware ON devices (product, firmware, firmware_rev)',
+              'CREATE INDEX IF NOT EXISTS devices_call ON devices (call)',
+              'CREATE INDEX IF NOT EXISTS devices_seen ON devices (last_seen)',
+              'CREATE INDEX IF NOT EXISTS filters_band ON filters (band, device)']
+
+    def __init__(self, filename = None):
+        self.filename = filename or os.path.join(configDir(), 'inventory.db')
+        self._db = None
+
+    def _open(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.filename)
+            for _s in self.schema:
+                self._db.execute(_s)
+            self._db.commit()
+        return self._db
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @staticmethod
+    def identity(state, usbId = None, port = None):
+        _id = '{}-{}.{}'.format(state.get('FPN', '?'), state.get('FHV', '?'), state.get('FHR', '?'))
+        if usbId is not None and usbId[2]:
+            return _id + '-usb:' + usbId[2]
+        return _id + '-port:' + str(port)
+
+    @staticmethod
+    def _number(v):
+        return int(v) if v is not None and v.strip().isdigit() else None
+
+    def update(self, state, filters, port, usbId = None, nbands = 16):
+        """Records the device described by state, returns its id"""
+        _id = self.identity(state, usbId, port)
+        _now = time.time()
+        _db = self._open()
+        _row = (state.get('FPN'), state.get('FHV'), state.get('FHR'),
+                self._number(state.get('FSV')), self._number(state.get('FSR')),
+                usbId[2] if usbId is not None else None, state.get('DNM', '').strip(),
+                state.get('DCS', '').strip(), state.get('DL4', '').strip(), port, _now,
+                json.dumps(Profiles.fromState(state, nbands), sort_keys = True), _id)
+        with _db:
+            _c = _db.execute('UPDATE devices SET product=?, hardware=?, hardware_rev=?, firmware=?, firmware_rev=?,'
+                             ' usb_serial=?, name=?, call=?, locator=?, port=?, last_seen=?, config=? WHERE id=?', _row)
+            if _c.rowcount == 0:
+                _db.execute('INSERT INTO devices (product, hardware, hardware_rev, firmware, firmware_rev, usb_serial,'
+                            ' name, call, locator, port, last_seen, config, id, first_seen)'
+                            ' VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)', _row + (_now,))
+            _db.execute('DELETE FROM filters WHERE device=?', (_id,))
+            _db.executemany('INSERT INTO filters (device, band) VALUES (?,?)', [(_id, _b) for _b in sorted(set(filters))])
+        return _id
+
+    def seen(self, id, port):
+        _db = self._open()
+        with _db:
+            _db.execute('UPDATE devices SET last_seen=?, port=? WHERE id=?', (time.time(), port, id))
+
+    def query(self, product = None, firmwareBelow = None, lpf = None, call = None, since = None, until = None):
+        """
+        Yields the devices that match all of the conditions given
+
+        firmwareBelow is (version, revision), lpf a band number and
+        since and until are times of the last sighting.
+        """
+        _where = []
+        _args = []
+        if product is not None:
+            _where.append('d.product = ?')
+            _args.append(product)
+        if firmwareBelow is not None:
+            _where.append('(d.firmware < ? OR (d.firmware = ? AND d.firmware_rev < ?))')
+            _args += [firmwareBelow[0], firmwareBelow[0], firmwareBelow[1]]
+        if lpf is not None:
+            _where.append('d.id IN (SELECT device FROM filters WHERE band = ?)')
+            _args.append(lpf)
+        if call is not None:
+            _where.append('d.call = ?')
+            _args.append(call)
+        if since is not None:
+            _where.append('d.last_seen >= ?')
+            _args.append(since)
+        if until is not None:
+            _where.append('d.last_seen < ?')
+            _args.append(until)
+        _sql = ('SELECT d.id, d.product, d.hardware, d.hardware_rev, d.firmware, d.firmware_rev, d.usb_serial,'
+                ' d.name, d.call, d.locator, d.port, d.first_seen, d.last_seen,'
+                ' (SELECT group_concat(band) FROM filters f WHERE f.device = d.id), d.config FROM devices d')
+        if len(_where) > 0:
+            _sql += ' WHERE ' + ' AND '.join(_where)
+        for _row in self._open().execute(_sql + ' ORDER BY d.id', _args):
+            _r = dict(zip(self.fields, _row))
+            _r['filters'] = [int(_b) for _b in _r['filters'].split(',')] if _r['filters'] else []
+            _r['config'] = json.loads(_r['config']) if _r['config'] else {}
+            yield _r
+
+    def export(self, out, format = 'csv', bands = None, **conditions):
+        """Writes the devices as they are read, so the inventory is never all in memory"""
+        def named(r):
+            for _k in ['first_seen', 'last_seen']:
+                r[_k] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(r[_k])) if r[_k] else None
+            if bands is not None:
+                r['filters'] = [bands[_b] if _b < len(bands) else _b for _b in r['filters']]
+            return r
+        _n = 0
+        if format == 'csv':
+            _w = csv.writer(out)
+            _w.writerow(self.fields)
+            for _r in self.query(**conditions):
+                _r = named(_r)
+                _r['filters'] = ' '.join(str(_b) for _b in _r['filters'])
+                _r['config'] = json.dumps(_r['config'], sort_keys = True)
+                _w.writerow([_r[_k] for _k in self.fields])
+                _n += 1
+        else:
+            out.write('[')
+            for _r in self.query(**conditions):
+                out.write(',\n' if _n > 0 else '\n')
+                out.write(json.dumps(named(_r), sort_keys = True))
+                _n += 1
+            out.write('\n]\n')
+        return _n
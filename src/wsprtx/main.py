@@ -0,0 +1,708 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The command line
+"""
+
+import atexit
+import calendar
+import getopt
+import json
+import os
+import shlex
+import socket
+import sqlite3
+import stat
+import sys
+import threading
+import time
+import zipfile
+import zlib
+try:
+    import curses  # the terminal View (not on Windows)
+except ImportError:
+    curses = None
+from . import common
+from . import gui
+from .common import configDir, monotonic
+from .alerts import Alerts
+from .capture import Capture
+from .controller import Controller
+from .daemon import Daemon, DaemonClient
+from .encoder import WSPREncoder
+from .firmware import FirmwareUpdate, IntelHex, SimBootloader
+from .gui import View
+from .hooks import Hooks
+from .inventory import Inventory
+from .model import Model
+from .poller import Poller
+from .profiles import Profiles
+from .script import Script
+from .spots import SpotArchive
+from .term import TermView
+from .txlog import TxLog
+from .web import WebServer
+
+###############################################################################
+##### Main
+###############################################################################
+def main(args):
+    port = ''
+    profile = ''
+    saveProfile = ''
+    profileFile = None
+    listProfiles = False
+    gpsStats = 0
+    clockStats = 0
+    metricsFile = None
+    txlogExport = ''
+    band = None
+    since = None
+    until = None
+    daemon = False
+    socketPath = None
+    client = ''
+    send = []
+    http = None
+    ports = []
+    flash = None
+    bootBaud = 115200
+    simBootloader = None
+    inventory = ''
+    product = None
+    firmwareBelow = None
+    lpf = None
+    script = None
+    terminal = False
+    captureFile = None
+    captureText = None
+    pollFields = {}
+    pollShare = 0.05
+    alertRules = None
+    alertSinks = []
+    alertVcc = None
+    hooks = []
+    encode = None
+    spots = None
+    callsFile = None
+    workers = None
+    encodeBenchmark = 0
+    
+    def usage(name):
+        print('Usage: {} [-d] [-p <serialport>] [OPTIONS]\nOptions:\n'.format(name)+
+              '    -d, --debug                  Provide debug information on stdout.\n'+
+              '    -h, --help                   Print this help message.\n'+
+              '    -p, --port = SERIALPORT      Serial port the device is on.\n'+
+              '    -P, --profile=NAME           Apply the named profile to the device and exit.\n'+
+              '        --save-profile=NAME      Save the device settings as a named profile and exit.\n'+
+              '        --list-profiles          List the saved profiles and exit.\n'+
+              '        --profiles=FILE          Profile file (default ~/.WSPR_TX_Config/profiles.json).\n'+
+              '        --gps-stats=SECONDS      Collect GPS statistics for SECONDS, print them and exit.\n'+
+              '        --clock=SECONDS          Measure the host clock against GPS for SECONDS, print it and exit.\n'+
+              '        --metrics=FILE           Write monitoring metrics to FILE every 15 seconds.\n'+
+              '        --txlog-export=FORMAT    Write the transmission log to stdout as csv or json and exit.\n'+
+              '        --band=BAND              Only export transmissions on BAND (e.g. 20m).\n'+
+              '        --since=YYYY-MM-DD       Only export transmissions from this date (UTC).\n'+
+              '        --until=YYYY-MM-DD       Only export transmissions up to and including this date.\n'+
+              '        --daemon                 Hold the port (-p) and share it with clients on a socket.\n'+
+              '        --socket=PATH            Daemon socket (default ~/.WSPR_TX_Config/daemon.sock).\n'+
+              '        --client=REQUEST         Ask the daemon for state, metrics, clock or watch its messages.\n'+
+              '        --send="CODE DATA"       Have the daemon send a command, e.g. --send="CCM S W".\n'+
+              '        --http=[HOST:]PORT       Serve a status page (HOST defaults to 127.0.0.1).\n'+
+              '        --flash=FILE             Write an Intel HEX firmware image to the device(s) and exit.\n'+
+              '                                 Give -p once for each device to update them together.\n'+
+              '        --bootloader-baud=BAUD   Speed of the bootloader (default 115200).\n'+
+              '        --sim-bootloader=FPN     Run a pretend device with a bootloader, for testing --flash.\n'+
+              '        --inventory=FORMAT       Write the devices seen to stdout as csv or json and exit.\n'+
+              '        --product=FPN            Only list devices of this product (e.g. 1017).\n'+
+              '        --firmware-below=VER     Only list devices with firmware older than VER (e.g. 1.2).\n'+
+              '        --lpf=BAND               Only list devices with a low pass filter for BAND.\n'+
+              '                                 --since and --until apply to when the device was last seen.\n'+
+              '        --script=FILE            Run a send/expect command script on the device and exit.\n'+
+              '        --poll=CODE:SECONDS,...  Fields to ask the device for, at most SECONDS apart (e.g.\n'+
+              '                                 MVC:60,TFQ:30), in the GUI, the terminal and the daemon.\n'+
+              '                                 Without it, the device is not asked for anything unprompted.\n'+
+              '        --poll-share=PERCENT     Most of the line the polls may use (default 5).\n'+
+              '        --alert-to=SINK          Send alerts on the device\'s health to SINK: log:FILE, json\n'+
+              '                                 (stdout) or desktop, in the GUI, the terminal and the daemon.\n'+
+              '                                 Give it once for each sink wanted.  Alerts are always\n'+
+              '                                 shown in the log of the View, and counted in the metrics.\n'+
+              '        --alerts=FILE            Alert rules, as a JSON list (default lock lost for 10 minutes,\n'+
+              '                                 no transmission for a beacon cycle, unknown responses).\n'+
+              '        --alert-vcc=VOLTS        Also alert on a supply (MVC) below VOLTS (with --poll=MVC:SECONDS).\n'+
+              '        --hook=EVENTS:COMMAND    Run COMMAND, with the event as JSON on its input, on EVENTS\n'+
+              '                                 (comma separated, or *): {}.\n'.format(', '.join(Hooks.events))+
+              '                                 A COMMAND of pipe:PATH writes the event to a named pipe.\n'+
+              '        --hooks=FILE             Hooks, as a JSON list.\n'+
+              '        --encode="CALL LOCATOR POWER"  Write the 162 WSPR symbols of a message and exit.\n'+
+              '                                 --encode=- encodes a message from each line of stdin.\n'+
+              '        --encode-benchmark=COUNT Time the encoding of COUNT messages, and exit.\n'+
+              '        --spots=ARCHIVE          Summarise the spots of our callsigns in a WSPRnet archive\n'+
+              '                                 (.csv, .csv.gz or .zip) as json, and exit.\n'+
+              '        --calls=FILE             The callsigns, one a line (default those of the inventory).\n'+
+              '        --workers=N              Processes reading the archive (default one per core).\n'+
+              '        --capture=FILE           Record every line sent and received, compressed, in FILE.\n'+
+              '        --capture-text=FILE      Write a capture to stdout as text and exit.\n'+
+              '                                 --since and --until pick the days wanted.\n'+
+              '        --curses                 Show the device in the terminal, instead of the GUI.\n'+
+              '    Use -p unix:PATH to run the GUI on a device shared by the daemon.\n')
+
+    # Begin
+    myname = args[0]
+    try:
+        optlist, args = getopt.getopt(args[1:], 'dhp:P:', ['debug', 'help', 'port = ', 'profile=',
+                                                           'save-profile=', 'list-profiles', 'profiles=',
+                                                           'gps-stats=', 'clock=', 'metrics=', 'txlog-export=',
+                                                           'band=', 'since=', 'until=', 'daemon',
+                                                           'socket=', 'client=', 'send=', 'http=',
+                                                           'flash=', 'bootloader-baud=', 'sim-bootloader=',
+                                                           'inventory=', 'product=', 'firmware-below=', 'lpf=',
+                                                           'script=', 'curses', 'capture=', 'capture-text=', 'poll=', 'poll-share=',
+                                                           'alert-to=', 'alerts=', 'alert-vcc=', 'hook=', 'hooks=',
+                                                           'encode=', 'encode-benchmark=',
+                                                           'spots=', 'calls=', 'workers='])
+        for (o, v) in optlist:
+            if   o == '-h' or o == '--help':
+                usage(myname)
+                sys.exit(0)
+            elif o == '-p' or o == '--port':
+                port = v
+                ports.append(v)
+            elif o == '-d' or o == '--debug':
+                if common.debug:
+                    print("HI")
+                common.debug = True
+            elif o == '-P' or o == '--profile':
+                profile = v
+            elif o == '--save-profile':
+                saveProfile = v
+            elif o == '--list-profiles':
+                listProfiles = True
+            elif o == '--profiles':
+                profileFile = v
+            elif o == '--gps-stats':
+                if not v.isdigit():
+                    raise getopt.GetoptError('--gps-stats needs a number of seconds')
+                gpsStats = int(v)
+            elif o == '--clock':
+                if not v.isdigit():
+                    raise getopt.GetoptError('--clock needs a number of seconds')
+                clockStats = int(v)
+            elif o == '--metrics':
+                metricsFile = v
+            elif o == '--txlog-export':
+                if v not in ['csv', 'json']:
+                    raise getopt.GetoptError('--txlog-export format must be csv or json')
+                txlogExport = v
+            elif o == '--band':
+                if v not in Model.bands():
+                    raise getopt.GetoptError('--band must be one of '+' '.join(Model.bands()))
+                band = Model.bands().index(v)
+            elif o == '--since' or o == '--until':
+                try:
+                    day = calendar.timegm(time.strptime(v, '%Y-%m-%d'))
+                except ValueError:
+                    raise getopt.GetoptError('{} needs a date as YYYY-MM-DD'.format(o))
+                if o == '--since':
+                    since = day
+                else:
+                    until = day + 86400
+            elif o == '--daemon':
+                daemon = True
+            elif o == '--socket':
+                socketPath = v
+            elif o == '--client':
+                if v not in ['state', 'metrics', 'clock', 'watch']:
+                    raise getopt.GetoptError('--client request must be state, metrics, clock or watch')
+                client = v
+            elif o == '--send':
+                if len(v.split(None, 1)) < 1 or len(v.split(None, 1)[0]) != 3:
+                    raise getopt.GetoptError('--send needs a three letter command code')
+                send.append(v)
+            elif o == '--http':
+                host, sep, number = v.rpartition(':')
+                if not number.isdigit() or int(number) > 65535:
+                    raise getopt.GetoptError('--http needs a port number, as PORT or HOST:PORT')
+                http = (host or '127.0.0.1', int(number))
+            elif o == '--flash':
+                flash = v
+            elif o == '--bootloader-baud':
+                if not v.isdigit():
+                    raise getopt.GetoptError('--bootloader-baud needs a number')
+                bootBaud = int(v)
+            elif o == '--sim-bootloader':
+                if v not in FirmwareUpdate.targets:
+                    raise getopt.GetoptError('--sim-bootloader must be one of '+' '.join(sorted(FirmwareUpdate.targets)))
+                simBootloader = v
+            elif o == '--inventory':
+                if v not in ['csv', 'json']:
+                    raise getopt.GetoptError('--inventory format must be csv or json')
+                inventory = v
+            elif o == '--product':
+                if not v.isdigit():
+                    raise getopt.GetoptError('--product needs a product number, like 1017')
+                product = v.zfill(5)
+            elif o == '--firmware-below':
+                words = v.split('.')
+                if len(words) > 2 or not all(w.isdigit() for w in words):
+                    raise getopt.GetoptError('--firmware-below needs a version, like 1 or 1.2')
+                firmwareBelow = (int(words[0]), int(words[1]) if len(words) > 1 else 0)
+            elif o == '--lpf':
+                if v not in Model.bands():
+                    raise getopt.GetoptError('--lpf must be one of '+' '.join(Model.bands()))
+                lpf = Model.bands().index(v)
+            elif o == '--script':
+                script = v
+            elif o == '--poll':
+                pollFields = {}
+                for field in v.split(',') if v != 'none' else []:
+                    code, sep, seconds = field.partition(':')
+                    if len(code) != 3 or not seconds.isdigit() or int(seconds) < 1:
+                        raise getopt.GetoptError('--poll needs CODE:SECONDS, like MVC:60,TFQ:30')
+                    pollFields[code.upper()] = int(seconds)
+            elif o == '--poll-share':
+                try:
+                    pollShare = float(v) / 100
+                except ValueError:
+                    pollShare = 0
+                if not 0 < pollShare <= 0.5:
+                    raise getopt.GetoptError('--poll-share needs a percentage, more than 0 and at most 50')
+            elif o == '--alert-to':
+                if v not in ['json', 'desktop'] and (v[0:4] != 'log:' or len(v) < 5):
+                    raise getopt.GetoptError('--alert-to must be log:FILE, json or desktop')
+                alertSinks.append(v)
+            elif o == '--alerts':
+                try:
+                    alertRules = Alerts.load(v)
+                except (IOError, OSError, ValueError) as e:
+                    raise getopt.GetoptError('--alerts: {}'.format(e))
+            elif o == '--alert-vcc':
+                try:
+                    alertVcc = float(v)
+                except ValueError:
+                    raise getopt.GetoptError('--alert-vcc needs a voltage, like 4.5')
+            elif o == '--hook':
+                events, sep, command = v.partition(':')
+                if command == '':
+                    raise getopt.GetoptError('--hook needs EVENTS:COMMAND, like tx_start,tx_end:~/bin/tx.sh')
+                hook = {'events': events.split(',')}
+                if command[0:5] == 'pipe:':
+                    hook['pipe'] = command[5:]
+                else:
+                    hook['command'] = shlex.split(command)
+                hooks.append(hook)
+            elif o == '--hooks':
+                try:
+                    hooks.extend(Hooks.load(v))
+                except (IOError, OSError, ValueError) as e:
+                    raise getopt.GetoptError('--hooks: {}'.format(e))
+            elif o == '--encode':
+                encode = v
+            elif o == '--encode-benchmark':
+                if not v.isdigit() or int(v) < 1:
+                    raise getopt.GetoptError('--encode-benchmark needs a number of messages')
+                encodeBenchmark = int(v)
+            elif o == '--spots':
+                spots = v
+            elif o == '--calls':
+                callsFile = v
+            elif o == '--workers':
+                if not v.isdigit() or int(v) < 1:
+                    raise getopt.GetoptError('--workers needs a number of processes')
+                workers = int(v)
+            elif o == '--capture':
+                captureFile = v
+            elif o == '--capture-text':
+                captureText = v
+            elif o == '--curses':
+                if curses is None:
+                    raise getopt.GetoptError('--curses needs the curses module, not available here')
+                terminal = True
+    except getopt.GetoptError as e:
+        sys.stderr.write('{}: {}\n'.format(myname, e.msg))
+        usage(myname)
+        sys.exit(1)
+
+    # Check a --port that was given, because it was not discovered
+    def checkPort(port):
+        if port[0:3] == 'COM' or port[0:5] == 'unix:':
+            return
+        if not os.path.exists (port):
+            sys.stderr.write('{}: file "{}" does not exist.\n'.format(myname,port))
+            sys.exit(1)
+        if not stat.S_ISCHR(os.stat(port).st_mode):
+            sys.stderr.write('{}: file "{}" is not a serial port\n'.format(myname,port))
+            sys.exit(1)
+
+    # Lines to and from the device are recorded with --capture
+    def startCapture(model):
+        if captureFile is None:
+            return
+        try:
+            model.capture = Capture(captureFile)
+        except (IOError, OSError, ValueError) as e:
+            sys.stderr.write('{}: cannot capture to {}: {}\n'.format(myname, captureFile, e))
+            sys.exit(1)
+        atexit.register(model.capture.close) # the last lines are kept, even when exiting early
+
+    def startHooks(controller):
+        try:
+            controller.hooks = Hooks(controller, hooks)
+        except ValueError as e:
+            sys.stderr.write('{}: {}\n'.format(myname, e))
+            sys.exit(1)
+
+    def startAlerts(controller):
+        if not alertSinks and alertRules is None and alertVcc is None:
+            return # no alerts asked for
+        rules = list(Alerts.defaults if alertRules is None else alertRules)
+        if alertVcc is not None:
+            rules.append({'name': 'low_vcc', 'code': 'MVC', 'kind': 'below', 'value': alertVcc,
+                          'clear': alertVcc + 0.1, 'for': 60, 'message': 'Supply below {} V'.format(alertVcc)})
+        sinks = [lambda alert: controller.view.logInsert(Alerts.text(alert))] # always, whatever else is given
+        for sink in alertSinks:
+            if sink == 'json':
+                sinks.append(Alerts.toJSON(sys.stdout))
+            elif sink == 'desktop':
+                desktop = Alerts.toDesktop()
+                if desktop is None:
+                    sys.stderr.write('{}: no desktop notifications here (notify-send is needed)\n'.format(myname))
+                    sys.exit(1)
+                sinks.append(desktop)
+            else:
+                sinks.append(Alerts.toLog(sink[4:]))
+        try:
+            controller.alerts = Alerts(controller, rules, sinks)
+        except (ValueError, TypeError) as e:
+            sys.stderr.write('{}: {}\n'.format(myname, e))
+            sys.exit(1)
+
+    # Some uses run without the GUI, these need a port given with -p
+    def headless(need):
+        if port == '':
+            sys.stderr.write('{}: a port (-p) is needed {}\n'.format(myname,need))
+            sys.exit(1)
+        checkPort(port)
+        controller = Controller()
+        model = Model(controller, port[0:5] != 'unix:')
+        controller.model = model
+        controller.metricsFile = metricsFile
+        startCapture(model)
+        model.portName = port
+        if model.portName == 'None':
+            sys.stderr.write('{}: Port "{}" cannot be opened\n'.format(myname,port))
+            sys.exit(1)
+        return controller, model
+
+    # The status page runs beside the GUI or the daemon
+    def webServer(controller):
+        if http is None:
+            return None
+        web = WebServer(controller, http[0], http[1])
+        try:
+            web.start()
+        except (IOError, OSError, socket.error) as e:
+            sys.stderr.write('{}: cannot serve the status page on {}:{}: {}\n'.format(myname, http[0], http[1], e))
+            return None
+        return web
+
+    if socketPath is None and hasattr(socket, 'AF_UNIX'):
+        socketPath = os.path.join(configDir(False), 'daemon.sock') # made by the daemon's Controller
+    if client != '' or len(send) > 0:
+        try:
+            daemonClient = DaemonClient(socketPath)
+        except socket.error as e:
+            sys.stderr.write('{}: cannot reach the daemon on {}: {}\n'.format(myname, socketPath, e))
+            sys.exit(1)
+        for line in send:
+            words = line.split(None, 1)
+            daemonClient.request('send', code = words[0].upper(), data = words[1] if len(words) > 1 else '')
+        if client == 'state':
+            print(json.dumps(daemonClient.request('state')['state'], indent = 2, sort_keys = True))
+        elif client == 'metrics':
+            sys.stdout.write(daemonClient.request('metrics')['text'])
+        elif client == 'clock':
+            print(json.dumps(daemonClient.request('clock')['clock'], indent = 2, sort_keys = True))
+        elif client == 'watch':
+            daemonClient.request('subscribe', raw = True)
+            try:
+                for event in daemonClient.events():
+                    print(event['line'])
+                    sys.stdout.flush()
+            except KeyboardInterrupt:
+                pass
+        daemonClient.close()
+        sys.exit(0)
+
+    if simBootloader is not None:
+        sim = SimBootloader(simBootloader)
+        sim.start()
+        print('Simulated {} with a bootloader on {}'.format(simBootloader, sim.name))
+        sys.stdout.flush()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        sim.stop()
+        sys.exit(0)
+
+    if flash is not None:
+        if len(ports) == 0:
+            sys.stderr.write('{}: a port (-p) is needed to update firmware\n'.format(myname))
+            sys.exit(1)
+        for p in ports:
+            checkPort(p)
+        try:
+            image = IntelHex.load(flash)
+        except (IOError, ValueError) as e:
+            sys.stderr.write('{}: {}: {}\n'.format(myname, flash, e))
+            sys.exit(1)
+        shown = {}
+        lock = threading.Lock()
+        def progress(p, phase, done, total, rate):
+            step = done * 10 // total if total > 0 else 10
+            with lock:
+                if shown.get((p, phase)) != step:
+                    shown[(p, phase)] = step
+                    print('{}: {} {:3d}% {:6d} B/s'.format(p, phase, step * 10, int(rate)))
+                    sys.stdout.flush()
+        print('{}: {} bytes, {} to update'.format(flash, image.size, len(ports)))
+        failed = False
+        for r in FirmwareUpdate.runAll([FirmwareUpdate(p, image, bootBaud, progress) for p in ports]):
+            if r['ok']:
+                print('{}: updated {} {}, {} bytes in {} s ({} B/s), CRC {}'.format(
+                    r['port'], r.get('product') or 'device', r.get('hardware') or '',
+                    r['bytes'], r['seconds'], r['rate'], r['crc']))
+            else:
+                failed = True
+                sys.stderr.write('{}: {} not updated: {}\n'.format(myname, r['port'], r['error']))
+        sys.exit(1 if failed else 0)
+
+    if inventory != '':
+        try:
+            Inventory().export(sys.stdout, inventory, Model.bands(), product = product,
+                               firmwareBelow = firmwareBelow, lpf = lpf, since = since, until = until)
+        except sqlite3.Error as e:
+            sys.stderr.write('{}: inventory: {}\n'.format(myname, e))
+            sys.exit(1)
+        sys.exit(0)
+
+    if txlogExport != '':
+        TxLog().export(sys.stdout, txlogExport, band, since, until, Model.bands())
+        sys.exit(0)
+
+    # Profiles are handled without the GUI, so a unit can be configured in one command
+    if listProfiles:
+        for name in Profiles(profileFile).names():
+            print(name)
+        sys.exit(0)
+    if profile != '' or saveProfile != '':
+        profiles = Profiles(profileFile)
+        if profile != '' and profiles.get(profile) is None:
+            sys.stderr.write('{}: no profile named "{}"\n'.format(myname,profile))
+            sys.exit(1)
+        controller, model = headless('to use profiles')
+        if saveProfile != '':
+            profiles.put(saveProfile, controller.snapshotProfile())
+            print('Saved profile "{}"'.format(saveProfile))
+        if profile != '':
+            t = controller.applyProfile(profiles.get(profile))
+            print('Applied profile "{}" with {} write(s)'.format(profile, len(t.writes())))
+            failed = False
+            for key in sorted(t.results.keys()):
+                if t.results[key] != 'ok':
+                    failed = True
+                    sys.stderr.write('{}: {} {} (sent {}, device reports {})\n'.format(
+                        myname, key, t.results[key], t.data(key), t.reported.get(key)))
+            if failed:
+                model.portName = 'None'
+                sys.exit(1)
+        model.portName = 'None'
+        sys.exit(0)
+
+    if script is not None:
+        try:
+            with open(script) as f:
+                lines = f.readlines()
+            Script.parse(lines)
+        except (IOError, ValueError) as e:
+            sys.stderr.write('{}: {}: {}\n'.format(myname, script, e))
+            sys.exit(1)
+        controller, model = headless('to run a script')
+        def show(text):
+            print(text)
+            sys.stdout.flush()
+        start = monotonic()
+        ok = controller.runScript(Script(controller, lines, show))
+        print('{} in {:.2f} s'.format('Finished' if ok else 'Failed', monotonic() - start))
+        controller.shutdown()
+        model.portName = 'None'
+        sys.exit(0 if ok else 1)
+
+    if captureText is not None:
+        try:
+            Capture.text(captureText, sys.stdout, since * 1000000000 if since is not None else None,
+                         until * 1000000000 if until is not None else None)
+        except (IOError, OSError, ValueError, zlib.error) as e:
+            sys.stderr.write('{}: {}: {}\n'.format(myname, captureText, e))
+            sys.exit(1)
+        sys.exit(0)
+
+    if spots is not None:
+        try:
+            if callsFile is not None:
+                with open(callsFile) as f:
+                    calls = [line.split('#')[0] for line in f]
+            else:
+                inventory = Inventory()
+                calls = [device['call'] for device in inventory.query() if device['call']]
+                inventory.close()
+            archive = SpotArchive(spots, calls, workers)
+            def progress(rows, seconds):
+                sys.stderr.write('{} rows in {:.0f} s, {:.0f} rows/s\n'.format(rows, seconds, rows / max(seconds, 1e-9)))
+            summary = archive.summarise(progress)
+        except (IOError, OSError, ValueError, zipfile.BadZipfile) as e:
+            sys.stderr.write('{}: {}\n'.format(myname, e))
+            sys.exit(1)
+        print(json.dumps(summary, indent = 2, sort_keys = True))
+        progress(summary['rows'], summary['seconds'])
+        sys.exit(0)
+
+    if encode is not None:
+        encoder = WSPREncoder()
+        lines = sys.stdin if encode == '-' else [encode]
+        failed = 0
+        for line in lines:
+            fields = line.split()
+            if len(fields) == 0:
+                continue
+            if len(fields) != 3:
+                fields.append('') # reported as unsendable, with the rest
+            try:
+                symbols = encoder.encode(*fields[0:3])
+                print('{} {}'.format(' '.join(fields), ''.join(str(s) for s in symbols)))
+            except ValueError as e:
+                sys.stderr.write('{}: {}\n'.format(' '.join(fields), e))
+                failed += 1
+        sys.exit(1 if failed else 0)
+
+    if encodeBenchmark > 0:
+        # Balloon style messages: calls and locators in turn, and every power allowed
+        powers = [p for p in range(61) if p % 10 in [0, 3, 7]]
+        messages = [('Q{}{}{}'.format(n % 10, chr(65 + n // 10 % 26), chr(65 + n // 260 % 26)),
+                     '{}{}{}{}'.format(chr(65 + n % 18), chr(65 + n // 18 % 18), n // 324 % 10, n // 3240 % 10),
+                     powers[n % len(powers)]) for n in range(encodeBenchmark)]
+        encoder = WSPREncoder()
+        encoder.cacheSize = encodeBenchmark
+        for name in ['encoding', 'cached']:
+            start = monotonic()
+            symbols = encoder.encodeMany(messages)
+            elapsed = monotonic() - start
+            print('{:<9} {} messages in {:.3f} s, {:.0f} messages/s'.format(
+                name, len(symbols), elapsed, len(symbols) / max(elapsed, 1e-9)))
+        sys.exit(0)
+
+    if terminal:
+        controller = Controller()
+        controller.metricsFile = metricsFile
+        model = Model(controller, port[0:5] != 'unix:')
+        controller.model = model
+        startCapture(model)
+        controller.poller = Poller(controller, pollFields, pollShare)
+        startAlerts(controller)
+        startHooks(controller)
+        if port == '':
+            port = model.getPorts()[0]
+        checkPort(port)
+        model.portName = port
+        if model.portName == 'None':
+            sys.stderr.write('{}: Port "{}" cannot be opened\n'.format(myname,port))
+            sys.exit(1)
+        web = webServer(controller)
+        def run(screen):
+            controller.view = TermView(controller, screen)
+            controller.view.setPort(model.portName, True)
+            controller.warmStart()
+            model.sendBatch([(c, 'G') for c in controller.statusCodes]) # fill the page in
+            controller.drive()
+        try:
+            curses.wrapper(run)
+        except KeyboardInterrupt:
+            controller.shutdown()
+        if web is not None:
+            web.stop()
+        model.portName = 'None'
+        sys.exit(0)
+
+    if daemon:
+        if not hasattr(socket, 'AF_UNIX'):
+            sys.stderr.write('{}: the daemon needs Unix sockets, which this system does not have\n'.format(myname))
+            sys.exit(1)
+        controller, model = headless('for the daemon')
+        controller.poller = Poller(controller, pollFields, pollShare)
+        startAlerts(controller)
+        startHooks(controller)
+        web = webServer(controller)
+        try:
+            Daemon(controller, socketPath).serve()
+        except KeyboardInterrupt:
+            pass
+        except (IOError, OSError, socket.error) as e:
+            sys.stderr.write('{}: {}\n'.format(myname, e))
+            sys.exit(1)
+        finally:
+            if web is not None:
+                web.stop()
+        model.portName = 'None'
+        sys.exit(0)
+
+    if gpsStats > 0 or clockStats > 0:
+        controller, model = headless('for GPS statistics')
+        def done():
+            controller.periodic()
+            return False
+        controller.pump(done, max(gpsStats, clockStats))
+        controller.shutdown()
+        model.portName = 'None'
+        if gpsStats > 0:
+            print(json.dumps(controller.gpsStats.summary(), indent = 2, sort_keys = True))
+        if clockStats > 0:
+            print(json.dumps(controller.clock.summary(), indent = 2, sort_keys = True))
+        sys.exit(0)
+
+    if gui.ttk is None:
+        sys.stderr.write('{}: the GUI needs tkinter (python-tk), not available here.  --curses runs in a terminal\n'.format(myname))
+        sys.exit(1)
+
+    controller = Controller()
+    controller.metricsFile = metricsFile
+
+    model = Model(controller, port[0:5] != 'unix:')
+    controller.model = model
+    startCapture(model)
+    controller.poller = Poller(controller, pollFields, pollShare)
+    startAlerts(controller)
+    startHooks(controller)
+    if port[0:5] == 'unix:':
+        model.addPort(port)
+
+    view  = View(controller)
+    controller.view = view
+    web = webServer(controller)
+
+    # Handle --port
+    if port != '':
+        checkPort(port)
+        model.portName = port
+        if model.portName == 'None':
+            sys.stderr.write('{}: Port "{}" cannot be opened\n'.format(myname,port))
+        view.setPort(model.portName, model.portName != 'None') # set the View based on the Model's state
+        view.serialOK(False)
+        controller.warmStart()
+
+    # Enter polling and event-driven loop
+    controller.drive()
+    if web is not None:
+        web.stop()
+    sys.exit(0)
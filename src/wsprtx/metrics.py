@@ -0,0 +1,70 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Named values for monitoring
+"""
+
+import os
+import sys
+
+# Metrics - named values for monitoring
+#
+# Values are kept in the Prometheus text format, so that a file written
+# with write() can be picked up by a node exporter text collector, or
+# the text served to anything that reads that format.
+#
+class Metrics(object):
+    """
+    Registry of named values
+
+        set(name,value,labels)  - sets a value, labels is an optional {name:value}
+        inc(name,by,labels)     - adds to a counter
+        get(name,labels)        - reads a value
+        text()                  - all of the values in the Prometheus text format
+        write(filename)         - writes text() to a file, replacing it atomically
+    """
+    def __init__(self):
+        self._values = {}
+        self._help = {}
+
+    @staticmethod
+    def _key(name, labels):
+        if not labels:
+            return (name, ())
+        return (name, tuple(sorted((str(_k), str(_v)) for _k, _v in labels.items())))
+
+    def set(self, name, value, labels = None, help = None):
+        self._values[self._key(name, labels)] = value
+        if help is not None:
+            self._help[name] = help
+
+    def inc(self, name, by = 1, labels = None, help = None):
+        _k = self._key(name, labels)
+        self._values[_k] = self._values.get(_k, 0) + by
+        if help is not None:
+            self._help[name] = help
+
+    def get(self, name, labels = None, default = None):
+        return self._values.get(self._key(name, labels), default)
+
+    def text(self):
+        _lines = []
+        _named = None
+        for (_name, _labels) in sorted(self._values.keys()):
+            if _name != _named:
+                _named = _name
+                if _name in self._help:
+                    _lines.append('# HELP wspr_{} {}'.format(_name, self._help[_name]))
+            _l = ''
+            if len(_labels) > 0:
+                _l = '{' + ','.join('{}="{}"'.format(_k, _v) for _k, _v in _labels) + '}'
+            _lines.append('wspr_{}{} {}'.format(_name, _l, self._values[(_name, _labels)]))
+        return '\n'.join(_lines) + '\n'
+
+    def write(self, filename):
+        _tmp = filename + '.tmp'
+        with open(_tmp, 'w') as _f:
+            _f.write(self.text())
+        if os.path.exists(filename) and sys.platform.startswith('win'):
+            os.remove(filename)
+        os.rename(_tmp, filename)
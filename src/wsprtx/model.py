@@ -0,0 +1,486 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The Model: the device on its port, and the last values it reported
+"""
+
+import errno
+import json
+import os
+import serial
+import socket
+import sys
+import threading
+import time
+try:
+    from serial.tools import list_ports # USB details of the ports, to follow a device that moves
+except ImportError:
+    list_ports = None
+from .common import monotonic, python
+from .capture import Capture
+
+###############################################################################
+##### Model
+###############################################################################
+#
+# A "Model" in MVC is theoretically where the logic of the program's
+# function is implemented, along with its data and state.  The Model
+# is independent of the user interface, allowing changes to the GUI
+# without a need to modify this core logic, and also independent of
+# the actual application logic, which resides in the Controller.  The
+# Model provides the program with its core functions, which for
+# different use cases has different meaning.  For many programs, the
+# Model implements business logic and workflows.
+#
+# The Model receives input from the Controller as events, such as user
+# input, occur. It also can provide status upon inquiry, either to the
+# Controller or the View.  Most implementations of MVC do not allow
+# direct communications between the Model and the View, but require
+# them to pass through the Controller. Some interpretations of MVC
+# allow the View to query the Model for data to display.  Here, some
+# data can be queried directly by the View from the Model using the
+# public functions.
+#
+# In this implementation, the Model data and state on the device must
+# be queried via Model() to the WSPR device. The Model really is the
+# device (the ZachTek WSPR transmitter), and Model() implements
+# functions to manage a particular set of such devices connected via
+# serial (and maybe in the future, USB) ports.  Model() also holds
+# some data about the device and the communication with it.  Commands
+# from the Controller are made synchronous, as Model() ensures that
+# some of the communications actions are succesful (like receiving a
+# whole line), but checking the infomation received is left to the
+# Controller, as is typical in MVC -- so retries are driven from the
+# Controller. The Controller must poll for asynchonous events from the
+# Model, as well as any responses to commands the Contoller sends.
+#
+class Model(object):
+    """
+    The Model for the MVC implementation
+
+    The model has these exported functions:
+        portName               - when assigned, sets the serial port to the name given
+                                 when read, provides the serial port name
+        getPorts()             - returns a [list] of serial ports found on the machine
+        readPort()             - polls for a line of data from the port
+                                 returns the stripped line of data from the port
+        sendPort(command,data) - sends a WSPR TX formatted command to the port
+        scanPorts()            - looks for serial ports again, returns the new list
+        fail(why)              - closes a port that has stopped working, keeping wanted
+        reopen(name)           - opens a port again after it failed
+        attach(name,port)      - uses a port object that was opened elsewhere, under the name given
+        wanted                 - the port last asked for, even if it has since failed
+        failed                 - why the port was closed under us, or None
+        usbId                  - (vid, pid, serial number) of the open USB port, or None
+        capture                - a Capture recording the lines sent and received, or None
+        stamp                  - (monotonic, wall clock) when the last line read began to arrive
+
+    When the port fails (unplugged, or the device resets and the
+    operating system drops it), it is closed and portName reads
+    'None', but wanted remains so that the port can be reopened.
+    """
+    def __init__(self, Controller, required = True):
+        self._vc = Controller   # I need to know the Controller to call notification functions
+        self._serialPort = 'None' # "None" is a flag that means we have not set it, yet.
+        self._serials = []      # The list of serial ports found on the machine
+        self._fd = None         # File descriptor of the open port
+        self.wanted = 'None'
+        self.failed = None
+        self.usbId = None
+        self.stamp = (0, 0)
+        self.capture = None
+        
+        # The first thing to do is to discover what serial ports are available on this system
+        self.scanPorts()
+        if len(self._serials) < 1 and required:
+            sys.stderr.write('No serial ports found.\n')
+            if sys.platform.startswith('linux') and len(self._candidates()) > 0:
+                sys.stderr.write('This may be because the user has no rights to the USB ports.\n')
+                sys.stderr.write('If this is the case, add the user to the "dialout" group:\n')
+                sys.stderr.write('\tsudo gpasswd -a YourUsername dialout\n')
+                sys.stderr.write('where "YourUsername" is the user id that will run this tool.\n')
+                sys.stderr.write('You may need to log out and back in to have it take effect.\n')
+            sys.exit(1)
+
+    def _candidates(self): # The names serial ports may have on this system
+        _ports=[]
+        if sys.platform.startswith('win'):
+            _ports = ['COM%s' % (i + 1) for i in range(256)]
+        elif sys.platform.startswith('linux') or sys.platform.startswith('cygwin'):
+            for _name in os.listdir('/dev'):
+                if _name.startswith('tty') and ( len(_name) > 3 ):
+                    if _name[3] == 'U':
+                        _ports.append('/dev/'+_name)
+        elif sys.platform.startswith('darwin'):
+            for _name in os.listdir('/dev'):
+                if _name.startswith('cu.'):
+                    _ports.append('/dev/'+_name)
+                if _name.startswith('ttyS'):
+                    _ports.append('/dev/'+_name)
+        else:
+            sys.stderr.write('OS unknown - cannot find ports')
+            self._serialPort = 'None'
+            sys.exit(1)
+        return _ports
+
+    def scanPorts(self):
+        # Test the possible ports and add them to the list (mainly for Windows)
+        _found = []
+        for _p in self._candidates():
+            if _p == self._serialPort: # already open, and we hold it exclusively
+                _found.append(_p)
+                continue
+            try:
+                _s = serial.Serial(_p)
+                _found.append(_p)
+                _s.close()
+            except:
+                pass
+        # Keep the ports that were added by name
+        self._serials = _found + [_p for _p in self._serials if _p[0:5] == 'unix:' and _p not in _found]
+        return self._serials
+
+    def getPorts(self): # Only used by the View to create a selector of possible ports
+        return self._serials
+
+    def addPort(self, name): # Adds a port that cannot be discovered, like a daemon socket
+        if name not in self._serials:
+            self._serials.append(name)
+
+    @property
+    def portName(self):
+        return self._serialPort
+
+    @portName.setter
+    def portName(self,name):
+        self.wanted = name
+        self._open(name)
+
+    def attach(self, name, port): # A port made elsewhere, like the simulated device of a test
+        self._open('None')
+        self.wanted = self._serialPort = name
+        self._fd = port
+
+    def reopen(self, name):
+        self._open(name, True)
+        if self._serialPort == 'None':
+            return False
+        self.wanted = name # the device may have come back under a new name
+        return True
+
+    def _open(self, name, quiet = False):
+        if self._serialPort != 'None':
+            try:
+                self._fd.close()
+            except (serial.SerialException, OSError, IOError):
+                pass
+        self._serialPort = name
+        self.failed = None
+        self.usbId = None
+        if name == 'None':
+            return
+        if name[0:5] == 'unix:': # The device is shared by a daemon
+            try:
+                self._fd = SocketPort(name[5:])
+            except (socket.error, OSError, IOError):
+                if not quiet:
+                    sys.stderr.write('Daemon not running on {}?\n'.format(name[5:]))
+                self._serialPort = 'None'
+            return
+        try:
+            self._fd = serial.Serial(port = self._serialPort, baudrate = 9600, bytesize = serial.EIGHTBITS,
+                                     parity = serial.PARITY_NONE, stopbits = serial.STOPBITS_ONE,
+                                     xonxoff = False, rtscts = False, dsrdtr = None, timeout = 1,
+                                     exclusive = True)
+        except (serial.SerialException, OSError, IOError) as e:
+            if not quiet:
+                sys.stderr.write('Port in use?\n' if isinstance(e, OSError) else 'Cannot open port: {}\n'.format(e))
+            self._serialPort = 'None'
+            return
+        self.usbId = self.identify(name)
+
+    @staticmethod
+    def identify(name):
+        """The (vid, pid, serial number) of a USB serial port, or None"""
+        if list_ports is None:
+            return None
+        try:
+            for _p in list_ports.comports():
+                if _p.device == name and getattr(_p, 'vid', None) is not None:
+                    return (_p.vid, _p.pid, _p.serial_number)
+        except (OSError, IOError):
+            pass
+        return None
+
+    @staticmethod
+    def findUSB(usbId):
+        """The name a USB serial port with this identity has now, or None"""
+        if list_ports is None or usbId is None:
+            return None
+        try:
+            for _p in list_ports.comports():
+                if getattr(_p, 'vid', None) is not None and (_p.vid, _p.pid, _p.serial_number) == usbId:
+                    return _p.device
+        except (OSError, IOError):
+            pass
+        return None
+
+    def fail(self, e):
+        """Closes a port that has gone (or is broken), but still wants it, for the Watchdog"""
+        self.failed = str(e) or e.__class__.__name__
+        try:
+            self._fd.close()
+        except (serial.SerialException, OSError, IOError, socket.error):
+            pass
+        self._serialPort = 'None'
+
+    def readPort(self):
+        if self._serialPort == 'None':
+            return ''
+        _ch = _buff = ''
+        _count = 0
+        try:
+            if self._fd.in_waiting < 1:
+                return ''
+            while _count < 1000000:
+                _count += 1
+                if python == 2:
+                    _ch = self._fd.read(1)
+                else:
+                    _ch = str(self._fd.read(1), 'ascii', 'replace')
+                if len(_ch) < 1: continue
+                if _ch in '\r\n': break
+                _buff = _buff + _ch
+            # Stamp the line with when it started to arrive, less the bytes queued behind it
+            _mono, _wall = monotonic(), time.time()
+            _baud = getattr(self._fd, 'baudrate', None)
+            if _baud:
+                _late = (self._fd.in_waiting + len(_buff) + 1) * 10.0 / _baud # the rest of a line end is still waiting
+                _mono, _wall = _mono - _late, _wall - _late
+            self.stamp = (_mono, _wall)
+        except (serial.SerialException, OSError, IOError, socket.error) as e:
+            self.fail(e)
+            return ''
+        if len(_buff) < 1:
+            return ''
+        if self.capture is not None:
+            self.capture.add(Capture.RX, _buff.rstrip(), int(self.stamp[1] * 1000000000))
+        if _buff[0] != '{':
+            return ''
+        return _buff.rstrip()
+            
+    def sendPort(self, cmd, data):
+        if len(cmd)>0:
+            _buff = '['+cmd+'] '+data
+        else:
+            _buff = data
+        self._vc.view.traceInsert(_buff)
+        if self.capture is not None:
+            self.capture.add(Capture.TX, _buff.rstrip())
+        if len(cmd)>0: _buff = _buff+'\r\n'
+        if python == 3:
+            _buff = str.encode(_buff)
+        self._write(_buff)
+
+    def _write(self, buff):
+        if self._serialPort == 'None':
+            return
+        try:
+            self._fd.write(buff)
+        except (serial.SerialException, OSError, IOError, socket.error) as e:
+            self.fail(e)
+
+    def waiting(self): # The number of bytes received but not yet read
+        if self._serialPort == 'None':
+            return 0
+        try:
+            return self._fd.in_waiting
+        except (serial.SerialException, OSError, IOError, socket.error) as e:
+            self.fail(e)
+            return 0
+
+    def sendBatch(self, commands):
+        """
+        Sends a list of (command,data) in a single write, without waiting for replies
+        """
+        _buff = ''
+        for _cmd, _data in commands:
+            _line = '['+_cmd+'] '+_data
+            self._vc.view.traceInsert(_line)
+            if self.capture is not None:
+                self.capture.add(Capture.TX, _line)
+            _buff = _buff + _line + '\r\n'
+        if python == 3:
+            _buff = str.encode(_buff)
+        self._write(_buff)
+
+    # Device (WSPR TX) specific items
+    statusCodes = ['CCM', 'OTP', 'OSM', 'OBD', 'OLC', 'OPW', 'DCS',   # the settings and identity, asked for together
+                   'DL4', 'DPD', 'DNM', 'DGF', 'FPN', 'FHV', 'FHR',
+                   'FSV', 'FSR', 'FRF', 'FLP' ]
+
+    @staticmethod
+    def bands():
+        return ['2190m', '630m', '160m', '80m', '40m', '30m', '20m', '17m',
+                '15m', '12m', '10m', '6m', '4m', '2m', '70cm', '23cm']
+
+    def powers(self):
+        return [ '0',  '3',  '7', '10', '13', '17',
+                '20', '23', '27', '30', '33', '37',
+                '40', '43', '47', '50', '53', '57', '60']
+
+# Socket Port - a device shared by the daemon
+#
+# When the daemon owns the serial port, other programs reach the device
+# through its Unix socket.  This class gives the Model the same few
+# functions it uses on a serial port: the daemon's stream of device
+# lines (which starts with the daemon's cached state) is read back as
+# bytes, and lines written are passed to the daemon to send.
+#
+class SocketPort(object):
+    """
+    Serial port look-alike for a device shared by Daemon()
+    """
+    def __init__(self, path):
+        self._s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._s.connect(path)
+        self._s.sendall(str.encode(json.dumps({'op': 'subscribe', 'raw': True}) + '\n'))
+        self._s.setblocking(False)
+        self._in = b''
+        self._rx = b''
+        self._tx = b''
+
+    def _poll(self):
+        try:
+            while True:
+                _b = self._s.recv(4096)
+                if len(_b) == 0:
+                    raise IOError('daemon closed the connection')
+                self._in += _b
+        except socket.error as e:
+            if e.args[0] not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                raise
+        while b'\n' in self._in:
+            _line, self._in = self._in.split(b'\n', 1)
+            _event = json.loads(_line.decode('utf-8'))
+            if _event.get('event') == 'line':
+                self._rx += _event['line'].encode('ascii', 'replace') + b'\r\n'
+
+    @property
+    def in_waiting(self):
+        self._poll()
+        return len(self._rx)
+
+    def read(self, n = 1):
+        if len(self._rx) < n:
+            self._poll()
+        _b, self._rx = self._rx[0:n], self._rx[n:]
+        return _b
+
+    def write(self, data):
+        self._tx += data
+        while b'\n' in self._tx:
+            _line, self._tx = self._tx.split(b'\n', 1)
+            _req = {'op': 'raw', 'line': _line.rstrip(b'\r').decode('ascii', 'replace'), 'quiet': True}
+            self._s.setblocking(True)
+            self._s.sendall(str.encode(json.dumps(_req) + '\n'))
+            self._s.setblocking(False)
+
+    def close(self):
+        self._s.close()
+
+# Device State - the last known values reported by the device
+#
+# Every message from the device is recorded here, so the Controller
+# can answer "what is the current setting?" without asking the device
+# again.  Messages that carry one item of a list (a band enable, a
+# fitted low pass filter) are kept under their own key, so that each
+# band is tracked separately.  Each key also remembers the message
+# count at which it was last received, so a caller can tell a fresh
+# answer from an old one.  GSI satellite reports are not kept, since
+# they are only a snapshot of the sky.
+#
+# The state also has a version number, which goes up each time a value
+# changes, and each key remembers the version of its last change.  A
+# reader in another thread (like the web dashboard) can wait() for the
+# version to pass the one it last saw, then fetch only what changed.
+#
+class DeviceState(object):
+    """
+    Cache of the values last reported by the device
+
+        update(code,data) - records a message from the device
+        get(key)          - the last data received for a key (a code, or 'OBD06' etc.)
+        received(key)     - the message count when the key was last received
+        count             - the number of messages recorded so far
+        version           - the number of changes of value so far
+        changed(key)      - the version when the key last changed
+        wait(version,t)   - waits up to t seconds for the version to pass version
+        snapshot()        - (version, {key:data}) taken together
+    """
+    def __init__(self):
+        self._data = {}
+        self._received = {}
+        self._changed = {}
+        self.count = 0
+        self.version = 0
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def key(code, data):
+        if code == 'OBD':
+            return code + data[0:2]
+        if code == 'FLP':
+            return code + data
+        return code
+
+    def update(self, code, data):
+        if code == 'GSI':
+            return
+        _k = self.key(code, data)
+        self.count += 1
+        self._received[_k] = self.count
+        if self._data.get(_k) != data:
+            with self._cond:
+                self._data[_k] = data
+                self.version += 1
+                self._changed[_k] = self.version
+                self._cond.notify_all()
+
+    def changed(self, key):
+        return self._changed.get(key, 0)
+
+    def wait(self, version, timeout):
+        _end = monotonic() + timeout
+        with self._cond:
+            while self.version <= version:
+                _left = _end - monotonic()
+                if _left <= 0:
+                    break
+                self._cond.wait(_left)
+        return self.version
+
+    def get(self, key, default = None):
+        return self._data.get(key, default)
+
+    def received(self, key):
+        return self._received.get(key, 0)
+
+    def keys(self):
+        with self._cond:
+            return list(self._data.keys())
+
+    def snapshot(self):
+        with self._cond:
+            return self.version, dict(self._data)
+
+    @staticmethod
+    def matches(wanted, current):
+        """True if the data reported by the device is the setting wanted"""
+        if current is None:
+            return False
+        wanted = str(wanted).strip()
+        current = current.strip()
+        if wanted.isdigit() and current.isdigit():
+            return int(wanted) == int(current)
+        return wanted == current
@@ -0,0 +1,90 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Polls of the fields the device does not report by itself
+"""
+
+from .common import monotonic
+
+# Poller - asks for the fields that change without the device saying so
+#
+# The device reports most changes itself, but some fields, like the
+# supply voltage (MVC), are only known when asked for.  Each field
+# polled has a longest interval.  An answer that differs from the last
+# one brings the next poll forward (to a quarter of the interval), and
+# each unchanged answer doubles the interval again, up to the longest.
+# A report the device sends by itself counts as an answer, so a field
+# the device keeps reporting is never asked for.
+#
+# Polls wait while the device is transmitting, while it has lines
+# waiting to be read, while a script is running, and while the link is
+# down.  They are paid for from a budget of a share of the line's
+# capacity (5% of 9600 baud is 48 characters a second), counting both
+# the request and the answer expected, so however many fields are
+# chosen, polling never takes more than its share.
+#
+# Nothing is polled unless fields are chosen (--poll).
+#
+class Poller(object):
+    """
+    Polls chosen codes, within a share of the line
+
+        fields           - {code: seconds}, the longest time between polls of each code
+        share            - the fraction of the line the polls may use
+        check()          - called from the main loop, sends the polls that are due
+        heard(code,data) - notes a report of a code, asked for or not
+        sent             - the number of polls sent
+    """
+    baud = 9600
+    fastest = 2     # seconds, the shortest interval after a change
+
+    def __init__(self, controller, fields = None, share = 0.05):
+        self._vc = controller
+        self.fields = dict(fields or {})
+        self.share = share
+        self.sent = 0
+        self._interval = {}
+        self._due = {}
+        self._last = {}
+        self._budget = 0.0
+        self._filled = monotonic()
+
+    def _cost(self, code):
+        # '[MVC] G' and '{MVC} data', with their line ends
+        return 9 + 8 + len(self._last.get(code, 'x' * 12))
+
+    def heard(self, code, data):
+        if code not in self.fields:
+            return
+        _longest = self.fields[code]
+        _i = self._interval.get(code, _longest)
+        if code in self._last and self._last[code] != data:
+            _i = min(_longest, max(self.fastest, _longest / 4.0))
+        else:
+            _i = min(_longest, _i * 2)
+        self._interval[code] = _i
+        self._last[code] = data
+        self._due[code] = monotonic() + _i
+
+    def check(self):
+        _now = monotonic()
+        _rate = self.share * self.baud / 10.0 # characters a second
+        self._budget = min(self._budget + (_now - self._filled) * _rate, max(_rate * 4, 40))
+        self._filled = _now
+        if len(self.fields) == 0 or not self._vc.watchdog.up or self._vc.script is not None:
+            return
+        _m = self._vc.model
+        if self._vc.state.get('TON', 'F')[0:1] == 'T' or _m.waiting() > 0:
+            return
+        for _code in sorted(self.fields, key = lambda _c: self._due.get(_c, 0)):
+            if self._due.get(_code, 0) > _now:
+                break
+            _cost = self._cost(_code)
+            if _cost > self._budget:
+                break
+            self._budget -= _cost
+            # Until it is answered, it is asked again after the same interval
+            self._due[_code] = _now + self._interval.get(_code, self.fields[_code])
+            _m.sendPort(_code, 'G')
+            self.sent += 1
+            self._vc.metrics.inc('polls_total', help = 'Fields asked for by the poller')
@@ -0,0 +1,129 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Named sets of device settings, saved to a file
+"""
+
+import json
+import os
+import sys
+from .common import configDir
+from .model import DeviceState
+
+# Profiles - named sets of device settings saved to a file
+#
+# A profile holds the settings that make up a beacon configuration.
+# Any field may be left out, in which case applying the profile leaves
+# that setting alone.  The fields are:
+#   call      - callsign (DCS)            locator   - Maidenhead locator (DL4)
+#   locmode   - G or M (OLC)              power     - reported dBm (DPD)
+#   powermode - N or A (OPW)              bands     - list of enabled band numbers (OBD)
+#   pause     - seconds after a pass (OTP)  boot    - N, W or S (OSM)
+#   name      - user set name (DNM)
+#
+# Comparing a profile with the device state gives the smallest list of
+# writes needed, so applying the same profile twice sends nothing.
+#
+class Profiles(object):
+    """
+    Named device configuration profiles, kept in a JSON file
+    """
+    codes = ['DCS', 'DL4', 'DPD', 'OBD', 'OTP', 'OSM', 'OLC', 'OPW', 'DNM']
+
+    def __init__(self, filename = None):
+        if filename is None:
+            filename = os.path.join(configDir(), 'profiles.json')
+        self.filename = filename
+        self._profiles = {}
+        if os.path.exists(self.filename):
+            with open(self.filename) as _f:
+                self._profiles = json.load(_f)
+
+    def names(self):
+        return sorted(self._profiles.keys())
+
+    def get(self, name):
+        return self._profiles.get(name)
+
+    def put(self, name, profile):
+        self._profiles[name] = profile
+        _tmp = self.filename + '.tmp'
+        with open(_tmp, 'w') as _f:
+            json.dump(self._profiles, _f, indent = 2, sort_keys = True)
+        if os.path.exists(self.filename) and sys.platform.startswith('win'):
+            os.remove(self.filename)
+        os.rename(_tmp, self.filename)
+
+    @staticmethod
+    def fromState(state, nbands):
+        """Builds a profile from the values held in a DeviceState"""
+        _p = {}
+        for _field, _code in [('call', 'DCS'), ('locator', 'DL4'), ('name', 'DNM'),
+                              ('boot', 'OSM'), ('locmode', 'OLC'), ('powermode', 'OPW')]:
+            _v = state.get(_code)
+            if _v is not None:
+                _p[_field] = _v.strip()
+        for _field, _code in [('power', 'DPD'), ('pause', 'OTP')]:
+            _v = state.get(_code)
+            if _v is not None and _v.strip().isdigit():
+                _p[_field] = int(_v)
+        _bands = []
+        _known = False
+        for _b in range(nbands):
+            _v = state.get('OBD{0:02d}'.format(_b))
+            if _v is not None:
+                _known = True
+                if _v[3:4] == 'E':
+                    _bands.append(_b)
+        if _known:
+            _p['bands'] = _bands
+        return _p
+
+    @staticmethod
+    def writes(profile, state, nbands):
+        """
+        Returns the [(command,data)] needed to bring the device from state to profile
+        """
+        _w = []
+        def differs(wanted, current):
+            return not DeviceState.matches(wanted, current)
+
+        if 'call' in profile:
+            _v = profile['call'].strip().upper()
+            if differs(_v, state.get('DCS')):
+                _w.append(('DCS', 'S '+_v))
+        if 'locator' in profile:
+            _v = profile['locator'].strip()
+            if differs(_v, state.get('DL4')):
+                _w.append(('DL4', 'S '+_v))
+        if 'locmode' in profile:
+            _v = profile['locmode'].strip().upper()[0:1]
+            if differs(_v, state.get('OLC')):
+                _w.append(('OLC', 'S '+_v))
+        if 'power' in profile:
+            _v = int(profile['power'])
+            if differs(_v, state.get('DPD')):
+                _w.append(('DPD', 'S {0:02d}'.format(_v)))
+        if 'powermode' in profile:
+            _v = profile['powermode'].strip().upper()[0:1]
+            if differs(_v, state.get('OPW')):
+                _w.append(('OPW', 'S '+_v))
+        if 'bands' in profile:
+            _on = [int(_b) for _b in profile['bands']]
+            for _b in range(nbands):
+                _v = '{0:02d} {1}'.format(_b, 'E' if _b in _on else 'D')
+                if differs(_v, state.get('OBD{0:02d}'.format(_b))):
+                    _w.append(('OBD', 'S '+_v))
+        if 'pause' in profile:
+            _v = int(profile['pause'])
+            if differs(_v, state.get('OTP')):
+                _w.append(('OTP', 'S {0:05d}'.format(_v)))
+        if 'boot' in profile:
+            _v = profile['boot'].strip().upper()[0:1]
+            if differs(_v, state.get('OSM')):
+                _w.append(('OSM', 'S '+_v))
+        if 'name' in profile:
+            _v = profile['name'].strip()
+            if differs(_v, state.get('DNM')):
+                _w.append(('DNM', 'S '+_v))
+        return _w
@@ -0,0 +1,174 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Expect style command scripts
+"""
+
+import re
+from .common import monotonic
+
+# Script - expect style command scripts, for bench work
+#
+# A script is a text file of steps, one to a line (lines starting with
+# '#' are comments):
+#   send CCM G          - sends a command ('send [CCM] G' or any raw text also works)
+#   expect CCM [REGEX]  - waits for a CCM message whose data matches REGEX
+#   wait SECONDS        - pauses, after everything before it is answered
+#   repeat N ... end    - runs the steps between N times
+#   timeout SECONDS     - the time allowed for each following expect (default 5)
+# Sends are not held up by the expects before them: everything up to the
+# next wait is written in one batch, and the expects are then matched,
+# in any order, against the messages that arrive.  So a wait (even
+# 'wait 0') is the way to have a step depend on the answers before it.
+# Each expect is matched by a different message.  The first expect that
+# times out stops the script.
+#
+# The Script does not read the port itself: the Controller feeds it
+# each message and calls poll(), so it runs in the GUI's main loop as
+# well as from the command line.
+#
+class Script(object):
+    """
+    A parsed command script, and its progress when run
+
+        poll()          - does what is due, returns False when finished
+        feed(code,data) - a message from the device
+        ok              - True when every step succeeded
+        results         - [(line, step, status, seconds)] for the finished steps
+    """
+    def __init__(self, controller, lines, output = None):
+        self._vc = controller
+        self.output = output or (lambda text: None)
+        self.steps = self.parse(lines)
+        self.results = []
+        self.ok = True
+        self._i = 0
+        self._msgs = []     # (time, code, data, used) received while expects are pending
+        self._pending = []  # [step, start, issued, deadline]
+        self._wait = None
+
+    @staticmethod
+    def parse(lines, limit = 100000):
+        """Turns the text into a list of steps, raises ValueError on a bad line"""
+        _steps = [[]]
+        _repeats = []
+        _timeout = 5.0
+        for _n, _line in enumerate(lines, 1):
+            _line = _line.strip()
+            if len(_line) == 0 or _line[0] == '#':
+                continue
+            _words = _line.split(None, 1)
+            _op = _words[0].lower()
+            _arg = _words[1].strip() if len(_words) > 1 else ''
+            try:
+                if _op == 'send':
+                    _w = _arg.split(None, 1)
+                    if len(_w) > 0 and len(_w[0]) == 3 and _w[0].isalpha():
+                        _steps[-1].append(('send', _n, _line, _w[0].upper(), _w[1] if len(_w) > 1 else ''))
+                    else:
+                        _steps[-1].append(('send', _n, _line, '', _arg))
+                elif _op == 'expect':
+                    _w = _arg.split(None, 1)
+                    if len(_w) < 1 or len(_w[0]) != 3:
+                        raise ValueError('expect needs a three letter code')
+                    _steps[-1].append(('expect', _n, _line, _w[0].upper(),
+                                       re.compile(_w[1] if len(_w) > 1 else ''), _timeout))
+                elif _op == 'wait':
+                    _steps[-1].append(('wait', _n, _line, float(_arg)))
+                elif _op == 'timeout':
+                    _timeout = float(_arg)
+                elif _op == 'repeat':
+                    _repeats.append(int(_arg))
+                    _steps.append([])
+                elif _op == 'end':
+                    if len(_repeats) == 0:
+                        raise ValueError('end without repeat')
+                    _body = _steps.pop()
+                    _times = _repeats.pop()
+                    if len(_steps[-1]) + len(_body) * _times > limit: # before the copies are made
+                        raise ValueError('more than {} steps'.format(limit))
+                    _steps[-1].extend(_body * _times)
+                else:
+                    raise ValueError('unknown step "{}"'.format(_op))
+            except re.error as e:
+                raise ValueError('line {}: bad pattern: {}'.format(_n, e))
+            except ValueError as e:
+                raise ValueError('line {}: {}'.format(_n, e))
+            if len(_steps[-1]) > limit:
+                raise ValueError('line {}: more than {} steps'.format(_n, limit))
+        if len(_repeats) > 0:
+            raise ValueError('repeat without end')
+        return _steps[0]
+
+    def _report(self, step, status, seconds):
+        self.results.append((step[1], step[2], status, seconds))
+        self.output('{:4d}  {:<36} {:>7} {:9.1f} ms'.format(step[1], step[2][0:36], status, seconds * 1000))
+
+    def feed(self, code, data):
+        if len(self._pending) > 0:
+            self._msgs.append([monotonic(), code, data, False])
+
+    def _issue(self):
+        # Everything up to the next wait goes out at once
+        _batch = []
+        _now = monotonic()
+        while self._i < len(self.steps) and self.steps[self._i][0] != 'wait':
+            _step = self.steps[self._i]
+            self._i += 1
+            if _step[0] == 'send':
+                _batch.append(_step)
+            else:
+                self._pending.append([_step, len(self._msgs), _now, _now + _step[5]])
+        _raw = []
+        for _step in _batch: # keep the order of raw and formatted commands
+            if _step[3] != '':
+                _raw.append((_step[3], _step[4]))
+                continue
+            if len(_raw) > 0:
+                self._vc.model.sendBatch(_raw)
+                _raw = []
+            self._vc.model.sendPort('', _step[4] + '\r\n')
+        if len(_raw) > 0:
+            self._vc.model.sendBatch(_raw)
+        for _step in _batch:
+            self._report(_step, 'sent', monotonic() - _now)
+
+    def _match(self):
+        _now = monotonic()
+        for _p in list(self._pending):
+            _step, _start, _issued, _deadline = _p
+            for _m in self._msgs[_start:]:
+                if not _m[3] and _m[1] == _step[3] and _step[4].search(_m[2]):
+                    _m[3] = True
+                    self._pending.remove(_p)
+                    self._report(_step, 'ok', _m[0] - _issued)
+                    break
+            else:
+                if _now > _deadline:
+                    self._report(_step, 'timeout', _now - _issued)
+                    self.ok = False
+        if len(self._pending) == 0:
+            self._msgs = []
+
+    def poll(self):
+        if not self.ok:
+            return False
+        self._match()
+        if not self.ok:
+            return False
+        if len(self._pending) > 0:
+            return True
+        if self._wait is not None:
+            if monotonic() < self._wait[1]:
+                return True
+            self._report(self._wait[0], 'ok', monotonic() - self._wait[2])
+            self._wait = None
+        if self._i >= len(self.steps):
+            return False
+        if self.steps[self._i][0] == 'wait':
+            _step = self.steps[self._i]
+            self._i += 1
+            self._wait = (_step, monotonic() + _step[3], monotonic())
+            return True
+        self._issue()
+        return True
@@ -0,0 +1,217 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The spots of our callsigns in a WSPRnet archive
+"""
+
+import collections
+import gzip
+import math
+import time
+import zipfile
+try:
+    import multiprocessing # reading spot archives on every core
+except ImportError:
+    multiprocessing = None
+from .common import monotonic
+
+# SpotArchive - how well our beacons are heard, from WSPRnet's archives
+#
+# WSPRnet publishes every spot of a month as one CSV file (gzip or zip
+# compressed, gigabytes when expanded), a row for each spot:
+#   id, time, reporter, reporter's locator, SNR, frequency, call,
+#   locator, power, drift, distance, azimuth, band, version, code
+# The archive is read a chunk at a time, each chunk cut at a line end,
+# and the chunks are shared out to worker processes, a few at a time,
+# so memory stays bounded however large the archive is.  A worker skips
+# a chunk that holds none of the callsigns at all, and otherwise sums
+# the spots of our callsigns: by band and by day, the SNRs (in 1 dB
+# bins) and the distances from the centres of the 4 character locators
+# (in 100 km bins).  The sums are added together as they come back.
+#
+class SpotArchive(object):
+    """
+    Streaming summary of a WSPRnet spot archive, for our callsigns
+
+        calls             - the callsigns counted
+        summarise(progress) - reads the archive, returns the summary (a dict)
+        distance(a,b)     - km between the centres of two 4 character locators
+    """
+    chunkSize = 4 << 20
+    bandNames = {-1: '2190m', 0: '630m', 1: '160m', 3: '80m', 5: '60m', 7: '40m', 10: '30m', 14: '20m',
+                 18: '17m', 21: '15m', 24: '12m', 28: '10m', 50: '6m', 70: '4m', 144: '2m', 432: '70cm',
+                 1296: '23cm'}
+    snrLow = -40   # SNRs below are counted in the first bin
+    snrBins = 71   # up to +30 dB
+    kmBin = 100
+    kmBins = 201   # up to 20000 km, the furthest two points on Earth are
+
+    def __init__(self, filename, calls, workers = None):
+        self.filename = filename
+        self.calls = sorted(set(_c.strip().upper() for _c in calls if _c.strip()))
+        if len(self.calls) == 0:
+            raise ValueError('no callsigns to look for')
+        if workers is None:
+            workers = multiprocessing.cpu_count() if multiprocessing is not None else 1
+        self.workers = max(1, workers)
+
+    def _open(self):
+        if self.filename.endswith('.gz'):
+            return gzip.open(self.filename, 'rb')
+        if self.filename.endswith('.zip'):
+            _z = zipfile.ZipFile(self.filename)
+            return _z.open(_z.namelist()[0])
+        return open(self.filename, 'rb')
+
+    def _chunks(self):
+        _rest = b''
+        with self._open() as _f:
+            while True:
+                _b = _f.read(self.chunkSize)
+                if not _b:
+                    break
+                _b = _rest + _b
+                _end = _b.rfind(b'\n') + 1
+                _rest = _b[_end:]
+                if _end > 0:
+                    yield _b[0:_end]
+        if _rest:
+            yield _rest
+
+    @staticmethod
+    def _lonlat(locator):
+        _l = locator[0:4].upper()
+        if len(_l) < 4 or not 'A' <= _l[0] <= 'R' or not 'A' <= _l[1] <= 'R' or not _l[2:4].isdigit():
+            return None
+        return ((ord(_l[0]) - 65) * 20 - 180 + int(_l[2]) * 2 + 1, (ord(_l[1]) - 65) * 10 - 90 + int(_l[3]) + 0.5)
+
+    @classmethod
+    def distance(cls, a, b):
+        _a, _b = cls._lonlat(a), cls._lonlat(b)
+        if _a is None or _b is None:
+            return None
+        _lon1, _lat1, _lon2, _lat2 = [math.radians(_v) for _v in _a + _b]
+        _h = math.sin((_lat2 - _lat1) / 2) ** 2 + \
+             math.cos(_lat1) * math.cos(_lat2) * math.sin((_lon2 - _lon1) / 2) ** 2
+        return 2 * 6371 * math.asin(min(1, math.sqrt(_h)))
+
+    @classmethod
+    def _sum(cls, job):
+        # One chunk, in a worker: the rows, and the sums for the spots of the calls
+        _chunk, _calls = job
+        _rows = _chunk.count(b'\n') + (0 if _chunk.endswith(b'\n') else 1) # the last row may have no line end
+        _out = {'rows': _rows, 'bands': {}, 'days': {}, 'calls': {}}
+        if not any(_c in _chunk for _c in _calls):
+            return _out
+        _distances = {}
+        for _line in _chunk.split(b'\n'):
+            _f = _line.split(b',')
+            if len(_f) < 13 or _f[6] not in _calls:
+                continue
+            try:
+                _day = int(_f[1]) // 86400
+                _snr = int(_f[4])
+                _band = int(_f[12])
+            except ValueError:
+                continue
+            _call = _f[6].decode('ascii', 'replace')
+            _pair = (_f[3][0:4], _f[7][0:4])
+            if _pair not in _distances:
+                _distances[_pair] = cls.distance(_pair[0].decode('ascii', 'replace'), _pair[1].decode('ascii', 'replace'))
+            _km = _distances[_pair]
+            _b = _out['bands'].get(_band)
+            if _b is None:
+                _b = _out['bands'][_band] = {'spots': 0, 'snr': [0] * cls.snrBins, 'km': [0] * cls.kmBins,
+                                             'km_max': 0, 'km_sum': 0.0, 'km_count': 0}
+            _b['spots'] += 1
+            _b['snr'][min(max(_snr - cls.snrLow, 0), cls.snrBins - 1)] += 1
+            if _km is not None:
+                _b['km'][min(int(_km) // cls.kmBin, cls.kmBins - 1)] += 1
+                _b['km_max'] = max(_b['km_max'], _km)
+                _b['km_sum'] += _km
+                _b['km_count'] += 1
+            _out['days'][_day] = _out['days'].get(_day, 0) + 1
+            _out['calls'][_call] = _out['calls'].get(_call, 0) + 1
+        return _out
+
+    @staticmethod
+    def _add(total, part):
+        total['rows'] += part['rows']
+        for _k in ['days', 'calls']:
+            for _key, _n in part[_k].items():
+                total[_k][_key] = total[_k].get(_key, 0) + _n
+        for _band, _p in part['bands'].items():
+            _t = total['bands'].get(_band)
+            if _t is None:
+                total['bands'][_band] = _p
+                continue
+            for _k in ['spots', 'km_sum', 'km_count']:
+                _t[_k] += _p[_k]
+            _t['km_max'] = max(_t['km_max'], _p['km_max'])
+            for _k in ['snr', 'km']:
+                _t[_k] = [_x + _y for _x, _y in zip(_t[_k], _p[_k])]
+
+    @classmethod
+    def _percentile(cls, bins, low, width, share):
+        _want = share * sum(bins)
+        _n = 0
+        for _i, _c in enumerate(bins):
+            _n += _c
+            if _c > 0 and _n >= _want:
+                return low + _i * width
+        return None
+
+    def summarise(self, progress = None):
+        """
+        Reads the archive, returns the spots of the calls by band, by day and by call
+
+        progress, if given, is called with the rows read and the seconds
+        taken, every ten seconds or so.
+        """
+        _calls = set(_c.encode('ascii') for _c in self.calls)
+        _total = {'rows': 0, 'bands': {}, 'days': {}, 'calls': {}}
+        _start = _shown = monotonic()
+        _jobs = ((_c, _calls) for _c in self._chunks())
+        _pool = None
+        if self.workers > 1:
+            _pool = multiprocessing.Pool(self.workers)
+        try:
+            _pending = collections.deque()
+            for _job in _jobs:
+                if _pool is None:
+                    self._add(_total, self._sum(_job))
+                else:
+                    _pending.append(_pool.apply_async(SpotArchive._sum, (_job,)))
+                    while len(_pending) > 2 * self.workers or (len(_pending) > 0 and _pending[0].ready()):
+                        self._add(_total, _pending.popleft().get())
+                if progress is not None and monotonic() - _shown >= 10:
+                    _shown = monotonic()
+                    progress(_total['rows'], _shown - _start)
+            while len(_pending) > 0:
+                self._add(_total, _pending.popleft().get())
+        finally:
+            if _pool is not None:
+                _pool.terminate()
+                _pool.join()
+        _seconds = monotonic() - _start
+        _bands = {}
+        for _band, _b in _total['bands'].items():
+            _name = self.bandNames.get(_band, '{} MHz'.format(_band))
+            _bands[_name] = {'spots': _b['spots'],
+                             'snr': {'min': self._percentile(_b['snr'], self.snrLow, 1, 0),
+                                     'median': self._percentile(_b['snr'], self.snrLow, 1, 0.5),
+                                     'p90': self._percentile(_b['snr'], self.snrLow, 1, 0.9),
+                                     'max': self._percentile(_b['snr'], self.snrLow, 1, 1),
+                                     'histogram': dict((str(self.snrLow + _i), _n)
+                                                       for _i, _n in enumerate(_b['snr']) if _n > 0)},
+                             'km': {'mean': round(_b['km_sum'] / _b['km_count']) if _b['km_count'] else None,
+                                    'median': self._percentile(_b['km'], 0, self.kmBin, 0.5),
+                                    'max': round(_b['km_max']),
+                                    'histogram': dict((str(_i * self.kmBin), _n)
+                                                      for _i, _n in enumerate(_b['km']) if _n > 0)}}
+        return {'archive': self.filename, 'calls': self.calls, 'rows': _total['rows'],
+                'spots': sum(_b['spots'] for _b in _bands.values()), 'seconds': round(_seconds, 3),
+                'rows_per_second': round(_total['rows'] / max(_seconds, 1e-9)),
+                'by_call': _total['calls'], 'bands': _bands,
+                'days': dict((time.strftime('%Y-%m-%d', time.gmtime(_d * 86400)), _n)
+                             for _d, _n in sorted(_total['days'].items()))}
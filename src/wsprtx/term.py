@@ -0,0 +1,292 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The curses View, for terminals
+"""
+
+import collections
+import time
+try:
+    import curses  # the terminal View (not on Windows)
+except ImportError:
+    curses = None
+from .model import Model
+from .views import NullView
+
+###############################################################################
+#### Terminal View
+###############################################################################
+#
+# A View for hosts without a display, such as a beacon controller
+# looked after over SSH.  It answers the same commands from the
+# Controller as the Tk View, and draws them with curses as a page of
+# text: the device and GPS status at the top, a bar for each band
+# that has a filter or is enabled, and the latest messages below.
+#
+# Each command only records its value and marks the part of the page
+# it belongs to.  refresh() then makes the text of the marked parts,
+# and writes only the rows that differ from what is on the screen, so
+# an idle page costs nothing to keep up to date.
+#
+class TermView(NullView):
+    """
+    Curses View implementation
+
+        update()  - redraws the rows that changed, and handles a key, False after q
+        refresh() - redraws the rows that changed
+    """
+    barWidth = 30
+    keys = ' q quit  w beacon  g generator  x stop  e save  t trace'
+
+    def __init__(self, Controller, screen):
+        self.vc = Controller
+        self._scr = screen
+        self._bands = Model.bands()
+        self._dirty = set(['status', 'bands', 'log'])
+        self._shown = {}                # the text of each row on the screen
+        self._log = collections.deque(maxlen = 200)
+        self._lp = set()                # bands with a filter installed
+        self._percent = {}              # progress of each band, -1 is the pause
+        self._active = None
+        self._mode = '-'
+        self._tx = False
+        self._link = False
+        self._stale = None              # (saved, names) of the settings shown that are not live
+        self._device = '-'
+        self._fv = self._fr = self._hv = self._hr = ''
+        self._frequency = '-'
+        self._fq = '-'
+        self._time = '--:--:--'
+        self._position = '-'
+        self._offset = None
+        self._sats = 0
+        self._signal = 0
+        self._port = 'None'
+        self._settings = {}             # the device settings shown, by name
+        self._enabled = set()           # the bands enabled
+        self._locked = None
+        self.trace = False              # show the lines sent and received too
+
+        if curses.has_colors():
+            curses.use_default_colors()
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+
+    ################################################################
+    # Commands from the Controller
+    ################################################################
+    def installLP(self, band):
+        self._lp.add(band)
+        self._dirty.add('bands')
+    def _setting(self, name, value):
+        if self._settings.get(name) != value:
+            self._settings[name] = value
+            self._dirty.add('status')
+    def setCall(self, call):
+        self._setting('call', call)
+    def setLocation(self, locator):
+        self._setting('location', locator)
+    def setName(self, name):
+        self._setting('name', name)
+    def setPower(self, power):
+        self._setting('power', power)
+    def setPositionSource(self, source):
+        self._setting('source', source)
+    def setPowerMode(self, mode):
+        self._setting('mode', mode)
+    def setBoot(self, mode):
+        self._setting('boot', mode)
+    def setPauseTime(self, data):
+        self._setting('pause', int(data))
+    def setBandEnabled(self, band, enabled):
+        if enabled:
+            self._enabled.add(band)
+        else:
+            self._enabled.discard(band)
+        self._dirty.add('bands')
+    def setLocked(self, locked):
+        self._setting('locked', 'Position Lock' if locked else 'No Position Lock')
+    def setPort(self, name, selected):
+        self._setting('port', name)
+    def setProgress(self, band, seconds):
+        if band < 0:
+            _p = self._settings.get('pause', 0)
+            self._percent = {-1: 100 if _p < 1 else 100 * (_p - seconds) // _p}
+        else:
+            self._percent = {band: min(100, 100 * seconds // 161)}
+        self._dirty.add('bands')
+    def setActive(self, band, color):
+        self._active = band if color in ['red', 'black'] else None # the Tk View hides the others
+        self._dirty.add('bands')
+    def setRunning(self):
+        self._mode = 'Beacon'
+        self._dirty.add('status')
+    def setStopped(self):
+        self._mode = 'Stopped'
+        self._active = None
+        self._dirty.update(['status', 'bands'])
+    def setGenerating(self):
+        self._mode = 'Signal generator'
+        self._active = None
+        self._dirty.update(['status', 'bands'])
+    def setFQ(self, data):
+        self._fq = '{:,.2f} Hz'.format(int(data) / 100.0)
+        self._dirty.add('status')
+    def serialOK(self, state):
+        if state != self._link:
+            self._link = state
+            self._dirty.add('status')
+    def setStale(self, keys, saved = None):
+        self._stale = (saved or 0, self.staleNames(keys)) if keys else None
+        self._dirty.add('status')
+    def clearSettings(self):
+        self._settings = {'port': self._settings.get('port', 'None')}
+        self._lp = set()
+        self._enabled = set()
+        self._fv = self._fr = self._hv = self._hr = ''
+        self._dirty.update(['status', 'bands'])
+    def setDebug(self, state):
+        self.trace = bool(state)
+    def traceInsert(self, msg):
+        if len(msg) > 0 and self.trace:
+            self.logInsert(msg)
+    def setDevice(self, data):
+        self._device = {'01011': 'LP1', '01012': 'Desktop', '01017': 'Mini'}.get(data, 'Unknown ' + data)
+        self._dirty.add('status')
+    def setHardwareVer(self, data):
+        self._hv = data
+        self._dirty.add('status')
+    def setHardwareRev(self, data):
+        self._hr = data
+        self._dirty.add('status')
+    def setFirmwareVer(self, data):
+        self._fv = data
+        self._dirty.add('status')
+    def setFirmwareRev(self, data):
+        self._fr = data
+        self._dirty.add('status')
+    def setFrequency(self, data):
+        self._frequency = '{:,.2f} Hz'.format(int(data) / 100.0)
+        self._dirty.add('status')
+    def tx(self, onoff):
+        self._tx = onoff != 0
+        self._dirty.add('status')
+    def program(self, mode):
+        pass # setRunning() and the like show the mode
+    def setPosition(self, maidenhead):
+        self._position = maidenhead
+        self._dirty.add('status')
+    def updateTime(self, time):
+        self._time = time
+        self._dirty.add('status')
+    def setClockOffset(self, summary):
+        self._offset = summary['offset']
+        self._dirty.add('status')
+    def satdata(self, data):
+        _snrs = sorted([int(_f[3]) for _f in [_s.split() for _s in data] if len(_f) > 3 and _f[3].isdigit()],
+                       reverse = True)
+        self._sats = len(_snrs)
+        self._signal = max(0, min(100, (sum(_snrs[0:4]) - 15) * 100 // 36)) # as the Tk View's meter
+        self._dirty.add('status')
+    def logInsert(self, msg):
+        self._log.append(msg)
+        self._dirty.add('log')
+
+    ################################################################
+    # Drawing
+    ################################################################
+    def _status(self):
+        _s = self._settings.get
+        _r = [' WSPR TX {}  port {} {}  {}{}{}'.format(self._device, _s('port', 'None'),
+                                                      'OK' if self._link else 'not responding',
+                                                      self._mode, '  TRANSMITTING' if self._tx else '',
+                                                      '' if self._stale is None else '  (last known {}: {})'.format(
+                                                          time.strftime('%Y-%m-%d %H:%M', time.localtime(self._stale[0])),
+                                                          ', '.join(self._stale[1]))),
+              ' Hardware {}.{}  firmware {}.{}  name {}'.format(self._hv, self._hr, self._fv, self._fr, _s('name', '')),
+              ' Call {}  locator {} ({})  power {} dBm ({})'.format(
+                  _s('call', ''), _s('location', ''), {'G': 'GPS', 'M': 'manual'}.get(_s('source'), '-'),
+                  _s('power', ''), {'N': 'reported', 'A': 'altitude'}.get(_s('mode'), '-')),
+              ' Pause {} s  starts in {} mode'.format(
+                  _s('pause', 0), {'N': 'stopped', 'W': 'beacon', 'S': 'generator'}.get(_s('boot'), '-')),
+              ' GPS {} UTC  {}  {}  {} satellites  signal {}%  host clock {}'.format(
+                  self._time, self._position, _s('locked', ''), self._sats, self._signal,
+                  '-' if self._offset is None else '{:+.3f} s'.format(self._offset)),
+              ' Frequency {}  generator {}'.format(self._frequency, self._fq)]
+        return [(_l, curses.A_BOLD if _n == 0 and self._tx else curses.A_NORMAL) for _n, _l in enumerate(_r)]
+
+    def _bar(self, label, band):
+        _n = self._percent.get(band, 0) * self.barWidth // 100
+        _mark = '>' if band == self._active else ' '
+        return (' {:>6} {} [{}{}]'.format(label, _mark, '#' * _n, '.' * (self.barWidth - _n)),
+                curses.A_BOLD if band == self._active else curses.A_NORMAL)
+
+    def _bandRows(self):
+        _r = []
+        for _b in range(len(self._bands)):
+            if _b in self._lp or _b in self._enabled:
+                _label = self._bands[_b] if _b in self._enabled else '(' + self._bands[_b] + ')'
+                _r.append(self._bar(_label, _b))
+        _r.append(self._bar('pause', -1))
+        return _r
+
+    def refresh(self):
+        if len(self._dirty) == 0:
+            return
+        _h, _w = self._scr.getmaxyx()
+        if 'status' in self._dirty:
+            self._statusRows = self._status()
+        if 'bands' in self._dirty:
+            self._bandsRows = self._bandRows()
+        self._dirty.clear()
+        _rows = self._statusRows + [('', 0)] + self._bandsRows + [('', 0)]
+        _room = max(0, _h - len(_rows) - 1)
+        _log = list(self._log)[-_room:] if _room > 0 else []
+        _rows += [(' ' + _l, curses.A_NORMAL) for _l in _log]
+        _rows += [('', 0)] * (_h - 1 - len(_rows)) + [(self.keys, curses.A_REVERSE)]
+        _changed = False
+        for _y, _row in enumerate(_rows[0:_h]):
+            _row = (_row[0][0:_w - 1], _row[1])
+            if self._shown.get(_y) == _row:
+                continue
+            self._shown[_y] = _row
+            _changed = True
+            try:
+                self._scr.addstr(_y, 0, _row[0], _row[1])
+                self._scr.clrtoeol()
+            except curses.error:
+                pass
+        if _changed:
+            self._scr.noutrefresh()
+            curses.doupdate()
+
+    ################################################################
+    # Keys, and the main loop
+    ################################################################
+    def key(self, ch):
+        if ch == ord('w'):
+            self.vc.startPressed()
+        elif ch == ord('g'):
+            self.vc.startGenerator()
+        elif ch == ord('x'):
+            self.vc.stopPressed()
+        elif ch == ord('e'):
+            self.vc.saveSettingsPressed()
+        elif ch == ord('t'):
+            self.setDebug(not self.trace)
+        elif ch == curses.KEY_RESIZE:
+            self._shown = {}
+            self._scr.clear()
+            self._dirty.update(['status', 'bands', 'log'])
+
+    def update(self):
+        self.refresh()
+        self._scr.timeout(0 if self.vc.model.waiting() > 0 else 100) # idle here, between lines
+        _ch = self._scr.getch()
+        if _ch == ord('q'):
+            return False
+        if _ch != -1:
+            self.key(_ch)
+        return True
@@ -0,0 +1,130 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+A group of setting writes, verified by the device's reports
+"""
+
+from .common import monotonic
+from .model import DeviceState
+
+# Transaction - a group of setting writes confirmed by the device
+#
+# The device answers a setting write by reporting the new value.  A
+# Transaction sends all of its writes in one batch, then watches the
+# DeviceState for those reports.  Writes that are answered with the
+# wrong value, or not answered at all, are sent again (after asking
+# for the value, in case only the report was lost), until all are
+# confirmed, a write has been refused too many times, or the one
+# deadline for the whole group passes.
+#
+# The result is a status for each field:
+#   'ok'       - the device reported the value written
+#   'mismatch' - the device reported a different value
+#   'timeout'  - the device never reported the value
+#
+# commit() waits for the result, reading the port itself.  From the
+# main loop, start() sends the writes and poll() follows them up
+# without waiting, as the messages are handled.
+#
+class Transaction(object):
+    """
+    Write-then-verify group of device settings
+
+        set(command,data)  - adds a write, e.g. set('DCS','W1OT') or set('OBD','06 E')
+        commit(timeout)    - sends, verifies and retries, returns {key:status}
+                             (optional: wait - seconds per round, tries - sends per write)
+        start(timeout)     - sends, for poll() to verify and retry (same options)
+        poll()             - True while there are writes still being verified
+        drop(key)          - forgets a write, as when a newer one replaces it
+        reported           - {key:data} the last value the device reported for each field
+        attempts           - {key:count} the number of times each write was sent
+    """
+    def __init__(self, controller):
+        self._vc = controller
+        self._writes = {}
+        self._order = []
+        self._pending = []
+        self._unanswered = []
+        self.results = {}
+        self.reported = {}
+        self.attempts = {}
+
+    def set(self, cmd, data):
+        _k = DeviceState.key(cmd, data)
+        if _k not in self._writes:
+            self._order.append(_k)
+        self._writes[_k] = (cmd, data)
+
+    def writes(self):
+        return [self._writes[_k] for _k in self._order]
+
+    def data(self, key):
+        return self._writes[key][1]
+
+    def keys(self):
+        return list(self._order)
+
+    def drop(self, key):
+        if key in self._writes:
+            del self._writes[key]
+            self._order.remove(key)
+        for _list in [self._pending, self._unanswered]:
+            if key in _list:
+                _list.remove(key)
+        self.results.pop(key, None)
+        self.attempts.pop(key, None)
+
+    def commit(self, timeout = 5, wait = 1, tries = 3):
+        self.start(timeout, wait, tries)
+        self._vc.pump(lambda: not self.poll(), timeout + wait)
+        return self.results
+
+    def start(self, timeout = 5, wait = 1, tries = 3):
+        self._end = monotonic() + timeout
+        self._wait = wait
+        self._tries = tries
+        self._pending = list(self._order)
+        self._unanswered = []
+        for _k in self._pending:
+            self.results[_k] = 'timeout'
+            self.attempts[_k] = 0
+        if len(self._pending) > 0:
+            self._send()
+
+    def _send(self):
+        self._start = self._vc.state.count
+        # Fields that were never answered are asked for, rather than blindly rewritten
+        _batch = [(self._writes[_k][0], 'G') for _k in self._unanswered]
+        for _k in self._pending:
+            if _k not in self._unanswered:
+                _batch.append((self._writes[_k][0], 'S '+self._writes[_k][1]))
+                self.attempts[_k] += 1
+        self._vc.model.sendBatch(_batch)
+        self._roundEnd = min(monotonic() + self._wait, self._end)
+
+    def poll(self):
+        if len(self._pending) == 0:
+            return False
+        _state = self._vc.state
+        if min([_state.received(_k) for _k in self._pending]) <= self._start and monotonic() < self._roundEnd:
+            return True # the round is not over
+        _retry = []
+        self._unanswered = []
+        for _k in self._pending:
+            if _state.received(_k) <= self._start:
+                self._unanswered.append(_k)
+                _retry.append(_k)
+                continue
+            self.reported[_k] = _state.get(_k)
+            if DeviceState.matches(self._writes[_k][1], _state.get(_k)):
+                self.results[_k] = 'ok'
+            else:
+                self.results[_k] = 'mismatch'
+                if self.attempts[_k] < self._tries:
+                    _retry.append(_k)
+        self._pending = _retry
+        if len(self._pending) == 0 or monotonic() >= self._end:
+            self._pending = []
+            return False
+        self._send()
+        return True
@@ -0,0 +1,172 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The local log of WSPR transmissions
+"""
+
+import array
+import csv
+import json
+import os
+import struct
+import sys
+import time
+from .common import configDir, python
+
+# Transmission Log - one record for each WSPR transmission
+#
+# The records are a fixed size and appended in time order, so the
+# records for a range of dates are found with a binary search on the
+# start times, reading a few records rather than the whole file.  For
+# each band, a second file lists the numbers of that band's records,
+# so "all 20m transmissions last month" is a binary search in the 20m
+# list, followed by reading just the records wanted.  Both files are
+# only ever appended to.  If the program stops between writing a
+# record and its index entry, the missing entries are added when the
+# log is next opened.
+#
+# Each record holds: start and end (UTC, seconds since 1970), band
+# number, frequency (in 1/100 Hz, as reported by TFQ), callsign,
+# locator and reported power.
+#
+class TxLog(object):
+    """
+    Append-only log of transmissions
+
+        add(record)               - appends a record (a dict, see fields)
+        query(band,since,until)   - yields the records matching, oldest first
+        export(out,format,...)    - streams the matching records to a file as csv or json
+        len(log)                  - the number of records
+    """
+    fields = ['start', 'end', 'band', 'frequency', 'call', 'locator', 'power']
+    _record = struct.Struct('<ddHQ12s8sbx')
+
+    def __init__(self, filename = None, bands = 16):
+        if filename is None:
+            filename = os.path.join(configDir(), 'txlog.dat')
+        self.filename = filename
+        self._bands = bands
+        self._size = self._record.size
+        if not os.path.exists(self.filename):
+            open(self.filename, 'wb').close()
+        _len = os.path.getsize(self.filename)
+        if _len % self._size != 0: # a record was only partly written
+            with open(self.filename, 'r+b') as _f:
+                _f.truncate(_len - _len % self._size)
+        self._count = os.path.getsize(self.filename) // self._size
+        self._index = []
+        _indexed = 0
+        for _b in range(self._bands):
+            _i = self._loadIndex(_b)
+            while len(_i) > 0 and _i[-1] >= self._count:
+                _i.pop()
+            if len(_i) > 0:
+                _indexed = max(_indexed, _i[-1] + 1)
+            self._index.append(_i)
+        for _n in range(_indexed, self._count):
+            self._indexRecord(_n, self._read(_n)['band'])
+
+    def _indexName(self, band):
+        return '{}.b{:02d}'.format(os.path.splitext(self.filename)[0], band)
+
+    def _loadIndex(self, band):
+        _i = array.array('I')
+        if os.path.exists(self._indexName(band)):
+            with open(self._indexName(band), 'rb') as _f:
+                _data = _f.read()
+            _data = _data[0:len(_data) - len(_data) % _i.itemsize]
+            if python == 3:
+                _i.frombytes(_data)
+            else:
+                _i.fromstring(_data)
+            if sys.byteorder == 'big':
+                _i.byteswap()
+        return _i
+
+    def _indexRecord(self, n, band):
+        if band >= self._bands:
+            return
+        _i = array.array('I', [n])
+        self._index[band].append(n)
+        if sys.byteorder == 'big':
+            _i.byteswap()
+        with open(self._indexName(band), 'ab') as _f:
+            _i.tofile(_f)
+
+    def __len__(self):
+        return self._count
+
+    def add(self, record):
+        _data = self._record.pack(float(record['start']), float(record['end']), int(record['band']),
+                                  int(record.get('frequency') or 0),
+                                  (record.get('call') or '').encode('ascii', 'replace'),
+                                  (record.get('locator') or '').encode('ascii', 'replace'),
+                                  int(record.get('power') or 0))
+        with open(self.filename, 'ab') as _f:
+            _f.write(_data)
+        self._count += 1
+        self._indexRecord(self._count - 1, int(record['band']))
+
+    def _read(self, n, f = None):
+        if f is None:
+            with open(self.filename, 'rb') as _f:
+                return self._read(n, _f)
+        f.seek(n * self._size)
+        _v = self._record.unpack(f.read(self._size))
+        return {'start': _v[0], 'end': _v[1], 'band': _v[2], 'frequency': _v[3],
+                'call': _v[4].rstrip(b'\0').decode('ascii'), 'locator': _v[5].rstrip(b'\0').decode('ascii'),
+                'power': _v[6]}
+
+    def _first(self, f, numbers, since):
+        # binary search for the first of the numbered records starting at or after since
+        _lo, _hi = 0, len(numbers)
+        while _lo < _hi:
+            _mid = (_lo + _hi) // 2
+            f.seek(numbers[_mid] * self._size)
+            if struct.unpack('<d', f.read(8))[0] < since:
+                _lo = _mid + 1
+            else:
+                _hi = _mid
+        return _lo
+
+    def query(self, band = None, since = None, until = None):
+        if band is None:
+            _numbers = range(self._count)
+        elif 0 <= band < self._bands:
+            _numbers = self._index[band]
+        else:
+            return
+        with open(self.filename, 'rb') as _f:
+            _n = 0 if since is None else self._first(_f, _numbers, since)
+            while _n < len(_numbers):
+                _r = self._read(_numbers[_n], _f)
+                if until is not None and _r['start'] >= until:
+                    return
+                yield _r
+                _n += 1
+
+    def export(self, out, format = 'csv', band = None, since = None, until = None, bands = None):
+        """Writes the records as they are read, so the log is never all in memory"""
+        def named(r):
+            r['start'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(r['start']))
+            r['end'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(r['end']))
+            if bands is not None and r['band'] < len(bands):
+                r['band'] = bands[r['band']]
+            r['frequency'] = r['frequency'] / 100.0
+            return r
+        _n = 0
+        if format == 'csv':
+            _w = csv.writer(out)
+            _w.writerow(self.fields)
+            for _r in self.query(band, since, until):
+                _r = named(_r)
+                _w.writerow([_r[_k] for _k in self.fields])
+                _n += 1
+        else:
+            out.write('[')
+            for _r in self.query(band, since, until):
+                out.write(',\n' if _n > 0 else '\n')
+                out.write(json.dumps(named(_r), sort_keys = True))
+                _n += 1
+            out.write('\n]\n')
+        return _n
@@ -0,0 +1,151 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The View interface: the commands a View is given
+"""
+
+import collections
+from . import common
+from .model import Model
+
+###############################################################################
+##### View interface
+###############################################################################
+#
+# The commands the Controller gives a View are events, each with the
+# values to show.  A View never has its variables or widgets set by
+# the Controller, so any View (Tk, curses, none at all) only needs to
+# answer these.  User input goes the other way, to the Controller's
+# handlers, with the values entered (bandCheck(enabled),
+# callUpdate(call), selectPort(name), sendPressed(text,crlf), ...).
+#
+# NullView is the interface, and does nothing.  It is the Controller's
+# View until another is attached, for the command line uses, and the
+# Views inherit from it, so a command one of them has no use for needs
+# no code.  RecordingView keeps the commands it is given, for checking
+# what the Controller did, and for measuring the Controller alone.
+#
+class NullView(object):
+    """
+    The View interface, answered by doing nothing
+
+    Device settings, as reported by the device:
+        setCall(call), setLocation(locator), setName(name), setPower(dBm),
+        setPositionSource('G' GPS or 'M' manual), setPowerMode('N' normal or 'A' altitude),
+        setPauseTime(seconds), setBoot(mode 'N','W' or 'S'), setBandEnabled(band,enabled),
+        installLP(band), setFQ(digits) - the signal generator frequency, 12 digits of 1/100 Hz
+    The device:
+        setDevice(product), setHardwareVer(v), setHardwareRev(r), setFirmwareVer(v), setFirmwareRev(r)
+    What the device is doing:
+        setRunning(), setStopped(), setGenerating(), program(mode 0-2), tx(on),
+        setActive(band,color) - band -1 is the pause, setProgress(band,seconds), setFrequency(data)
+    GPS:
+        updateTime(hh:mm:ss), setPosition(locator), setLocked(locked), satdata(GSI lines),
+        setClockOffset(summary) - see ClockOffset
+    The link, and the program:
+        serialOK(ok), setPort(name,selected), setRxChars(count), setSaving(saving),
+        setScriptRunning(running), setDebug(shown),
+        setStale(keys,saved) - the settings (DeviceState keys) still shown as last known, saved at
+                               saved (seconds since 1970), an empty set once none are,
+        clearSettings() - the settings shown are not known (another device is on the port)
+    Text:
+        traceInsert(line) - lines sent and received, logInsert(line) - messages for the user
+    update() - handles the View's own events, returns False once the View is closed
+    """
+    commands = ['setCall', 'setLocation', 'setName', 'setPower', 'setPositionSource', 'setPowerMode',
+                'setPauseTime', 'setBoot', 'setBandEnabled', 'installLP', 'setFQ',
+                'setDevice', 'setHardwareVer', 'setHardwareRev', 'setFirmwareVer', 'setFirmwareRev',
+                'setRunning', 'setStopped', 'setGenerating', 'program', 'tx', 'setActive', 'setProgress',
+                'setFrequency', 'updateTime', 'setPosition', 'setLocked', 'satdata', 'setClockOffset',
+                'serialOK', 'setPort', 'setRxChars', 'setSaving', 'setScriptRunning', 'setDebug', 'setStale',
+                'clearSettings',
+                'traceInsert', 'logInsert']
+
+    def setCall(self, call): pass
+    def setLocation(self, locator): pass
+    def setName(self, name): pass
+    def setPower(self, power): pass
+    def setPositionSource(self, source): pass
+    def setPowerMode(self, mode): pass
+    def setPauseTime(self, seconds): pass
+    def setBoot(self, mode): pass
+    def setBandEnabled(self, band, enabled): pass
+    def installLP(self, band): pass
+    def setFQ(self, data): pass
+    def setDevice(self, data): pass
+    def setHardwareVer(self, data): pass
+    def setHardwareRev(self, data): pass
+    def setFirmwareVer(self, data): pass
+    def setFirmwareRev(self, data): pass
+    def setRunning(self): pass
+    def setStopped(self): pass
+    def setGenerating(self): pass
+    def program(self, mode): pass
+    def tx(self, onoff): pass
+    def setActive(self, band, color): pass
+    def setProgress(self, band, seconds): pass
+    def setFrequency(self, data): pass
+    def updateTime(self, time): pass
+    def setPosition(self, maidenhead): pass
+    def setLocked(self, locked): pass
+    def satdata(self, data): pass
+    def setClockOffset(self, summary): pass
+    def serialOK(self, state): pass
+    def setPort(self, name, selected): pass
+    def setRxChars(self, count): pass
+    def setSaving(self, saving): pass
+    def setScriptRunning(self, running): pass
+    def setDebug(self, state): pass
+    def setStale(self, keys, saved = None): pass
+    def clearSettings(self): pass
+    def logInsert(self, msg): pass
+
+    names = {'CCM': 'mode', 'OTP': 'pause', 'OSM': 'start mode', 'OBD': 'band', 'OLC': 'position source',
+             'OPW': 'power mode', 'DCS': 'call', 'DL4': 'locator', 'DPD': 'power', 'DNM': 'name',
+             'DGF': 'generator frequency', 'FPN': 'product', 'FHV': 'hardware', 'FHR': 'hardware',
+             'FSV': 'firmware', 'FSR': 'firmware', 'FRF': 'reference', 'FLP': 'filter'}
+
+    @classmethod
+    def staleNames(cls, keys):
+        """The names of the settings with the keys, for showing setStale's keys"""
+        _bands = Model.bands()
+        _names = []
+        for _k in sorted(keys):
+            _n = cls.names.get(_k[0:3], _k)
+            if _k[3:].isdigit() and int(_k[3:]) < len(_bands):
+                _n = '{} {}'.format(_bands[int(_k[3:])], _n)
+            if _n not in _names:
+                _names.append(_n)
+        return _names
+
+    def traceInsert(self, msg):
+        if len(msg)>0 and common.debug: print(msg)
+
+    def update(self):
+        return True
+
+class RecordingView(NullView):
+    """
+    A View that keeps the commands it is given
+
+        calls  - the last (command, args) given, oldest first
+        counts - how many times each command was given
+        clear()
+    """
+    def __init__(self, limit = 10000):
+        self.calls = collections.deque(maxlen = limit)
+        self.counts = collections.Counter()
+
+    def clear(self):
+        self.calls.clear()
+        self.counts.clear()
+
+def _recorder(name):
+    def command(self, *args):
+        self.calls.append((name, args))
+        self.counts[name] += 1
+    command.__name__ = name
+    return command
+
+for _name in NullView.commands:
+    setattr(RecordingView, _name, _recorder(_name))
@@ -0,0 +1,113 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Notices a dead link to the device and reopens the port
+"""
+
+import os
+import sys
+from .common import monotonic
+from .model import Model
+
+# Watchdog - keeps the link to the device up without an operator
+#
+# A working device talks at least once a second (GTM), so a long
+# silence means the link is dead even when the port still looks open,
+# as when the device has reset and the USB adapter was not dropped.
+# Half way to the limit the device is asked for its mode, to wake a
+# quiet one, and at the limit the port is closed.  A port that fails
+# outright is closed by the Model at once.
+#
+# A closed port that was wanted is reopened after 1, 2, 4 ... seconds,
+# up to a minute apart.  If the port name has gone, the USB device is
+# looked for by its identity, in case it came back under a new name.
+# The DeviceState is kept across the outage, so once the link is back
+# only the mode and transmit state are asked for; a device that reset
+# announces itself (MIN) and is read again in full as usual.
+#
+class Watchdog(object):
+    """
+    Watches the link, and reopens the port when it fails
+
+        heard()   - notes that a line was received
+        check()   - called from the main loop, does any work that is due
+        up        - True when the link is working
+    """
+    resync = ['CCM', 'TON'] # what a reconnect asks for, the rest is cached
+
+    def __init__(self, controller, stall = 30, backoff = 1, limit = 60):
+        self._vc = controller
+        self.stall = stall
+        self.backoff = backoff
+        self.limit = limit
+        self.up = False
+        self._heard = monotonic()
+        self._probed = False
+        self._down = None     # when the link was lost
+        self._delay = backoff
+        self._retry = 0
+
+    def heard(self):
+        self._heard = monotonic()
+        self._probed = False
+
+    def _lost(self, why):
+        _m = self._vc.model
+        self.up = False
+        self._down = monotonic()
+        self._delay = self.backoff
+        self._retry = self._down + self._delay
+        self._usbId = _m.usbId
+        self._vc.metrics.inc('link_outages_total', help = 'Times the link to the device was lost')
+        self._vc.metrics.set('link_up', 0, help = 'Whether the link to the device is working')
+        sys.stderr.write('Link to {} lost ({}), reconnecting\n'.format(_m.wanted, why))
+        self._vc.linkChanged(False, why)
+
+    def _reconnect(self):
+        _m = self._vc.model
+        _name = _m.wanted
+        if _name[0:3] != 'COM' and _name[0:5] != 'unix:' and not os.path.exists(_name):
+            _name = Model.findUSB(self._usbId) or _name # follow the device to its new name
+        if not _m.reopen(_name):
+            self._delay = min(self._delay * 2, self.limit)
+            self._retry = monotonic() + self._delay
+            return
+        _outage = monotonic() - self._down
+        self._down = None
+        self.up = True
+        self.heard()
+        _metrics = self._vc.metrics
+        _metrics.inc('link_reconnects_total', help = 'Times the link to the device was restored')
+        _metrics.set('link_outage_seconds', round(_outage, 1), help = 'Length of the last outage')
+        _metrics.inc('link_outage_seconds_total', round(_outage, 1), help = 'Time without a link to the device')
+        _metrics.set('link_up', 1, help = 'Whether the link to the device is working')
+        sys.stderr.write('Link to {} restored after {:.1f} seconds\n'.format(_name, _outage))
+        _m.sendBatch([(_c, 'G') for _c in self.resync])
+        self._vc.linkChanged(True, 'restored')
+
+    def check(self):
+        _m = self._vc.model
+        if _m is self._vc or _m.wanted == 'None':
+            self.up = False
+            self._down = None
+            return
+        _now = monotonic()
+        if _m.portName != 'None':
+            if self._down is not None or not self.up: # opened by the user, or by a reconnect elsewhere
+                self.up = True
+                self._down = None
+                self.heard()
+                self._vc.metrics.set('link_up', 1, help = 'Whether the link to the device is working')
+                return
+            _quiet = _now - self._heard
+            if _quiet > self.stall:
+                _m.fail('no data for {} seconds'.format(int(_quiet))) # close it, but still want it
+                self._lost(_m.failed)
+            elif _quiet > self.stall / 2.0 and not self._probed:
+                self._probed = True
+                _m.sendPort('CCM', 'G')
+            return
+        if self._down is None:
+            self._lost(_m.failed or 'port closed')
+        elif _now >= self._retry:
+            self._reconnect()
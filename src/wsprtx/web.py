@@ -0,0 +1,214 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+A read only status page served over HTTP
+"""
+
+import json
+import sys
+import threading
+from . import common
+from .common import python
+from .model import Model
+# The http server is named differently in 2.x vs 3.x
+if python == 2:
+    import BaseHTTPServer as httpserver
+    import SocketServer as socketserver
+    import urlparse
+else:
+    import http.server as httpserver
+    import socketserver
+    import urllib.parse as urlparse
+
+###############################################################################
+##### Web dashboard
+###############################################################################
+#
+# A small HTTP server, for watching a device from a browser when there
+# is no display (or it is at the other end of an SSH tunnel).  It runs
+# in its own threads beside the main loop, and only reads the
+# Controller's DeviceState.
+#   GET /                 - the status page
+#   GET /status?since=V   - {"version":V,"fields":{name:value}}
+# The fields are the ones on the status panel of the GUI.  A request
+# gives only the fields that changed after version V (all of them for
+# V=0), and when nothing has changed it waits up to 25 seconds for a
+# change before answering with no fields.  The page asks again with
+# the version it was given, so each open page costs one waiting thread,
+# and the fields are worked out once per change however many look.
+#
+class WebServer(object):
+    """
+    Read only status of the device over HTTP
+
+        start()   - serves requests in a background thread
+        stop()    - stops serving
+        status(since,timeout) - the reply to /status
+    """
+    devices = {'01011': 'WSPR TX LP1', '01012': 'WSPR TX Desktop', '01017': 'WSPR Mini'}
+    modes = {'N': 'Idle', 'W': 'WSPR Beacon', 'S': 'Signal Generator'}
+
+    def __init__(self, controller, host = '127.0.0.1', port = 8073):
+        self._vc = controller
+        self.address = (host, port)
+        self._lock = threading.Lock()
+        self._version = -1
+        self._fields = {}        # name -> (version of last change, value)
+        self._server = None
+
+    def _progress(self, state):
+        _band = {}
+        for _code in ['TWS', 'MPS', 'TCC']:
+            _band[state.received(_code) or 0] = _code
+        _last = _band[max(_band.keys())]
+        _tws = state.get('TWS', '')
+        if _last == 'TWS' and _tws[0:2].isdigit() and _tws[3:6].isdigit() and int(_tws[0:2]) < len(Model.bands()):
+            return {'state': 'transmitting', 'band': Model.bands()[int(_tws[0:2])], 'seconds': int(_tws[3:6])}
+        if _last == 'MPS' and state.get('MPS', '').isdigit():
+            return {'state': 'paused', 'band': None, 'seconds': int(state.get('MPS'))}
+        return {'state': 'idle', 'band': None, 'seconds': 0}
+
+    def fields(self, state):
+        """The status panel, worked out from a DeviceState"""
+        _d = state.get
+        _tbn = _d('TBN', '')
+        _tfq = _d('TFQ', '')
+        return {'model': self.devices.get(_d('FPN'), 'Unknown' if _d('FPN') else None),
+                'product': _d('FPN'),
+                'hardware': '{} rev {}'.format(_d('FHV', '?'), _d('FHR', '?')) if _d('FHV') else None,
+                'firmware': '{} rev {}'.format(_d('FSV', '?'), _d('FSR', '?')) if _d('FSV') else None,
+                'name': _d('DNM'),
+                'mode': self.modes.get(_d('CCM', '')[0:1]),
+                'tx': {'T': True, 'F': False}.get(_d('TON', '')[0:1]),
+                'frequency': int(_tfq) / 100.0 if _tfq.isdigit() else None,
+                'gps_time': _d('GTM'),
+                'gps_lock': {'T': True, 'F': False}.get(_d('GLC', '')[0:1]),
+                'locator': _d('GL4', _d('DL4')),
+                'next_band': Model.bands()[int(_tbn)] if _tbn.isdigit() and int(_tbn) < len(Model.bands()) else None,
+                'progress': self._progress(state)}
+
+    def _update(self):
+        with self._lock:
+            _state = self._vc.state
+            if _state.version == self._version:
+                return
+            _v = _state.version
+            for _name, _value in self.fields(_state).items():
+                if _name not in self._fields or self._fields[_name][1] != _value:
+                    self._fields[_name] = (_v, _value)
+            self._version = _v
+
+    def status(self, since = 0, timeout = 25):
+        _state = self._vc.state
+        if since == _state.version: # nothing new yet
+            _state.wait(since, timeout)
+        self._update()
+        with self._lock:
+            if since > self._version: # the program restarted since the page last asked
+                since = 0
+            return {'version': self._version,
+                    'fields': dict((_n, _f[1]) for _n, _f in self._fields.items() if since == 0 or _f[0] > since)}
+
+    def start(self):
+        self._server = _WebHTTPServer(self.address, _WebHandler)
+        self._server.web = self
+        _t = threading.Thread(target = self._server.serve_forever)
+        _t.daemon = True
+        _t.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+class _WebHTTPServer(socketserver.ThreadingMixIn, httpserver.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class _WebHandler(httpserver.BaseHTTPRequestHandler):
+    def _reply(self, code, ctype, body):
+        _b = str.encode(body)
+        self.send_response(code)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(_b)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(_b)
+
+    def do_GET(self):
+        _url = urlparse.urlparse(self.path)
+        if _url.path == '/':
+            self._reply(200, 'text/html; charset=utf-8', _webPage)
+        elif _url.path == '/status':
+            _q = urlparse.parse_qs(_url.query)
+            _since = _q.get('since', ['0'])[0]
+            _wait = _q.get('wait', ['25'])[0]
+            if not _since.isdigit() or not _wait.isdigit():
+                self._reply(400, 'text/plain', 'since and wait must be numbers\n')
+                return
+            _status = self.server.web.status(int(_since), min(int(_wait), 60))
+            self._reply(200, 'application/json', json.dumps(_status, sort_keys = True))
+        else:
+            self._reply(404, 'text/plain', 'not found\n')
+
+    def log_message(self, format, *args):
+        if common.debug:
+            sys.stdout.write('web: ' + (format % args) + '\n')
+
+_webPage = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>WSPR TX</title>
+<style>
+body { font-family: Arial, sans-serif; margin: 2em; }
+table { border-collapse: collapse; }
+td { padding: 0.3em 1em; border-bottom: 1px solid #ddd; }
+td:first-child { color: #666; }
+#conn { color: #999; font-size: small; }
+</style></head>
+<body><h2>WSPR TX status</h2>
+<table>
+<tr><td>Device</td><td id="model"></td></tr>
+<tr><td>Name</td><td id="name"></td></tr>
+<tr><td>Hardware</td><td id="hardware"></td></tr>
+<tr><td>Firmware</td><td id="firmware"></td></tr>
+<tr><td>Mode</td><td id="mode"></td></tr>
+<tr><td>Transmitting</td><td id="tx"></td></tr>
+<tr><td>Frequency</td><td id="frequency"></td></tr>
+<tr><td>GPS time</td><td id="gps_time"></td></tr>
+<tr><td>GPS lock</td><td id="gps_lock"></td></tr>
+<tr><td>Locator</td><td id="locator"></td></tr>
+<tr><td>Next band</td><td id="next_band"></td></tr>
+<tr><td>Progress</td><td id="progress"></td></tr>
+</table>
+<p id="conn">connecting</p>
+<script>
+var version = 0;
+function show(name, v) {
+  var e = document.getElementById(name);
+  if (!e) return;
+  if (v === null || v === undefined) v = '';
+  else if (v === true) v = 'yes';
+  else if (v === false) v = 'no';
+  else if (name == 'frequency') v = v.toFixed(2) + ' Hz';
+  else if (name == 'progress') v = v.state + (v.band ? ' on ' + v.band : '') + (v.seconds ? ', ' + v.seconds + ' s' : '');
+  e.textContent = v;
+}
+function poll() {
+  var r = new XMLHttpRequest();
+  r.open('GET', '/status?since=' + version);
+  r.onload = function() {
+    var s = JSON.parse(r.responseText);
+    for (var n in s.fields) show(n, s.fields[n]);
+    version = s.version;
+    document.getElementById('conn').textContent = 'version ' + version;
+    poll();
+  };
+  r.onerror = function() {
+    document.getElementById('conn').textContent = 'disconnected, retrying';
+    setTimeout(poll, 5000);
+  };
+  r.send();
+}
+poll();
+</script></body></html>
+"""
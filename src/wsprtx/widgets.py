@@ -0,0 +1,331 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Tk helpers for the View: tooltips, info buttons and their window, and the mirror clock
+"""
+
+from .common import monotonic, python
+try:
+    if python == 2:
+        from Tkinter import *
+    else:
+        from tkinter import *
+except ImportError:
+    pass           # the GUI (not needed for the terminal View, the daemon, ...)
+
+# Tooltips
+#
+# All of the tooltips of a window share one popup, made the first time
+# a tip is shown.  Hovering moves it and changes its text, and leaving
+# hides it after a short delay, so moving from one tip to the next does
+# not flicker and no windows are made or destroyed.  The TipManager
+# also keeps a registry of the tips, so that making a tip again for the
+# same widget (or canvas tag) changes its text rather than adding more
+# bindings, and a widget's entry goes when the widget is destroyed.
+#
+class TipManager(object):
+    """
+    The one tooltip popup of a Tk root, and the registry of its tips
+
+        get(widget)          - the manager for the widget's root
+        show(owner,text,...) - shows text at the pointer for owner
+        hide(owner,delay)    - hides owner's tip after delay ms
+        register(key,tip)    - remembers a tip, returns the one already there
+    """
+    delay = 150 # ms before a tip is hidden
+
+    def __init__(self, root):
+        self._root = root
+        self._popup = None
+        self._label = None
+        self._hide = None
+        self.owner = None
+        self.registry = {}
+
+    @staticmethod
+    def get(widget):
+        _root = widget._root()
+        if not hasattr(_root, '_tipManager'):
+            _root._tipManager = TipManager(_root)
+        return _root._tipManager
+
+    def _window(self):
+        if self._popup is None:
+            self._popup = Toplevel(self._root)
+            self._popup.wm_overrideredirect(True)
+            try:
+                self._popup.tk.call("::tk::unsupported::MacWindowStyle", "style",
+                                    self._popup._w, "help", "noActivates")
+            except TclError:
+                pass
+            self._label = Label(self._popup, justify='left', font=('Arial',12),
+                                background="#ffffff", relief='solid', borderwidth=1)
+            self._label.pack(ipadx=2)
+        return self._popup
+
+    def show(self, owner, text, x, y, wrap = 360):
+        if self._hide is not None:
+            self._root.after_cancel(self._hide)
+            self._hide = None
+        _p = self._window()
+        self.owner = owner
+        self._label.config(text = text, wraplength = wrap)
+        _p.wm_geometry("+%d+%d" % (x, y + 20))
+        _p.deiconify()
+        _p.lift()
+
+    def retext(self, owner, text):
+        if self.owner is owner and self._label is not None:
+            self._label.config(text = text)
+
+    def hide(self, owner, delay = None):
+        if self.owner is not owner or self._popup is None:
+            return
+        if self._hide is not None:
+            self._root.after_cancel(self._hide)
+        self._hide = self._root.after(self.delay if delay is None else delay, self._withdraw)
+
+    def _withdraw(self):
+        self._hide = None
+        self.owner = None
+        self._popup.withdraw()
+
+    def register(self, key, tip):
+        return self.registry.setdefault(key, tip)
+
+    def forget(self, key):
+        _tip = self.registry.pop(key, None)
+        if _tip is not None and self.owner is _tip:
+            self.hide(_tip, 0)
+
+class CreateToolTip(object):
+    """
+    Creates tooltips for widgets
+
+    Making a second tip for a widget only changes the text of the first.
+    """
+    def __new__(cls, widget, text, wrap = 360):
+        _tips = TipManager.get(widget)
+        _tip = _tips.registry.get(('widget', str(widget)))
+        if _tip is None:
+            _tip = object.__new__(cls)
+            _tip._widget = None
+        return _tip
+
+    def __init__(self, widget, text, wrap = 360):
+        if self._widget is not None: # already bound
+            self.text = text
+            return
+        self._widget = widget
+        self._text = text
+        self._wrap = wrap
+        self._tips = TipManager.get(widget)
+        self._tips.register(('widget', str(widget)), self)
+        self._widget.bind("<Enter>", self._enter, '+')
+        self._widget.bind("<Leave>", self._leave, '+')
+        self._widget.bind("<ButtonPress>", self._leave, '+')
+        self._widget.bind("<Destroy>", self._forget, '+')
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        self._text = text
+        self._tips.retext(self, text)
+        
+    def _enter(self, event=None): 
+        self._tips.show(self, self._text, self._widget.winfo_pointerx(),
+                        self._widget.winfo_pointery(), self._wrap)
+        
+    def _leave(self, event=None):
+        self._tips.hide(self)
+
+    def _forget(self, event=None):
+        if event is None or event.widget is self._widget:
+            self._tips.forget(('widget', str(self._widget)))
+
+class CreateCanvasTip(object):
+    """
+    Creates tooltips for items inside a canvas
+
+    A tag is bound once, however many times a tip is made for it.  Items
+    that come and go (like the satellites) share one tag, and each item's
+    text is set with setItem() and dropped with clearItems().
+    """
+    def __new__(cls, canvas, tag, text='item info'):
+        _tip = TipManager.get(canvas).registry.get(('canvas', str(canvas), tag))
+        if _tip is None:
+            _tip = object.__new__(cls)
+            _tip._canvas = None
+        return _tip
+
+    def __init__(self, canvas, tag, text='item info'):
+        if self._canvas is not None: # already bound
+            self._text = text
+            return
+        self._canvas = canvas
+        self._tag = tag
+        self._text = text
+        self._items = {}
+        self._tips = TipManager.get(canvas)
+        self._tips.register(('canvas', str(canvas), tag), self)
+        self._canvas.tag_bind(self._tag,"<Enter>", self._enter)
+        self._canvas.tag_bind(self._tag,"<Leave>", self._leave)
+        self._canvas.tag_bind(self._tag,"<ButtonPress>", self._leave)
+
+    def setItem(self, item, text):
+        self._items[item] = text
+
+    def clearItems(self):
+        self._items = {}
+
+    def _enter(self, event=None):
+        _current = self._canvas.find_withtag('current')
+        _text = self._items.get(_current[0], self._text) if len(_current) > 0 else self._text
+        self._tips.show(self, _text, self._canvas.winfo_pointerx(),
+                        self._canvas.winfo_pointery(), 180)
+
+    def _leave(self, event=None):
+        self._tips.hide(self)
+
+class CreateInfoButton(object):
+    """
+    Creates info buttons that display tooltips when hovering and popups when clicked
+    """
+    def __init__(self, widget, text, info, bg):
+        self._widget = widget
+        self._text = text
+        self._info = info
+        self._b = BitmapImage(data="""
+        #define info_width 16
+        #define info_height 16
+        static unsigned char info_bits[] = {
+        0xe0, 0x03, 0x18, 0x0c, 0x04, 0x10, 0x82, 0x20, 0x02, 0x20, 0x81, 0x40,
+        0x81, 0x40, 0x81, 0x40, 0x81, 0x40, 0x81, 0x40, 0x82, 0x20, 0x82, 0x20,
+        0x04, 0x10, 0x18, 0x0c, 0xe0, 0x03, 0x00, 0x00};
+        """,foreground="black", background=bg)
+        self._iCircle = Label(widget, image=self._b, bg=bg)
+        CreateToolTip(self._iCircle, text, 640)
+        self._iCircle.bind("<ButtonPress>", self._pop, '+')
+
+    def grid(self, **args):
+        self._iCircle.grid(args)
+
+    def place(self,**args):
+        self._iCircle.place(args)
+
+    def _pop(self, event=None):
+        InfoDialog.get(self._iCircle).show(self._info)
+
+class InfoDialog(object):
+    """
+    The information window of a Tk root, shared by all of the info buttons
+
+    It is a child of the main window, made the first time it is needed
+    and hidden rather than destroyed, and it has no event loop of its
+    own, so the Controller's loop (and the serial port) keep running
+    while it is open.
+    """
+    def __init__(self, root):
+        self._root = root
+        self._win = None
+
+    @staticmethod
+    def get(widget):
+        _root = widget._root()
+        if not hasattr(_root, '_infoDialog'):
+            _root._infoDialog = InfoDialog(_root)
+        return _root._infoDialog
+
+    def _window(self):
+        if self._win is None:
+            self._win = Toplevel(self._root)
+            self._win.configure(background='white')
+            self._win.wm_title("Information")
+            self._win.protocol("WM_DELETE_WINDOW", self.hide)
+            _f = Frame(self._win, bg='white', bd=0)
+            _f.pack(padx=20,pady=20,fill=BOTH,expand=True)
+            _d = Canvas(_f, width = 40, height = 40, borderwidth = 0, highlightthickness = 0, bg = 'white')
+            _d.create_oval(0, 0, 36, 36, outline = 'blue', fill = 'blue')
+            _d.create_text(18, 18, text = 'i', font=('Arial',18), fill='white')
+            _d.pack(side=LEFT, anchor=NE, pady=10, padx=10)
+            self._label = Label(_f, font=('PT Mono',12), bg='white', justify='left')
+            self._label.pack(pady=10, padx=20,side=TOP,fill=X)
+            Button(self._win, text="Okay", command = self.hide, bg = 'grey80', font = ('Arial', 18)).pack(side=RIGHT,fill=None,padx=10,pady=10)
+        return self._win
+
+    def show(self, info):
+        _w = self._window()
+        self._label.config(text = info)
+        _w.deiconify()
+        _w.lift()
+        _w.focus_set()
+
+    def hide(self):
+        if self._win is not None:
+            self._win.withdraw()
+
+# Mirror Clock - a Class used by the View
+#
+# Because the WSPR device stops updating the GPS clock while
+# transmitting, a solution is needed to keep the UTC clock display
+# going. Each GPS time report records the UTC time of day against the
+# host's monotonic clock, and the displayed time is always computed
+# from that offset, so it does not drift however late the Tk timer
+# runs, or how long the device is silent.  The Tk timer only decides
+# when to redraw: it is set for just after the next whole second of
+# the mirrored time, and the clock variable is only written when the
+# displayed second changes, so Tk gets one redraw per second whether
+# the update came from the timer or from the GPS.
+#
+class MC():
+    """
+    The Mirror Clock keeps time
+
+    The clock can be Set, and can be read
+    The clock pushes the current time *directly* to the controller as a periodic event
+    """
+    def __init__(self, root, clock):
+        self._base = None   # UTC seconds of the day at the last GPS time report
+        self._at = 0        # monotonic() when that report arrived
+        self._shown = None  # the time string last pushed to the display
+        self._job = None
+        self._root = root
+        self._clock = clock
+
+    def _seconds(self):
+        return (self._base + (monotonic() - self._at)) % 86400
+
+    def _show(self):
+        _t = self.time
+        if _t != self._shown:
+            self._shown = _t
+            # This is ugly, but we need to push the time
+            self._clock.set(_t)
+
+    def __tick(self):
+        self._show()
+        # Wake just after the next second boundary of the mirrored time
+        _wait = int((1.0 - (monotonic() - self._at) % 1.0) * 1000) + 2
+        self._job = self._root.after(_wait, self.__tick)
+
+    @property
+    def time(self):
+        if self._base is None:
+            return ''
+        _s = int(self._seconds())
+        return "{0:02d}:{1:02d}:{2:02d}".format(_s // 3600, (_s // 60) % 60, _s % 60)
+
+    @time.setter
+    def time(self,data):
+        try:
+            _h,_m,_s = data.split(':')
+            _base = int(_h)*3600 + int(_m)*60 + int(_s)
+        except ValueError:
+            return -1
+        self._base, self._at = _base, monotonic()
+        self._show()
+        if self._job is None:
+            self.__tick()
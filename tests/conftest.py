@@ -0,0 +1,11 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Puts the wsprtx package, in src, on the path of the tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,161 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+A synthetic device, for the tests
+"""
+
+import collections
+import math
+import time
+from wsprtx.common import monotonic
+from wsprtx.model import Model
+
+# Simulated Device - a synthetic device, for the tests
+#
+# A test gives it to the Model in place of a serial port, with
+# Model.attach().  It answers G and S commands from a table of
+# settings, and produces the stream a working beacon does: GPS
+# satellites (GSI), time (GTM) and lock (GLC) every second, and when
+# in WSPR mode, a transmission on the next enabled band every even two
+# minutes (TON, TBN, TWS), with pause reports (MPS) in between.  As on
+# the real device, the GPS reports stop while transmitting.
+#
+# Its clock runs speed times faster than real time, or (with a speed of
+# 0) only when advance() is called, so a test can run days of device
+# time in minutes.  A long step reports a few of its seconds, spread
+# across it, so that each cycle still has both its transmitting and its
+# GPS seconds reported.
+#
+class SimDevice(object):
+    """
+    Serial port look-alike producing a synthetic device stream
+
+        advance(seconds)  - moves the device's clock on, producing its reports
+        now               - the device's clock (seconds since 1970)
+        lines             - the number of lines the device has sent
+        sent              - the lines the device has been sent
+        samples           - the most seconds reported in one step
+    """
+    samples = 8
+    settings = {'CCM': 'W', 'OTP': '00000', 'OSM': 'W', 'OLC': 'G', 'OPW': 'N', 'DCS': 'N0CALL',
+                'DL4': 'JO65', 'DPD': '23', 'DNM': 'Simulated', 'DGF': '000010000000', 'FPN': '01012',
+                'FHV': '1', 'FHR': '2', 'FSV': '1', 'FSR': '10', 'FRF': '2600000000'}
+
+    def __init__(self, speed = 1.0, start = None):
+        self.speed = speed
+        self.now = int(time.time() if start is None else start)
+        self._wall = monotonic()
+        self._v = dict(self.settings)
+        self._bands = dict((_b, 'E' if _b in [6, 7] else 'D') for _b in range(len(Model.bands())))
+        self._out = collections.deque()
+        self._rx = b''
+        self._tx = b''
+        self._band = None  # the band transmitting, or None
+        self._next = 6
+        self._lockDue = 0  # when the lock and locator are next reported
+        self.lines = 0
+        self.sent = []
+        self._say('MIN', 'Simulated WSPR device started')
+
+    def _say(self, code, data):
+        self.lines += 1
+        self._out.append(str.encode('{' + code + '} ' + data + '\r\n'))
+
+    def _enabled(self):
+        return [_b for _b in sorted(self._bands) if self._bands[_b] == 'E']
+
+    def _tick(self):
+        # The reports of one second of the device's clock
+        _s = self.now % 120
+        _beacon = self._v['CCM'] == 'W' and len(self._enabled()) > 0
+        if _beacon and _s < 111:
+            if self._band is None:
+                self._band = self._next
+                _later = [_b for _b in self._enabled() if _b > self._band] + self._enabled()
+                self._next = _later[0]
+                self._say('TON', 'T')
+                self._say('TBN', '{0:02d}'.format(self._next))
+            self._say('TWS', '{0:02d} {1:03d}'.format(self._band, _s))
+            return
+        if self._band is not None:
+            self._band = None
+            self._say('TCC', '')
+            self._say('TON', 'F')
+        if _beacon:
+            self._say('MPS', '{}'.format(120 - _s))
+        for _prn in range(1, 33, 3): # eleven satellites, moving slowly across the sky
+            _az = (_prn * 37 + self.now // 240) % 360
+            _el = int(45 + 40 * math.sin((self.now / 21600.0 + _prn) % (2 * math.pi)))
+            if _el > 0:
+                self._say('GSI', '{} {} {} {}'.format(_prn, _az, _el, 20 + (_prn * 7 + self.now // 60) % 25))
+        self._say('GTM', time.strftime('%H:%M:%S', time.gmtime(self.now)))
+        if self.now >= self._lockDue: # every ten seconds, or at the first GPS second after
+            self._lockDue = self.now + 10
+            self._say('GLC', 'T')
+            self._say('GL4', self._v['DL4'][0:4])
+
+    def advance(self, seconds):
+        _n = int(seconds)
+        if _n <= self.samples:
+            _ticks = range(_n)
+        else: # a few seconds spread across the step, the last one included
+            _ticks = [_n * (_i + 1) // self.samples - 1 for _i in range(self.samples)]
+        _at = -1
+        for _t in _ticks:
+            self.now += _t - _at
+            _at = _t
+            self._tick()
+
+    def _run(self):
+        if self.speed > 0:
+            _due = int((monotonic() - self._wall) * self.speed)
+            if _due > 0:
+                self._wall += _due / float(self.speed)
+                for _n in range(min(_due, 60)):
+                    self.advance(1)
+        while len(self._out) > 0 and len(self._rx) < 4096:
+            self._rx += self._out.popleft()
+
+    @property
+    def in_waiting(self):
+        self._run()
+        return len(self._rx)
+
+    def read(self, n = 1):
+        if len(self._rx) < n:
+            self._run()
+        _b, self._rx = self._rx[0:n], self._rx[n:]
+        return _b
+
+    def write(self, data):
+        self._tx += data
+        while b'\n' in self._tx:
+            _line, self._tx = self._tx.split(b'\n', 1)
+            _line = _line.rstrip(b'\r').decode('ascii', 'replace')
+            self.sent.append(_line)
+            if len(_line) < 6 or _line[0] != '[':
+                continue
+            _code, _arg = _line[1:4], _line[6:]
+            if _arg[0:1] == 'G':
+                if _code == 'OBD':
+                    for _b in sorted(self._bands):
+                        self._say('OBD', '{0:02d} {1}'.format(_b, self._bands[_b]))
+                elif _code == 'FLP':
+                    self._say('FLP', 'LP06')
+                elif _code == 'TFQ':
+                    self._say('TFQ', '1409712000')
+                elif _code in self._v:
+                    self._say(_code, self._v[_code])
+            elif _arg[0:1] == 'S':
+                _d = _arg[2:]
+                if _code == 'CSE':
+                    self._say('MIN', 'Settings saved')
+                elif _code == 'OBD' and _d[0:2].isdigit():
+                    self._bands[int(_d[0:2])] = _d[3:4]
+                    self._say('OBD', _d)
+                elif _code in self._v:
+                    self._v[_code] = _d
+                    self._say(_code, _d)
+
+    def close(self):
+        pass
@@ -0,0 +1,210 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Alert rules over the device's messages
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from wsprtx import alerts
+from wsprtx.alerts import Alerts
+from wsprtx.metrics import Metrics
+
+# A stream keeping what is written to it
+class Lines(list):
+    def write(self, text):
+        self.append(text)
+
+    def flush(self):
+        pass
+
+# The parts of a Controller the Alerts look at
+class AlertController(object):
+    def __init__(self):
+        self.state = {}
+        self.metrics = Metrics()
+
+class TestAlerts(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self._monotonic = alerts.monotonic
+        alerts.monotonic = lambda: self.now
+        self._vc = AlertController()
+        self.sent = []
+
+    def tearDown(self):
+        alerts.monotonic = self._monotonic
+
+    def alerts(self, rules = None):
+        return Alerts(self._vc, rules, [self.sent.append])
+
+    def states(self):
+        return [(_a['rule'], _a['state']) for _a in self.sent]
+
+    def wait(self, a, seconds):
+        # The main loop, checking every half second
+        for _n in range(int(seconds * 2)):
+            self.now += 0.5
+            a.check()
+
+    def test_rules(self):
+        for _rule in [{'code': 'GLC', 'kind': 'equals'}, {'name': 'x', 'kind': 'equals'},
+                      {'name': 'x', 'code': 'GLC', 'kind': 'sometimes'}]:
+            with self.assertRaises(ValueError):
+                self.alerts([_rule])
+        self.assertEqual(len(self.alerts([{'name': 'odd', 'kind': 'unknown'}]).rules), 1)
+
+    def test_load(self):
+        _scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        try:
+            _file = os.path.join(_scratch, 'rules.json')
+            with open(_file, 'w') as _f:
+                json.dump({'name': 'x'}, _f)
+            with self.assertRaises(ValueError):
+                Alerts.load(_file)
+            with open(_file, 'w') as _f:
+                json.dump(Alerts.defaults, _f)
+            self.assertEqual(Alerts.load(_file), Alerts.defaults)
+        finally:
+            shutil.rmtree(_scratch)
+
+    def test_equals(self):
+        # Fires once the condition has held long enough, once however many messages hold it
+        _a = self.alerts()
+        _a.message('GLC', 'F')
+        self.wait(_a, 599)
+        self.assertEqual(self.sent, [])
+        _a.message('GLC', 'F')
+        self.wait(_a, 2)
+        _a.message('GLC', 'F')
+        self.assertEqual(self.states(), [('gps_lock', 'firing')])
+        self.assertEqual((self.sent[0]['code'], self.sent[0]['data'], self.sent[0]['message']),
+                         ('GLC', 'F', 'GPS position lock lost'))
+        self.assertIn('gps_lock', _a.active)
+        self.assertEqual(self._vc.metrics.get('alert_active', {'rule': 'gps_lock'}), 1)
+        # and is resolved once it has been gone long enough
+        _a.message('GLC', 'T')
+        self.wait(_a, 30)
+        _a.message('GLC', 'F') # back before it cleared
+        _a.message('GLC', 'T')
+        self.wait(_a, 59)
+        self.assertEqual(len(self.sent), 1)
+        self.wait(_a, 2)
+        self.assertEqual(self.states(), [('gps_lock', 'firing'), ('gps_lock', 'resolved')])
+        self.assertEqual(_a.active, {})
+        self.assertEqual(self._vc.metrics.get('alerts_total', {'rule': 'gps_lock'}), 2)
+
+    def test_short(self):
+        # A condition gone before its time is not sent
+        _a = self.alerts()
+        _a.message('GLC', 'F')
+        self.wait(_a, 300)
+        _a.message('GLC', 'T')
+        self.wait(_a, 600)
+        self.assertEqual(self.sent, [])
+
+    def test_hysteresis(self):
+        _a = self.alerts([{'name': 'low_vcc', 'code': 'MVC', 'kind': 'below', 'value': 4.5, 'clear': 4.6}])
+        for _v, _expected in [('4.6', []), ('4.4', ['firing']), ('4.55', ['firing']), ('bad', ['firing']),
+                              ('4.59', ['firing']), ('4.61', ['firing', 'resolved']), ('4.55', ['firing', 'resolved'])]:
+            _a.message('MVC', _v)
+            self.assertEqual([_s[1] for _s in self.states()], _expected, _v)
+
+    def test_absence(self):
+        # Not heard for a beacon cycle and the pause, while beaconing
+        self._vc.state = {'CCM': 'W', 'OTP': '00120'}
+        _a = self.alerts()
+        _a.message('TWS', '1')
+        self.wait(_a, 359)
+        self.assertEqual(self.sent, [])
+        self.wait(_a, 2)
+        self.assertEqual(self.states(), [('no_transmission', 'firing')])
+        self.assertEqual(self.sent[0]['data'], None)
+        _a.message('TWS', '1')
+        self.assertEqual(self.states(), [('no_transmission', 'firing'), ('no_transmission', 'resolved')])
+
+    def test_not_watched(self):
+        # Stopping the beacon resolves the alert, and the rule starts afresh when it beacons again
+        self._vc.state = {'CCM': 'W', 'OTP': '0'}
+        _a = self.alerts()
+        self.wait(_a, 241)
+        self._vc.state['CCM'] = 'N'
+        self.wait(_a, 1000)
+        self.assertEqual(self.states(), [('no_transmission', 'firing'), ('no_transmission', 'resolved')])
+        self._vc.state['CCM'] = 'W'
+        self.wait(_a, 200)
+        self.assertEqual(len(self.sent), 2)
+
+    def test_repeat(self):
+        _a = self.alerts([{'name': 'lock', 'code': 'GLC', 'kind': 'equals', 'value': 'F', 'repeat': 100}])
+        _a.message('GLC', 'F')
+        self.wait(_a, 250)
+        self.assertEqual(self.states(), [('lock', 'firing')] * 3)
+
+    def test_unknown(self):
+        # Once for each code in the repeat time
+        _a = self.alerts()
+        _a.unknown('{XYZ} 1')
+        _a.unknown('{XYZ} 2')
+        _a.unknown('{ABC} 1')
+        self.assertEqual([(_s['state'], _s['data']) for _s in self.sent], [('event', '{XYZ} 1'), ('event', '{ABC} 1')])
+        self.assertNotIn('code', self.sent[0])
+        self.now += 3600
+        _a.unknown('{XYZ} 3')
+        self.assertEqual(len(self.sent), 3)
+        self.assertEqual(_a.active, {})
+
+    def test_other_codes(self):
+        _a = self.alerts()
+        for _code in ['GTM', 'GSI', 'TFQ', 'MVC']:
+            _a.message(_code, 'F')
+        self.wait(_a, 700)
+        self.assertEqual(self.sent, [])
+
+class TestSinks(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self.alert = {'time': '2021-06-01T12:00:00Z', 'rule': 'gps_lock', 'state': 'firing',
+                      'message': 'GPS position lock lost', 'data': 'F', 'code': 'GLC'}
+
+    def tearDown(self):
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def test_text(self):
+        self.assertEqual(Alerts.text(self.alert), '2021-06-01T12:00:00Z FIRING gps_lock: GPS position lock lost (F)')
+        self.alert['data'] = None
+        self.assertEqual(Alerts.text(self.alert), '2021-06-01T12:00:00Z FIRING gps_lock: GPS position lock lost')
+
+    def test_log(self):
+        _file = os.path.join(self._scratch, 'alerts.log')
+        _sink = Alerts.toLog(_file)
+        _sink(self.alert)
+        _sink(self.alert)
+        with open(_file) as _f:
+            self.assertEqual(_f.read(), (Alerts.text(self.alert) + '\n') * 2)
+
+    def test_json(self):
+        _out = Lines()
+        Alerts.toJSON(_out)(self.alert)
+        self.assertEqual(json.loads(_out[0]), self.alert)
+
+    def test_failed(self):
+        # A sink that fails does not stop the others
+        _stderr = sys.stderr
+        sys.stderr = _said = Lines()
+        try:
+            _sent = []
+            _a = Alerts(AlertController(), None, [Alerts.toLog(os.path.join(self._scratch, 'no', 'such.log')),
+                                                   _sent.append])
+            _a.unknown('{XYZ} 1')
+        finally:
+            sys.stderr = _stderr
+        self.assertEqual(len(_sent), 1)
+        self.assertTrue(_said[0].startswith('Alert not sent: '))
+
+if __name__ == '__main__':
+    unittest.main()
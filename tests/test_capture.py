@@ -0,0 +1,131 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The compressed capture of the serial traffic
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from wsprtx import capture
+from wsprtx.capture import Capture
+
+# A stream keeping what is written to it
+class Lines(list):
+    def write(self, text):
+        self.append(text)
+
+second = 1000000000
+
+class TestCapture(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self.filename = os.path.join(self._scratch, 'capture.wcap')
+        self._blockSize = Capture.blockSize
+        self._monotonic = capture.monotonic
+
+    def tearDown(self):
+        Capture.blockSize = self._blockSize
+        capture.monotonic = self._monotonic
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def write(self, lines, close = True):
+        _c = Capture(self.filename)
+        for _l in lines:
+            _c.add(*_l)
+        if close:
+            _c.close()
+        return _c
+
+    def test_round_trip(self):
+        _lines = [(Capture.TX, '[DCS] G', 1 * second), (Capture.RX, '{DCS} K1ABC', 1 * second + 5),
+                  (Capture.RX, b'{GTM} 12:00:00', 2 * second)]
+        self.write(_lines)
+        self.assertEqual(list(Capture.read(self.filename)),
+                         [(1 * second, Capture.TX, '[DCS] G'), (1 * second + 5, Capture.RX, '{DCS} K1ABC'),
+                          (2 * second, Capture.RX, '{GTM} 12:00:00')])
+
+    def test_blocks(self):
+        # Many blocks, and only the lines between the times
+        Capture.blockSize = 200
+        _c = self.write([(Capture.RX, '{{GTM}} line {}'.format(_n), _n * second) for _n in range(100)])
+        self.assertGreater(len(_c.index), 5)
+        self.assertEqual(sum(_e[3] for _e in _c.index), 100)
+        _read = list(Capture.read(self.filename, since = 40 * second, until = 45 * second))
+        self.assertEqual([_r[0] // second for _r in _read], [40, 41, 42, 43, 44])
+        self.assertEqual(_read[0][2], '{GTM} line 40')
+        self.assertEqual(list(Capture.read(self.filename, since = 100 * second)), [])
+        self.assertEqual(len(list(Capture.read(self.filename, until = 1))), 1)
+
+    def test_out_of_order(self):
+        # A line stamped before the one added ahead of it is still found
+        self.write([(Capture.TX, '[CCM] G', 10 * second), (Capture.RX, '{CCM} W', 9 * second)])
+        self.write([(Capture.TX, '[CCM] G', 20 * second), (Capture.RX, '{CCM} N', 19 * second)])
+        self.assertEqual([_r[2] for _r in Capture.read(self.filename, until = 19 * second + 1)],
+                         ['[CCM] G', '{CCM} W', '{CCM} N'])
+        self.assertEqual([_r[2] for _r in Capture.read(self.filename, since = 9 * second, until = 10 * second)],
+                         ['{CCM} W'])
+
+    def test_reopen(self):
+        # Opening again appends, and writes the index anew
+        self.write([(Capture.RX, 'first', 1 * second)])
+        _size = os.path.getsize(self.filename)
+        _c = self.write([(Capture.RX, 'second', 2 * second)])
+        self.assertEqual(len(_c.index), 2)
+        self.assertGreater(os.path.getsize(self.filename), _size)
+        self.assertEqual([_r[2] for _r in Capture.read(self.filename)], ['first', 'second'])
+
+    def test_unclosed(self):
+        # Without an index the block headers are read, and a partial block dropped
+        Capture.blockSize = 100
+        _c = self.write([(Capture.RX, 'x' * 50, _n * second) for _n in range(10)], close = False)
+        _c._f.flush()
+        _blocks = len(_c.index)
+        _c._f.close()
+        self.assertEqual(len(list(Capture.read(self.filename))), _blocks * 2)
+        with open(self.filename, 'ab') as _f:
+            _f.write(Capture._block.pack(b'BLK1', 20 * second, 21 * second, 2, 500) + b'partial')
+        self.assertEqual(len(list(Capture.read(self.filename))), _blocks * 2)
+        # and opening it again carries on after the last whole block
+        self.write([(Capture.RX, 'again', 30 * second)])
+        _read = list(Capture.read(self.filename))
+        self.assertEqual(len(_read), _blocks * 2 + 1)
+        self.assertEqual(_read[-1], (30 * second, Capture.RX, 'again'))
+
+    def test_flush(self):
+        # Lines are written as a block once they are old enough
+        self.now = 100.0
+        capture.monotonic = lambda: self.now
+        _c = self.write([(Capture.RX, 'line', 1 * second)], close = False)
+        _c.flush(5)
+        self.assertEqual(_c.index, [])
+        self.now += 6
+        _c.flush(5)
+        self.assertEqual(len(_c.index), 1)
+        _c.flush(5) # nothing more to write
+        self.assertEqual(len(_c.index), 1)
+        _c.close()
+        _c.close()
+
+    def test_long_line(self):
+        self.write([(Capture.RX, 'y' * 70000, 1)])
+        self.assertEqual(len(list(Capture.read(self.filename))[0][2]), 65535)
+
+    def test_text(self):
+        self.write([(Capture.TX, '[DPD] G', 1600000000 * second + 5), (Capture.RX, '{DPD} 23', 1600000001 * second)])
+        _out = Lines()
+        self.assertEqual(Capture.text(self.filename, _out), 2)
+        self.assertEqual(_out, ['2020-09-13T12:26:40.000000005Z > [DPD] G\n',
+                                '2020-09-13T12:26:41.000000000Z < {DPD} 23\n'])
+
+    def test_not_a_capture(self):
+        with open(self.filename, 'wb') as _f:
+            _f.write(b'something else')
+        with self.assertRaises(ValueError):
+            Capture(self.filename)
+        with self.assertRaises(ValueError):
+            list(Capture.read(self.filename))
+
+if __name__ == '__main__':
+    unittest.main()
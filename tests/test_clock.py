@@ -0,0 +1,69 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The mirror clock, kept from the GPS time reports
+"""
+
+import unittest
+from wsprtx import widgets
+from wsprtx.widgets import MC
+
+# The parts of Tk the clock uses: a timer, and the variable it shows
+class FakeRoot(object):
+    def __init__(self):
+        self.timers = []
+
+    def after(self, ms, callback):
+        self.timers.append((ms, callback))
+        return len(self.timers)
+
+class FakeVar(object):
+    def __init__(self):
+        self.values = []
+
+    def set(self, value):
+        self.values.append(value)
+
+class TestMirrorClock(unittest.TestCase):
+    def setUp(self):
+        self.now = 100.0
+        self._monotonic = widgets.monotonic
+        widgets.monotonic = lambda: self.now
+        self.root = FakeRoot()
+        self.var = FakeVar()
+        self.clock = MC(self.root, self.var)
+
+    def tearDown(self):
+        widgets.monotonic = self._monotonic
+
+    def test_runs(self):
+        self.assertEqual(self.clock.time, '')
+        self.clock.time = '12:00:00'
+        self.assertEqual(self.var.values, ['12:00:00'])
+        self.now += 61.5 # the device silent, while transmitting
+        self.assertEqual(self.clock.time, '12:01:01')
+        self.clock.time = '23:59:59'
+        self.now += 2
+        self.assertEqual(self.clock.time, '00:00:01')
+
+    def test_bad(self):
+        self.clock.time = '12:00:00'
+        self.clock.time = '12:00'
+        self.clock.time = 'xx:yy:zz'
+        self.assertEqual(self.clock.time, '12:00:00')
+
+    def test_redraws(self):
+        # One timer, set for just after the next second, and one redraw a second
+        self.clock.time = '12:00:00'
+        self.assertEqual([_t[0] for _t in self.root.timers], [1002])
+        self.now += 1.25
+        self.root.timers[-1][1]()
+        self.assertEqual(self.var.values, ['12:00:00', '12:00:01'])
+        self.assertEqual(self.root.timers[-1][0], 752)
+        self.now += 0.25
+        self.root.timers[-1][1]() # early, in the same second
+        self.assertEqual(self.var.values, ['12:00:00', '12:00:01'])
+        self.now += 0.5
+        self.clock.time = '12:00:02' # a report restarts the second, not another timer
+        self.assertEqual(self.var.values, ['12:00:00', '12:00:01', '12:00:02'])
+        self.assertEqual(len(self.root.timers), 3)
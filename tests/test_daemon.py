@@ -0,0 +1,148 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The daemon sharing the device with local clients
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from wsprtx.controller import Controller
+from wsprtx.daemon import Daemon, DaemonClient
+from wsprtx.model import Model
+from simdevice import SimDevice
+
+# Waits for a condition made true by the daemon's thread
+def until(done, timeout = 5):
+    _end = time.time() + timeout
+    while not done():
+        if time.time() > _end:
+            return False
+        time.sleep(0.02)
+    return True
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        if not hasattr(socket, 'AF_UNIX'):
+            self.skipTest('no Unix sockets')
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self.path = os.path.join(self._scratch, 'daemon.sock')
+        self._vc = Controller(self._scratch)
+        self._vc.model = Model(self._vc, False)
+        self.device = SimDevice(20) # GPS reports twenty times a second
+        self._vc.model.attach('sim', self.device)
+        self.daemon = Daemon(self._vc, self.path)
+        self._thread = threading.Thread(target = self.daemon.serve)
+        self._thread.daemon = True
+        self._thread.start()
+        self.assertTrue(until(lambda: os.path.exists(self.path)))
+        self.clients = []
+
+    def tearDown(self):
+        for _c in self.clients:
+            _c.close()
+        self.daemon.stop()
+        self._thread.join(5)
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def client(self):
+        _c = DaemonClient(self.path)
+        self.clients.append(_c)
+        return _c
+
+    def test_state(self):
+        # The cache is filled from the device, and answered from the cache
+        _c = self.client()
+        self.assertTrue(until(lambda: 'FPN' in _c.request('state')['state']))
+        _state = _c.request('state')['state']
+        self.assertEqual(_state['DCS'], 'N0CALL')
+        self.assertEqual(_state['OBD06'], '06 E')
+        _asked = len(self.device.sent)
+        _c.request('state')
+        self.assertEqual(len(self.device.sent), _asked)
+
+    def test_send(self):
+        _c = self.client()
+        self.assertTrue(_c.request('send', code = 'DNM', data = 'S Shared')['ok'])
+        self.assertTrue(_c.request('raw', line = '[DPD] S 30')['ok'])
+        self.assertTrue(until(lambda: _c.request('state')['state'].get('DPD') == '30'))
+        self.assertEqual(self.device._v['DNM'], 'Shared')
+        self.assertEqual(self.device.sent[-2:], ['[DNM] S Shared', '[DPD] S 30'])
+
+    def test_subscribe(self):
+        # Only the codes asked for, after the cache
+        _c = self.client()
+        self.assertTrue(_c.request('subscribe', codes = ['GTM'])['ok'])
+        _events = _c.events()
+        self.assertEqual(next(_events)['event'], 'state')
+        for _n in range(3):
+            _e = next(_events)
+            self.assertEqual((_e['event'], _e['code'], _e['key']), ('update', 'GTM', 'GTM'))
+
+    def test_raw(self):
+        # The device's lines, as the device sent them
+        _c = self.client()
+        self.assertTrue(until(lambda: 'DCS' in _c.request('state')['state']))
+        self.assertTrue(_c.request('subscribe', raw = True)['ok'])
+        _lines = []
+        for _e in _c.events():
+            _lines.append(_e['line'])
+            if _e['line'][0:5] == '{GTM}' and len(_lines) > 20:
+                break
+        self.assertIn('{DCS} N0CALL', _lines)
+        self.assertIn('{OBD} 06 E', _lines)
+
+    def test_clients(self):
+        # Each client gets its own replies
+        _a, _b = self.client(), self.client()
+        self.assertTrue(until(lambda: 'DNM' in _a.request('state')['state']))
+        self.assertTrue(_a.request('subscribe', codes = ['DNM'])['ok'])
+        self.assertTrue(_b.request('send', code = 'DNM', data = 'S Other')['ok'])
+        for _e in _a.events():
+            if _e['event'] == 'update':
+                break
+        self.assertEqual(_e['data'], 'Other')
+        self.assertIn('wspr_', _b.request('metrics')['text'])
+        self.assertIn('offset', _b.request('clock')['clock'])
+
+    def test_bad(self):
+        _c = self.client()
+        self.assertEqual(_c.request('reboot'), {'ok': False, 'error': 'unknown op reboot', 'id': 1})
+        _s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        _s.connect(self.path)
+        _f = _s.makefile('rb')
+        _s.sendall(b'not json\n{"op": "send"}\n')
+        self.assertIn('bad request', json.loads(_f.readline().decode('utf-8'))['error'])
+        self.assertIn('bad request', json.loads(_f.readline().decode('utf-8'))['error'])
+        _f.close()
+        _s.close()
+
+    def test_one(self):
+        # A second daemon on the same socket is refused, and the socket goes with the daemon
+        _other = Controller(self._scratch)
+        with self.assertRaises(IOError):
+            Daemon(_other, self.path)._listen()
+        _other.shutdown()
+        self.assertTrue(os.path.exists(self.path))
+        _c = self.client()
+        self.assertTrue(_c.request('state')['ok'])
+        self.daemon.stop()
+        self._thread.join(5)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_stale(self):
+        # The socket of a daemon that stopped without removing it is taken over
+        _path = os.path.join(self._scratch, 'stale.sock')
+        _s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        _s.bind(_path)
+        _s.close()
+        _other = Controller(self._scratch)
+        _daemon = Daemon(_other, _path)
+        _daemon._listen()
+        _daemon._server.close()
+        _other.shutdown()
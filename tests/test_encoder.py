@@ -0,0 +1,98 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The symbols of WSPR Type 1 messages
+"""
+
+import unittest
+from wsprtx.encoder import WSPREncoder
+
+# The reference message, K1ABC FN42 37, as the WSPR documentation gives it
+reference = tuple(int(_s) for _s in (
+    '3 3 0 0 2 0 0 0 1 0 2 0 1 3 1 2 2 2 1 0 0 3 2 3 1 3 3 2 2 0 2 0 0 0 3 2 0 1 2 3 2 2 0 0 2 2 3 2 1 1 0 2 3 3 '
+    '2 1 0 2 2 1 3 2 1 2 2 2 0 3 3 0 3 0 3 0 1 2 1 0 2 1 2 0 3 2 1 3 2 0 0 3 3 2 3 0 3 2 2 0 3 0 2 0 2 0 1 0 2 3 '
+    '0 2 1 1 1 2 3 3 0 2 3 1 2 1 2 2 2 1 3 3 2 0 0 0 0 1 0 3 2 0 1 3 2 2 2 2 2 0 2 3 3 2 3 2 3 3 2 0 0 3 1 2 2 2'
+).split())
+
+class TestPack(unittest.TestCase):
+    def test_reference(self):
+        self.assertEqual(WSPREncoder.pack('K1ABC', 'FN42', 37), (259047992, 2896997))
+
+    def test_digit_second(self):
+        # A callsign with its digit second is sent with a space before it
+        self.assertEqual(WSPREncoder.pack('G0ABC', 'IO91', 10), WSPREncoder.pack(' G0ABC', 'IO91', '10'))
+        self.assertEqual(WSPREncoder.pack('K1A', 'FN42', 0)[0], WSPREncoder.pack(' K1A  ', 'FN42', 0)[0])
+        self.assertNotEqual(WSPREncoder.pack('KA1ABC', 'FN42', 0), WSPREncoder.pack('K1ABC', 'FN42', 0))
+
+    def test_bounds(self):
+        # The corners of the fields still fit their bits
+        _n, _m = WSPREncoder.pack('ZZ9ZZZ', 'AA00', 60)
+        self.assertLess(_n, 1 << 28)
+        self.assertLess(_m, 1 << 22)
+        _n, _m = WSPREncoder.pack('009', 'RR99', 0)
+        self.assertGreaterEqual(_m, 0)
+
+    def test_errors(self):
+        for _call, _locator, _power, _error in [
+                ('K1ABC/P', 'FN42', 37, 'K1ABC/P needs a Type 2 message, which is not encoded'),
+                ('ABCDEF', 'FN42', 37, 'callsign ABCDEF should have a digit third, or second in at most 5 characters'),
+                ('1', 'FN42', 37, 'callsign 1 should have a digit third, or second in at most 5 characters'),
+                ('KA1ABCD', 'FN42', 37, 'callsign KA1ABCD should have a digit third, or second in at most 5 characters'),
+                ('K1AB1', 'FN42', 37, 'callsign K1AB1 should end in letters'),
+                ('K1ABC', 'SS00', 37, 'locator SS00 should be like FN42'),
+                ('K1ABC', 'FN4', 37, 'locator FN4 should be like FN42'),
+                ('K1ABC', 'FN4A', 37, 'locator FN4A should be like FN42'),
+                ('K1ABC', 'FN42', 38, 'power 38 should be 0 to 60 dBm, ending in 0, 3 or 7'),
+                ('K1ABC', 'FN42', 63, 'power 63 should be 0 to 60 dBm, ending in 0, 3 or 7'),
+                ('K1ABC', 'FN42', 'lots', 'power lots should be 0 to 60 dBm, ending in 0, 3 or 7')]:
+            with self.assertRaises(ValueError) as _e:
+                WSPREncoder.pack(_call, _locator, _power)
+            self.assertEqual(str(_e.exception), _error)
+
+class TestEncode(unittest.TestCase):
+    def setUp(self):
+        self.encoder = WSPREncoder()
+
+    def test_reference(self):
+        self.assertEqual(self.encoder.encode('K1ABC', 'FN42', 37), reference)
+
+    def test_sync(self):
+        # The low bit of every symbol is the sync vector
+        for _message in [('K1ABC', 'FN42', 37), ('G0ABC', 'IO91', 10), ('ZZ9ZZZ', 'RR99', 60)]:
+            _symbols = self.encoder.encode(*_message)
+            self.assertEqual(len(_symbols), 162)
+            self.assertEqual(tuple(_s & 1 for _s in _symbols), WSPREncoder._sync)
+            self.assertTrue(all(0 <= _s <= 3 for _s in _symbols))
+
+    def test_order(self):
+        self.assertEqual(len(WSPREncoder._order), 162)
+        self.assertEqual(sorted(WSPREncoder._order), list(range(162)))
+        self.assertEqual(WSPREncoder._order[0:4], [0, 128, 64, 32])
+
+    def test_cache(self):
+        # The same message, however written, is encoded once
+        _first = self.encoder.encode('K1ABC', 'FN42', 37)
+        self.assertIs(self.encoder.encode(' k1abc ', 'fn42', '37'), _first)
+        self.assertEqual((self.encoder.misses, self.encoder.hits), (1, 1))
+
+    def test_least_recent(self):
+        self.encoder.cacheSize = 2
+        self.encoder.encode('K1ABC', 'FN42', 37)
+        self.encoder.encode('G0ABC', 'IO91', 10)
+        self.encoder.encode('K1ABC', 'FN42', 37)
+        self.encoder.encode('W1AW', 'FN31', 30) # the G0ABC message goes
+        self.assertEqual(self.encoder.misses, 3)
+        self.encoder.encode('K1ABC', 'FN42', 37)
+        self.assertEqual(self.encoder.misses, 3)
+        self.encoder.encode('G0ABC', 'IO91', 10)
+        self.assertEqual(self.encoder.misses, 4)
+
+    def test_many(self):
+        _out = self.encoder.encodeMany([('K1ABC', 'FN42', 37), ('K1ABC', 'FN42', 38)])
+        self.assertEqual(_out[0], reference)
+        self.assertTrue(isinstance(_out[1], ValueError))
+        self.assertEqual(self.encoder.check('K1ABC', 'FN42', 37), None)
+        self.assertEqual(self.encoder.check('K1ABC', 'FN42', 38), str(_out[1]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Intel HEX images, and firmware updates against the simulated bootloader
+"""
+
+import binascii
+import os
+import unittest
+from wsprtx.firmware import FirmwareUpdate, IntelHex, SimBootloader
+
+# The Intel HEX records of data at an address, 16 bytes a line, and the end
+def hexRecords(address, data, end = True):
+    _lines = []
+    for _n in range(0, len(data), 16):
+        _a = address + _n
+        _rec = bytearray([len(data[_n:_n + 16]), _a >> 8 & 0xFF, _a & 0xFF, 0]) + data[_n:_n + 16]
+        _rec.append(-sum(_rec) & 0xFF)
+        _lines.append(':' + binascii.hexlify(bytes(_rec)).decode('ascii').upper())
+    if end:
+        _lines.append(':00000001FF')
+    return _lines
+
+class TestIntelHex(unittest.TestCase):
+    def test_parse(self):
+        _image = IntelHex([':10010000214601360121470136007EFE09D2190140',
+                           ':100110002146017E17C20001FF5F16002148011928',
+                           ':00000001FF'])
+        self.assertEqual(_image.ranges, [(0x100, 0x120)])
+        self.assertEqual(_image.size, 32)
+        self.assertEqual(_image.end, 0x120)
+        self.assertEqual(_image.data[0x100:0x104], bytearray(b'\x21\x46\x01\x36'))
+        self.assertEqual(_image.data[0:0x100], bytearray(b'\xff' * 0x100)) # no data is erased flash
+
+    def test_extended(self):
+        # An extended linear address moves the records after it
+        _image = IntelHex([':020000040001F9', ':0100000055AA', ':00000001FF'], limit = 0x20000)
+        self.assertEqual(_image.ranges, [(0x10000, 0x10001)])
+
+    def test_pages(self):
+        _image = IntelHex(hexRecords(0x70, bytearray(range(0x20))))
+        _pages = list(_image.pages(128))
+        self.assertEqual([_a for _a, _p in _pages], [0, 128]) # the data crosses a page
+        self.assertEqual(len(_pages[1][1]), 128)
+        self.assertEqual(_pages[1][1][0:0x10], bytearray(range(0x10, 0x20)))
+        self.assertEqual(_pages[1][1][0x10:], bytearray(b'\xff' * 0x70))
+
+    def test_bad(self):
+        for _lines, _why in [([':10010000214601360121470136007EFE09D2190141', ':00000001FF'], 'checksum'),
+                             ([':0201000021', ':00000001FF'], 'length'),
+                             (['10010000214601360121470136007EFE09D2190140'], 'not a HEX record'),
+                             ([':1001000021460136012147013600ZZFE09D2190140'], 'hex digits'),
+                             ([':0100000055AA'], 'no end of file'),
+                             ([':0100000655A4', ':00000001FF'], 'record type')]:
+            with self.assertRaises(ValueError) as e:
+                IntelHex(_lines)
+            self.assertIn(_why, str(e.exception))
+        with self.assertRaises(ValueError):
+            IntelHex(hexRecords(0xFF0, bytearray(32)), limit = 0x1000) # beyond the memory
+
+# Each update is run against a SimBootloader on a pseudo terminal, as
+# it would be against a device on a serial port
+class TestFirmwareUpdate(unittest.TestCase):
+    def setUp(self):
+        if not hasattr(os, 'openpty'):
+            self.skipTest('no pseudo terminals')
+        self.image = IntelHex(hexRecords(0, bytearray((_n * 7) & 0xFF for _n in range(1000))))
+        self.sims = []
+
+    def tearDown(self):
+        for _sim in self.sims:
+            _sim.stop()
+
+    def sim(self, *args, **kwargs):
+        _sim = SimBootloader(*args, **kwargs)
+        _sim.start()
+        self.sims.append(_sim)
+        return _sim
+
+    def test_update(self):
+        _sim = self.sim('01017')
+        _progress = []
+        _r = FirmwareUpdate(_sim.name, self.image, progress = lambda *args: _progress.append(args)).run()
+        self.assertTrue(_r['ok'], _r['error'])
+        self.assertEqual(_r['product'], '01017')
+        self.assertEqual(_r['pages'], 8)
+        self.assertEqual(_sim.writes, 8)
+        self.assertEqual(_sim.flash[0:self.image.end], self.image.data)
+        self.assertEqual(_sim.flash[self.image.end:1024], bytearray(b'\xff' * (1024 - self.image.end)))
+        self.assertEqual(_r['crc'], _r['crc_read'])
+        self.assertEqual([_p[1] for _p in _progress], ['write'] * 8 + ['verify'] * 8)
+        self.assertEqual(_progress[-1][2:4], (1024, 1024))
+
+    def test_several(self):
+        _sims = [self.sim('01012'), self.sim('01017')]
+        _results = FirmwareUpdate.runAll([FirmwareUpdate(_s.name, self.image) for _s in _sims])
+        self.assertEqual([_r['ok'] for _r in _results], [True, True])
+        for _sim in _sims:
+            self.assertEqual(_sim.flash[0:self.image.end], self.image.data)
+
+    def test_signature(self):
+        # A device reporting itself as a 1017, with some other processor
+        _sim = self.sim('01017', target = {'signature': b'\x1e\x95\x14', 'page': 128, 'flash': 32256})
+        _r = FirmwareUpdate(_sim.name, self.image).run()
+        self.assertFalse(_r['ok'])
+        self.assertIn('signature 1e9514', _r['error'])
+        self.assertEqual(_sim.writes, 0)
+
+    def test_unknown(self):
+        _sim = self.sim('09999')
+        _r = FirmwareUpdate(_sim.name, self.image).run()
+        self.assertFalse(_r['ok'])
+        self.assertIn('unknown device 09999', _r['error'])
+        self.assertEqual(_sim.writes, 0)
+
+    def test_too_big(self):
+        _sim = self.sim('01012')
+        _r = FirmwareUpdate(_sim.name, IntelHex(hexRecords(32240, bytearray(32)))).run()
+        self.assertFalse(_r['ok'])
+        self.assertIn('room for 32256', _r['error'])
+        self.assertEqual(_sim.writes, 0)
+
+    def test_verify(self):
+        # Every page written has a bad byte, so none reads back the same
+        _sim = self.sim('01012', corrupt = 1.0)
+        _r = FirmwareUpdate(_sim.name, self.image).run()
+        self.assertFalse(_r['ok'])
+        self.assertIn('8 page(s) did not verify, first at 0x0000', _r['error'])
+        self.assertNotEqual(_r['crc'], _r['crc_read'])
+
+    def test_timeout(self):
+        # The bootloader takes longer to write a page than the update waits
+        _sim = self.sim('01012', delay = 1.5)
+        _r = FirmwareUpdate(_sim.name, self.image).run()
+        self.assertFalse(_r['ok'])
+        self.assertEqual(_r['error'], 'bootloader did not answer')
+        self.assertNotIn('pages', _r)
@@ -0,0 +1,217 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+GPS statistics, the host clock against GPS time, and the sky coverage map
+"""
+
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from wsprtx import gps
+from wsprtx.gps import ClockOffset, GPSStats, SkyCoverage
+from wsprtx.metrics import Metrics
+from wsprtx.model import Model
+
+class TestGPSStats(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self._monotonic = gps.monotonic
+        gps.monotonic = lambda: self.now
+        self.stats = GPSStats(windows = (5, 3))
+
+    def tearDown(self):
+        gps.monotonic = self._monotonic
+
+    def test_windows(self):
+        for _snr in [10, 20, 30, 40, 50, 60]:
+            self.stats.sample(7, _snr)
+        _sat = self.stats.satellite(7)
+        # Each window holds the last reports, however many came before
+        self.assertEqual(_sat[3], {'count': 3, 'mean': 50.0, 'min': 40, 'max': 60,
+                                   'p10': 40, 'p50': 50, 'p90': 60})
+        self.assertEqual(_sat[5], {'count': 5, 'mean': 40.0, 'min': 20, 'max': 60,
+                                   'p10': 20, 'p50': 40, 'p90': 60})
+        self.assertEqual(self.stats.satellite(8), {})
+
+    def test_clamped(self):
+        self.stats.sample(1, -5)
+        self.stats.sample(1, 150)
+        self.assertEqual(self.stats.satellite(1)[3]['min'], 0)
+        self.assertEqual(self.stats.satellite(1)[3]['max'], 99)
+
+    def test_lock(self):
+        self.now += 30
+        self.stats.lock(True)
+        self.assertEqual(self.stats.ttff, 30)
+        self.now += 60
+        self.stats.lock(True) # still locked
+        self.stats.lock(False)
+        self.now += 10
+        self.stats.lock(True)
+        self.assertEqual(self.stats.ttff, 10) # from the loss
+        self.now += 20
+        _sum = self.stats.summary()
+        self.assertEqual(_sum['lock_losses'], 1)
+        self.assertEqual(_sum['lock_seconds'], 20)
+        self.assertEqual(_sum['lock_uptime'], round(80 / 120.0, 4))
+        self.assertTrue(_sum['locked'])
+
+    def test_export(self):
+        self.stats.sample(12, 30)
+        self.now += 5
+        self.stats.lock(True)
+        _m = Metrics()
+        self.stats.export(_m)
+        self.assertEqual(_m.get('gps_locked'), 1)
+        self.assertEqual(_m.get('gps_ttff_seconds'), 5)
+        self.assertEqual(_m.get('gps_snr_mean', {'prn': 12, 'window': '3'}), 30)
+        self.assertIn('wspr_gps_snr_mean{prn="12",window="3"} 30.0', _m.text().split('\n'))
+        self.assertIn('# HELP wspr_gps_locked GPS position lock (1 = locked)', _m.text().split('\n'))
+
+class TestClockOffset(unittest.TestCase):
+    def setUp(self):
+        self.clock = ClockOffset(window = 4, tolerance = 1.0)
+        self.day = 1600000000 - 1600000000 % 86400 # a midnight
+
+    def test_empty(self):
+        self.assertEqual(self.clock.summary(), {'offset': None, 'jitter': None, 'last': None,
+                                                'samples': 0, 'window': 0, 'good_for_wspr': None})
+        _m = Metrics()
+        self.clock.export(_m)
+        self.assertEqual(_m.text(), Metrics().text())
+
+    def test_smallest(self):
+        # Delays only make a sample late, so the smallest is the offset
+        for _late in [0.25, 0.125, 0.5, 0.25]:
+            self.clock.sample('12:00:00', self.day + 43200 + _late)
+        self.assertEqual(self.clock.offset, 0.125)
+        self.assertAlmostEqual(self.clock.jitter, math.sqrt(0.07421875 / 4), 6)
+        _sum = self.clock.summary()
+        self.assertEqual((_sum['last'], _sum['samples'], _sum['window']), (0.25, 4, 4))
+        self.assertTrue(_sum['good_for_wspr'])
+
+    def test_window(self):
+        # Only the last few samples count
+        self.clock.sample('12:00:00', self.day + 43200 - 3)
+        for _n in range(4):
+            self.clock.sample('12:00:0{}'.format(_n), self.day + 43200 + _n + 0.5)
+        self.assertEqual(self.clock.offset, 0.5)
+        self.assertEqual(self.clock.jitter, 0)
+        self.assertEqual(self.clock.count, 5)
+
+    def test_midnight(self):
+        # The host and GPS either side of midnight
+        self.clock.sample('23:59:59', self.day + 86400 + 0.5)
+        self.assertEqual(self.clock.offset, 1.5)
+        self.clock.sample('00:00:01', self.day + 86400 - 1.0)
+        self.assertEqual(self.clock.offset, -2.0)
+        self.assertFalse(self.clock.summary()['good_for_wspr'])
+
+    def test_bad(self):
+        for _gtm in ['', '12:00', 'aa:bb:cc', '12:00:00:00']:
+            self.clock.sample(_gtm, self.day)
+        self.assertEqual(self.clock.count, 0)
+        self.assertEqual(self.clock.offset, None)
+
+    def test_export(self):
+        self.clock.sample('06:00:00', self.day + 21600.03)
+        _m = Metrics()
+        self.clock.export(_m)
+        self.assertEqual(_m.get('clock_offset_seconds'), 0.03)
+        self.assertEqual(_m.get('clock_jitter_seconds'), 0)
+        self.assertEqual(_m.get('clock_samples_total'), 1)
+
+# A port holding lines already received, at a slow baud rate
+class SlowPort(object):
+    baudrate = 100
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def in_waiting(self):
+        return len(self.data)
+
+    def read(self, n = 1):
+        _b = self.data[0:n]
+        self.data = self.data[n:]
+        return _b
+
+    def close(self):
+        pass
+
+class TestStamp(unittest.TestCase):
+    def test_late(self):
+        # A line is stamped with when it began to arrive, less the bytes queued behind it
+        _model = Model(None, False)
+        _model.attach('slow', SlowPort(b'{GTM} 1:2\r\n12345678'))
+        _before = time.time()
+        self.assertEqual(_model.readPort(), '{GTM} 1:2')
+        _after = time.time()
+        # 9 bytes, the line end and 8 bytes waiting, 10 bits each
+        _late = (9 + 2 + 8) * 10.0 / SlowPort.baudrate
+        self.assertTrue(_before - _late - 0.01 <= _model.stamp[1] <= _after - _late + 0.01)
+
+# A stream keeping what is written to it
+class Lines(list):
+    def write(self, text):
+        self.append(text)
+
+class TestSkyCoverage(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self.sky = SkyCoverage(os.path.join(self._scratch, 'sky.dat'))
+
+    def tearDown(self):
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def test_cells(self):
+        self.assertEqual(self.sky.cell(0, 0), 0)
+        self.assertEqual(self.sky.cell(359, 0), 35)
+        self.assertEqual(self.sky.cell(365, 15), 36) # azimuth wraps
+        self.assertEqual(self.sky.cell(10, 90), 8 * 36 + 1) # the zenith is in the top row
+        self.assertEqual(self.sky.cell(0, -3), 0)
+        self.assertEqual(self.sky.bounds(8 * 36 + 1), (10, 80))
+
+    def test_add(self):
+        self.assertEqual(self.sky.mean(0), None)
+        self.sky.add(123, 45, 30)
+        self.sky.add(127, 49, 40)
+        self.sky.add(300, 10, 20)
+        _c = self.sky.cell(120, 40)
+        self.assertEqual(self.sky.count[_c], 2)
+        self.assertEqual(self.sky.mean(_c), 35.0)
+        # Only the cells added to since the last look are drawn again
+        self.assertEqual(self.sky.changed(), set([_c, self.sky.cell(300, 10)]))
+        self.assertEqual(self.sky.changed(), set())
+
+    def test_saved(self):
+        self.sky.add(123, 45, 30)
+        self.assertTrue(self.sky.dirty)
+        self.sky.save()
+        self.assertFalse(self.sky.dirty)
+        _again = SkyCoverage(self.sky.filename)
+        _again.load()
+        _c = self.sky.cell(123, 45)
+        self.assertEqual(_again.mean(_c), 30.0)
+        self.assertEqual(len(_again.changed()), _again.cells) # all drawn, once loaded
+        self.assertEqual(os.listdir(self._scratch), ['sky.dat'])
+
+    def test_bad_file(self):
+        with open(self.sky.filename, 'wb') as _f:
+            _f.write(b'WSPRSKY1' + b'short')
+        _stderr = sys.stderr
+        sys.stderr = Lines()
+        try:
+            self.sky.load()
+            _said = sys.stderr
+        finally:
+            sys.stderr = _stderr
+        self.assertEqual(len(_said), 1)
+        self.assertIn('not loaded', _said[0])
+        self.assertEqual(len(self.sky.count), self.sky.cells) # still an empty map
+        self.assertEqual(self.sky.mean(0), None)
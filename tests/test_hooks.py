@@ -0,0 +1,165 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Local hooks run on changes on the device
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from wsprtx.hooks import Hooks
+from wsprtx.metrics import Metrics
+
+# A stream keeping what is written to it
+class Lines(list):
+    def write(self, text):
+        self.append(text)
+
+# The parts of a Controller the Hooks look at
+class Port(object):
+    portName = '/dev/ttyUSB0'
+
+class HookController(object):
+    def __init__(self):
+        self.state = {'DCS': 'K1ABC', 'DL4': 'FN42', 'DNM': 'Beacon', 'TBN': '06'}
+        self.model = Port()
+        self.metrics = Metrics()
+
+# A hook command appending its event, and the line it was given, to a file
+record = ('import os, sys, time\n'
+          'time.sleep(float(sys.argv[2]))\n'
+          'with open(sys.argv[1], "a") as f:\n'
+          '    f.write(os.environ["WSPR_EVENT"] + " " + sys.stdin.read())\n')
+
+class TestHooks(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self.out = os.path.join(self._scratch, 'events')
+        self._vc = HookController()
+        self.hooks = None
+
+    def tearDown(self):
+        if self.hooks is not None:
+            self.hooks.close()
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def make(self, hooks):
+        self.hooks = Hooks(self._vc, hooks)
+        return self.hooks
+
+    def command(self, delay = 0):
+        return [sys.executable, '-c', record, self.out, str(delay)]
+
+    def events(self):
+        if not os.path.exists(self.out):
+            return []
+        with open(self.out) as _f:
+            return [(_l.split(' ', 1)[0], json.loads(_l.split(' ', 1)[1])) for _l in _f]
+
+    def until(self, done, timeout = 10):
+        _end = time.time() + timeout
+        while not done() and time.time() < _end:
+            time.sleep(0.02)
+        return done()
+
+    def test_rules(self):
+        for _hook in [{'events': ['*']}, {'events': ['*'], 'command': ['true'], 'pipe': '/tmp/x'},
+                      {'events': 'mode', 'command': ['true']}, {'events': ['boot'], 'command': ['true']}]:
+            with self.assertRaises(ValueError):
+                Hooks(self._vc, [_hook])
+        _h = Hooks(self._vc, [{'command': 'notify'}])
+        self.assertEqual((_h.hooks[0]['command'], _h.hooks[0]['events']), (['notify'], ['*']))
+
+    def test_events(self):
+        # Changes fire events, the first report of a mode does not
+        _h = self.make([{'events': ['*'], 'command': self.command()}])
+        _fired = []
+        _h.fire = lambda event, data: _fired.append((event, data))
+        for _code, _data in [('CCM', 'W'), ('CCM', 'W'), ('TON', 'T'), ('TON', 'F'), ('GLC', 'T'), ('GLC', 'F'),
+                             ('GLC', 'T'), ('CCM', 'S'), ('TFQ', '1')]:
+            _h.message(_code, _data)
+        self.assertEqual(_fired, [('tx_start', {'band': '06'}), ('tx_end', {'band': '06'}), ('lock_lost', {}),
+                                  ('lock_regained', {}), ('mode', {'from': 'W', 'to': 'S'})])
+
+    def test_command(self):
+        # The command gets the event on its standard input, and in WSPR_EVENT
+        _h = self.make([{'events': ['tx_start', 'tx_end'], 'command': self.command()}])
+        _h.message('TON', 'T')
+        _h.message('GLC', 'F') # not wanted
+        _h.message('TON', 'F')
+        self.assertTrue(self.until(lambda: len(self.events()) == 2))
+        _h.close()
+        _events = self.events()
+        self.assertEqual([_e[0] for _e in _events], ['tx_start', 'tx_end']) # in order
+        self.assertEqual(_events[0][1]['event'], 'tx_start')
+        self.assertEqual(_events[0][1]['data'], {'band': '06'})
+        self.assertEqual(_events[0][1]['device'], {'call': 'K1ABC', 'locator': 'FN42', 'name': 'Beacon',
+                                                  'port': '/dev/ttyUSB0'})
+        self.assertEqual(self._vc.metrics.get('hooks_run_total'), 2)
+
+    def test_failed(self):
+        _h = self.make([{'events': ['*'], 'command': [sys.executable, '-c', 'import sys; sys.exit(3)']}])
+        _h.fire('connected', {})
+        self.assertTrue(self.until(lambda: self._vc.metrics.get('hooks_failed_total') == 1))
+
+    def test_timeout(self):
+        _stderr = sys.stderr
+        sys.stderr = _said = Lines()
+        try:
+            _h = self.make([{'events': ['*'], 'command': self.command(30), 'timeout': 0.3}])
+            _h.fire('connected', {})
+            self.assertTrue(self.until(lambda: self._vc.metrics.get('hooks_failed_total') == 1))
+        finally:
+            sys.stderr = _stderr
+        self.assertEqual(_said, ['Hook for connected killed after 0.3 seconds\n'])
+        self.assertEqual(self.events(), [])
+
+    def test_rate(self):
+        # Runs over the rate are dropped, and counted
+        _h = self.make([{'events': ['*'], 'command': self.command(), 'rate': 2}])
+        for _n in range(5):
+            _h.fire('connected', {'n': _n})
+        self.assertEqual(self._vc.metrics.get('hooks_dropped_total'), 3)
+        self.assertTrue(self.until(lambda: len(self.events()) == 2))
+
+    def test_queue(self):
+        # A hook that holds up its events does not hold up the caller
+        _h = self.make([{'events': ['*'], 'command': self.command(1), 'rate': 1000}])
+        _h.queueLimit = 4
+        _start = time.time()
+        for _n in range(10):
+            _h.fire('connected', {})
+        self.assertLess(time.time() - _start, 0.5)
+        # the queue holds 4, and a worker may have taken one already
+        self.assertIn(self._vc.metrics.get('hooks_dropped_total'), [5, 6])
+
+    def test_close(self):
+        # The events already fired are run before the workers stop
+        _h = self.make([{'events': ['*'], 'command': self.command(0.3)}])
+        _h.fire('disconnected', {})
+        _h.close()
+        self.assertEqual([_e[0] for _e in self.events()], ['disconnected'])
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), 'no named pipes')
+    def test_pipe(self):
+        _pipe = os.path.join(self._scratch, 'events.fifo')
+        os.mkfifo(_pipe)
+        _h = self.make([{'events': ['lock_lost'], 'pipe': _pipe}])
+        # Dropped while nothing reads the pipe
+        _h.fire('lock_lost', {})
+        self.assertTrue(self.until(lambda: self._vc.metrics.get('hooks_failed_total') == 1))
+        _fd = os.open(_pipe, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            _h.fire('lock_lost', {})
+            self.assertTrue(self.until(lambda: self._vc.metrics.get('hooks_run_total') == 1))
+            _line = os.read(_fd, 4096).decode()
+        finally:
+            os.close(_fd)
+        self.assertEqual(json.loads(_line)['event'], 'lock_lost')
+
+if __name__ == '__main__':
+    unittest.main()
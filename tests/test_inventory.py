@@ -0,0 +1,275 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The inventory of the devices seen
+"""
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from wsprtx.controller import Controller
+from wsprtx.inventory import Inventory, StateCache
+from wsprtx.model import DeviceState, Model
+from wsprtx.views import RecordingView
+from simdevice import SimDevice
+
+# A device state, as a device reports its identity and settings
+def deviceState(**values):
+    _state = DeviceState()
+    _values = {'FPN': '1017', 'FHV': '1', 'FHR': '2', 'FSV': '1', 'FSR': '3',
+               'DNM': 'Beacon', 'DCS': 'W1OT', 'DL4': 'FN42'}
+    _values.update(values)
+    for _code, _data in _values.items():
+        _state.update(_code, _data)
+    return _state
+
+class TestInventory(unittest.TestCase):
+    def setUp(self):
+        self.scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self.inventory = Inventory(os.path.join(self.scratch, 'inventory.db'))
+
+    def tearDown(self):
+        self.inventory.close()
+        shutil.rmtree(self.scratch)
+
+    def export(self, format, **conditions):
+        self.out = os.path.join(self.scratch, 'inventory.' + format)
+        with open(self.out, 'w') as _f:
+            return self.inventory.export(_f, format, **conditions)
+
+    def test_identity(self):
+        # The USB serial when the adapter has one, else the port; never the name
+        _state = deviceState()
+        self.assertEqual(Inventory.identity(_state, ('0403', '6001', 'A1B2'), 'COM3'), '1017-1.2-usb:A1B2')
+        self.assertEqual(Inventory.identity(_state, ('1a86', '7523', ''), 'COM3'), '1017-1.2-port:COM3')
+        self.assertEqual(Inventory.identity(_state, None, '/dev/ttyUSB0'), '1017-1.2-port:/dev/ttyUSB0')
+        self.assertEqual(Inventory.identity(deviceState(DNM = 'Balloon'), None, 'COM3'), '1017-1.2-port:COM3')
+
+    def test_update(self):
+        _id = self.inventory.update(deviceState(), [6, 7, 6], 'COM3', ('0403', '6001', 'A1B2'))
+        _rows = list(self.inventory.query())
+        self.assertEqual(len(_rows), 1)
+        _r = _rows[0]
+        self.assertEqual(_r['id'], _id)
+        self.assertEqual((_r['product'], _r['firmware'], _r['firmware_rev']), ('1017', 1, 3))
+        self.assertEqual((_r['name'], _r['call'], _r['locator'], _r['port']), ('Beacon', 'W1OT', 'FN42', 'COM3'))
+        self.assertEqual(_r['usb_serial'], 'A1B2')
+        self.assertEqual(_r['filters'], [6, 7])
+        self.assertEqual(_r['config']['call'], 'W1OT')
+        self.assertEqual(_r['first_seen'], _r['last_seen'])
+
+    def test_again(self):
+        # A device seen again keeps its row, and when it was first seen
+        self.inventory.update(deviceState(), [6, 7], 'COM3', ('0403', '6001', 'A1B2'))
+        _first = list(self.inventory.query())[0]['first_seen']
+        time.sleep(0.01)
+        _id = self.inventory.update(deviceState(DNM = 'Balloon', FSR = '4'), [8], 'COM4', ('0403', '6001', 'A1B2'))
+        _rows = list(self.inventory.query())
+        self.assertEqual(len(_rows), 1)
+        self.assertEqual(_rows[0]['id'], _id)
+        self.assertEqual((_rows[0]['name'], _rows[0]['port'], _rows[0]['firmware_rev']), ('Balloon', 'COM4', 4))
+        self.assertEqual(_rows[0]['filters'], [8])
+        self.assertEqual(_rows[0]['first_seen'], _first)
+        self.assertTrue(_rows[0]['last_seen'] > _first)
+
+    def test_two_unnamed(self):
+        # Two units without USB serials, on two ports, are two rows
+        self.inventory.update(deviceState(DNM = ''), [], 'COM3', ('1a86', '7523', ''))
+        self.inventory.update(deviceState(DNM = ''), [], 'COM4', ('1a86', '7523', ''))
+        self.assertEqual([_r['port'] for _r in self.inventory.query()], ['COM3', 'COM4'])
+
+    def test_seen(self):
+        _id = self.inventory.update(deviceState(), [], 'COM3', ('0403', '6001', 'A1B2'))
+        _before = list(self.inventory.query())[0]['last_seen']
+        time.sleep(0.01)
+        self.inventory.seen(_id, 'COM5')
+        _r = list(self.inventory.query())[0]
+        self.assertEqual(_r['port'], 'COM5')
+        self.assertTrue(_r['last_seen'] > _before)
+
+    def test_query(self):
+        self.inventory.update(deviceState(FSV = '0', FSR = '9'), [6], 'COM1')
+        self.inventory.update(deviceState(FSV = '1', FSR = '2', DCS = 'K1ABC'), [7], 'COM2')
+        self.inventory.update(deviceState(FSV = '1', FSR = '3'), [6, 7], 'COM3')
+        self.inventory.update(deviceState(FPN = '1028', FSV = '0', FSR = '1'), [], 'COM4')
+        def ports(**conditions):
+            return [_r['port'] for _r in self.inventory.query(**conditions)]
+        self.assertEqual(ports(product = '1017'), ['COM1', 'COM2', 'COM3'])
+        self.assertEqual(ports(product = '1017', firmwareBelow = (1, 3)), ['COM1', 'COM2'])
+        self.assertEqual(ports(firmwareBelow = (1, 0)), ['COM1', 'COM4'])
+        self.assertEqual(ports(lpf = 6), ['COM1', 'COM3'])
+        self.assertEqual(ports(lpf = 7, call = 'W1OT'), ['COM3'])
+        self.assertEqual(ports(call = 'K1ABC'), ['COM2'])
+        self.assertEqual(ports(since = time.time() + 60), [])
+        self.assertEqual(ports(until = time.time() + 60), ['COM1', 'COM2', 'COM3', 'COM4'])
+
+    def test_export_csv(self):
+        self.inventory.update(deviceState(), [6, 7], 'COM3')
+        self.inventory.update(deviceState(FPN = '1028'), [], 'COM4')
+        self.assertEqual(self.export('csv', bands = ['160m'] * 6 + ['40m', '30m'], product = '1017'), 1)
+        with open(self.out) as _f:
+            _rows = list(csv.reader(_f))
+        self.assertEqual(_rows[0], Inventory.fields)
+        self.assertEqual(len(_rows), 2)
+        _r = dict(zip(_rows[0], _rows[1]))
+        self.assertEqual(_r['filters'], '40m 30m')
+        self.assertTrue(_r['last_seen'].endswith('Z'))
+        self.assertEqual(json.loads(_r['config'])['locator'], 'FN42')
+
+    def test_export_json(self):
+        self.inventory.update(deviceState(), [6], 'COM3')
+        self.inventory.update(deviceState(), [], 'COM4')
+        self.assertEqual(self.export('json'), 2)
+        with open(self.out) as _f:
+            _rows = json.load(_f)
+        self.assertEqual([_r['port'] for _r in _rows], ['COM3', 'COM4'])
+        self.assertEqual(_rows[0]['filters'], [6])
+
+    def test_empty(self):
+        self.assertEqual(self.export('json'), 0)
+        with open(self.out) as _f:
+            self.assertEqual(json.load(_f), [])
+
+class TestStateCache(unittest.TestCase):
+    def setUp(self):
+        self.scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self.filename = os.path.join(self.scratch, 'devices.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.scratch)
+
+    def test_round_trip(self):
+        _cache = StateCache(self.filename)
+        self.assertEqual(_cache.get('COM3'), None)
+        _state = deviceState()
+        _state.update('OBD', '06 E')
+        _state.update('GTM', '12:00:00') # not a setting
+        _cache.put('COM3', '1017-1.2-port:COM3', _state)
+        _cache.save()
+        _entry = StateCache(self.filename).get('COM3')
+        self.assertEqual(_entry['identity'], '1017-1.2-port:COM3')
+        self.assertEqual(_entry['state']['DCS'], 'W1OT')
+        self.assertEqual(_entry['state']['OBD06'], '06 E')
+        self.assertFalse('GTM' in _entry['state'])
+        self.assertTrue(abs(_entry['saved'] - time.time()) < 60)
+        self.assertEqual(os.listdir(self.scratch), ['devices.json'])
+
+    def test_unchanged(self):
+        # Nothing is written unless something was put
+        StateCache(self.filename).save()
+        self.assertFalse(os.path.exists(self.filename))
+
+    def test_unreadable(self):
+        with open(self.filename, 'w') as _f:
+            _f.write('{not json')
+        _cache = StateCache(self.filename)
+        self.assertEqual(_cache.get('COM3'), None)
+        _cache.put('COM3', 'x', deviceState())
+        _cache.save()
+        self.assertEqual(StateCache(self.filename).get('COM3')['identity'], 'x')
+
+    def test_moved(self):
+        # A device is found on another port by the serial number of its USB adapter
+        _cache = StateCache(self.filename)
+        _cache.put('COM3', '1017-1.2-usb:A1B2', deviceState(DCS = 'OLD'))
+        time.sleep(0.01)
+        _cache.put('COM4', '1017-1.2-usb:A1B2', deviceState(DCS = 'NEW'))
+        _cache.put('COM5', '1017-1.2-port:COM5', deviceState(DCS = 'OTHER'))
+        self.assertEqual(_cache.get('COM9', ('0403', '6001', 'A1B2'))['state']['DCS'], 'NEW')
+        self.assertEqual(_cache.get('COM5', ('1a86', '7523', ''))['state']['DCS'], 'OTHER')
+        self.assertEqual(_cache.get('COM9', ('0403', '6001', 'ZZZZ')), None)
+
+    def test_ports(self):
+        # Only the most recently saved ports are kept
+        _cache = StateCache(self.filename)
+        _cache.ports = 2
+        for _port in ['COM1', 'COM2', 'COM3']:
+            _cache.put(_port, _port, deviceState())
+            time.sleep(0.01)
+        self.assertEqual(_cache.get('COM1'), None)
+        self.assertEqual(_cache.get('COM3')['identity'], 'COM3')
+        self.assertEqual(len(_cache._entries), 2)
+
+# A simulated device that is a different unit: its hardware revision differs
+class OtherUnit(SimDevice):
+    settings = dict(SimDevice.settings, FHR = '3', DCS = 'K1ABC')
+
+# The settings read back in one batch; FLP is left out, as its answers are one per filter
+settings = [_c for _c in Model.statusCodes if _c != 'FLP']
+
+class TestWarmStart(unittest.TestCase):
+    def setUp(self):
+        self.scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self._vc = None
+
+    def tearDown(self):
+        if self._vc is not None:
+            self._vc.shutdown()
+        shutil.rmtree(self.scratch)
+
+    def controller(self, device):
+        if self._vc is not None:
+            self._vc.shutdown()
+        self._vc = Controller(self.scratch)
+        self._vc.view = self.view = RecordingView()
+        self._vc.model = Model(self._vc, False)
+        self._vc.model.attach('sim', device)
+        return self._vc
+
+    def calls(self, name):
+        return [_args for _command, _args in self.view.calls if _command == name]
+
+    def seen(self):
+        # A device is seen, and its settings kept when the program ends
+        _vc = self.controller(SimDevice(0))
+        self.assertTrue(_vc.readSettings(settings))
+        _vc.shutdown()
+        self._vc = None
+
+    def test_nothing_saved(self):
+        self.controller(SimDevice(0)).warmStart()
+        self.assertEqual(self.calls('setStale'), [])
+        self.assertEqual(self.calls('setCall'), [])
+
+    def test_stale(self):
+        # The settings last known are shown at once, and each is fresh once reported again
+        self.seen()
+        _device = SimDevice(0)
+        _device._v['DCS'] = 'W1OT' # changed since
+        _vc = self.controller(_device)
+        _vc.warmStart()
+        self.assertEqual(self.calls('setCall'), [('N0CALL',)])
+        self.assertEqual(self.calls('setLocation'), [('JO65',)])
+        _stale, _saved = self.calls('setStale')[-1]
+        self.assertTrue(set(['DCS', 'DL4', 'FPN', 'OBD06']) <= _stale)
+        self.assertTrue(abs(_saved - time.time()) < 60)
+        self.assertEqual(_device.sent, []) # nothing written to the device
+        _vc.readSettings(['FPN', 'FHV', 'FHR', 'DCS'])
+        self.assertEqual(self.calls('setCall')[-1], ('W1OT',))
+        _stale = self.calls('setStale')[-1][0]
+        self.assertFalse('DCS' in _stale or 'FPN' in _stale)
+        self.assertTrue('DL4' in _stale)
+        self.assertEqual(self.calls('clearSettings'), [])
+        _vc.readSettings(settings)
+        self.assertEqual(self.calls('setStale')[-1][0], set())
+        self.assertTrue(all(_a[0:1] == '[' and _a[6:7] == 'G' for _a in _device.sent)) # only asked
+
+    def test_other_unit(self):
+        # Another device on the port: the settings shown are cleared once its identity is known
+        self.seen()
+        _vc = self.controller(OtherUnit(0))
+        _vc.warmStart()
+        self.assertEqual(self.calls('setCall'), [('N0CALL',)])
+        _vc.readSettings(['FPN', 'FHV', 'FHR'])
+        self.assertEqual(len(self.calls('clearSettings')), 1)
+        self.assertEqual(self.calls('setStale')[-1][0], set())
+        self.assertIn(('The device on sim is not the one last seen there',), self.calls('logInsert'))
+        _vc.readSettings(['DCS'])
+        self.assertEqual(self.calls('setCall')[-1], ('K1ABC',))
+
+if __name__ == '__main__':
+    unittest.main()
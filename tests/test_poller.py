@@ -0,0 +1,140 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Polls of the fields the device does not report by itself
+"""
+
+import unittest
+from wsprtx import poller
+from wsprtx.metrics import Metrics
+from wsprtx.poller import Poller
+
+# The parts of a Controller the Poller looks at
+class Link(object):
+    up = True
+
+class Port(object):
+    def __init__(self):
+        self.sent = []
+        self.lines = 0
+
+    def waiting(self):
+        return self.lines
+
+    def sendPort(self, code, data):
+        self.sent.append('[{}] {}'.format(code, data))
+
+class PollController(object):
+    def __init__(self):
+        self.watchdog = Link()
+        self.script = None
+        self.state = {}
+        self.model = Port()
+        self.metrics = Metrics()
+
+class TestPoller(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self._monotonic = poller.monotonic
+        poller.monotonic = lambda: self.now
+        self._vc = PollController()
+        self.sent = self._vc.model.sent
+
+    def tearDown(self):
+        poller.monotonic = self._monotonic
+
+    def step(self, p, seconds, answer = None):
+        # Checks every tenth of a second, the device answering at once
+        for _n in range(int(round(seconds * 10))):
+            self.now += 0.1
+            _before = len(self.sent)
+            p.check()
+            for _line in self.sent[_before:]:
+                if answer is not None:
+                    p.heard(_line[1:4], answer(_line[1:4]))
+
+    def test_nothing_chosen(self):
+        _p = Poller(self._vc)
+        self.step(_p, 60)
+        self.assertEqual((self.sent, _p.sent), ([], 0))
+
+    def test_held(self):
+        # Nothing while transmitting, with lines waiting, with a script, or with the link down
+        _p = Poller(self._vc, {'MVC': 10})
+        for _hold, _undo in [(lambda: self._vc.state.update(TON = 'T'), lambda: self._vc.state.update(TON = 'F')),
+                             (lambda: setattr(self._vc.model, 'lines', 3), lambda: setattr(self._vc.model, 'lines', 0)),
+                             (lambda: setattr(self._vc, 'script', 'running'), lambda: setattr(self._vc, 'script', None)),
+                             (lambda: setattr(self._vc.watchdog, 'up', False), lambda: setattr(self._vc.watchdog, 'up', True))]:
+            _hold()
+            self.step(_p, 5)
+            self.assertEqual(self.sent, [])
+            _undo()
+        self.step(_p, 1)
+        self.assertEqual(self.sent, ['[MVC] G'])
+        self.assertEqual(self._vc.metrics.get('polls_total'), 1)
+
+    def test_intervals(self):
+        # Unchanged answers double the interval up to the longest, a change brings the next poll forward
+        _p = Poller(self._vc, {'MVC': 40})
+        _volts = ['5.01']
+        self.step(_p, 1, lambda code: _volts[0])
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(_p._interval['MVC'], 40)
+        self.step(_p, 40, lambda code: _volts[0])
+        self.assertEqual(len(self.sent), 2)
+        _volts[0] = '4.80'
+        self.step(_p, 40, lambda code: _volts[0]) # a change, then every 10 s
+        self.assertEqual(_p._interval['MVC'], 10)
+        self.assertEqual(len(self.sent), 3)
+        self.step(_p, 10.1, lambda code: _volts[0]) # unchanged: 20 s
+        self.assertEqual((len(self.sent), _p._interval['MVC']), (4, 20))
+        self.step(_p, 20.1, lambda code: _volts[0]) # then the longest
+        self.assertEqual((len(self.sent), _p._interval['MVC']), (5, 40))
+        self.step(_p, 39, lambda code: _volts[0])
+        self.assertEqual(len(self.sent), 5)
+
+    def test_fastest(self):
+        # A short longest interval is not brought below the fastest
+        _p = Poller(self._vc, {'MVC': 4})
+        _p.heard('MVC', '5.00')
+        _p.heard('MVC', '4.90')
+        self.assertEqual(_p._interval['MVC'], Poller.fastest)
+
+    def test_reported(self):
+        # A field the device reports by itself is never asked for
+        _p = Poller(self._vc, {'TFQ': 10})
+        for _n in range(30):
+            _p.heard('TFQ', '{}'.format(_n % 2))
+            self.step(_p, 1)
+        self.assertEqual(self.sent, [])
+        _p.heard('XYZ', '1') # not polled, ignored
+        self.assertFalse('XYZ' in _p._due)
+
+    def test_unanswered(self):
+        # Asked again after the same interval until answered
+        _p = Poller(self._vc, {'MVC': 10})
+        self.step(_p, 25)
+        self.assertEqual(len(self.sent), 3)
+
+    def test_rate_cap(self):
+        # However many fields, the polls keep within their share of the line
+        _fields = dict(('F{:02d}'.format(_n), 1) for _n in range(40))
+        _p = Poller(self._vc, _fields, share = 0.05)
+        self.step(_p, 100, lambda code: '{:08.1f}'.format(self.now))
+        _chars = len(self.sent) * (9 + 8 + 8)
+        _rate = 0.05 * Poller.baud / 10.0
+        self.assertLessEqual(_chars, _rate * 100 + _rate * 4)
+        self.assertGreater(_chars, _rate * 100 * 0.8)
+        # and every field gets its turn
+        self.assertEqual(set(_l[1:4] for _l in self.sent), set(_fields))
+
+    def test_burst(self):
+        # The budget saved while idle is capped
+        _p = Poller(self._vc, dict(('F{:02d}'.format(_n), 1) for _n in range(40)), share = 0.05)
+        self.now += 3600
+        _p.check()
+        self.assertLessEqual(len(self.sent) * (9 + 8 + 12), 0.05 * Poller.baud / 10.0 * 4)
+        self.assertGreater(len(self.sent), 0)
+
+if __name__ == '__main__':
+    unittest.main()
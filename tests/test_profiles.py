@@ -0,0 +1,104 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Profiles, and the smallest set of writes that applies one
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from wsprtx.controller import Controller
+from wsprtx.model import DeviceState, Model
+from wsprtx.profiles import Profiles
+from simdevice import SimDevice
+
+# A device state, as the device reports it
+def deviceState(values, bands = (6, 7), nbands = 16):
+    _state = DeviceState()
+    for _code, _data in values.items():
+        _state.update(_code, _data)
+    for _b in range(nbands):
+        _state.update('OBD', '{0:02d} {1}'.format(_b, 'E' if _b in bands else 'D'))
+    return _state
+
+class TestWrites(unittest.TestCase):
+    def setUp(self):
+        self.state = deviceState({'DCS': 'W1OT', 'DL4': 'FN42', 'DPD': '23', 'OTP': '00120',
+                                  'OSM': 'W', 'OLC': 'G', 'OPW': 'N', 'DNM': 'Beacon'})
+
+    def test_same(self):
+        _profile = {'call': 'W1OT', 'locator': 'FN42', 'power': 23, 'pause': 120, 'boot': 'W',
+                    'locmode': 'G', 'powermode': 'N', 'name': 'Beacon', 'bands': [6, 7]}
+        self.assertEqual(Profiles.writes(_profile, self.state, 16), [])
+
+    def test_diff(self):
+        # Only the fields that differ are written, numbers compared as numbers
+        _profile = {'call': 'k1abc', 'power': '23', 'pause': 480, 'bands': [7, 8], 'locmode': 'manual'}
+        self.assertEqual(Profiles.writes(_profile, self.state, 16),
+                         [('DCS', 'S K1ABC'), ('OLC', 'S M'), ('OBD', 'S 06 D'), ('OBD', 'S 08 E'),
+                          ('OTP', 'S 00480')])
+
+    def test_left_out(self):
+        # Fields not in the profile are left alone
+        self.assertEqual(Profiles.writes({}, self.state, 16), [])
+        self.assertEqual(Profiles.writes({'name': 'Balloon'}, self.state, 16), [('DNM', 'S Balloon')])
+
+    def test_unknown(self):
+        # Settings the device has not reported are written
+        self.assertEqual(Profiles.writes({'call': 'W1OT', 'bands': []}, DeviceState(), 2),
+                         [('DCS', 'S W1OT'), ('OBD', 'S 00 D'), ('OBD', 'S 01 D')])
+
+    def test_snapshot(self):
+        # A profile taken from the device applies to it with nothing to write
+        _profile = Profiles.fromState(self.state, 16)
+        self.assertEqual(_profile, {'call': 'W1OT', 'locator': 'FN42', 'power': 23, 'pause': 120,
+                                    'boot': 'W', 'locmode': 'G', 'powermode': 'N', 'name': 'Beacon',
+                                    'bands': [6, 7]})
+        self.assertEqual(Profiles.writes(_profile, self.state, 16), [])
+
+class TestFile(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+
+    def tearDown(self):
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def test_saved(self):
+        _file = os.path.join(self._scratch, 'profiles.json')
+        _profiles = Profiles(_file)
+        self.assertEqual(_profiles.names(), [])
+        _profiles.put('balloon', {'call': 'K1ABC', 'bands': [6]})
+        _profiles.put('home', {'call': 'W1OT'})
+        _again = Profiles(_file)
+        self.assertEqual(_again.names(), ['balloon', 'home'])
+        self.assertEqual(_again.get('balloon'), {'call': 'K1ABC', 'bands': [6]})
+        self.assertEqual(_again.get('missing'), None)
+        self.assertEqual(os.listdir(self._scratch), ['profiles.json'])
+
+class TestApply(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self._vc = Controller(self._scratch)
+        self._vc.model = Model(self._vc, False)
+        self._device = SimDevice(0)
+        self._vc.model.attach('sim', self._device)
+
+    def tearDown(self):
+        self._vc.shutdown()
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def test_apply(self):
+        _profile = {'call': 'K1ABC', 'locator': 'FN42', 'power': 37, 'bands': [6, 8]}
+        _t = self._vc.applyProfile(_profile)
+        self.assertEqual(sorted(_t.results.values()), ['ok'] * 5)
+        _writes = [_c for _c in self._device.sent if _c[6:7] == 'S']
+        self.assertEqual(_writes, ['[DCS] S K1ABC', '[DL4] S FN42', '[DPD] S 37',
+                                   '[OBD] S 07 D', '[OBD] S 08 E', '[CSE] S'])
+        self.assertEqual(self._device._v['DCS'], 'K1ABC')
+        self.assertEqual(self._device._bands[8], 'E')
+        # Applied again, the settings are read, and nothing is written or saved
+        del self._device.sent[:]
+        _t = self._vc.applyProfile(_profile)
+        self.assertEqual(_t.writes(), [])
+        self.assertEqual([_c for _c in self._device.sent if _c[6:7] == 'S'], [])
@@ -0,0 +1,171 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Expect style command scripts
+"""
+
+import shutil
+import tempfile
+import unittest
+from wsprtx import script
+from wsprtx.controller import Controller
+from wsprtx.model import Model
+from wsprtx.script import Script
+from simdevice import SimDevice
+
+# A Model that keeps what is sent, and a Controller holding it
+class SentModel(object):
+    def __init__(self):
+        self.sent = []
+
+    def sendBatch(self, commands):
+        self.sent.append(list(commands))
+
+    def sendPort(self, code, data):
+        self.sent.append(data)
+
+class SentController(object):
+    def __init__(self):
+        self.model = SentModel()
+
+class TestParse(unittest.TestCase):
+    def test_steps(self):
+        _steps = Script.parse(['# a comment', '', 'send dcs K1ABC', 'send [CCM] G',
+                               'expect DCS K1ABC', 'timeout 2', 'expect ccm', 'wait 0.5'])
+        self.assertEqual([_s[0:2] for _s in _steps], [('send', 3), ('send', 4), ('expect', 5), ('expect', 7), ('wait', 8)])
+        self.assertEqual(_steps[0][3:], ('DCS', 'K1ABC'))
+        self.assertEqual(_steps[1][3:], ('', '[CCM] G'))
+        self.assertEqual((_steps[2][3], _steps[2][4].pattern, _steps[2][5]), ('DCS', 'K1ABC', 5.0))
+        self.assertEqual((_steps[3][3], _steps[3][4].pattern, _steps[3][5]), ('CCM', '', 2.0))
+        self.assertEqual(_steps[4][3], 0.5)
+
+    def test_repeat(self):
+        _steps = Script.parse(['repeat 2', 'send CCM G', 'repeat 3', 'wait 0', 'end', 'end', 'send DPD G'])
+        self.assertEqual([_s[0] for _s in _steps], ['send', 'wait', 'wait', 'wait'] * 2 + ['send'])
+        self.assertEqual(Script.parse(['repeat 0', 'send CCM G', 'end']), [])
+
+    def test_errors(self):
+        for _lines, _error in [(['jump 3'], 'line 1: unknown step "jump"'),
+                               (['send CCM G', 'end'], 'line 2: end without repeat'),
+                               (['repeat 2', 'send CCM G'], 'repeat without end'),
+                               (['expect'], 'line 1: expect needs a three letter code'),
+                               (['expect CCMX'], 'line 1: expect needs a three letter code'),
+                               (['wait soon'], 'line 1: '),
+                               (['repeat many'], 'line 1: '),
+                               (['expect CCM ('], 'line 1: bad pattern: ')]:
+            with self.assertRaises(ValueError) as _e:
+                Script.parse(_lines)
+            self.assertTrue(str(_e.exception).startswith(_error), str(_e.exception))
+
+    def test_limit(self):
+        # Too many steps is found before the copies are made
+        with self.assertRaises(ValueError) as _e:
+            Script.parse(['repeat 1000', 'repeat 1000', 'repeat 1000', 'send CCM G', 'end', 'end', 'end'])
+        self.assertEqual(str(_e.exception), 'line 6: more than 100000 steps')
+        with self.assertRaises(ValueError):
+            Script.parse(['send CCM G'] * 4, limit = 3)
+        self.assertEqual(len(Script.parse(['repeat 3', 'send CCM G', 'end'], limit = 3)), 3)
+
+class TestRun(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self._monotonic = script.monotonic
+        script.monotonic = lambda: self.now
+        self._vc = SentController()
+        self.said = []
+
+    def tearDown(self):
+        script.monotonic = self._monotonic
+
+    def script(self, lines):
+        return Script(self._vc, lines, self.said.append)
+
+    def statuses(self, s):
+        return [(_r[0], _r[2]) for _r in s.results]
+
+    def test_batch(self):
+        # Everything up to a wait goes out at once, raw text in its place
+        _s = self.script(['send DCS K1ABC', 'send [CCM] G', 'send DPD G', 'wait 1', 'send CCM G'])
+        self.assertTrue(_s.poll())
+        self.assertEqual(self._vc.model.sent, [[('DCS', 'K1ABC')], '[CCM] G\r\n', [('DPD', 'G')]])
+        self.assertTrue(_s.poll())
+        self.now += 0.5
+        self.assertTrue(_s.poll())
+        self.assertEqual(len(self._vc.model.sent), 3)
+        self.now += 0.6
+        self.assertTrue(_s.poll())
+        self.assertEqual(self._vc.model.sent[3:], [[('CCM', 'G')]])
+        self.assertFalse(_s.poll())
+        self.assertTrue(_s.ok)
+        self.assertEqual(self.statuses(_s), [(1, 'sent'), (2, 'sent'), (3, 'sent'), (4, 'ok'), (5, 'sent')])
+        self.assertEqual(len(self.said), 5)
+
+    def test_expects(self):
+        # Matched in any order, each by a different message
+        _s = self.script(['send CCM G', 'expect DPD 2.', 'expect CCM W', 'expect CCM', 'wait 0', 'send DPD G'])
+        _s.poll()
+        _s.feed('CCM', 'W')
+        self.now += 0.25
+        _s.feed('CCM', 'N')
+        _s.feed('DPD', '23')
+        while _s.poll():
+            pass
+        self.assertTrue(_s.ok)
+        self.assertEqual(self.statuses(_s), [(1, 'sent'), (2, 'ok'), (3, 'ok'), (4, 'ok'), (5, 'ok'), (6, 'sent')])
+        self.assertEqual(_s.results[1][3], 0.25)
+        self.assertEqual(_s.results[2][3], 0.0)
+
+    def test_held(self):
+        # A wait holds the steps after it until the expects before it are answered
+        _s = self.script(['expect CCM', 'wait 0', 'send DPD G'])
+        _s.feed('CCM', 'W') # before the expect is issued, not counted
+        _s.poll()
+        self.now += 1
+        self.assertTrue(_s.poll())
+        self.assertEqual(self._vc.model.sent, [])
+        _s.feed('CCM', 'N')
+        _s.poll()
+        _s.poll()
+        self.assertEqual(self._vc.model.sent, [[('DPD', 'G')]])
+
+    def test_timeout(self):
+        # The first expect not answered in time stops the script
+        _s = self.script(['timeout 2', 'expect CCM', 'expect DPD', 'wait 0', 'send CCM G'])
+        _s.poll()
+        _s.feed('DPD', '23')
+        self.now += 1.5
+        self.assertTrue(_s.poll())
+        self.now += 1
+        self.assertFalse(_s.poll())
+        self.assertFalse(_s.ok)
+        self.assertEqual(self.statuses(_s), [(3, 'ok'), (2, 'timeout')])
+        self.assertEqual(self._vc.model.sent, [])
+        self.assertFalse(_s.poll())
+
+class TestDevice(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self._vc = Controller(self._scratch)
+        self._vc.model = Model(self._vc, False)
+        self.device = SimDevice(0)
+        self._vc.model.attach('sim', self.device)
+
+    def tearDown(self):
+        self._vc.shutdown()
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def test_run(self):
+        _s = Script(self._vc, ['send DCS S K1ABC', 'expect DCS K1ABC', 'wait 0',
+                               'send [DPD] G', 'expect DPD \\d+'])
+        self.assertTrue(self._vc.runScript(_s))
+        self.assertEqual([_r[2] for _r in _s.results], ['sent', 'ok', 'ok', 'sent', 'ok'])
+        self.assertTrue('[DCS] S K1ABC' in self.device.sent)
+        self.assertTrue('[DPD] G' in self.device.sent)
+
+    def test_fail(self):
+        _s = Script(self._vc, ['timeout 0.3', 'send DCS G', 'expect DCS NOCALL'])
+        self.assertFalse(self._vc.runScript(_s))
+        self.assertEqual(_s.results[-1][2], 'timeout')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Runs the program for simulated days, watching for growth
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    import tracemalloc # memory measurements in soak tests (Python 3 only)
+except ImportError:
+    tracemalloc = None
+from wsprtx import gui
+from wsprtx.common import monotonic
+from wsprtx.controller import Controller
+from wsprtx.model import Model
+from wsprtx.widgets import TipManager
+from simdevice import SimDevice
+
+src = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src')
+
+###############################################################################
+##### Soak test
+###############################################################################
+#
+# The program runs for weeks at a time, so anything that grows with
+# each message will eventually hurt.  A soak test runs the Controller
+# (and the View, when there is a display) against a SimDevice whose
+# clock is stepped as fast as the program can keep up, so a month of
+# device time passes in minutes.  Every so often it measures:
+#   memory   - the Python memory in use (traced, where tracemalloc exists)
+#   widgets  - the Tk widgets, and the canvas items and listbox lines in them
+#   tips     - the tooltips registered
+#   fds      - the open file descriptors
+# The first third of the run is allowed for warming up (the statistics
+# windows filling).  After that, nothing should keep growing, so a line
+# is fitted to each measure over the rest of the run, and its slope (the
+# growth in a day) must be below a small rate.  A leak of a few bytes a
+# message is several times the memory rate, the transmission log's
+# index (a few kB a day) is well within it.
+#
+class Soak(object):
+    """
+    Runs the program against a simulated device for days of device time
+
+        run(days,step,samples) - runs and reports, returns True if nothing grew
+        measure()              - the current measurements {name:value}
+        grew()                 - the measures that kept growing, with their growth in a day
+        close()                - shuts the Controller down
+    """
+    # How much each measure may grow in a day of device time, after the warm up.
+    # The samples kept are themselves a few hundred bytes each.
+    allowed = {'memory': 16384, 'widgets': 0.5, 'items': 5, 'lines': 1, 'tips': 0.5, 'fds': 0.5}
+
+    def __init__(self, controller, device, output = None):
+        self._vc = controller
+        self.device = device
+        self.output = output or (lambda text: None)
+        self.samples = []
+
+    def close(self):
+        self._vc.shutdown()
+        self._vc.model.portName = 'None'
+
+    def _tk(self):
+        # Widgets, canvas items and listbox lines, counted from the root down
+        _widgets = _items = _lines = 0
+        _todo = [self._vc.view.root]
+        while len(_todo) > 0:
+            _w = _todo.pop()
+            _widgets += 1
+            if isinstance(_w, gui.Canvas):
+                _items += len(_w.find_all())
+            elif isinstance(_w, gui.Listbox):
+                _lines += _w.size()
+            _todo.extend(_w.winfo_children())
+        return _widgets, _items, _lines
+
+    def measure(self):
+        _m = {'day': round((self.device.now - self._start) / 86400.0, 2)}
+        _m['memory'] = tracemalloc.get_traced_memory()[0] if tracemalloc is not None else None
+        if isinstance(self._vc.view, gui.View):
+            _m['widgets'], _m['items'], _m['lines'] = self._tk()
+            _m['tips'] = len(TipManager.get(self._vc.view.root).registry)
+        else:
+            _m['widgets'] = _m['items'] = _m['lines'] = _m['tips'] = None
+        for _d in ['/proc/self/fd', '/dev/fd']:
+            if os.path.isdir(_d):
+                _m['fds'] = len(os.listdir(_d))
+                break
+        else:
+            _m['fds'] = None
+        return _m
+
+    @staticmethod
+    def slope(points):
+        """The slope of the least squares line through the (x, y) points"""
+        _n = float(len(points))
+        _mx = sum(_x for _x, _y in points) / _n
+        _my = sum(_y for _x, _y in points) / _n
+        _sxx = sum((_x - _mx) ** 2 for _x, _y in points)
+        if _sxx == 0:
+            return 0.0
+        return sum((_x - _mx) * (_y - _my) for _x, _y in points) / _sxx
+
+    def grew(self):
+        """The measures that kept growing after the warm up, as {name:(first, last, growth a day)}"""
+        _after = self.samples[len(self.samples) // 3:]
+        _grew = {}
+        if len(_after) < 3:
+            return _grew
+        for _k, _rate in self.allowed.items():
+            if self.samples[-1].get(_k) is None:
+                continue
+            _slope = self.slope([(_s['day'], _s[_k]) for _s in _after])
+            if _slope > _rate:
+                _grew[_k] = (_after[0][_k], _after[-1][_k], _slope)
+        return _grew
+
+    def run(self, days = 30, step = 30, samples = 60):
+        _steps = int(days * 86400 / step)
+        _every = max(1, _steps // samples)
+        _view = isinstance(self._vc.view, gui.View)
+        self._start = self.device.now
+        if tracemalloc is not None:
+            tracemalloc.start()
+        _began = monotonic()
+        self.output('  day   memory  widgets    items    lines     tips      fds')
+        try:
+            for _n in range(_steps + 1):
+                self.device.advance(step)
+                while True:
+                    self._vc.step()
+                    if self._vc.model.waiting() < 1:
+                        break
+                self._vc.view.update()
+                if not _view:
+                    self._vc.sky.changed() # taken by the View's sky plot, when there is one
+                if _n % _every == 0:
+                    _m = self.measure()
+                    self.samples.append(_m)
+                    self.output('{:5.1f} '.format(_m['day']) + ' '.join(
+                        '{:>8}'.format('-' if _m[_k] is None else _m[_k])
+                        for _k in ['memory', 'widgets', 'items', 'lines', 'tips', 'fds']))
+        finally:
+            if tracemalloc is not None:
+                tracemalloc.stop()
+        _grew = self.grew()
+        self.output('{} days of device time in {:.0f} seconds{}'.format(
+            days, monotonic() - _began, '' if _view else ' (without the View)'))
+        for _k in sorted(_grew):
+            self.output('{} grew from {} to {}, {:.1f} a day'.format(_k, *_grew[_k]))
+        return len(_grew) == 0
+
+# A soak short enough for every run of the tests (seconds): three days
+# of device time in minute steps, a day to warm up and two after it, in
+# which a leak of a few bytes a message shows.  A longer soak is run
+# with the days wanted in WSPR_SOAK_DAYS, e.g. WSPR_SOAK_DAYS=30.
+class TestSoak(unittest.TestCase):
+    days = float(os.environ.get('WSPR_SOAK_DAYS', 3))
+    step = 60
+
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_soak')
+        self._cwd = os.getcwd()
+        self._vc = Controller(self._scratch) # away from the real files
+        self._model = Model(self._vc, False)
+        self._vc.model = self._model
+        if gui.ttk is not None:
+            try:
+                os.chdir(src) # where the View's images are
+                self._vc.view = gui.View(self._vc)
+            except gui.TclError:
+                pass # no display, so without the View
+        # The simulated device is stepped by the soak test, not by the clock
+        self._device = SimDevice(0)
+        self._model.attach('sim', self._device)
+        self._vc.view.setPort(self._model.portName, True)
+        self._vc.view.serialOK(True)
+
+    def tearDown(self):
+        if isinstance(self._vc.view, gui.View):
+            self._vc.view.root.destroy()
+        os.chdir(self._cwd)
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def test_soak(self):
+        _report = []
+        _test = Soak(self._vc, self._device, _report.append)
+        try:
+            _ok = _test.run(self.days, self.step)
+        finally:
+            _test.close()
+        self.assertTrue(_ok, '\n'.join(_report))
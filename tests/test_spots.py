@@ -0,0 +1,143 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Summaries of the spots of our callsigns in a WSPRnet archive
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from wsprtx import spots
+from wsprtx.spots import SpotArchive
+
+day = 1622505600 # 2021-06-01
+
+# Rows as WSPRnet writes them
+def row(n, seconds, reporter, grid, snr, call, locator, band):
+    return '{},{},{},{},{},14.097100,{},{},23,0,0,0,{},2.2.2,0'.format(
+        n, day + seconds, reporter, grid, snr, call, locator, band)
+
+rows = [row(1, 0, 'G4ABC', 'IO91', -20, 'K1ABC', 'FN42', 14),
+        row(2, 120, 'DL1XYZ', 'JO62', -25, 'K1ABC', 'FN42', 14),
+        row(3, 240, 'W1AW', 'FN31', 5, 'K1ABC', 'FN42', 14),
+        row(4, 240, 'W1AW', 'FN31', -10, 'W9XYZ', 'EN52', 14),
+        row(5, 86400, 'VK2AB', 'QF56', -50, 'K1ABC', 'FN42', 7),
+        row(6, 86400, 'JA1AA', 'PM95', 40, 'N0CALL', 'EM00', 7),
+        row(7, 86400, 'ZL1AB', 'RF70', -20, 'K1ABC', 'bad', 7),
+        'not,a,spot',
+        row(9, 90000, 'G4ABC', 'IO91', 'x', 'K1ABC', 'FN42', 14)]
+
+class TestDistance(unittest.TestCase):
+    def test_distance(self):
+        self.assertEqual(SpotArchive.distance('FN42', 'fn42'), 0)
+        self.assertEqual(SpotArchive._lonlat('FN42'), (-71, 42.5))
+        self.assertAlmostEqual(SpotArchive.distance('JJ00', 'JJ10'), 2 * 111.19, delta = 0.5) # 2 degrees at the equator
+        self.assertEqual(SpotArchive.distance('FN42', 'IO91'), SpotArchive.distance('IO91', 'FN42'))
+        self.assertAlmostEqual(SpotArchive.distance('AA00', 'RR99'), 179 * 111.19, delta = 5) # pole to pole, nearly
+        self.assertEqual(SpotArchive.distance('FN42', 'ZZ00'), None)
+        self.assertEqual(SpotArchive.distance('FN4', 'FN42'), None)
+
+class TestSpotArchive(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self._chunkSize = SpotArchive.chunkSize
+        self._monotonic = spots.monotonic
+
+    def tearDown(self):
+        SpotArchive.chunkSize = self._chunkSize
+        spots.monotonic = self._monotonic
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def archive(self, name, lines, end = '\n'):
+        _data = ('\n'.join(lines) + end).encode('ascii')
+        _name = os.path.join(self._scratch, name)
+        if name.endswith('.gz'):
+            with gzip.open(_name, 'wb') as _f:
+                _f.write(_data)
+        elif name.endswith('.zip'):
+            with zipfile.ZipFile(_name, 'w', zipfile.ZIP_DEFLATED) as _z:
+                _z.writestr('wsprspots.csv', _data)
+        else:
+            with open(_name, 'wb') as _f:
+                _f.write(_data)
+        return _name
+
+    def test_calls(self):
+        with self.assertRaises(ValueError):
+            SpotArchive('x.csv', [' ', ''])
+        self.assertEqual(SpotArchive('x.csv', ['k1abc ', 'K1ABC', 'w9xyz']).calls, ['K1ABC', 'W9XYZ'])
+
+    def test_summary(self):
+        _s = SpotArchive(self.archive('spots.csv', rows), ['k1abc'], workers = 1).summarise()
+        self.assertEqual((_s['rows'], _s['spots'], _s['calls']), (9, 5, ['K1ABC']))
+        self.assertEqual(_s['by_call'], {'K1ABC': 5})
+        self.assertEqual(_s['days'], {'2021-06-01': 3, '2021-06-02': 2})
+        _20 = _s['bands']['20m']
+        self.assertEqual(_20['spots'], 3)
+        self.assertEqual(_20['snr'], {'min': -25, 'median': -20, 'p90': 5, 'max': 5,
+                                      'histogram': {'-25': 1, '-20': 1, '5': 1}})
+        self.assertEqual(_20['km']['max'], round(SpotArchive.distance('FN42', 'JO62')))
+        self.assertEqual(sum(_20['km']['histogram'].values()), 3)
+        _40 = _s['bands']['40m']
+        self.assertEqual(_40['spots'], 2)
+        self.assertEqual(_40['snr']['min'], -40) # below the first bin
+        self.assertEqual(sum(_40['km']['histogram'].values()), 1) # one locator not known
+
+    def test_unnamed_band(self):
+        _s = SpotArchive(self.archive('spots.csv', [row(1, 0, 'G4ABC', 'IO91', -20, 'K1ABC', 'FN42', 99)]),
+                         ['K1ABC'], workers = 1).summarise()
+        self.assertEqual(list(_s['bands']), ['99 MHz'])
+
+    def test_last_line(self):
+        # The last row counts without a line end after it
+        _s = SpotArchive(self.archive('spots.csv', rows[0:3], end = ''), ['K1ABC'], workers = 1).summarise()
+        self.assertEqual((_s['rows'], _s['spots']), (3, 3))
+
+    def test_chunks(self):
+        # Rows cut across chunks are put together
+        _whole = SpotArchive(self.archive('spots.csv', rows * 20), ['K1ABC', 'W9XYZ'], workers = 1).summarise()
+        SpotArchive.chunkSize = 37
+        _cut = SpotArchive(self.archive('spots.csv', rows * 20), ['K1ABC', 'W9XYZ'], workers = 1).summarise()
+        for _k in ['rows', 'spots', 'by_call', 'bands', 'days']:
+            self.assertEqual(_cut[_k], _whole[_k], _k)
+        self.assertEqual(_cut['by_call'], {'K1ABC': 100, 'W9XYZ': 20})
+
+    def test_compressed(self):
+        _plain = SpotArchive(self.archive('spots.csv', rows), ['K1ABC'], workers = 1).summarise()
+        for _name in ['spots.csv.gz', 'spots.zip']:
+            _s = SpotArchive(self.archive(_name, rows), ['K1ABC'], workers = 1).summarise()
+            self.assertEqual((_s['rows'], _s['bands']), (_plain['rows'], _plain['bands']), _name)
+
+    @unittest.skipIf(spots.multiprocessing is None, 'no multiprocessing')
+    def test_workers(self):
+        # The same sums from worker processes
+        SpotArchive.chunkSize = 200
+        _name = self.archive('spots.csv', rows * 50)
+        _one = SpotArchive(_name, ['K1ABC'], workers = 1).summarise()
+        _two = SpotArchive(_name, ['K1ABC'], workers = 2).summarise()
+        for _k in ['rows', 'spots', 'by_call', 'bands', 'days']:
+            self.assertEqual(_two[_k], _one[_k], _k)
+
+    def test_progress(self):
+        self.now = 0.0
+        def tick():
+            self.now += 4
+            return self.now
+        spots.monotonic = tick
+        SpotArchive.chunkSize = 100
+        _shown = []
+        SpotArchive(self.archive('spots.csv', rows * 10), ['K1ABC'], workers = 1).summarise(
+            lambda rows, seconds: _shown.append((rows, seconds)))
+        self.assertGreater(len(_shown), 3)
+        self.assertTrue(all(_b[0] >= _a[0] and _b[1] - _a[1] >= 10 for _a, _b in zip(_shown, _shown[1:])))
+
+    def test_skipped(self):
+        # A chunk without the calls is only counted
+        self.assertEqual(SpotArchive._sum((('\n'.join(rows) + '\n').encode('ascii'), set([b'Q9QQQ']))),
+                         {'rows': 9, 'bands': {}, 'days': {}, 'calls': {}})
+
+if __name__ == '__main__':
+    unittest.main()
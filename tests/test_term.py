@@ -0,0 +1,187 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The curses View, drawn on a stand-in screen
+"""
+
+import unittest
+from wsprtx import term
+from wsprtx.term import TermView
+
+# The parts of curses the View uses, without a terminal
+class FakeCurses(object):
+    A_NORMAL = 0
+    A_BOLD = 1
+    A_REVERSE = 2
+    KEY_RESIZE = 410
+
+    class error(Exception):
+        pass
+
+    def __init__(self):
+        self.updates = 0
+
+    def has_colors(self):
+        return False
+
+    def curs_set(self, visibility):
+        pass
+
+    def doupdate(self):
+        self.updates += 1
+
+# A screen keeping the rows written to it
+class FakeScreen(object):
+    def __init__(self, height = 24, width = 60):
+        self.size = (height, width)
+        self.rows = {}
+        self.written = []
+        self.keys = []
+
+    def getmaxyx(self):
+        return self.size
+
+    def addstr(self, y, x, text, attr):
+        self.rows[y] = (text, attr)
+        self.written.append(y)
+
+    def clrtoeol(self):
+        pass
+
+    def noutrefresh(self):
+        pass
+
+    def clear(self):
+        self.rows = {}
+
+    def timeout(self, ms):
+        pass
+
+    def getch(self):
+        return self.keys.pop(0) if len(self.keys) > 0 else -1
+
+# A Controller keeping the buttons pressed
+class Pressed(list):
+    class model(object):
+        @staticmethod
+        def waiting():
+            return 0
+
+    def __getattr__(self, name):
+        return lambda: self.append(name)
+
+class TestTermView(unittest.TestCase):
+    def setUp(self):
+        self._curses = term.curses
+        term.curses = FakeCurses()
+        self.screen = FakeScreen()
+        self.pressed = Pressed()
+        self.view = TermView(self.pressed, self.screen)
+
+    def tearDown(self):
+        term.curses = self._curses
+
+    def text(self):
+        return [self.screen.rows[_y][0] for _y in sorted(self.screen.rows)]
+
+    def test_page(self):
+        self.view.setCall('K1ABC')
+        self.view.setLocation('FN42')
+        self.view.setPower('23')
+        self.view.setPositionSource('G')
+        self.view.setDevice('01017')
+        self.view.refresh()
+        _text = self.text()
+        self.assertEqual(len(_text), 24)
+        self.assertEqual(_text[0], ' WSPR TX Mini  port None not responding  -')
+        self.assertEqual(_text[2], ' Call K1ABC  locator FN42 (GPS)  power 23 dBm (-)')
+        self.assertEqual(_text[-1], TermView.keys)
+        self.assertEqual(self.screen.rows[23][1], FakeCurses.A_REVERSE)
+
+    def test_changed_rows(self):
+        # Only the rows that differ are written again
+        self.view.refresh()
+        self.assertEqual(len(self.screen.written), 24)
+        self.screen.written = []
+        self.view.setCall('') # no change
+        self.view.refresh()
+        self.assertEqual(self.screen.written, [])
+        self.assertEqual(term.curses.updates, 1)
+        self.view.setCall('K1ABC')
+        self.view.refresh()
+        self.assertEqual(self.screen.written, [2])
+
+    def test_bands(self):
+        # A bar for each band with a filter or enabled, and the pause
+        self.view.installLP(4)
+        self.view.setBandEnabled(6, True)
+        self.view.setActive(6, 'red')
+        self.view.setProgress(6, 161 // 2)
+        self.view.refresh()
+        _text = self.text()
+        self.assertEqual(_text[7], '  (40m)   [' + '.' * 30 + ']')
+        self.assertEqual(_text[8], '    20m > [' + '#' * 14 + '.' * 16 + ']')
+        self.assertEqual(_text[9], '  pause   [' + '.' * 30 + ']')
+        self.assertEqual(self.screen.rows[8][1], FakeCurses.A_BOLD)
+        self.view.setBandEnabled(6, False)
+        self.view.setPauseTime('120')
+        self.view.setProgress(-1, 30)
+        self.view.refresh()
+        self.assertEqual(self.text()[8], '  pause   [' + '#' * 22 + '.' * 8 + ']')
+
+    def test_log(self):
+        # The latest messages that fit, traced lines only when tracing
+        for _n in range(30):
+            self.view.logInsert('message {}'.format(_n))
+        self.view.traceInsert('not traced')
+        self.view.refresh()
+        _text = self.text()
+        self.assertEqual(_text[9], ' message 16')
+        self.assertEqual(_text[22], ' message 29')
+        self.screen.keys = [ord('t')]
+        self.view.update()
+        self.view.traceInsert('{TCC} 1')
+        self.view.refresh()
+        self.assertEqual(self.text()[22], ' {TCC} 1')
+
+    def test_clipped(self):
+        # Rows are cut to the width, and a short screen keeps the top
+        self.screen.size = (5, 20)
+        self.view.setStale(['DCS', 'OBD06'], 0)
+        self.view.refresh()
+        self.assertEqual(len(self.screen.rows), 5)
+        self.assertTrue(all(len(_t) <= 19 for _t in self.text()))
+        self.assertEqual(self.text()[0], ' WSPR TX -  port No')
+
+    def test_stale(self):
+        self.screen.size = (24, 120)
+        self.view.setStale(['DCS', 'OBD06'], 0)
+        self.view.refresh()
+        self.assertTrue(self.text()[0].endswith(': call, 20m band)'), self.text()[0])
+        self.view.setStale([])
+        self.view.refresh()
+        self.assertTrue(self.text()[0].endswith('not responding  -'))
+
+    def test_clock(self):
+        self.screen.size = (24, 120)
+        self.view.refresh()
+        self.view.setClockOffset({'offset': 0.0125})
+        self.view.refresh()
+        self.assertTrue(self.text()[4].endswith('host clock +0.013 s'), self.text()[4])
+
+    def test_keys(self):
+        self.screen.keys = [ord('w'), ord('g'), ord('x'), ord('e'), ord('z'), ord('q')]
+        while self.view.update():
+            pass
+        self.assertEqual(self.pressed, ['startPressed', 'startGenerator', 'stopPressed', 'saveSettingsPressed'])
+
+    def test_resize(self):
+        self.view.refresh()
+        self.screen.written = []
+        self.screen.keys = [FakeCurses.KEY_RESIZE]
+        self.view.update()
+        self.view.refresh()
+        self.assertEqual(len(self.screen.written), 24)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+How fast the Controller takes the device's lines, with each kind of View
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from wsprtx import gui
+from wsprtx.common import monotonic
+from wsprtx.controller import Controller
+from wsprtx.model import Model
+from wsprtx.views import NullView, RecordingView
+from wsprtx.widgets import InfoDialog
+from simdevice import SimDevice
+
+src = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src')
+
+# The Controller, on the lines a simulated device has ready, run as
+# drive() does.  The device's clock is stepped, not run, so each run
+# is given the same lines.
+def timeController(makeView, seconds = 600):
+    _scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+    _views = []
+    try:
+        _vc = Controller(_scratch) # away from the real files
+        _model = Model(_vc, False)
+        _vc.model = _model
+        _view = makeView(_vc)
+        _views.append(_view)
+        _vc.view = _view
+        _device = SimDevice(0)
+        _model.attach('sim', _device)
+        for _n in range(seconds):
+            _device.advance(1)
+        _start = monotonic()
+        while _model.waiting() > 0:
+            _vc.step()
+            _view.update()
+        _elapsed = monotonic() - _start
+        _lines = _device.lines
+        _vc.shutdown()
+        _model.portName = 'None'
+        return _lines, _elapsed
+    finally:
+        for _view in _views:
+            if isinstance(_view, gui.View):
+                _view.root.destroy()
+        shutil.rmtree(_scratch, ignore_errors = True)
+
+class TestViews(unittest.TestCase):
+    def test_recording(self):
+        _recording = RecordingView()
+        _lines, _elapsed = timeController(lambda controller: _recording)
+        self.assertGreater(_lines, 1000)
+        # Every line the device sent was taken, and the time shown
+        self.assertEqual(_recording.counts['setRxChars'], _lines)
+        self.assertGreater(_recording.counts['updateTime'], 0)
+
+    def test_null(self):
+        _lines, _elapsed = timeController(lambda controller: NullView())
+        self.assertGreater(_lines, 1000)
+
+# The GUI, with an info popup closed and then open: the popup has no
+# event loop of its own, so the port is read as fast with it open.
+class TestInfoDialog(unittest.TestCase):
+    def setUp(self):
+        if gui.ttk is None:
+            self.skipTest('no tkinter')
+        try:
+            gui.Tk().destroy()
+        except gui.TclError as e:
+            self.skipTest('no display ({})'.format(e))
+        self._cwd = os.getcwd()
+        os.chdir(src) # where the View's images are
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+
+    def view(self, controller, popup):
+        _view = gui.View(controller)
+        if popup:
+            InfoDialog.get(_view.root).show('Open while the device is read')
+            _view.root.update()
+        return _view
+
+    def test_popup(self):
+        _closed = min(timeController(lambda controller: self.view(controller, False))[1] for _n in range(2))
+        _lines, _open = timeController(lambda controller: self.view(controller, True))
+        self.assertGreater(_lines, 1000)
+        self.assertLess(_open, 2 * _closed + 0.5)
@@ -0,0 +1,151 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Setting writes, verified by the device's reports
+"""
+
+import shutil
+import tempfile
+import unittest
+from wsprtx.controller import Controller
+from wsprtx.model import Model
+from wsprtx.views import RecordingView
+from simdevice import SimDevice
+
+# A device that reports its own power, whatever is written
+class Stubborn(SimDevice):
+    def _say(self, code, data):
+        SimDevice._say(self, code, '12' if code == 'DPD' else data)
+
+# A device that takes a name, but does not report it
+class Quiet(SimDevice):
+    def _say(self, code, data):
+        if code != 'DNM':
+            SimDevice._say(self, code, data)
+
+# A View that sends what it is shown, as a Tk entry with a trace would
+class EchoView(RecordingView):
+    def __init__(self, controller):
+        RecordingView.__init__(self)
+        self._vc = controller
+
+    def setCall(self, call):
+        RecordingView.setCall(self, call)
+        self._vc.callUpdate(call)
+
+class TestTransaction(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self._vc = Controller(self._scratch)
+        self._vc.model = Model(self._vc, False)
+
+    def tearDown(self):
+        self._vc.shutdown()
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def attach(self, device):
+        self._vc.model.attach('sim', device)
+        return device
+
+    def test_ok(self):
+        _device = self.attach(SimDevice(0))
+        _t = self._vc.transaction()
+        _t.set('DCS', 'K1ABC')
+        _t.set('OBD', '03 E')
+        _t.set('OTP', '00480')
+        self.assertEqual(_t.commit(timeout = 2, wait = 0.5), {'DCS': 'ok', 'OBD03': 'ok', 'OTP': 'ok'})
+        self.assertEqual(_t.attempts, {'DCS': 1, 'OBD03': 1, 'OTP': 1})
+        self.assertEqual(_t.reported['OBD03'], '03 E')
+        # All in one batch
+        self.assertEqual([_l for _l in _device.sent if _l[6:7] == 'S'],
+                         ['[DCS] S K1ABC', '[OBD] S 03 E', '[OTP] S 00480'])
+
+    def test_mismatch(self):
+        # Written again until the tries run out, the other fields left alone
+        _device = self.attach(Stubborn(0))
+        _t = self._vc.transaction()
+        _t.set('DPD', '99')
+        _t.set('DCS', 'AB1C')
+        self.assertEqual(_t.commit(timeout = 2, wait = 0.5, tries = 3), {'DPD': 'mismatch', 'DCS': 'ok'})
+        self.assertEqual(_t.attempts, {'DPD': 3, 'DCS': 1})
+        self.assertEqual(_t.reported['DPD'], '12')
+        self.assertEqual(_device.sent.count('[DPD] S 99'), 3)
+
+    def test_timeout(self):
+        # Not answered, it is asked for rather than written again, until the deadline
+        _device = self.attach(Quiet(0))
+        _t = self._vc.transaction()
+        _t.set('DNM', 'Balloon')
+        _t.set('DCS', 'AB1C')
+        self.assertEqual(_t.commit(timeout = 1, wait = 0.3), {'DNM': 'timeout', 'DCS': 'ok'})
+        self.assertEqual(_t.attempts['DNM'], 1)
+        self.assertEqual(_device.sent.count('[DNM] S Balloon'), 1)
+        self.assertGreater(_device.sent.count('[DNM] G'), 0)
+
+    def test_start(self):
+        # From the main loop: started, then followed up as the messages are handled
+        _device = self.attach(SimDevice(0))
+        _t = self._vc.transaction()
+        _t.set('DCS', 'K1ABC')
+        _t.set('DPD', '37')
+        _t.start(timeout = 2, wait = 0.5)
+        self.assertEqual(_t.results, {'DCS': 'timeout', 'DPD': 'timeout'})
+        self.assertTrue(_t.poll())
+        _t.drop('DPD') # replaced by a newer write
+        self.assertEqual(_t.keys(), ['DCS'])
+        self.assertTrue(self._vc.pump(lambda: not _t.poll(), 2))
+        self.assertEqual(_t.results, {'DCS': 'ok'})
+        self.assertEqual(_device._v['DCS'], 'K1ABC')
+
+    def test_empty(self):
+        _device = self.attach(SimDevice(0))
+        _t = self._vc.transaction()
+        self.assertEqual(_t.commit(timeout = 1), {})
+        self.assertFalse(_t.poll())
+        self.assertEqual(_device.sent, [])
+
+# The settings entered in the View, written without waiting
+class TestWriteSettings(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self._vc = Controller(self._scratch)
+        self._vc.model = Model(self._vc, False)
+        self._vc.view = EchoView(self._vc)
+        self._device = SimDevice(0)
+        self._vc.model.attach('sim', self._device)
+        self._vc.readSettings(['DCS', 'DPD', 'CCM'])
+        del self._device.sent[:]
+
+    def tearDown(self):
+        self._vc.shutdown()
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def settle(self):
+        self._vc.pump(lambda: self._vc.checkWrites() or len(self._vc._writing) == 0, 3)
+
+    def test_written(self):
+        # Only what differs is written, and the result logged when it is confirmed
+        _t = self._vc.writeSettings([('DCS', 'N0CALL'), ('DPD', '37')])
+        self.assertEqual(_t.keys(), ['DPD'])
+        self.assertEqual(self._device.sent, ['[DPD] S 37'])
+        self.settle()
+        self.assertIn(('logInsert', ('Set power to 37',)), self._vc.view.calls)
+
+    def test_newest(self):
+        # A newer value of a field replaces the one still being verified
+        _first = self._vc.writeSettings([('DPD', '30')])
+        self._vc.writeSettings([('DPD', '33')])
+        self.assertEqual(_first.keys(), [])
+        self.settle()
+        self.assertEqual(self._device._v['DPD'], '33')
+
+    def test_no_echo(self):
+        # A callsign reported by the device is shown, and not written back
+        self._device._say('DCS', 'W1OT')
+        self._vc.pump(lambda: self._vc.model.waiting() < 1 and self._vc.state.get('DCS') == 'W1OT', 2)
+        self.assertIn(('setCall', ('W1OT',)), self._vc.view.calls)
+        self.assertEqual(self._device.sent, [])
+        self.assertEqual(self._device._v['CCM'], 'W')
+        # Entered in the View, it is
+        self._vc.callUpdate('K1ABC')
+        self.assertEqual(self._device.sent, ['[CCM] S N', '[DCS] S K1ABC'])
@@ -0,0 +1,99 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The local log of WSPR transmissions
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from wsprtx.controller import Controller
+from wsprtx.model import Model
+from wsprtx.txlog import TxLog
+from simdevice import SimDevice
+
+day = 86400
+
+class TestTxLog(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self.filename = os.path.join(self._scratch, 'txlog.dat')
+        self.log = TxLog(self.filename)
+        # Ten days, one transmission a day on 20m (band 6) and another on 30m (band 5)
+        for _d in range(10):
+            for _band in [5, 6]:
+                _start = 1600000000 + _d * day + _band * 120
+                self.log.add({'start': _start, 'end': _start + 110, 'band': _band, 'frequency': 1409712000 + _d,
+                              'call': 'K1ABC', 'locator': 'FN42', 'power': 37})
+
+    def tearDown(self):
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def test_query(self):
+        self.assertEqual(len(self.log), 20)
+        _all = list(self.log.query())
+        self.assertEqual([_r['band'] for _r in _all[0:4]], [5, 6, 5, 6])
+        self.assertEqual(_all[1], {'start': 1600000720.0, 'end': 1600000830.0, 'band': 6, 'frequency': 1409712000,
+                                   'call': 'K1ABC', 'locator': 'FN42', 'power': 37})
+        _20m = list(self.log.query(6, 1600000000 + 3 * day, 1600000000 + 6 * day))
+        self.assertEqual([_r['frequency'] - 1409712000 for _r in _20m], [3, 4, 5])
+        self.assertEqual(list(self.log.query(6, 1600000000 + 20 * day)), [])
+        self.assertEqual(list(self.log.query(99)), [])
+
+    def test_reopened(self):
+        # Stopped after writing a record, but not its index entry, then
+        # while writing another: the first is indexed, the second dropped
+        with open(self.filename, 'ab') as _f:
+            _f.write(TxLog._record.pack(1600000000 + 11 * day, 1600000000 + 11 * day + 110, 5, 0, b'', b'', 0))
+            _f.write(b'\0' * 10)
+        _log = TxLog(self.filename)
+        self.assertEqual(len(_log), 21)
+        self.assertEqual(len(list(_log.query(5))), 11)
+        _log.add({'start': 1600000000 + 12 * day, 'end': 1600000000 + 12 * day + 110, 'band': 5})
+        self.assertEqual(len(list(TxLog(self.filename).query(5))), 12)
+
+    def test_csv(self):
+        _out = io.StringIO() if str is not bytes else io.BytesIO()
+        self.assertEqual(self.log.export(_out, 'csv', band = 5, until = 1600000000 + 2 * day,
+                                         bands = ['160m', '80m', '60m', '40m', '30m', '30m']), 2)
+        _lines = _out.getvalue().splitlines()
+        self.assertEqual(_lines[0], 'start,end,band,frequency,call,locator,power')
+        self.assertEqual(_lines[1], '2020-09-13T12:36:40Z,2020-09-13T12:38:30Z,30m,14097120.0,K1ABC,FN42,37')
+
+    def test_json(self):
+        _out = io.StringIO() if str is not bytes else io.BytesIO()
+        self.assertEqual(self.log.export(_out, 'json', since = 1600000000 + 9 * day), 2)
+        _records = json.loads(_out.getvalue())
+        self.assertEqual([_r['band'] for _r in _records], [5, 6])
+        self.assertEqual(_records[0]['start'], '2020-09-22T12:36:40Z')
+
+# The transmissions the simulated device makes are logged
+class TestLogged(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self._vc = Controller(self._scratch)
+        self._vc.model = Model(self._vc, False)
+        self._device = SimDevice(0, start = 1600000080)
+        self._vc.model.attach('sim', self._device)
+
+    def tearDown(self):
+        self._vc.shutdown()
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def test_logged(self):
+        for _s in range(10 * 60):
+            if _s % 120 == 30:
+                self._vc.model.sendPort('CCM', 'G') # asked while transmitting
+            self._device.advance(1)
+            while self._vc.model.waiting() > 0:
+                self._vc.step()
+        _records = list(self._vc.txlog.query())
+        # One record a transmission, however the device's mode is asked for
+        self.assertEqual([_r['band'] for _r in _records], [6, 7, 6, 7, 6])
+        self.assertEqual(set((_r['call'], _r['locator'], _r['power']) for _r in _records),
+                         set([('N0CALL', 'JO65', 23)]))
+        for _r in _records:
+            self.assertGreaterEqual(_r['end'], _r['start'])
@@ -0,0 +1,116 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The View interface, and the Views that answer it
+"""
+
+import inspect
+import shutil
+import tempfile
+import unittest
+from wsprtx import gui
+from wsprtx.controller import Controller
+from wsprtx.model import Model
+from wsprtx.term import TermView
+from wsprtx.views import NullView, RecordingView
+from simdevice import SimDevice
+
+argspec = getattr(inspect, 'getfullargspec', None) or inspect.getargspec
+
+# A View with the commands of the interface and nothing else, so any
+# other call from the Controller fails
+class StrictView(object):
+    def __init__(self):
+        self.calls = []
+
+    def update(self):
+        return True
+
+def _strict(name):
+    def command(self, *args):
+        self.calls.append(name)
+    return command
+
+for _name in NullView.commands:
+    setattr(StrictView, _name, _strict(_name))
+
+class TestInterface(unittest.TestCase):
+    def test_commands(self):
+        # Every command is answered by NullView, once in the list
+        self.assertEqual(len(set(NullView.commands)), len(NullView.commands))
+        for _name in NullView.commands:
+            self.assertTrue(callable(getattr(NullView, _name, None)), _name)
+        self.assertIsNone(NullView().setCall('K1ABC'))
+        self.assertTrue(NullView().update())
+
+    def test_views(self):
+        # The Views take the same arguments for each command as the interface
+        _views = [RecordingView, TermView]
+        if gui.ttk is not None:
+            _views.append(gui.View)
+        for _view in _views:
+            for _name in NullView.commands:
+                _args = argspec(getattr(NullView, _name))
+                _theirs = argspec(getattr(_view, _name))
+                if _theirs[1] is not None: # a recorder takes any arguments
+                    continue
+                self.assertEqual(len(_theirs[0]), len(_args[0]), '{}.{}'.format(_view.__name__, _name))
+
+    def test_stale_names(self):
+        self.assertEqual(NullView.staleNames(['DCS', 'OBD06', 'OBD07', 'FSV', 'FSR', 'XYZ']),
+                         ['call', 'firmware', '20m band', '17m band', 'XYZ'])
+        self.assertEqual(NullView.staleNames([]), [])
+
+class TestRecordingView(unittest.TestCase):
+    def test_recorded(self):
+        _view = RecordingView(limit = 3)
+        _view.setCall('K1ABC')
+        _view.setBandEnabled(6, True)
+        _view.setStale(['DCS'], 10)
+        _view.setCall('W1OT')
+        self.assertEqual(list(_view.calls), [('setBandEnabled', (6, True)), ('setStale', (['DCS'], 10)),
+                                             ('setCall', ('W1OT',))])
+        self.assertEqual(_view.counts['setCall'], 2)
+        self.assertEqual(_view.setCall.__name__, 'setCall')
+        _view.clear()
+        self.assertEqual((len(_view.calls), sum(_view.counts.values())), (0, 0))
+
+    def test_separate(self):
+        # Each RecordingView keeps its own
+        _a = RecordingView()
+        _b = RecordingView()
+        _a.tx(1)
+        self.assertEqual(len(_b.calls), 0)
+
+class TestController(unittest.TestCase):
+    def setUp(self):
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self._vc = Controller(self._scratch)
+        self._vc.model = Model(self._vc, False)
+        self._vc.view = self.view = StrictView()
+        self.device = SimDevice(0)
+        self._vc.model.attach('sim', self.device)
+
+    def tearDown(self):
+        self._vc.shutdown()
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def drive(self, seconds):
+        for _n in range(seconds):
+            self.device.advance(1)
+        while self._vc.model.waiting() > 0:
+            self._vc.step()
+            self.view.update()
+
+    def test_interface(self):
+        # The Controller only gives the View the commands of the interface
+        self.drive(30)
+        self._vc.startPressed()
+        self.drive(600)
+        self._vc.stopPressed()
+        self.drive(5)
+        for _name in ['setCall', 'setLocation', 'updateTime', 'satdata', 'setRxChars', 'tx', 'setProgress']:
+            self.assertIn(_name, self.view.calls)
+
+if __name__ == '__main__':
+    unittest.main()
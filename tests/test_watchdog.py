@@ -0,0 +1,118 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The watchdog, noticing a dead link to the device and reopening the port
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from wsprtx import watchdog
+from wsprtx.controller import Controller
+from wsprtx.model import Model
+from wsprtx.views import RecordingView
+from simdevice import SimDevice
+
+# A stream keeping what is written to it
+class Lines(list):
+    def write(self, text):
+        self.append(text)
+
+class TestWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self._monotonic = watchdog.monotonic
+        watchdog.monotonic = lambda: self.now
+        self._stderr = sys.stderr
+        sys.stderr = self.said = Lines()
+        self._scratch = tempfile.mkdtemp(prefix = 'WSPR_test')
+        self._vc = Controller(self._scratch)
+        self._vc.view = RecordingView()
+        self.model = self._vc.model = Model(self._vc, False)
+        self.device = SimDevice(0)
+        self.model.attach('sim', self.device)
+        self.dog = self._vc.watchdog
+        # The port reopens when the test says it may
+        self.reopens = []
+        self.back = None
+        self.model.reopen = self.reopen
+
+    def tearDown(self):
+        watchdog.monotonic = self._monotonic
+        sys.stderr = self._stderr
+        self._vc.shutdown()
+        shutil.rmtree(self._scratch, ignore_errors = True)
+
+    def reopen(self, name):
+        self.reopens.append(self.now)
+        if self.back is None:
+            return False
+        self.model.attach(name, self.back)
+        return True
+
+    def wait(self, seconds):
+        # The main loop, once a second
+        for _n in range(int(seconds)):
+            self.now += 1
+            self.dog.check()
+
+    def test_silent(self):
+        self.dog.check()
+        self.assertTrue(self.dog.up)
+        self.wait(15)
+        self.assertEqual(self.device.sent, [])
+        self.wait(1) # half way, the device is asked for its mode
+        self.assertEqual(self.device.sent, ['[CCM] G'])
+        self.wait(14)
+        self.assertTrue(self.dog.up)
+        self.wait(1)
+        self.assertFalse(self.dog.up)
+        self.assertEqual(self.model.portName, 'None')
+        self.assertEqual(self.model.wanted, 'sim') # still wanted
+        self.assertEqual(self.model.failed, 'no data for 31 seconds')
+        self.assertEqual(self._vc.metrics.get('link_outages_total'), 1)
+        self.assertIn(('logInsert', ('Link down: no data for 31 seconds',)), self._vc.view.calls)
+
+    def test_heard(self):
+        # A device that talks keeps the link up
+        self.dog.check()
+        for _n in range(60):
+            self.wait(1)
+            self.dog.heard()
+        self.assertTrue(self.dog.up)
+        self.assertEqual(self.device.sent, [])
+
+    def test_backoff(self):
+        self.dog.check()
+        self.model.fail(IOError('unplugged'))
+        self.dog.check()
+        self.assertFalse(self.dog.up)
+        self.wait(200)
+        # Tried again after 1, 2, 4 ... seconds, and at most a minute apart
+        _gaps = [_b - _a for _a, _b in zip([1000.0] + self.reopens, self.reopens)]
+        self.assertEqual(_gaps, [1, 2, 4, 8, 16, 32, 60, 60])
+
+    def test_restored(self):
+        self.dog.check()
+        self.model.fail(IOError('unplugged'))
+        self.dog.check()
+        self.wait(5)
+        self.back = SimDevice(0)
+        self.wait(5)
+        self.assertTrue(self.dog.up)
+        self.assertEqual(self.model.portName, 'sim')
+        self.assertEqual(self._vc.metrics.get('link_reconnects_total'), 1)
+        self.assertEqual(self._vc.metrics.get('link_outage_seconds'), 7)
+        # Only the mode and the transmit state are asked for, the rest is kept
+        self.assertEqual(self.back.sent, ['[CCM] G', '[TON] G'])
+        self.assertIn('Link to sim restored after 7.0 seconds\n', self.said)
+        self.assertIn(('logInsert', ('Link up: restored',)), self._vc.view.calls)
+
+    def test_not_wanted(self):
+        # A port closed by the user is left closed
+        self.dog.check()
+        self.model.portName = 'None'
+        self.wait(10)
+        self.assertFalse(self.dog.up)
+        self.assertEqual(self.reopens, [])
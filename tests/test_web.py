@@ -0,0 +1,116 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+The read only status page
+"""
+
+import json
+import threading
+import time
+import unittest
+from wsprtx.common import python
+from wsprtx.model import DeviceState, Model
+from wsprtx.web import WebServer
+if python == 2:
+    import urllib2 as request
+    from urllib2 import HTTPError
+else:
+    import urllib.request as request
+    from urllib.error import HTTPError
+
+# The status page only reads the Controller's DeviceState
+class StateOnly(object):
+    def __init__(self):
+        self.state = DeviceState()
+
+    def say(self, code, data):
+        self.state.update(code, data)
+
+class TestStatus(unittest.TestCase):
+    def setUp(self):
+        self._vc = StateOnly()
+        for _code, _data in [('FPN', '01017'), ('FHV', '1'), ('FHR', '2'), ('CCM', 'W'), ('TFQ', '1409712000'),
+                             ('GLC', 'T'), ('GL4', 'FN42'), ('TBN', '07')]:
+            self._vc.say(_code, _data)
+        self.web = WebServer(self._vc)
+
+    def test_fields(self):
+        _s = self.web.status(0)
+        self.assertEqual(_s['version'], 8)
+        _f = _s['fields']
+        self.assertEqual(_f['model'], 'WSPR Mini')
+        self.assertEqual(_f['hardware'], '1 rev 2')
+        self.assertEqual(_f['firmware'], None)
+        self.assertEqual(_f['mode'], 'WSPR Beacon')
+        self.assertEqual(_f['frequency'], 14097120.0)
+        self.assertEqual(_f['gps_lock'], True)
+        self.assertEqual(_f['next_band'], Model.bands()[7])
+        self.assertEqual(_f['progress'], {'state': 'idle', 'band': None, 'seconds': 0})
+
+    def test_changes(self):
+        _v = self.web.status(0)['version']
+        self._vc.say('TWS', '06 012')
+        self._vc.say('TON', 'T')
+        _s = self.web.status(_v)
+        self.assertEqual(sorted(_s['fields']), ['progress', 'tx'])
+        self.assertEqual(_s['fields']['progress'], {'state': 'transmitting', 'band': Model.bands()[6], 'seconds': 12})
+        self._vc.say('MPS', '60')
+        self.assertEqual(self.web.status(_s['version'])['fields'],
+                         {'progress': {'state': 'paused', 'band': None, 'seconds': 60}})
+
+    def test_wait(self):
+        # Nothing new: the answer waits for a change, or gives no fields
+        _v = self.web.status(0)['version']
+        _start = time.time()
+        self.assertEqual(self.web.status(_v, 0.2)['fields'], {})
+        self.assertGreaterEqual(time.time() - _start, 0.2)
+        _t = threading.Timer(0.1, self._vc.say, ['DNM', 'Balloon'])
+        _t.start()
+        self.assertEqual(self.web.status(_v, 5)['fields'], {'name': 'Balloon'})
+        _t.join()
+
+    def test_restarted(self):
+        # A page from before a restart is given everything, at once
+        _start = time.time()
+        self.assertEqual(len(self.web.status(1000)['fields']), len(self.web.fields(self._vc.state)))
+        self.assertLess(time.time() - _start, 1)
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self._vc = StateOnly()
+        self._vc.say('DNM', 'Balloon')
+        self.web = WebServer(self._vc, port = 0)
+        self.web.start()
+        self.url = 'http://127.0.0.1:{}'.format(self.web._server.server_address[1])
+
+    def tearDown(self):
+        self.web.stop()
+
+    def get(self, path):
+        _r = request.urlopen(self.url + path, timeout = 5)
+        try:
+            return _r.getcode(), _r.info().get('Content-Type'), _r.read().decode('utf-8')
+        finally:
+            _r.close()
+
+    def test_pages(self):
+        _code, _type, _body = self.get('/')
+        self.assertEqual((_code, _type), (200, 'text/html; charset=utf-8'))
+        self.assertIn('/status?since=', _body)
+        _code, _type, _body = self.get('/status?since=0')
+        self.assertEqual((_code, _type), (200, 'application/json'))
+        self.assertEqual(json.loads(_body)['fields']['name'], 'Balloon')
+        _code, _type, _body = self.get('/status?since=1&wait=0')
+        self.assertEqual(json.loads(_body), {'version': 1, 'fields': {}})
+
+    def test_errors(self):
+        for _path, _code in [('/status?since=x', 400), ('/status?wait=-1', 400), ('/other', 404)]:
+            with self.assertRaises(HTTPError) as e:
+                self.get(_path)
+            self.assertEqual(e.exception.code, _code)
+
+    def test_stop(self):
+        self.web.stop()
+        self.web.stop() # twice is harmless
+        with self.assertRaises(IOError):
+            self.get('/')
@@ -0,0 +1,143 @@
+# Copyright 2021 Kendell Chilton
+# Licensed under the MIT License, see the LICENSE file
+"""
+Tooltips sharing one popup through a TipManager
+"""
+
+import unittest
+from wsprtx import widgets
+from wsprtx.widgets import TipManager
+
+# A Tk root's timers, run when the test says
+class FakeRoot(object):
+    def __init__(self):
+        self.timers = {}
+        self._n = 0
+
+    def after(self, ms, callback):
+        self._n += 1
+        self.timers[self._n] = (ms, callback)
+        return self._n
+
+    def after_cancel(self, id):
+        del self.timers[id]
+
+    def run(self):
+        for _id in sorted(self.timers):
+            self.timers.pop(_id)[1]()
+
+# The popup and its label, keeping what is done to them
+class FakeWidget(object):
+    def __init__(self):
+        self.shown = False
+        self.geometry = None
+        self.options = {}
+
+    def config(self, **options):
+        self.options.update(options)
+
+    def wm_geometry(self, geometry):
+        self.geometry = geometry
+
+    def deiconify(self):
+        self.shown = True
+
+    def withdraw(self):
+        self.shown = False
+
+    def lift(self):
+        pass
+
+class TestTipManager(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.tips = TipManager(self.root)
+        self.made = 0
+        self.tips._window = self.window # the popup is made once, when first shown
+        self.popup = FakeWidget()
+        self.label = FakeWidget()
+
+    def window(self):
+        if self.tips._popup is None:
+            self.made += 1
+            self.tips._popup = self.popup
+            self.tips._label = self.label
+        return self.tips._popup
+
+    def test_show(self):
+        self.tips.show('a', 'first', 100, 200)
+        self.assertTrue(self.popup.shown)
+        self.assertEqual(self.popup.geometry, '+100+220')
+        self.assertEqual(self.label.options, {'text': 'first', 'wraplength': 360})
+        # Another tip moves the same popup
+        self.tips.show('b', 'second', 10, 20, 180)
+        self.assertEqual(self.made, 1)
+        self.assertEqual(self.tips.owner, 'b')
+        self.assertEqual(self.label.options, {'text': 'second', 'wraplength': 180})
+
+    def test_hide(self):
+        # Hidden after the delay, unless another tip is shown first
+        self.tips.hide('a') # nothing shown yet
+        self.assertEqual(self.root.timers, {})
+        self.tips.show('a', 'first', 0, 0)
+        self.tips.hide('a')
+        self.assertEqual([_t[0] for _t in self.root.timers.values()], [TipManager.delay])
+        self.tips.show('b', 'second', 0, 0)
+        self.assertEqual(self.root.timers, {})
+        self.tips.hide('a') # not the one shown
+        self.assertEqual(self.root.timers, {})
+        self.tips.hide('b', 0)
+        self.tips.hide('b', 0)
+        self.assertEqual(len(self.root.timers), 1)
+        self.root.run()
+        self.assertFalse(self.popup.shown)
+        self.assertEqual(self.tips.owner, None)
+
+    def test_retext(self):
+        self.tips.show('a', 'first', 0, 0)
+        self.tips.retext('b', 'not shown')
+        self.assertEqual(self.label.options['text'], 'first')
+        self.tips.retext('a', 'changed')
+        self.assertEqual(self.label.options['text'], 'changed')
+
+    def test_registry(self):
+        # A tip made again for the same key is the first one
+        self.assertEqual(self.tips.register(('widget', '.a'), 'tip'), 'tip')
+        self.assertEqual(self.tips.register(('widget', '.a'), 'another'), 'tip')
+        self.tips.show('tip', 'text', 0, 0)
+        self.tips.forget(('widget', '.a'))
+        self.tips.forget(('widget', '.b'))
+        self.assertEqual(self.tips.registry, {})
+        self.assertEqual([_t[0] for _t in self.root.timers.values()], [0])
+
+# The tips on real widgets, when there is a display
+class TestToolTips(unittest.TestCase):
+    def setUp(self):
+        if not hasattr(widgets, 'Tk'):
+            self.skipTest('no tkinter')
+        try:
+            self.root = widgets.Tk()
+        except widgets.TclError as e:
+            self.skipTest('no display ({})'.format(e))
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def test_widget(self):
+        _button = widgets.Button(self.root, text = 'Call')
+        _tip = widgets.CreateToolTip(_button, 'first')
+        self.assertIs(widgets.CreateToolTip(_button, 'second'), _tip)
+        self.assertEqual(_tip.text, 'second')
+        _tips = TipManager.get(_button)
+        self.assertIs(TipManager.get(self.root), _tips)
+        _button.destroy()
+        self.assertEqual(_tips.registry, {})
+
+    def test_canvas(self):
+        _canvas = widgets.Canvas(self.root)
+        _tip = widgets.CreateCanvasTip(_canvas, 'sat', 'satellite')
+        self.assertIs(widgets.CreateCanvasTip(_canvas, 'sat', 'other'), _tip)
+        self.assertEqual(len(TipManager.get(_canvas).registry), 1)
+
+if __name__ == '__main__':
+    unittest.main()